@@ -0,0 +1,146 @@
+import csv
+import io
+import re
+from datetime import datetime
+
+import numpy as np
+import streamlit as st
+
+from backend.inventory_store import get_node_record
+from backend.traversal import DIRECTION_BOTH, traverse_from_seeds
+
+# Objects typed without a prefix are InfoObjects, as in the single-object analysis
+DEFAULT_OBJECT_TYPE = 'IOBJ'
+
+# Header names recognised as the object column of an uploaded list (first column otherwise)
+NAME_COLUMNS = ('node_id', 'object', 'object_name', 'name', 'iobjnm', 'infoobject')
+
+_SEPARATORS = re.compile(r'[\s,;]+')
+
+
+def get_seed_node_id(name):
+    """Node id of a listed object: TYPE:NAME is kept, a bare name is taken as an InfoObject"""
+    name = name.strip().strip('"\'').strip()
+    if not name:
+        return None
+    if ':' in name:
+        obj_type, obj_name = name.split(':', 1)
+        return f"{obj_type.strip().upper()}:{obj_name.strip()}"
+    return f"{DEFAULT_OBJECT_TYPE}:{name}"
+
+
+def parse_object_names(text):
+    """Distinct node ids of a pasted object list (newline, comma, semicolon or blank separated)"""
+    node_ids = (get_seed_node_id(token) for token in _SEPARATORS.split(text or ''))
+    return list(dict.fromkeys(node_id for node_id in node_ids if node_id))
+
+
+def read_object_names_csv(content):
+    """Distinct node ids of an uploaded CSV: the object column when a header names it, the first column otherwise"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig', errors='replace')
+    rows = [row for row in csv.reader(io.StringIO(content)) if row and any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = next((header.index(name) for name in NAME_COLUMNS if name in header), None)
+    if column is not None:
+        rows = rows[1:]
+    column = column or 0
+
+    node_ids = (get_seed_node_id(row[column]) for row in rows if len(row) > column)
+    return list(dict.fromkeys(node_id for node_id in node_ids if node_id))
+
+
+def analyze_batch_impact(self, seed_nodes, depth, connection_types, direction=DIRECTION_BOTH):
+    """Consolidated impact of several objects (e.g. a transport request) from one multi-seed traversal
+
+    Every object reached within depth levels of any seed is listed once, with the
+    shortest distance to the list and the seeds that reach it. Seeds reached by other
+    seeds are kept and flagged, since they are part of the impact too.
+    """
+    graph = st.session_state.graph
+    seeds = [node_id for node_id in dict.fromkeys(seed_nodes) if node_id in graph.nodes]
+    missing = [node_id for node_id in dict.fromkeys(seed_nodes) if node_id not in graph.nodes]
+    if not seeds:
+        return None
+
+    traversal = traverse_from_seeds(graph, seeds, depth, connection_types, direction)
+    seed_positions = {node_id: column for column, node_id in enumerate(traversal.seeds)}
+    seed_matrix = traversal.get_seed_matrix()
+
+    # A seed does not impact itself
+    for row, node_id in enumerate(traversal.get_node_ids()):
+        column = seed_positions.get(node_id)
+        if column is not None:
+            seed_matrix[row, column] = False
+    impacted_rows = np.flatnonzero(seed_matrix.any(axis=1))
+
+    impacted_objects = []
+    by_type = {}
+    for row in impacted_rows:
+        node_id = traversal.adjacency.node_ids[traversal.reached[row]]
+        node_data = get_node_record(graph, node_id) or {}
+        obj_type, obj_name = node_id.split(':', 1)
+        reached_by = [traversal.seeds[column] for column in np.flatnonzero(seed_matrix[row])]
+        impacted_objects.append({
+            'node_id': node_id,
+            'name': node_data.get('name', obj_name),
+            'type': obj_type,
+            'type_name': node_data.get('type_name', obj_type),
+            'category': node_data.get('category', ''),
+            'owner': node_data.get('owner', 'Unknown'),
+            'infoarea': node_data.get('infoarea', 'UNASSIGNED'),
+            'min_depth': int(traversal.other_depths[row]),
+            'seed_count': len(reached_by),
+            'reached_by': reached_by,
+            'in_transport': node_id in seed_positions
+        })
+        by_type[obj_type] = by_type.get(obj_type, 0) + 1
+
+    # Objects hit by most of the transport first, then the closest ones
+    impacted_objects.sort(key=lambda obj: (-obj['seed_count'], obj['min_depth'], obj['node_id']))
+    per_seed = {node_id: int(count) for node_id, count in zip(traversal.seeds, seed_matrix.sum(axis=0))}
+
+    return {
+        'seeds': seeds,
+        'missing': missing,
+        'impacted_objects': impacted_objects,
+        'by_type': dict(sorted(by_type.items(), key=lambda item: -item[1])),
+        'per_seed': per_seed,
+        'total_impacted': len(impacted_objects),
+        'shared_impacted': sum(1 for obj in impacted_objects if obj['seed_count'] > 1),
+        'analysis_depth': depth,
+        'connection_types': list(connection_types or [])
+    }
+
+
+def prepare_batch_impact_csv(self, results):
+    """Prepare CSV export of a batch impact analysis"""
+
+    csv_data = []
+
+    csv_data.append("Batch Impact Analysis Report")
+    csv_data.append(f"Analysis Date,{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    csv_data.append(f"Analyzed Objects,{len(results['seeds'])}")
+    csv_data.append(f"Objects Not Found,{len(results['missing'])}")
+    csv_data.append(f"Total Impacted Objects,{results['total_impacted']}")
+    csv_data.append(f"Analysis Depth,{results['analysis_depth']}")
+    csv_data.append("")
+
+    csv_data.append("Analyzed Objects")
+    csv_data.append("Object,Impacted Objects")
+    for node_id, count in results['per_seed'].items():
+        csv_data.append(f"{node_id},{count}")
+    for node_id in results['missing']:
+        csv_data.append(f"{node_id},NOT FOUND")
+    csv_data.append("")
+
+    csv_data.append("Impacted Objects")
+    csv_data.append("Object Name,Object Type,Category,Owner,InfoArea,Min Depth,Reached By Count,In Transport,Reached By")
+    for obj in results['impacted_objects']:
+        csv_data.append(f"{obj['name']},{obj['type_name']},{obj['category']},{obj['owner']},{obj['infoarea']}"
+                        f",{obj['min_depth']},{obj['seed_count']},{'Yes' if obj['in_transport'] else 'No'},{';'.join(obj['reached_by'])}")
+
+    return "\n".join(csv_data)
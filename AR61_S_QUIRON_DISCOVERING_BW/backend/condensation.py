@@ -0,0 +1,165 @@
+import numpy as np
+
+from backend.csr_graph import get_indptr
+from backend.node_interner import get_graph_attributes
+from backend.traversal import get_typed_adjacency
+
+# Key under which the condensations of a graph travel with it (graph.graph attributes),
+# one per set of edge types
+CONDENSATION_GRAPH_KEY = 'flow_condensation'
+
+# Edges along which data actually flows; usage edges only describe a provider's structure
+FLOW_EDGE_TYPES = ('transformation', 'source_connection')
+
+
+class Condensation:
+    """Strongly connected components of the edges of some types, numbered in topological order
+
+    Only nodes touched by those edges get a component (-1 otherwise). Component ids
+    follow a topological order of the condensed DAG, so every DAG edge goes from a
+    lower to a higher id and a single pass over the ids in order is a DAG sweep.
+    Members and DAG successors are kept as CSR arrays indexed by component.
+    """
+
+    def __init__(self, graph, edge_types=FLOW_EDGE_TYPES):
+        adjacency = get_typed_adjacency(graph)
+        self.adjacency = adjacency
+        self.edge_types = tuple(edge_types)
+
+        sources, targets = adjacency.get_edges(edge_types)
+        touched = np.unique(np.concatenate([sources, targets])).astype(np.int32)
+        local = np.full(len(adjacency), -1, dtype=np.int32)
+        local[touched] = np.arange(len(touched), dtype=np.int32)
+        local_sources, local_targets = local[sources], local[targets]
+
+        order = np.argsort(local_sources, kind='stable')
+        closed, count = strongly_connected_components(get_indptr(local_sources[order], len(touched)), local_targets[order])
+        # Tarjan closes components sinks first: reversing the numbering gives a topological order
+        components = (count - 1 - closed).astype(np.int32)
+        self.component_count = count
+        self.components = np.full(len(adjacency), -1, dtype=np.int32)
+        self.components[touched] = components
+
+        member_order = np.argsort(components, kind='stable')
+        self.members = touched[member_order]
+        self.member_ptr = get_indptr(components[member_order], count)
+
+        edge_sources, edge_targets = components[local_sources], components[local_targets]
+        cross = edge_sources != edge_targets
+        pairs = np.unique(edge_sources[cross].astype(np.int64) * max(count, 1) + edge_targets[cross])
+        self.dag_indptr = get_indptr((pairs // max(count, 1)).astype(np.int64), count)
+        self.dag_indices = (pairs % max(count, 1)).astype(np.int32)
+
+        # Components of several nodes, or a single node with an edge to itself
+        self.cyclic = np.diff(self.member_ptr) > 1
+        self.cyclic[edge_sources[~cross]] = True
+
+    def __len__(self):
+        return self.component_count
+
+    def get_component(self, node_id):
+        """Component id of a node (-1 when none of the edges touches it)"""
+        code = self.adjacency.get_code(node_id)
+        return int(self.components[code]) if code >= 0 else -1
+
+    def get_members(self, component):
+        """Node ids of a component"""
+        start, stop = self.member_ptr[component], self.member_ptr[component + 1]
+        return [self.adjacency.node_ids[code] for code in self.members[start:stop]]
+
+    def get_successors(self, component):
+        """Components directly downstream of a component in the condensed DAG"""
+        return self.dag_indices[self.dag_indptr[component]:self.dag_indptr[component + 1]]
+
+    def is_cyclic(self, node_id):
+        component = self.get_component(node_id)
+        return component >= 0 and bool(self.cyclic[component])
+
+    def count_cycles(self):
+        return int(np.count_nonzero(self.cyclic))
+
+    def get_cycles(self, limit=None):
+        """Node ids of every cyclic component, largest first"""
+        cyclic = np.flatnonzero(self.cyclic)
+        sizes = np.diff(self.member_ptr)[cyclic]
+        ordered = cyclic[np.argsort(-sizes, kind='stable')]
+        return [self.get_members(component) for component in ordered[:limit]]
+
+    def get_topological_nodes(self):
+        """Node ids ordered so that every edge between different components points forward"""
+        return [self.adjacency.node_ids[code] for code in self.members]
+
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.components, self.members, self.member_ptr,
+                                              self.dag_indptr, self.dag_indices, self.cyclic))
+
+
+def strongly_connected_components(indptr, indices):
+    """Tarjan's algorithm on a CSR digraph with an explicit stack (no recursion limit on long chains)
+
+    Returns (component of every node, component count); components are numbered in the
+    order they are closed, which is a reverse topological order of the condensation.
+    """
+    node_count = len(indptr) - 1
+    indptr, indices = indptr.tolist(), indices.tolist()
+    index, low = [-1] * node_count, [0] * node_count
+    on_stack, component = [False] * node_count, [-1] * node_count
+    stack, counter, count = [], 0, 0
+
+    for root in range(node_count):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, indptr[root])]
+
+        while work:
+            node, position = work[-1]
+            end = indptr[node + 1]
+            while position < end:
+                successor = indices[position]
+                position += 1
+                if index[successor] < 0:
+                    # Descend: remember where to resume this node's edges
+                    work[-1] = (node, position)
+                    index[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    work.append((successor, indptr[successor]))
+                    break
+                if on_stack[successor] and index[successor] < low[node]:
+                    low[node] = index[successor]
+            else:
+                work.pop()
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = count
+                        if member == node:
+                            break
+                    count += 1
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+    return np.asarray(component, dtype=np.int32), count
+
+
+def get_condensation(graph, edge_types=FLOW_EDGE_TYPES):
+    """Condensation of a graph over some edge types, built on first use and kept with the graph"""
+    graph_attributes = get_graph_attributes(graph)
+    condensations = graph_attributes.setdefault(CONDENSATION_GRAPH_KEY, {}) if graph_attributes is not None else {}
+    key = tuple(sorted(edge_types))
+    condensation = condensations.get(key)
+    # Patches replace the adjacency index, which retires every condensation built on it
+    if condensation is not None and condensation.adjacency is get_typed_adjacency(graph):
+        return condensation
+
+    condensation = Condensation(graph, edge_types)
+    condensations[key] = condensation
+    return condensation
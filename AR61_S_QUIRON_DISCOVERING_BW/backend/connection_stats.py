@@ -0,0 +1,94 @@
+import numpy as np
+
+from backend.node_interner import get_graph_attributes, get_node_interner
+
+# Key under which the connection statistics computed at load travel with the graph (graph.graph attributes)
+CONNECTION_STATS_GRAPH_KEY = 'connection_stats'
+
+# Lower bound of every connection level but the first; np.digitize maps a degree to its level
+CONNECTION_LEVELS = ('0 (Isolated)', '1-5', '6-10', '11-20', '21-50', '50+')
+CONNECTION_LEVEL_BOUNDS = np.array([1, 6, 11, 21, 51])
+
+
+class ConnectionStats:
+    """Connection statistics of a dataset, computed from the interner degree arrays
+
+    Degrees are aligned with the inventory codes, so the per-type figures are plain
+    bincounts over the type code of every row. The statistics belong to one interner:
+    a patched dataset gets a new interner and therefore new statistics.
+    """
+
+    def __init__(self, global_inventory, graph):
+        interner = get_node_interner(global_inventory, graph)
+        self.interner = interner
+        degrees = interner.get_degrees('degree').astype(np.int64)
+        type_codes = interner.type_codes
+        type_count = len(interner.types)
+        connected = degrees > 0
+
+        type_totals = np.bincount(type_codes, minlength=type_count)
+        type_connected = np.bincount(type_codes, weights=connected, minlength=type_count).astype(np.int64)
+        type_connections = np.bincount(type_codes, weights=degrees, minlength=type_count).astype(np.int64)
+        level_counts = np.bincount(np.digitize(degrees, CONNECTION_LEVEL_BOUNDS), minlength=len(CONNECTION_LEVELS))
+
+        total_objects = len(degrees)
+        connected_objects = int(np.count_nonzero(connected))
+        self.values = {
+            'total_objects': total_objects,
+            'connected_objects': connected_objects,
+            'isolated_objects': total_objects - connected_objects,
+            'overall_connected_percentage': 0.0,
+            'isolated_percentage': 0.0,
+            'connection_level_distribution': dict(zip(CONNECTION_LEVELS, level_counts.tolist())),
+            'by_object_type': {},
+            'average_connections': 0.0,
+            'max_connections': 0,
+            'most_connected_object': None
+        }
+
+        for type_code, obj_type in enumerate(interner.types):
+            total, type_connected_count = int(type_totals[type_code]), int(type_connected[type_code])
+            self.values['by_object_type'][obj_type] = {
+                'total': total,
+                'connected': type_connected_count,
+                'isolated': total - type_connected_count,
+                'connected_percentage': (type_connected_count / total) * 100 if total else 0.0,
+                'average_connections': int(type_connections[type_code]) / total if total else 0.0,
+                'total_connections': int(type_connections[type_code])
+            }
+
+        if total_objects:
+            self.values['overall_connected_percentage'] = (connected_objects / total_objects) * 100
+            self.values['isolated_percentage'] = (self.values['isolated_objects'] / total_objects) * 100
+            self.values['average_connections'] = int(degrees.sum()) / total_objects
+
+            # argmax keeps the first object in inventory order among the most connected ones
+            code = int(np.argmax(degrees))
+            if degrees[code] > 0:
+                obj_type = interner.get_type(code)
+                obj = global_inventory[obj_type][code - interner.type_ranges[obj_type][0]]
+                self.values['max_connections'] = int(degrees[code])
+                self.values['most_connected_object'] = {
+                    'name': obj['name'],
+                    'type': obj['type_name'],
+                    'connections': int(degrees[code])
+                }
+
+
+def index_connection_stats(global_inventory, graph):
+    """Compute the connection statistics of a freshly built or patched graph and keep them with it"""
+    stats = ConnectionStats(global_inventory, graph)
+    graph.graph[CONNECTION_STATS_GRAPH_KEY] = stats
+    return stats
+
+
+def get_connection_stats(global_inventory, graph):
+    """Connection statistics of a dataset, recomputed only when its interner has been replaced"""
+    graph_attributes = get_graph_attributes(graph)
+    stats = graph_attributes.get(CONNECTION_STATS_GRAPH_KEY) if graph_attributes is not None else None
+    if stats is not None and stats.interner is get_node_interner(global_inventory, graph):
+        return stats.values
+
+    if graph_attributes is None:
+        return ConnectionStats(global_inventory, graph).values
+    return index_connection_stats(global_inventory, graph).values
@@ -0,0 +1,241 @@
+import numpy as np
+import networkx as nx
+
+from backend.edge_store import EdgeTable, GRAPH_EDGE_KEYS
+from backend.inventory_store import get_node_attributes
+from backend.node_interner import NodeInterner, index_graph_nodes
+
+# Graph engines selectable at load time
+GRAPH_ENGINE_NETWORKX = 'networkx'
+GRAPH_ENGINE_CSR = 'csr'
+GRAPH_ENGINES = {
+    GRAPH_ENGINE_NETWORKX: 'NetworkX (editable)',
+    GRAPH_ENGINE_CSR: 'CSR arrays (read-only, fastest traversal)'
+}
+
+
+class CSRNodeView:
+    """Read-only stand-in for graph.nodes: membership, iteration and attribute lookup"""
+
+    __slots__ = ('_graph',)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __contains__(self, node_id):
+        return node_id in self._graph.interner
+
+    def __iter__(self):
+        return self._graph.interner.iter_node_ids()
+
+    def __len__(self):
+        return self._graph.number_of_nodes()
+
+    def __getitem__(self, node_id):
+        attributes = self.get(node_id)
+        if attributes is None:
+            raise KeyError(node_id)
+        return attributes
+
+    def get(self, node_id, default=None):
+        code = self._graph.interner.get_code(node_id)
+        return self._graph.get_node_attributes(code) if code >= 0 else default
+
+    def __call__(self, data=False):
+        if not data:
+            return iter(self)
+        return ((node_id, self[node_id]) for node_id in self)
+
+
+class CSRGraph:
+    """Read-only directed graph over compressed sparse row arrays
+
+    Node codes are the NodeInterner codes. The forward arrays hold, for every code,
+    its successors in indices[indptr[code]:indptr[code + 1]] (sorted) with the edge
+    kind of each entry in kinds; the reverse arrays hold the predecessors the same
+    way. Like a NetworkX DiGraph there is a single edge per ordered node pair, with
+    the attributes of the last relationship seen for it.
+    """
+
+    def __init__(self, global_inventory, interner, indptr, indices, kinds, rev_indptr, rev_indices, rev_kinds, kind_attributes):
+        self.global_inventory = global_inventory
+        self.interner = interner
+        self.indptr = indptr
+        self.indices = indices
+        self.kinds = kinds
+        self.rev_indptr = rev_indptr
+        self.rev_indices = rev_indices
+        self.rev_kinds = rev_kinds
+        self.kind_attributes = kind_attributes
+        self.graph = {}
+        self.nodes = CSRNodeView(self)
+        self._node_count = sum(1 for _ in interner.iter_node_ids())
+
+        # Duplicate inventory rows share the node of their first occurrence
+        canonical = interner.get_canonical_codes()
+        out_degrees = np.diff(indptr).astype(np.int32)[canonical]
+        in_degrees = np.diff(rev_indptr).astype(np.int32)[canonical]
+        self._degrees = {'degree': out_degrees + in_degrees, 'in_degree': in_degrees, 'out_degree': out_degrees}
+
+    @classmethod
+    def from_dataset(cls, global_inventory, relationships):
+        """Build the CSR arrays from the inventory and the edge table (lists of dicts are encoded first)"""
+        if not isinstance(relationships, EdgeTable):
+            relationships = EdgeTable.from_records(relationships)
+
+        interner = NodeInterner(global_inventory)
+        node_count = len(interner)
+
+        # Edges are re-coded into interner codes; endpoints outside the inventory are dropped
+        remap = interner.encode(relationships.nodes)
+        src = remap[relationships.src] if len(remap) else np.empty(0, dtype=np.int32)
+        dst = remap[relationships.dst] if len(remap) else np.empty(0, dtype=np.int32)
+        valid = (src >= 0) & (dst >= 0)
+        src, dst, kinds = src[valid], dst[valid], relationships.kind[valid]
+
+        # Keep the last edge of every (source, target) pair, ordered by source then target
+        keys = src.astype(np.int64) * node_count + dst
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        order = order[np.append(sorted_keys[1:] != sorted_keys[:-1], True)] if len(order) else order
+        src, dst, kinds = src[order], dst[order], kinds[order]
+
+        reverse = np.argsort(dst.astype(np.int64) * node_count + src, kind='stable')
+        kind_attributes = [{key: kind[key] for key in GRAPH_EDGE_KEYS} for kind in relationships.kinds]
+
+        graph = cls(
+            global_inventory, interner,
+            get_indptr(src, node_count), dst.astype(np.int32), kinds,
+            get_indptr(dst, node_count), src[reverse].astype(np.int32), kinds[reverse],
+            kind_attributes
+        )
+        index_graph_nodes(global_inventory, graph, interner)
+        return graph
+
+    # Structure
+    def __len__(self):
+        return self._node_count
+
+    def __contains__(self, node_id):
+        return node_id in self.interner
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def number_of_nodes(self):
+        return self._node_count
+
+    def number_of_edges(self):
+        return len(self.indices)
+
+    def is_directed(self):
+        return True
+
+    def is_multigraph(self):
+        return False
+
+    def get_code(self, node_id):
+        """Interner code of a node, raising like NetworkX for unknown nodes"""
+        code = self.interner.get_code(node_id)
+        if code < 0:
+            raise nx.NetworkXError(f"The node {node_id} is not in the digraph.")
+        return code
+
+    def get_node_attributes(self, code):
+        """Node attributes of a code, served from the inventory row it was built from"""
+        obj_type = self.interner.get_type(code)
+        start, _ = self.interner.type_ranges[obj_type]
+        return get_node_attributes(self.global_inventory[obj_type][code - start])
+
+    # Integer adjacency, used by the traversal code
+    def successor_codes(self, code):
+        return self.indices[self.indptr[code]:self.indptr[code + 1]]
+
+    def predecessor_codes(self, code):
+        return self.rev_indices[self.rev_indptr[code]:self.rev_indptr[code + 1]]
+
+    def successor_kinds(self, code):
+        return self.kinds[self.indptr[code]:self.indptr[code + 1]]
+
+    def predecessor_kinds(self, code):
+        return self.rev_kinds[self.rev_indptr[code]:self.rev_indptr[code + 1]]
+
+    def find_edge(self, source_code, target_code):
+        """Position of an edge in the forward arrays, or -1"""
+        start, stop = self.indptr[source_code], self.indptr[source_code + 1]
+        position = start + np.searchsorted(self.indices[start:stop], target_code)
+        return int(position) if position < stop and self.indices[position] == target_code else -1
+
+    # NetworkX-compatible subset
+    def successors(self, node_id):
+        return iter(self.interner.decode(self.successor_codes(self.get_code(node_id))))
+
+    def predecessors(self, node_id):
+        return iter(self.interner.decode(self.predecessor_codes(self.get_code(node_id))))
+
+    neighbors = successors
+
+    def has_edge(self, source, target):
+        source_code, target_code = self.interner.get_code(source), self.interner.get_code(target)
+        return source_code >= 0 and target_code >= 0 and self.find_edge(source_code, target_code) >= 0
+
+    def get_edge_data(self, source, target, default=None):
+        source_code, target_code = self.interner.get_code(source), self.interner.get_code(target)
+        if source_code < 0 or target_code < 0:
+            return default
+        position = self.find_edge(source_code, target_code)
+        return dict(self.kind_attributes[self.kinds[position]]) if position >= 0 else default
+
+    def edges(self, nbunch=None, data=False):
+        """Out-edges of one node (or of every node) as (source, target[, attributes]) tuples"""
+        if nbunch is None:
+            node_ids = self.nodes
+        elif nbunch in self:
+            node_ids = [nbunch]
+        else:
+            node_ids = [node_id for node_id in nbunch if node_id in self]
+        for node_id in node_ids:
+            code = self.get_code(node_id)
+            for position in range(self.indptr[code], self.indptr[code + 1]):
+                target = self.interner.node_ids[self.indices[position]]
+                yield (node_id, target, dict(self.kind_attributes[self.kinds[position]])) if data else (node_id, target)
+
+    def _degree_view(self, kind, node_id):
+        degrees = self.get_degree_array(kind)
+        if node_id is not None:
+            return int(degrees[self.get_code(node_id)])
+        return ((node, int(degrees[self.interner.get_code(node)])) for node in self.nodes)
+
+    def degree(self, node_id=None):
+        return self._degree_view('degree', node_id)
+
+    def in_degree(self, node_id=None):
+        return self._degree_view('in_degree', node_id)
+
+    def out_degree(self, node_id=None):
+        return self._degree_view('out_degree', node_id)
+
+    def get_degree_array(self, kind='degree', node_ids=None):
+        """Degree of every interner code, or of the given node ids (self-loops count twice in 'degree', as in NetworkX)"""
+        degrees = self._degrees[kind]
+        if node_ids is None or node_ids is self.interner.node_ids:
+            return degrees
+        codes = self.interner.encode(node_ids)
+        return np.where(codes >= 0, degrees[codes], 0).astype(np.int32)
+
+    def nbytes(self):
+        """Memory held by the adjacency arrays"""
+        arrays = (self.indptr, self.indices, self.kinds, self.rev_indptr, self.rev_indices, self.rev_kinds)
+        return sum(array.nbytes for array in arrays)
+
+
+def get_indptr(codes, node_count):
+    """CSR row pointers for edges sorted by the given endpoint codes"""
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=node_count), out=indptr[1:])
+    return indptr
+
+
+def get_graph_engine(graph):
+    """Engine a loaded graph was built with"""
+    return GRAPH_ENGINE_CSR if isinstance(graph, CSRGraph) else GRAPH_ENGINE_NETWORKX
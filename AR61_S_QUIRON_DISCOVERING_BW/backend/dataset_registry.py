@@ -0,0 +1,153 @@
+import time
+import threading
+import networkx as nx
+from backend.job_runner import shutdown_job_pool
+from backend.result_cache import discard_dataset_results
+
+# Process-wide registry of loaded datasets shared read-only by every Streamlit session.
+# Each entry tracks the sessions using it (with their last access time) so that
+# datasets nobody has touched for a while can be dropped to reclaim memory.
+DEFAULT_IDLE_TTL_SECONDS = 30 * 60
+
+_registry = {}
+_registry_lock = threading.RLock()
+
+
+def get_session_id():
+    """Return the current Streamlit session id, or 'local' outside a script run"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except Exception:
+        ctx = None
+    return ctx.session_id if ctx is not None else 'local'
+
+
+def get_dataset_key(fingerprint, graph_engine=None):
+    """Build the registry key for a database fingerprint (None when it cannot be shared)"""
+    if not fingerprint:
+        return None
+    dataset_key = f"{fingerprint['content_hash']}:{fingerprint['config_hash']}"
+    # Datasets held with a non-default graph engine are shared separately
+    return f"{dataset_key}:{graph_engine}" if graph_engine and graph_engine != 'networkx' else dataset_key
+
+
+def register_dataset(dataset_key, global_inventory, relationships, graph, dataset_stats):
+    """Store a freshly loaded dataset, replacing older data under the same key but keeping its sessions"""
+    with _registry_lock:
+        entry = _registry.get(dataset_key)
+        if entry is None:
+            entry = {'key': dataset_key, 'sessions': {}, 'created': time.time()}
+            _registry[dataset_key] = entry
+        entry.update({
+            'global_inventory': global_inventory,
+            'relationships': relationships,
+            'graph': graph,
+            'dataset_stats': dataset_stats,
+            'last_access': time.time()
+        })
+        # Results computed on a previous version of this dataset can no longer be hit
+        discard_dataset_results(dataset_key, keep_version=dataset_stats.get('dataset_version', 1))
+        return entry
+
+
+def acquire_dataset(dataset_key, session_id=None, now=None):
+    """Take (or refresh) a session reference on a dataset; returns the entry or None if not loaded"""
+    now = time.time() if now is None else now
+    session_id = session_id or get_session_id()
+    with _registry_lock:
+        entry = _registry.get(dataset_key)
+        if entry is None:
+            return None
+        entry['sessions'][session_id] = now
+        entry['last_access'] = now
+        return entry
+
+
+def release_dataset(dataset_key, session_id=None):
+    """Drop a session reference; the data stays cached until it has been idle long enough"""
+    session_id = session_id or get_session_id()
+    with _registry_lock:
+        entry = _registry.get(dataset_key)
+        if entry is not None:
+            entry['sessions'].pop(session_id, None)
+
+
+def evict_idle_datasets(idle_ttl=DEFAULT_IDLE_TTL_SECONDS, now=None):
+    """Forget stale session references and evict datasets without any; returns the evicted keys"""
+    now = time.time() if now is None else now
+    evicted = []
+    with _registry_lock:
+        for dataset_key, entry in list(_registry.items()):
+            # Browser tabs that were simply closed never release, so expire their references too
+            sessions = entry['sessions']
+            for session_id, last_seen in list(sessions.items()):
+                if now - last_seen > idle_ttl:
+                    del sessions[session_id]
+
+            if not sessions and now - entry['last_access'] > idle_ttl:
+                del _registry[dataset_key]
+                discard_dataset_results(dataset_key)
+                shutdown_job_pool(dataset_key)
+                evicted.append(dataset_key)
+    return evicted
+
+
+def get_registry_stats():
+    """Summarize the registry contents for display"""
+    with _registry_lock:
+        return {
+            'datasets': len(_registry),
+            'sessions': sum(len(entry['sessions']) for entry in _registry.values()),
+            'by_dataset': {
+                dataset_key: {
+                    'sessions': len(entry['sessions']),
+                    'objects': entry['dataset_stats'].get('total_objects', 0),
+                    'last_access': entry['last_access']
+                }
+                for dataset_key, entry in _registry.items()
+            }
+        }
+
+
+def clear_registry():
+    """Remove every registered dataset"""
+    with _registry_lock:
+        _registry.clear()
+
+
+def attach_session_dataset(session_state, dataset_key, entry):
+    """Point the session at a shared dataset; the session keeps references, never copies"""
+    previous_key = getattr(session_state, 'dataset_key', None)
+    if previous_key and previous_key != dataset_key:
+        release_dataset(previous_key)
+
+    session_state.dataset_key = dataset_key
+    session_state.global_inventory = entry['global_inventory']
+    session_state.relationships = entry['relationships']
+    session_state.graph = entry['graph']
+    session_state.dataset_stats = entry['dataset_stats']
+
+
+def sync_session_dataset(session_state, idle_ttl=DEFAULT_IDLE_TTL_SECONDS):
+    """Refresh this session's reference on each rerun and detach it if its dataset was evicted"""
+    evict_idle_datasets(idle_ttl)
+
+    dataset_key = getattr(session_state, 'dataset_key', None)
+    if not dataset_key:
+        return False
+
+    entry = acquire_dataset(dataset_key)
+    if entry is None:
+        # The shared dataset was evicted while this session was idle
+        session_state.dataset_key = None
+        session_state.data_loaded = False
+        session_state.global_inventory = {}
+        session_state.relationships = []
+        session_state.graph = nx.DiGraph()
+        session_state.dataset_stats = {}
+        return False
+
+    if session_state.graph is not entry['graph']:
+        attach_session_dataset(session_state, dataset_key, entry)
+    return True
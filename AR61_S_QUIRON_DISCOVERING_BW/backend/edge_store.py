@@ -0,0 +1,329 @@
+from collections.abc import Mapping, Sequence
+import numpy as np
+
+# Edge attributes that depend only on the edge kind and are kept once per kind in a side table
+KIND_KEYS = ('type', 'source_type', 'target_type', 'weight', 'color')
+
+# Row keys in the order build_edge used ('trans_id' is only present on transformations)
+ROW_KEYS = ('source', 'target', 'type', 'source_type', 'target_type', 'source_name', 'target_name', 'weight', 'color')
+TRANSFORMATION_ROW_KEYS = ROW_KEYS[:3] + ('trans_id',) + ROW_KEYS[3:]
+
+# Attributes copied onto NetworkX edges; pages only ever read the type from graph edges
+GRAPH_EDGE_KEYS = ('type', 'weight', 'color')
+
+MAX_EDGE_KINDS = np.iinfo(np.uint8).max + 1
+INITIAL_CAPACITY = 1024
+NO_TRANSFORMATION = -1
+
+
+class EdgeRow(Mapping):
+    """Read-only dict-like view of one relationship"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._table.get_value(self._index, key)
+
+    def __iter__(self):
+        return iter(self._table.get_row_keys(self._index))
+
+    def __len__(self):
+        return len(self._table.get_row_keys(self._index))
+
+    def copy(self):
+        """Materialize the relationship as a regular dict that callers may modify"""
+        return {key: self[key] for key in self}
+
+    @property
+    def index(self):
+        return self._index
+
+    def __repr__(self):
+        return f"EdgeRow({self.copy()!r})"
+
+
+class EdgeTable(Sequence):
+    """Integer-coded relationship store exposed as a sequence of dict-like rows
+
+    Endpoints are int32 codes into the node id table, the kind is a uint8 code into
+    the kind side table (type, endpoint types, weight, color) and the transformation
+    id an int32 code into the transformation id table (-1 when the edge has none).
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.kinds = []
+        self.trans_ids = []
+        self._node_index = {}
+        self._kind_index = {}
+        self._trans_index = {}
+        self._size = 0
+        self._src = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self._dst = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self._kind = np.empty(INITIAL_CAPACITY, dtype=np.uint8)
+        self._trans = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from relationship dicts (any iterable, including a streaming generator)"""
+        table = cls()
+        table.extend(records)
+        return table
+
+    # Columns, trimmed to the stored edges
+    @property
+    def src(self):
+        return self._src[:self._size]
+
+    @property
+    def dst(self):
+        return self._dst[:self._size]
+
+    @property
+    def kind(self):
+        return self._kind[:self._size]
+
+    @property
+    def trans(self):
+        return self._trans[:self._size]
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._src):
+            return
+        capacity = max(len(self._src), INITIAL_CAPACITY)
+        while capacity < needed:
+            capacity *= 2
+        for name in ('_src', '_dst', '_kind', '_trans'):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def intern_node(self, node_id):
+        """Code of a node id, adding it to the node table if needed"""
+        code = self._node_index.get(node_id)
+        if code is None:
+            code = len(self.nodes)
+            self.nodes.append(node_id)
+            self._node_index[node_id] = code
+        return code
+
+    def intern_kind(self, edge_type, source_type, target_type, weight, color):
+        """Code of an edge kind, adding it to the kind table if needed"""
+        key = (edge_type, source_type, target_type, weight, color)
+        code = self._kind_index.get(key)
+        if code is None:
+            if len(self.kinds) >= MAX_EDGE_KINDS:
+                raise ValueError(f"More than {MAX_EDGE_KINDS} distinct edge kinds")
+            code = len(self.kinds)
+            self.kinds.append(dict(zip(KIND_KEYS, key)))
+            self._kind_index[key] = code
+        return code
+
+    def intern_trans_id(self, trans_id):
+        """Code of a transformation id (-1 for edges without one)"""
+        if trans_id is None:
+            return NO_TRANSFORMATION
+        code = self._trans_index.get(trans_id)
+        if code is None:
+            code = len(self.trans_ids)
+            self.trans_ids.append(trans_id)
+            self._trans_index[trans_id] = code
+        return code
+
+    def append(self, edge):
+        """Encode one relationship dict (or row view)"""
+        self._reserve(1)
+        index = self._size
+        self._src[index] = self.intern_node(edge['source'])
+        self._dst[index] = self.intern_node(edge['target'])
+        self._kind[index] = self.intern_kind(edge['type'], edge.get('source_type'), edge.get('target_type'),
+                                             edge.get('weight'), edge.get('color'))
+        self._trans[index] = self.intern_trans_id(edge.get('trans_id'))
+        self._size += 1
+
+    def extend(self, edges):
+        """Append relationships; other tables are merged column-wise by remapping their codes"""
+        if not isinstance(edges, EdgeTable):
+            for edge in edges:
+                self.append(edge)
+            return
+
+        node_map = np.fromiter((self.intern_node(node_id) for node_id in edges.nodes), dtype=np.int32, count=len(edges.nodes))
+        kind_map = np.fromiter((self.intern_kind(*(kind[key] for key in KIND_KEYS)) for kind in edges.kinds),
+                               dtype=np.uint8, count=len(edges.kinds))
+        # The extra slot maps the "no transformation" code onto itself
+        trans_map = np.fromiter((self.intern_trans_id(trans_id) for trans_id in edges.trans_ids),
+                                dtype=np.int32, count=len(edges.trans_ids))
+        trans_map = np.append(trans_map, np.int32(NO_TRANSFORMATION))
+
+        count = len(edges)
+        self._reserve(count)
+        end = self._size + count
+        self._src[self._size:end] = node_map[edges.src]
+        self._dst[self._size:end] = node_map[edges.dst]
+        self._kind[self._size:end] = kind_map[edges.kind]
+        self._trans[self._size:end] = trans_map[edges.trans]
+        self._size = end
+
+    def copy(self):
+        """Independent copy that can be patched while readers keep using this table"""
+        table = EdgeTable.__new__(EdgeTable)
+        table.__dict__.update(self.__getstate__())
+        for name in ('nodes', 'kinds', 'trans_ids', '_node_index', '_kind_index', '_trans_index'):
+            setattr(table, name, getattr(self, name).copy())
+        return table
+
+    def retain(self, mask):
+        """Keep only the edges selected by a boolean mask, in place"""
+        keep = np.flatnonzero(mask)
+        for name in ('_src', '_dst', '_kind', '_trans'):
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+        self._size = len(keep)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [EdgeRow(self, i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('edge index out of range')
+        return EdgeRow(self, index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield EdgeRow(self, index)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(row == item for row, item in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Drop the spare capacity from pickled snapshots
+        for name in ('_src', '_dst', '_kind', '_trans'):
+            state[name] = getattr(self, name)[:self._size].copy()
+        return state
+
+    def get_row_keys(self, index):
+        """Keys of one row; only transformations carry a 'trans_id'"""
+        return ROW_KEYS if self._trans[index] == NO_TRANSFORMATION else TRANSFORMATION_ROW_KEYS
+
+    def get_value(self, index, key):
+        """Value of one cell, decoding node, kind and transformation codes"""
+        if key == 'source':
+            return self.nodes[self._src[index]]
+        if key == 'target':
+            return self.nodes[self._dst[index]]
+        if key in ('source_name', 'target_name'):
+            column = self._src if key == 'source_name' else self._dst
+            return self.nodes[column[index]].split(':', 1)[1]
+        if key == 'trans_id':
+            code = self._trans[index]
+            if code == NO_TRANSFORMATION:
+                raise KeyError(key)
+            return self.trans_ids[code]
+        if key in KIND_KEYS:
+            return self.kinds[self._kind[index]][key]
+        raise KeyError(key)
+
+    def get_node_codes(self, node_ids):
+        """Codes of the given node ids that appear in the table"""
+        codes = [self._node_index[node_id] for node_id in node_ids if node_id in self._node_index]
+        return np.asarray(codes, dtype=np.int32)
+
+    def get_kind_codes(self, edge_types):
+        """Codes of every kind whose edge type is one of the given types"""
+        edge_types = set(edge_types)
+        return np.asarray([code for code, kind in enumerate(self.kinds) if kind['type'] in edge_types], dtype=np.uint8)
+
+    def type_mask(self, edge_types):
+        """Boolean mask of the edges of the given types"""
+        return np.isin(self.kind, self.get_kind_codes(edge_types))
+
+    def touching_mask(self, node_ids):
+        """Boolean mask of the edges with either endpoint among the given node ids"""
+        codes = self.get_node_codes(node_ids)
+        return np.isin(self.src, codes) | np.isin(self.dst, codes)
+
+    def within_mask(self, node_ids):
+        """Boolean mask of the edges with both endpoints among the given node ids"""
+        codes = self.get_node_codes(node_ids)
+        return np.isin(self.src, codes) & np.isin(self.dst, codes)
+
+    def trans_mask(self, trans_ids):
+        """Boolean mask of the edges belonging to the given transformations"""
+        codes = [self._trans_index[trans_id] for trans_id in trans_ids if trans_id in self._trans_index]
+        return np.isin(self.trans, np.asarray(codes, dtype=np.int32))
+
+    def count_by_type(self):
+        """Number of edges per edge type"""
+        counts = {}
+        for code, count in enumerate(np.bincount(self.kind, minlength=len(self.kinds))):
+            if count:
+                edge_type = self.kinds[code]['type']
+                counts[edge_type] = counts.get(edge_type, 0) + int(count)
+        return counts
+
+    def iter_graph_edges(self, graph):
+        """(source, target, attributes) of the edges whose endpoints are both nodes of the graph"""
+        known = np.fromiter((node_id in graph for node_id in self.nodes), dtype=bool, count=len(self.nodes))
+        if not known.any():
+            return
+        kind_attributes = [{key: kind[key] for key in GRAPH_EDGE_KEYS} for kind in self.kinds]
+        for index in np.flatnonzero(known[self.src] & known[self.dst]):
+            yield self.nodes[self._src[index]], self.nodes[self._dst[index]], kind_attributes[self._kind[index]]
+
+    def rows(self, indices):
+        """Row views for the given edge positions"""
+        return [EdgeRow(self, int(index)) for index in indices]
+
+    def nbytes(self):
+        """Memory held by the edge columns (node and kind tables excluded)"""
+        return sum(getattr(self, name)[:self._size].nbytes for name in ('_src', '_dst', '_kind', '_trans'))
+
+
+def get_edge_attributes(rel):
+    """NetworkX edge attributes for a relationship; table rows only keep the kind attributes"""
+    if isinstance(rel, EdgeRow):
+        return {key: rel[key] for key in GRAPH_EDGE_KEYS}
+    return rel
+
+
+def count_edge_types(relationships):
+    """Number of relationships per edge type for an edge table or a list of dicts"""
+    if isinstance(relationships, EdgeTable):
+        return relationships.count_by_type()
+    counts = {}
+    for rel in relationships:
+        counts[rel['type']] = counts.get(rel['type'], 0) + 1
+    return counts
+
+
+def select_edges_within(relationships, node_ids, max_edges=0):
+    """Relationships with both endpoints in node_ids, capped at max_edges when it is positive"""
+    if isinstance(relationships, EdgeTable):
+        indices = np.flatnonzero(relationships.within_mask(node_ids))
+        if max_edges > 0:
+            indices = indices[:max_edges]
+        return relationships.rows(indices)
+
+    selected = []
+    for rel in relationships:
+        if rel['source'] in node_ids and rel['target'] in node_ids:
+            selected.append(rel)
+            if len(selected) >= max_edges and max_edges > 0:
+                break
+    return selected
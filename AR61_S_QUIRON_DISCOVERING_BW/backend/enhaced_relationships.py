@@ -1,130 +1,116 @@
 import streamlit as st
 import networkx as nx
 
-
-def analyze_enhanced_relationships(self, conn, available_tables):
+from backend.inventory_store import InventoryTable, COLUMN_DEFAULTS, get_node_attributes
+from backend.edge_store import EdgeTable, get_edge_attributes
+from backend.node_interner import NodeInterner, index_graph_nodes
+
+# Rows pulled from SQLite per fetchmany call while streaming relationship tables
+RELATIONSHIP_BATCH_SIZE = 5000
+
+# Memory allowed for one keyset page (SQLite's bounded sorter plus the rows in flight)
+RELATIONSHIP_MEMORY_BUDGET_MB = 64
+ESTIMATED_BYTES_PER_ROW = 512
+MIN_PAGE_SIZE = 1000
+
+# Optional object table columns and the inventory column they fill
+OBJECT_COLUMN_SOURCES = {
+    'OWNER': 'owner', 'INFOAREA': 'infoarea', 'ACTIVFL': 'active', 'OBJSTAT': 'status', 'CONTTIMESTMP': 'last_changed'
+}
+
+
+def build_edge(source_type, source_name, target_type, target_name, edge_type, weight, color, trans_id=None):
+    """Build a relationship record in the layout shared by the graph and the pages"""
+    source_name = source_name.strip()
+    target_name = target_name.strip()
+    edge = {
+        'source': f"{source_type}:{source_name}",
+        'target': f"{target_type}:{target_name}",
+        'type': edge_type
+    }
+    if trans_id is not None:
+        edge['trans_id'] = trans_id
+    edge.update({
+        'source_type': source_type,
+        'target_type': target_type,
+        'source_name': source_name,
+        'target_name': target_name,
+        'weight': weight,
+        'color': color
+    })
+    return edge
+
+
+def transformation_edge(self, row):
+    """Transformation between two mapped object types"""
+    source_type, source_name, target_type, target_name, trans_id = row
+
+    source_type_mapped = map_sap_type_to_our_type(self, source_type)
+    target_type_mapped = map_sap_type_to_our_type(self, target_type)
+
+    if source_type_mapped and target_type_mapped:
+        return build_edge(source_type_mapped, source_name, target_type_mapped, target_name,
+                          'transformation', 3, '#2E86C1', trans_id=trans_id)
+    return None
+
+
+def dimension_usage_edge(self, row):
+    """InfoObject used as a characteristic in an InfoCube dimension"""
+    iobj_name, cube_name = row
+    return build_edge('IOBJ', iobj_name, 'CUBE', cube_name, 'usage_dimension', 2, '#E67E22')
+
+
+def keyfigure_usage_edge(self, row):
+    """InfoObject used as a key figure in an InfoCube"""
+    iobj_name, cube_name = row
+    return build_edge('IOBJ', iobj_name, 'CUBE', cube_name, 'usage_keyfigure', 2, '#8E44AD')
+
+
+def datasource_iobj_edge(self, row):
+    """DataSource feeding an InfoObject"""
+    ds_name, iobj_name = row
+    return build_edge('DS', ds_name, 'IOBJ', iobj_name, 'source_connection', 2, '#3498DB')
+
+
+def datasource_cube_edge(self, row):
+    """Direct DataSource to InfoCube connection"""
+    isource_name, cube_name = row
+    return build_edge('DS', isource_name, 'CUBE', cube_name, 'source_connection', 3, '#16A085')
+
+
+# Relationship tables in load order; 'order' is the keyset, 'match' the columns naming objects and
+# 'required' the endpoint columns a row needs to become an edge (all default to the selected columns)
+RELATIONSHIP_SOURCES = [
+    {'table': 'RSTRAN', 'columns': ('SOURCETYPE', 'SOURCENAME', 'TARGETTYPE', 'TARGETNAME', 'TRANID'),
+     'order': ('TRANID', 'SOURCETYPE', 'SOURCENAME', 'TARGETTYPE', 'TARGETNAME'),
+     'match': ('SOURCENAME', 'TARGETNAME', 'TRANID'),
+     'required': ('SOURCENAME', 'TARGETNAME'),
+     'condition': "OBJVERS = 'A'", 'to_edge': transformation_edge},
+    {'table': 'RSDDIMEIOBJ', 'columns': ('IOBJNM', 'INFOCUBE'),
+     'condition': "OBJVERS = 'A'", 'to_edge': dimension_usage_edge},
+    {'table': 'RSDCUBEIOBJ', 'columns': ('IOBJNM', 'INFOCUBE'),
+     'condition': "OBJVERS = 'A' AND IOBJTP = 'KYF'", 'to_edge': keyfigure_usage_edge},
+    {'table': 'RSSELDONE', 'columns': ('DS_NAME', 'IOBJNM'),
+     'condition': "OBJVERS = 'A'", 'to_edge': datasource_iobj_edge},
+    {'table': 'RSDCUBEISOURCE', 'columns': ('ISOURCE', 'INFOCUBE'),
+     'condition': "OBJVERS = 'A'", 'to_edge': datasource_cube_edge},
+]
+
+
+def get_page_size(memory_budget_mb=RELATIONSHIP_MEMORY_BUDGET_MB):
+    """Translate a memory budget into the number of rows per keyset page"""
+    return max(MIN_PAGE_SIZE, int(memory_budget_mb * 1024 * 1024) // ESTIMATED_BYTES_PER_ROW)
+
+
+def analyze_enhanced_relationships(self, conn, available_tables, progress_callback=None,
+                                   memory_budget_mb=RELATIONSHIP_MEMORY_BUDGET_MB):
     """Enhanced relationship analysis with better InfoCube and InfoSource support"""
-    relationships = []
+    relationships = EdgeTable()
 
     try:
-        cursor = conn.cursor()
-
-        # Transformation relationships (enhanced)
-        if 'RSTRAN' in available_tables:
-            cursor.execute("""
-                SELECT DISTINCT SOURCETYPE, SOURCENAME, TARGETTYPE, TARGETNAME, TRANID
-                FROM RSTRAN
-                WHERE OBJVERS = 'A' AND SOURCENAME IS NOT NULL AND TARGETNAME IS NOT NULL
-                ORDER BY TRANID
-            """)
-
-            for row in cursor.fetchall():
-                source_type, source_name, target_type, target_name, trans_id = row
-
-                source_type_mapped = map_sap_type_to_our_type(self, source_type)
-                target_type_mapped = map_sap_type_to_our_type(self, target_type)
-
-                if source_type_mapped and target_type_mapped:
-                    relationships.append({
-                        'source': f"{source_type_mapped}:{source_name.strip()}",
-                        'target': f"{target_type_mapped}:{target_name.strip()}",
-                        'type': 'transformation',
-                        'trans_id': trans_id,
-                        'source_type': source_type_mapped,
-                        'target_type': target_type_mapped,
-                        'source_name': source_name.strip(),
-                        'target_name': target_name.strip(),
-                        'weight': 3,
-                        'color': '#2E86C1'
-                    })
-
-        # InfoObject usage in InfoCubes (dimensions)
-        if 'RSDDIMEIOBJ' in available_tables:
-            cursor.execute("""
-                SELECT DISTINCT IOBJNM, INFOCUBE
-                FROM RSDDIMEIOBJ
-                WHERE OBJVERS = 'A'
-                LIMIT 20000
-            """)
-
-            for iobj_name, cube_name in cursor.fetchall():
-                relationships.append({
-                    'source': f"IOBJ:{iobj_name.strip()}",
-                    'target': f"CUBE:{cube_name.strip()}",
-                    'type': 'usage_dimension',
-                    'source_type': 'IOBJ',
-                    'target_type': 'CUBE',
-                    'source_name': iobj_name.strip(),
-                    'target_name': cube_name.strip(),
-                    'weight': 2,
-                    'color': '#E67E22'
-                })
-
-        # InfoObject usage in InfoCubes (key figures)
-        if 'RSDCUBEIOBJ' in available_tables:
-            cursor.execute("""
-                SELECT DISTINCT IOBJNM, INFOCUBE
-                FROM RSDCUBEIOBJ
-                WHERE OBJVERS = 'A' AND IOBJTP = 'KYF'
-                LIMIT 15000
-            """)
-
-            for iobj_name, cube_name in cursor.fetchall():
-                relationships.append({
-                    'source': f"IOBJ:{iobj_name.strip()}",
-                    'target': f"CUBE:{cube_name.strip()}",
-                    'type': 'usage_keyfigure',
-                    'source_type': 'IOBJ',
-                    'target_type': 'CUBE',
-                    'source_name': iobj_name.strip(),
-                    'target_name': cube_name.strip(),
-                    'weight': 2,
-                    'color': '#8E44AD'
-                })
-
-        # Enhanced DataSource connections
-        if 'RSSELDONE' in available_tables:
-            cursor.execute("""
-                SELECT DISTINCT DS_NAME, IOBJNM
-                FROM RSSELDONE
-                WHERE OBJVERS = 'A' AND DS_NAME IS NOT NULL AND IOBJNM IS NOT NULL
-                LIMIT 15000
-            """)
-
-            for ds_name, iobj_name in cursor.fetchall():
-                relationships.append({
-                    'source': f"DS:{ds_name.strip()}",
-                    'target': f"IOBJ:{iobj_name.strip()}",
-                    'type': 'source_connection',
-                    'source_type': 'DS',
-                    'target_type': 'IOBJ',
-                    'source_name': ds_name.strip(),
-                    'target_name': iobj_name.strip(),
-                    'weight': 2,
-                    'color': '#3498DB'
-                })
-
-        # Direct DataSource to InfoCube connections (if available)
-        if 'RSDCUBEISOURCE' in available_tables:
-            cursor.execute("""
-                SELECT DISTINCT ISOURCE, INFOCUBE
-                FROM RSDCUBEISOURCE
-                WHERE OBJVERS = 'A'
-                LIMIT 10000
-            """)
-
-            for isource_name, cube_name in cursor.fetchall():
-                relationships.append({
-                    'source': f"DS:{isource_name.strip()}",
-                    'target': f"CUBE:{cube_name.strip()}",
-                    'type': 'source_connection',
-                    'source_type': 'DS',
-                    'target_type': 'CUBE',
-                    'source_name': isource_name.strip(),
-                    'target_name': cube_name.strip(),
-                    'weight': 3,
-                    'color': '#16A085'
-                })
+        relationships.extend(iter_enhanced_relationships(self, conn, available_tables,
+                                                         progress_callback=progress_callback,
+                                                         memory_budget_mb=memory_budget_mb))
 
     except Exception as e:
         st.error(f"Error analyzing enhanced relationships: {str(e)}")
@@ -132,6 +118,107 @@ def analyze_enhanced_relationships(self, conn, available_tables):
     return relationships
 
 
+def iter_fetchmany(cursor, batch_size=RELATIONSHIP_BATCH_SIZE):
+    """Yield the rows of an executed query in fetchmany batches"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
+
+
+def get_keyset_condition(order, nullable=()):
+    """Condition selecting the rows after a key in ORDER BY order, and a function giving its parameters
+
+    Without nullable columns this is a plain row value comparison. Columns that may hold NULL
+    (which SQLite sorts first) are compared with IS for equality and an explicit NULL check.
+    """
+    if not any(column in nullable for column in order):
+        return f"({', '.join(order)}) > ({', '.join('?' * len(order))})", tuple
+
+    terms = []
+    for position, column in enumerate(order):
+        equal = [f"{previous} IS ?" for previous in order[:position]]
+        after = f"({column} > ? OR (? IS NULL AND {column} IS NOT NULL))" if column in nullable else f"{column} > ?"
+        terms.append(f"({' AND '.join(equal + [after])})")
+
+    def get_parameters(key):
+        parameters = []
+        for position, column in enumerate(order):
+            parameters.extend(key[:position])
+            parameters.extend((key[position], key[position]) if column in nullable else (key[position],))
+        return tuple(parameters)
+
+    return f"({' OR '.join(terms)})", get_parameters
+
+
+def iter_keyset_rows(cursor, table, columns, condition, page_size, order=None,
+                     batch_size=RELATIONSHIP_BATCH_SIZE, on_page=None, required=None):
+    """Read every DISTINCT row of a table in keyset order, one LIMIT page at a time
+
+    Rows with NULL in a required column are skipped; other columns may be NULL.
+    """
+    order = order or columns
+    required = columns if required is None else required
+    key_positions = [columns.index(column) for column in order]
+    not_null = ''.join(f" AND {column} IS NOT NULL" for column in required)
+    base_query = f"SELECT DISTINCT {', '.join(columns)} FROM {table} WHERE {condition}{not_null}"
+    order_by = ', '.join(order)
+    after_key, get_key_parameters = get_keyset_condition(order, set(columns) - set(required))
+
+    last_key = None
+    rows_loaded = 0
+    pages_loaded = 0
+    while True:
+        if last_key is None:
+            cursor.execute(f"{base_query} ORDER BY {order_by} LIMIT ?", (page_size,))
+        else:
+            cursor.execute(f"{base_query} AND {after_key} ORDER BY {order_by} LIMIT ?", (*get_key_parameters(last_key), page_size))
+
+        page_rows = 0
+        for row in iter_fetchmany(cursor, min(batch_size, page_size)):
+            page_rows += 1
+            last_key = tuple(row[position] for position in key_positions)
+            yield row
+
+        rows_loaded += page_rows
+        pages_loaded += 1
+        if on_page:
+            on_page(table, rows_loaded, pages_loaded)
+
+        # A short page means the keyset is exhausted
+        if page_rows < page_size:
+            break
+
+
+def iter_source_relationships(self, cursor, source, page_size, batch_size=RELATIONSHIP_BATCH_SIZE, progress_callback=None):
+    """Stream the edges of a single RELATIONSHIP_SOURCES entry"""
+    to_edge = source['to_edge']
+    for row in iter_keyset_rows(cursor, source['table'], source['columns'], source['condition'], page_size,
+                                order=source.get('order'), batch_size=batch_size, on_page=progress_callback,
+                                required=source.get('required')):
+        edge = to_edge(self, row)
+        if edge is not None:
+            yield edge
+
+
+def iter_enhanced_relationships(self, conn, available_tables, batch_size=RELATIONSHIP_BATCH_SIZE,
+                                progress_callback=None, memory_budget_mb=RELATIONSHIP_MEMORY_BUDGET_MB):
+    """Stream relationship edges from complete tables read in keyset-ordered pages"""
+    cursor = conn.cursor()
+    page_size = get_page_size(memory_budget_mb)
+
+    for source in RELATIONSHIP_SOURCES:
+        if source['table'] in available_tables:
+            yield from iter_source_relationships(self, cursor, source, page_size, batch_size, progress_callback)
+
+
+def load_relationship_source(self, conn, source, memory_budget_mb=RELATIONSHIP_MEMORY_BUDGET_MB):
+    """Read all edges of one relationship table on the given connection (used by the parallel loader)"""
+    page_size = get_page_size(memory_budget_mb)
+    return EdgeTable.from_records(iter_source_relationships(self, conn.cursor(), source, page_size))
+
+
 def map_sap_type_to_our_type(self, sap_type):
     """Enhanced mapping with InfoSource support"""
     type_mapping = {
@@ -143,16 +230,34 @@ def map_sap_type_to_our_type(self, sap_type):
     return type_mapping.get(sap_type)
 
 
-def get_active_objects_by_type(self, conn, object_type, config):
-    """Get active objects for a specific type with error handling"""
+def build_active_objects_filter(object_type, columns):
+    """WHERE clause selecting the active objects of a type (empty when the table has no filter columns)"""
+    objvers_condition = "WHERE OBJVERS = 'A'" if 'OBJVERS' in columns else ""
+
+    if object_type == 'CUBE' and 'CUBETYPE' in columns:
+        if objvers_condition:
+            objvers_condition += " AND (CUBETYPE != 'M' OR CUBETYPE IS NULL)"
+        else:
+            objvers_condition = "WHERE (CUBETYPE != 'M' OR CUBETYPE IS NULL)"
+
+    return objvers_condition
+
+
+def get_table_columns(cursor, table):
+    """Column names of a table"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def get_active_objects_by_type(self, conn, object_type, config, changed_since=None):
+    """Get active objects for a specific type with error handling (only rows changed since a CONTTIMESTMP if given)"""
     try:
         cursor = conn.cursor()
         table = config['table']
         key_field = config['key_field']
 
         # Get table structure
-        cursor.execute(f"PRAGMA table_info({table})")
-        columns = [col[1] for col in cursor.fetchall()]
+        columns = get_table_columns(cursor, table)
 
         # Build query
         base_columns = [key_field]
@@ -162,13 +267,14 @@ def get_active_objects_by_type(self, conn, object_type, config):
             if col in columns:
                 base_columns.append(col)
 
-        objvers_condition = "WHERE OBJVERS = 'A'" if 'OBJVERS' in columns else ""
+        objvers_condition = build_active_objects_filter(object_type, columns)
+        params = ()
 
-        if object_type == 'CUBE' and 'CUBETYPE' in columns:
-            if objvers_condition:
-                objvers_condition += " AND (CUBETYPE != 'M' OR CUBETYPE IS NULL)"
-            else:
-                objvers_condition = "WHERE (CUBETYPE != 'M' OR CUBETYPE IS NULL)"
+        # Delta reads: rows without a timestamp cannot be dated, so they are always re-read
+        if changed_since is not None and 'CONTTIMESTMP' in columns:
+            delta_condition = "(CONTTIMESTMP >= ? OR CONTTIMESTMP IS NULL)"
+            objvers_condition = f"{objvers_condition} AND {delta_condition}" if objvers_condition else f"WHERE {delta_condition}"
+            params = (changed_since,)
 
         query = f"""
             SELECT {', '.join(base_columns)}
@@ -177,46 +283,30 @@ def get_active_objects_by_type(self, conn, object_type, config):
             ORDER BY {key_field}
         """
 
-        cursor.execute(query)
+        cursor.execute(query, params)
         results = cursor.fetchall()
 
-        # Process results
-        objects = []
+        # Process results column by column; type-level attributes come from the config
+        names = []
+        values = {column: [] for column in OBJECT_COLUMN_SOURCES.values()}
         for row in results:
-            obj = {
-                'name': row[0],
-                'type': object_type,
-                'type_name': config['name'],
-                'category': config['category'],
-                'color': config['color'],
-                'shape': config['shape'],
-                'size_base': config['size_base'],
-                'icon': config['icon'],
-                'z_layer': config['z_layer']
-            }
+            names.append(row[0])
+            row_values = {}
 
             # Add optional fields with defaults
             for i, col in enumerate(base_columns[1:], 1):
-                if i < len(row) and row[i] is not None:
-                    if col == 'OWNER':
-                        obj['owner'] = row[i]
-                    elif col == 'INFOAREA':
-                        obj['infoarea'] = row[i]
-                    elif col == 'ACTIVFL':
-                        obj['active'] = 'Yes' if row[i] == 'X' else 'No'
-                    elif col == 'OBJSTAT':
-                        obj['status'] = row[i]
+                if i < len(row) and row[i] is not None and col in OBJECT_COLUMN_SOURCES:
+                    if col == 'ACTIVFL':
+                        row_values['active'] = 'Yes' if row[i] == 'X' else 'No'
                     elif col == 'CONTTIMESTMP':
-                        obj['last_changed'] = str(row[i])
+                        row_values['last_changed'] = str(row[i])
+                    else:
+                        row_values[OBJECT_COLUMN_SOURCES[col]] = row[i]
 
-            # Set defaults
-            obj.setdefault('owner', 'Unknown')
-            obj.setdefault('infoarea', 'UNASSIGNED')
-            obj.setdefault('active', 'Unknown')
-            obj.setdefault('status', 'Unknown')
-            obj.setdefault('last_changed', 'Unknown')
+            for column, column_values in values.items():
+                column_values.append(row_values.get(column, COLUMN_DEFAULTS[column]))
 
-            objects.append(obj)
+        objects = InventoryTable(object_type, config, names, values)
 
         return objects
 
@@ -225,22 +315,79 @@ def get_active_objects_by_type(self, conn, object_type, config):
         return []
 
 
+def get_active_object_names(self, conn, object_type, config):
+    """Names of all currently active objects of a type (key-only scan used to detect deletions)"""
+    cursor = conn.cursor()
+    columns = get_table_columns(cursor, config['table'])
+    cursor.execute(f"SELECT {config['key_field']} FROM {config['table']} {build_active_objects_filter(object_type, columns)}")
+    return {row[0] for row in iter_fetchmany(cursor)}
+
+
+def get_object_high_water_mark(self, conn, object_type, config):
+    """Latest CONTTIMESTMP of the active objects of a type, or None when the table cannot be dated"""
+    try:
+        cursor = conn.cursor()
+        columns = get_table_columns(cursor, config['table'])
+        if 'CONTTIMESTMP' not in columns:
+            return None
+        cursor.execute(f"SELECT MAX(CONTTIMESTMP) FROM {config['table']} {build_active_objects_filter(object_type, columns)}")
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except Exception:
+        return None
+
+
+def iter_relationships_for_objects(self, conn, available_tables, object_names, batch_size=500):
+    """Stream the edges of every relationship table that mention any of the given object names"""
+    cursor = conn.cursor()
+    names = sorted({str(name).strip() for name in object_names})
+
+    for source in RELATIONSHIP_SOURCES:
+        if source['table'] not in available_tables:
+            continue
+
+        columns = source['columns']
+        not_null = ' AND '.join(f"{column} IS NOT NULL" for column in source.get('required', columns))
+        seen = set()
+        to_edge = source['to_edge']
+
+        # IN lists are batched to stay below SQLite's bound parameter limit
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            placeholders = ', '.join('?' * len(batch))
+            match = ' OR '.join(f"TRIM({column}) IN ({placeholders})" for column in source.get('match', columns))
+            cursor.execute(
+                f"SELECT DISTINCT {', '.join(columns)} FROM {source['table']} "
+                f"WHERE {source['condition']} AND {not_null} AND ({match})",
+                tuple(batch) * len(source.get('match', columns))
+            )
+            for row in iter_fetchmany(cursor):
+                # A row can match several batches through different columns
+                if row in seen:
+                    continue
+                seen.add(row)
+                edge = to_edge(self, row)
+                if edge is not None:
+                    yield edge
+
+
 def build_relationship_graph(self, global_inventory, relationships):
-    """Build NetworkX graph from relationships"""
+    """Build NetworkX graph from relationships (any iterable, including a streaming generator)"""
     graph = nx.DiGraph()
+    interner = NodeInterner(global_inventory)
 
-    # Add nodes
+    # Add nodes, reusing the interned node id strings
     for obj_type, objects in global_inventory.items():
-        for obj in objects:
-            node_id = f"{obj_type}:{obj['name']}"
-            graph.add_node(node_id, **obj)
-
-    # Add edges (limit for performance)
-    max_edges = 75000  # Increased for InfoCube analysis
-    for i, rel in enumerate(relationships):
-        if i >= max_edges:
-            break
-        if rel['source'] in graph.nodes and rel['target'] in graph.nodes:
-            graph.add_edge(rel['source'], rel['target'], **rel)
-
+        for index, obj in enumerate(objects):
+            graph.add_node(interner.get_node_id(obj_type, index), **get_node_attributes(obj))
+
+    # Add every edge whose endpoints are known objects
+    if isinstance(relationships, EdgeTable):
+        graph.add_edges_from(relationships.iter_graph_edges(graph))
+    else:
+        for rel in relationships:
+            if rel['source'] in graph.nodes and rel['target'] in graph.nodes:
+                graph.add_edge(rel['source'], rel['target'], **get_edge_attributes(rel))
+
+    index_graph_nodes(global_inventory, graph, interner)
     return graph
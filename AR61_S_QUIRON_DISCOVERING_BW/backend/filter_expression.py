@@ -0,0 +1,300 @@
+import re
+import operator
+from functools import lru_cache
+
+import numpy as np
+
+from backend.search_index import get_timestamp_numbers
+
+# Small filter language over the inventory, e.g.
+#     type in (CUBE, ADSO) and infoarea ~ 'FI*' and degree >= 5 and changed > 2025-01-01
+# Comparisons combine with and / or / not and parentheses. Text comparisons ignore case
+# and ~ / !~ match shell-style wildcards (* and ?). An expression is parsed once and
+# evaluated as NumPy boolean masks over the codes of a SearchIndex: categorical columns
+# are tested once per distinct value, numeric and date columns as whole arrays.
+
+FIELD_TEXT = 'text'
+FIELD_NAME = 'name'
+FIELD_TYPE = 'type'
+FIELD_NUMBER = 'number'
+FIELD_DATE = 'date'
+
+# Field name -> (kind, source): an indexed column, a degree kind, or the name / type / change date
+FILTER_FIELDS = {
+    'name': (FIELD_NAME, None),
+    'type': (FIELD_TYPE, None),
+    'type_name': (FIELD_TEXT, 'type_name'),
+    'category': (FIELD_TEXT, 'category'),
+    'infoarea': (FIELD_TEXT, 'infoarea'),
+    'owner': (FIELD_TEXT, 'owner'),
+    'active': (FIELD_TEXT, 'active'),
+    'status': (FIELD_TEXT, 'status'),
+    'degree': (FIELD_NUMBER, 'degree'),
+    'connections': (FIELD_NUMBER, 'degree'),
+    'in_degree': (FIELD_NUMBER, 'in_degree'),
+    'out_degree': (FIELD_NUMBER, 'out_degree'),
+    'changed': (FIELD_DATE, None),
+    'last_changed': (FIELD_DATE, None)
+}
+
+ORDER_OPERATORS = {
+    '=': operator.eq, '==': operator.eq, '!=': operator.ne,
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le
+}
+MATCH_OPERATORS = ('~', '!~')
+IN_OPERATOR = 'in'
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<op>>=|<=|!=|!~|==|=|>|<|~)
+  | (?P<punct>[(),])
+  | (?P<word>[^\s(),'"=<>!~]+)
+)""", re.VERBOSE)
+
+_KEYWORDS = ('and', 'or', 'not', IN_OPERATOR)
+
+
+class FilterSyntaxError(ValueError):
+    """An expression that cannot be parsed, with the position of the problem"""
+
+
+def tokenize(text):
+    """(kind, value, position) tokens of an expression; quoted strings lose their quotes"""
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            position += len(text[position:]) - len(text[position:].lstrip())
+            raise FilterSyntaxError(f"Unexpected character {text[position]!r} at position {position + 1}")
+        kind = match.lastgroup
+        value, start = match.group(kind), match.start(kind)
+        if kind == 'string':
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == 'word' and value.lower() in _KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value, start))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent: or binds loosest, then and, then not"""
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self, kind=None, value=None):
+        if self.index >= len(self.tokens):
+            return None
+        token = self.tokens[self.index]
+        if (kind is not None and token[0] != kind) or (value is not None and token[1] != value):
+            return None
+        return token
+
+    def take(self, kind=None, value=None, expected=None):
+        token = self.peek(kind, value)
+        if token is None:
+            found = self.tokens[self.index] if self.index < len(self.tokens) else None
+            where = f"{found[1]!r} at position {found[2] + 1}" if found else "the end of the filter"
+            raise FilterSyntaxError(f"Expected {expected or value or kind} but found {where}")
+        self.index += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            return None
+        tree = self.parse_or()
+        if self.index < len(self.tokens):
+            token = self.tokens[self.index]
+            raise FilterSyntaxError(f"Unexpected {token[1]!r} at position {token[2] + 1}")
+        return tree
+
+    def parse_or(self):
+        terms = [self.parse_and()]
+        while self.peek('keyword', 'or'):
+            self.index += 1
+            terms.append(self.parse_and())
+        return terms[0] if len(terms) == 1 else ('or', terms)
+
+    def parse_and(self):
+        terms = [self.parse_not()]
+        while self.peek('keyword', 'and'):
+            self.index += 1
+            terms.append(self.parse_not())
+        return terms[0] if len(terms) == 1 else ('and', terms)
+
+    def parse_not(self):
+        if self.peek('keyword', 'not'):
+            self.index += 1
+            return ('not', self.parse_not())
+        if self.peek('punct', '('):
+            self.index += 1
+            tree = self.parse_or()
+            self.take('punct', ')', expected="')'")
+            return tree
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        _, field, position = self.take('word', expected='a field name')
+        field = field.lower()
+        if field not in FILTER_FIELDS:
+            raise FilterSyntaxError(f"Unknown field {field!r} at position {position + 1}; "
+                                    f"available fields: {', '.join(FILTER_FIELDS)}")
+
+        if self.peek('keyword', IN_OPERATOR):
+            self.index += 1
+            self.take('punct', '(', expected="'(' after in")
+            values = [self.take_value()]
+            while self.peek('punct', ','):
+                self.index += 1
+                values.append(self.take_value())
+            self.take('punct', ')', expected="')'")
+            return ('compare', field, IN_OPERATOR, convert_values(field, IN_OPERATOR, values))
+
+        _, op, position = self.take('op', expected='a comparison operator')
+        kind = FILTER_FIELDS[field][0]
+        if op in MATCH_OPERATORS and kind in (FIELD_NUMBER, FIELD_DATE):
+            raise FilterSyntaxError(f"Operator {op!r} at position {position + 1} only applies to text fields")
+        return ('compare', field, op, convert_values(field, op, [self.take_value()]))
+
+    def take_value(self):
+        token = self.peek('string') or self.peek('word')
+        if token is None:
+            self.take(expected='a value')
+        self.index += 1
+        return token[1], token[2]
+
+
+def convert_values(field, op, values):
+    """Typed literals of a comparison: numbers for degrees, YYYYMMDDhhmmss numbers for dates"""
+    kind = FILTER_FIELDS[field][0]
+    converted = []
+    for value, position in values:
+        if kind == FIELD_NUMBER:
+            try:
+                converted.append(float(value))
+            except ValueError:
+                raise FilterSyntaxError(f"{field} needs a number, not {value!r} (position {position + 1})") from None
+        elif kind == FIELD_DATE:
+            stamp = get_timestamp_numbers([value])[0]
+            if np.isnan(stamp):
+                raise FilterSyntaxError(f"{field} needs a date such as 2025-01-01, not {value!r} (position {position + 1})")
+            converted.append(stamp)
+        else:
+            converted.append(value)
+    return tuple(converted)
+
+
+def get_glob_regex(patterns):
+    """Regex body matching any of some wildcard patterns on a single line (* and ? never cross a newline)"""
+    bodies = (''.join('[^\n]*' if char == '*' else '[^\n]' if char == '?' else re.escape(char) for char in pattern)
+              for pattern in patterns)
+    return '(?:' + '|'.join(bodies) + ')'
+
+
+def get_text_predicate(op, values):
+    """Case-insensitive test of one text value against the literals of a comparison"""
+    if op in MATCH_OPERATORS:
+        pattern = re.compile(get_glob_regex(values) + r'\Z', re.IGNORECASE)
+        matches = (lambda text: pattern.match(text) is not None)
+        return matches if op == '~' else (lambda text: not matches(text))
+    literals = [value.casefold() for value in values]
+    if op == IN_OPERATOR:
+        wanted = set(literals)
+        return lambda text: text.casefold() in wanted
+    compare = ORDER_OPERATORS[op]
+    return lambda text: compare(text.casefold(), literals[0])
+
+
+class FilterExpression:
+    """A parsed filter, evaluated as a boolean mask over the codes of a search index"""
+
+    def __init__(self, text):
+        self.text = text.strip()
+        self.tree = _Parser(self.text).parse()
+
+    def __bool__(self):
+        return self.tree is not None
+
+    def get_mask(self, search_index):
+        if self.tree is None:
+            return np.ones(len(search_index), dtype=bool)
+        return self._evaluate(self.tree, search_index)
+
+    def _evaluate(self, tree, search_index):
+        if tree[0] == 'and':
+            mask = self._evaluate(tree[1][0], search_index)
+            for term in tree[1][1:]:
+                mask &= self._evaluate(term, search_index)
+            return mask
+        if tree[0] == 'or':
+            mask = self._evaluate(tree[1][0], search_index)
+            for term in tree[1][1:]:
+                mask |= self._evaluate(term, search_index)
+            return mask
+        if tree[0] == 'not':
+            return ~self._evaluate(tree[1], search_index)
+        return self._compare(search_index, *tree[1:])
+
+    def _compare(self, search_index, field, op, values):
+        kind, source = FILTER_FIELDS[field]
+        if kind in (FIELD_NUMBER, FIELD_DATE):
+            data = search_index.interner.get_degrees(source) if kind == FIELD_NUMBER else search_index.changed
+            if op == IN_OPERATOR:
+                return np.isin(data, values)
+            with np.errstate(invalid='ignore'):
+                return ORDER_OPERATORS[op](data, values[0])
+
+        predicate = get_text_predicate(op, values)
+        if kind == FIELD_TYPE:
+            # One test per object type, spread over its code range
+            hits = np.fromiter((predicate(obj_type) for obj_type in search_index.interner.types), dtype=bool)
+            return hits[search_index.interner.type_codes] if len(hits) else np.zeros(len(search_index), dtype=bool)
+        if kind == FIELD_NAME:
+            return get_name_mask(search_index, op, values, predicate)
+
+        # Categorical columns: one test per distinct value
+        categories = search_index.get_values(source)
+        hits = np.fromiter((predicate(str(value)) for value in categories), dtype=bool, count=len(categories))
+        return hits[search_index.column_codes[source]]
+
+
+def get_name_mask(search_index, op, values, predicate):
+    """Names use the index where the comparison allows it (exact names, prefixes, substrings)"""
+    if op in ('=', '==', IN_OPERATOR):
+        codes = [code for value in values for code in search_index.match_prefix(value).tolist()
+                 if search_index.names[code] == value.lower()]
+        return search_index.to_mask(np.asarray(codes, dtype=np.int64))
+    if op == '~' and len(values) == 1:
+        pattern = values[0]
+        body = pattern.strip('*')
+        if body and not any(char in body for char in '*?['):
+            if pattern == body + '*':
+                return search_index.to_mask(search_index.match_prefix(body))
+            if pattern == '*' + body + '*':
+                return search_index.match_names(body)
+    if op in MATCH_OPERATORS:
+        # One regex scan over all names joined by newlines instead of a match per name
+        text, offsets = search_index.get_joined_names()
+        starts = [match.start() for match in re.finditer(r'(?im)^' + get_glob_regex(values) + '$', text)]
+        mask = search_index.to_mask(np.searchsorted(offsets, starts))
+        return mask if op == '~' else ~mask
+    return np.fromiter((predicate(name) for name in search_index.names), dtype=bool, count=len(search_index))
+
+
+@lru_cache(maxsize=128)
+def compile_filter(text):
+    """Parsed filter expression (cached by text); raises FilterSyntaxError"""
+    return FilterExpression(text or '')
+
+
+def get_filter_mask(search_index, text):
+    """Mask of the objects matching a filter expression (every object for an empty one)"""
+    return compile_filter((text or '').strip()).get_mask(search_index)
+
+
+def quote_filter_value(value):
+    """Literal of a value for an expression built by code"""
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
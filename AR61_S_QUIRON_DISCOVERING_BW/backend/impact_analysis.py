@@ -6,120 +6,92 @@ import plotly.graph_objects as go
 from datetime import datetime
 from connectors.source_detectors import get_source_system_info
 from backend.infocube_analysis import position_nodes_in_circle
+from backend.inventory_store import get_node_record
+from backend.traversal import DEFAULT_NODE_BUDGET, DEFAULT_TIME_BUDGET_SECONDS, DIRECTION_BOTH, iter_traversal
 
 
-def analyze_infoobject_impact_with_sources(self, iobj_name, depth, include_source_tracing, connection_types, show_source_systems):
+def analyze_infoobject_impact_with_sources(self, iobj_name, depth, include_source_tracing, connection_types, show_source_systems,
+                                           max_nodes=DEFAULT_NODE_BUDGET, time_budget=DEFAULT_TIME_BUDGET_SECONDS):
     """Analyze impact for a specific InfoObject with enhanced source tracing"""
+    results = None
+    for results in iter_infoobject_impact_levels(self, iobj_name, depth, include_source_tracing, connection_types, show_source_systems,
+                                                 max_nodes, time_budget):
+        pass
+    return results
+
+
+def iter_infoobject_impact_levels(self, iobj_name, depth, include_source_tracing, connection_types, show_source_systems,
+                                  max_nodes=DEFAULT_NODE_BUDGET, time_budget=DEFAULT_TIME_BUDGET_SECONDS):
+    """Impact analysis results after each completed depth level; the last one is the full analysis
+
+    A traversal that runs out of its node or time budget ends early with a partial result.
+    """
 
     target_node = f"IOBJ:{iobj_name}"
 
     if target_node not in st.session_state.graph.nodes:
-        return None
+        return
 
-    # Find all connected objects including source tracing
+    graph = st.session_state.graph
     connected_objects = {}
-    relationships_found = []
-    visited_nodes = set()
     source_connections = []
+    described = 0
+
+    def trace_sources(node, node_depth, traversal):
+        # DataSources found by source tracing join the next level of the traversal
+        source_info = trace_to_data_sources(self, node, node_depth)
+        source_connections.extend(source_info or [])
+        return [src_info['source_node'] for src_info in source_info or [] if src_info['source_node'] not in traversal]
+
+    for traversal in iter_traversal(graph, [target_node], depth, connection_types, DIRECTION_BOTH,
+                                    expand=trace_sources if include_source_tracing else None,
+                                    max_nodes=max_nodes, time_budget=time_budget):
+        relationships_found = traversal.get_relationships()
+
+        # Collect object details for the nodes expanded by the new level
+        for node_id in traversal.get_expanded_nodes()[described:]:
+            if node_id == target_node:
+                continue  # Skip the target InfoObject itself
+
+            node_data = get_node_record(graph, node_id)
+            if node_data:
+                obj_type = node_data['type']
+                if obj_type not in connected_objects:
+                    connected_objects[obj_type] = []
+
+                # Add connection statistics
+                connections_out = graph.out_degree(node_id)
+                connections_in = graph.in_degree(node_id)
+
+                object_info = node_data.copy()
+                object_info.update({
+                    'node_id': node_id,
+                    'connections_out': connections_out,
+                    'connections_in': connections_in,
+                    'total_connections': connections_in + connections_out
+                })
 
-    # Use BFS to find connections up to specified depth
-    current_level = {target_node}
-
-    for current_depth in range(depth):
-        next_level = set()
-
-        for node in current_level:
-            if node in visited_nodes:
-                continue
-
-            visited_nodes.add(node)
-
-            # Get all neighbors (both incoming and outgoing)
-            neighbors = set()
-
-            # Outgoing connections (where this object is used)
-            for neighbor in st.session_state.graph.successors(node):
-                edge_data = st.session_state.graph.get_edge_data(node, neighbor)
-                if edge_data and edge_data.get('type') in connection_types:
-                    neighbors.add(neighbor)
-                    relationships_found.append({
-                        'source': node,
-                        'target': neighbor,
-                        'direction': 'outgoing',
-                        'depth': current_depth + 1,
-                        **edge_data
-                    })
-
-            # Incoming connections (what uses this object)
-            for neighbor in st.session_state.graph.predecessors(node):
-                edge_data = st.session_state.graph.get_edge_data(neighbor, node)
-                if edge_data and edge_data.get('type') in connection_types:
-                    neighbors.add(neighbor)
-                    relationships_found.append({
-                        'source': neighbor,
-                        'target': node,
-                        'direction': 'incoming',
-                        'depth': current_depth + 1,
-                        **edge_data
-                    })
-
-            # Enhanced source tracing
-            if include_source_tracing:
-                source_info = trace_to_data_sources(self, node, current_depth + 1)
-                if source_info:
-                    source_connections.extend(source_info)
-                    # Add DataSources to neighbors for continued analysis
-                    for src_info in source_info:
-                        if src_info['source_node'] not in visited_nodes:
-                            neighbors.add(src_info['source_node'])
-
-            next_level.update(neighbors)
-
-        if next_level:
-            current_level = next_level
-        else:
-            break
-
-    # Collect object details for all connected nodes
-    for node_id in visited_nodes:
-        if node_id == target_node:
-            continue  # Skip the target InfoObject itself
-
-        node_data = st.session_state.graph.nodes.get(node_id)
-        if node_data:
-            obj_type = node_data['type']
-            if obj_type not in connected_objects:
-                connected_objects[obj_type] = []
-
-            # Add connection statistics
-            connections_out = len(list(st.session_state.graph.successors(node_id)))
-            connections_in = len(list(st.session_state.graph.predecessors(node_id)))
-
-            object_info = node_data.copy()
-            object_info.update({
-                'node_id': node_id,
-                'connections_out': connections_out,
-                'connections_in': connections_in,
-                'total_connections': connections_in + connections_out
-            })
-
-            # Add source system information if available
-            if show_source_systems and obj_type == 'DS':
-                object_info['source_system'] = get_source_system_info(self, node_data['name'])
-
-            connected_objects[obj_type].append(object_info)
-
-    return {
-        'target_iobj': iobj_name,
-        'connected_objects': connected_objects,
-        'relationships': relationships_found,
-        'source_connections': source_connections,
-        'total_objects': sum(len(objects) for objects in connected_objects.values()),
-        'total_relationships': len(relationships_found),
-        'total_source_connections': len(source_connections),
-        'analysis_depth': depth,
-        'source_tracing_enabled': include_source_tracing
-    }
+                # Add source system information if available
+                if show_source_systems and obj_type == 'DS':
+                    object_info['source_system'] = get_source_system_info(self, node_data['name'])
+
+                connected_objects[obj_type].append(object_info)
+        described = len(traversal.expanded)
+
+        yield {
+            'target_iobj': iobj_name,
+            'connected_objects': {obj_type: list(objects) for obj_type, objects in connected_objects.items()},
+            'relationships': relationships_found,
+            'source_connections': list(source_connections),
+            'total_objects': sum(len(objects) for objects in connected_objects.values()),
+            'total_relationships': len(relationships_found),
+            'total_source_connections': len(source_connections),
+            'analysis_depth': depth,
+            'source_tracing_enabled': include_source_tracing,
+            'levels_completed': traversal.levels_completed,
+            'partial': not traversal.complete,
+            'stopped_by': traversal.stopped_by
+        }
 
 
 def trace_to_data_sources(self, node_id, depth):
@@ -129,7 +101,7 @@ def trace_to_data_sources(self, node_id, depth):
 
     # Look for transformation connections that lead to DataSources
     for neighbor in st.session_state.graph.predecessors(node_id):
-        neighbor_data = st.session_state.graph.nodes.get(neighbor)
+        neighbor_data = get_node_record(st.session_state.graph, neighbor)
         if neighbor_data and neighbor_data.get('type') == 'DS':
             # Found a direct DataSource connection
             edge_data = st.session_state.graph.get_edge_data(neighbor, node_id)
@@ -145,7 +117,7 @@ def trace_to_data_sources(self, node_id, depth):
         elif neighbor_data and neighbor_data.get('type') in ['ADSO', 'ODSO', 'CUBE']:
             # Check if this provider has DataSource connections
             for ds_neighbor in st.session_state.graph.predecessors(neighbor):
-                ds_data = st.session_state.graph.nodes.get(ds_neighbor)
+                ds_data = get_node_record(st.session_state.graph, ds_neighbor)
                 if ds_data and ds_data.get('type') == 'DS':
                     edge_data = st.session_state.graph.get_edge_data(ds_neighbor, neighbor)
                     source_connections.append({
@@ -240,7 +212,7 @@ def display_impact_analysis_with_sources(self, iobj_name, results, group_by_type
         upstream_objects = []
         for rel in results['relationships']:
             if rel['direction'] == 'incoming':
-                source_node = st.session_state.graph.nodes.get(rel['source'])
+                source_node = get_node_record(st.session_state.graph, rel['source'])
                 if source_node:
                     upstream_objects.append({
                         'Object': source_node['name'],
@@ -263,7 +235,7 @@ def display_impact_analysis_with_sources(self, iobj_name, results, group_by_type
         downstream_objects = []
         for rel in results['relationships']:
             if rel['direction'] == 'outgoing':
-                target_node = st.session_state.graph.nodes.get(rel['target'])
+                target_node = get_node_record(st.session_state.graph, rel['target'])
                 if target_node:
                     downstream_objects.append({
                         'Object': target_node['name'],
@@ -6,131 +6,119 @@ from datetime import datetime
 import random
 import math
 from connectors.source_detectors import determine_infosource_type, get_source_system_info
+from backend.inventory_store import get_node_record
+from backend.connection_stats import get_connection_stats
+from backend.traversal import DEFAULT_NODE_BUDGET, DEFAULT_TIME_BUDGET_SECONDS, DIRECTION_BOTH, iter_traversal
+from backend.reachability import get_source_reachability
+from backend.lineage import LINEAGE_ORDER_SHORTEST, LineagePaths, trace_lineage
 
 
-def analyze_infocube_connections(self, cube_name, depth, include_all_sources, connection_types, show_lineage):
+def analyze_infocube_connections(self, cube_name, depth, include_all_sources, connection_types, show_lineage,
+                                 lineage_order=LINEAGE_ORDER_SHORTEST, max_nodes=DEFAULT_NODE_BUDGET,
+                                 time_budget=DEFAULT_TIME_BUDGET_SECONDS):
     """NEW METHOD: Analyze all connections for a specific InfoCube"""
+    results = None
+    for results in iter_infocube_connection_levels(self, cube_name, depth, include_all_sources, connection_types,
+                                                   show_lineage, lineage_order, max_nodes, time_budget):
+        pass
+    return results
 
-    target_node = f"CUBE:{cube_name}"
 
-    if target_node not in st.session_state.graph.nodes:
-        return None
+def iter_infocube_connection_levels(self, cube_name, depth, include_all_sources, connection_types, show_lineage,
+                                    lineage_order=LINEAGE_ORDER_SHORTEST, max_nodes=DEFAULT_NODE_BUDGET,
+                                    time_budget=DEFAULT_TIME_BUDGET_SECONDS):
+    """InfoCube connection results after each completed depth level; lineage is only traced for the last one
 
-    # Find all connected objects including complete source tracing
-    connected_objects = {}
-    relationships_found = []
-    visited_nodes = set()
-    data_lineage_paths = []
-
-    # Use BFS to find connections up to specified depth
-    current_level = {target_node}
-
-    for current_depth in range(depth):
-        next_level = set()
-
-        for node in current_level:
-            if node in visited_nodes:
-                continue
-
-            visited_nodes.add(node)
-
-            # Get all neighbors (both incoming and outgoing)
-            neighbors = set()
-
-            # Incoming connections (what feeds this InfoCube)
-            for neighbor in st.session_state.graph.predecessors(node):
-                edge_data = st.session_state.graph.get_edge_data(neighbor, node)
-                if edge_data and edge_data.get('type') in connection_types:
-                    neighbors.add(neighbor)
-                    relationships_found.append({
-                        'source': neighbor,
-                        'target': node,
-                        'direction': 'incoming',
-                        'depth': current_depth + 1,
-                        **edge_data
-                    })
-
-            # Outgoing connections (what uses this InfoCube)
-            for neighbor in st.session_state.graph.successors(node):
-                edge_data = st.session_state.graph.get_edge_data(node, neighbor)
-                if edge_data and edge_data.get('type') in connection_types:
-                    neighbors.add(neighbor)
-                    relationships_found.append({
-                        'source': node,
-                        'target': neighbor,
-                        'direction': 'outgoing',
-                        'depth': current_depth + 1,
-                        **edge_data
-                    })
-
-            # Enhanced source tracing for InfoCubes
-            if include_all_sources:
-                source_connections = trace_infocube_to_all_sources(self, node, current_depth + 1)
-                for src_conn in source_connections:
-                    if src_conn['source_node'] not in visited_nodes:
-                        neighbors.add(src_conn['source_node'])
-                        relationships_found.append({
-                            'source': src_conn['source_node'],
-                            'target': node,
-                            'direction': 'incoming',
-                            'depth': current_depth + 1,
-                            'type': 'source_connection',
-                            'source_system': src_conn.get('source_system', 'Unknown'),
-                            'connection_path': src_conn.get('connection_path', [])
-                        })
-
-            next_level.update(neighbors)
-
-        if next_level:
-            current_level = next_level
-        else:
-            break
+    A traversal that runs out of its node or time budget ends early with a partial result.
+    """
 
-    # Generate data lineage paths if requested
-    if show_lineage:
-        data_lineage_paths = generate_infocube_data_lineage(self, target_node, visited_nodes)
-
-    # Collect object details for all connected nodes
-    for node_id in visited_nodes:
-        if node_id == target_node:
-            continue  # Skip the target InfoCube itself
-
-        node_data = st.session_state.graph.nodes.get(node_id)
-        if node_data:
-            obj_type = node_data['type']
-            if obj_type not in connected_objects:
-                connected_objects[obj_type] = []
-
-            # Add connection statistics
-            connections_out = len(list(st.session_state.graph.successors(node_id)))
-            connections_in = len(list(st.session_state.graph.predecessors(node_id)))
-
-            object_info = node_data.copy()
-            object_info.update({
-                'node_id': node_id,
-                'connections_out': connections_out,
-                'connections_in': connections_in,
-                'total_connections': connections_in + connections_out
-            })
-
-            # Add source system information for DataSources
-            if obj_type == 'DS':
-                object_info['source_system'] = get_source_system_info(self, node_data['name'])
-                object_info['infosource_type'] = determine_infosource_type(self, node_data['name'])
+    target_node = f"CUBE:{cube_name}"
 
-            connected_objects[obj_type].append(object_info)
+    if target_node not in st.session_state.graph.nodes:
+        return
 
-    return {
-        'target_cube': cube_name,
-        'connected_objects': connected_objects,
-        'relationships': relationships_found,
-        'data_lineage_paths': data_lineage_paths,
-        'total_objects': sum(len(objects) for objects in connected_objects.values()),
-        'total_relationships': len(relationships_found),
-        'analysis_depth': depth,
-        'includes_all_sources': include_all_sources,
-        'lineage_analysis': show_lineage
-    }
+    graph = st.session_state.graph
+    connected_objects = {}
+    source_relationships = []
+    upstream_datasources = get_source_reachability(graph).get_upstream_sources(target_node)
+    described = 0
+
+    def trace_sources(node, node_depth, traversal):
+        # Sources found by tracing join the next level of the traversal
+        extra_nodes = []
+        for src_conn in trace_infocube_to_all_sources(self, node, node_depth):
+            if src_conn['source_node'] not in traversal:
+                extra_nodes.append(src_conn['source_node'])
+                source_relationships.append({
+                    'source': src_conn['source_node'],
+                    'target': node,
+                    'direction': 'incoming',
+                    'depth': node_depth,
+                    'type': 'source_connection',
+                    'source_system': src_conn.get('source_system', 'Unknown'),
+                    'connection_path': src_conn.get('connection_path', [])
+                })
+        return extra_nodes
+
+    for traversal in iter_traversal(graph, [target_node], depth, connection_types, DIRECTION_BOTH,
+                                    expand=trace_sources if include_all_sources else None,
+                                    max_nodes=max_nodes, time_budget=time_budget):
+        relationships_found = traversal.get_relationships() + source_relationships
+        visited_nodes = traversal.get_expanded_nodes()
+
+        # Generate data lineage paths if requested, once every level is known
+        data_lineage_paths = []
+        if show_lineage and traversal.final:
+            data_lineage_paths = generate_infocube_data_lineage(self, target_node, set(visited_nodes), lineage_order)
+
+        # Collect object details for the nodes expanded by the new level
+        for node_id in visited_nodes[described:]:
+            if node_id == target_node:
+                continue  # Skip the target InfoCube itself
+
+            node_data = get_node_record(graph, node_id)
+            if node_data:
+                obj_type = node_data['type']
+                if obj_type not in connected_objects:
+                    connected_objects[obj_type] = []
+
+                # Add connection statistics
+                connections_out = graph.out_degree(node_id)
+                connections_in = graph.in_degree(node_id)
+
+                object_info = node_data.copy()
+                object_info.update({
+                    'node_id': node_id,
+                    'connections_out': connections_out,
+                    'connections_in': connections_in,
+                    'total_connections': connections_in + connections_out
+                })
+
+                # Add source system information for DataSources
+                if obj_type == 'DS':
+                    object_info['source_system'] = get_source_system_info(self, node_data['name'])
+                    object_info['infosource_type'] = determine_infosource_type(self, node_data['name'])
+
+                connected_objects[obj_type].append(object_info)
+        described = len(visited_nodes)
+
+        yield {
+            'target_cube': cube_name,
+            'connected_objects': {obj_type: list(objects) for obj_type, objects in connected_objects.items()},
+            'relationships': relationships_found,
+            'data_lineage_paths': data_lineage_paths,
+            'lineage_total_paths': getattr(data_lineage_paths, 'total_paths', len(data_lineage_paths)),
+            'lineage_truncated': getattr(data_lineage_paths, 'truncated', False),
+            'upstream_datasources': upstream_datasources,
+            'total_objects': sum(len(objects) for objects in connected_objects.values()),
+            'total_relationships': len(relationships_found),
+            'analysis_depth': depth,
+            'includes_all_sources': include_all_sources,
+            'lineage_analysis': show_lineage,
+            'levels_completed': traversal.levels_completed,
+            'partial': not traversal.complete,
+            'stopped_by': traversal.stopped_by
+        }
 
 
 def trace_infocube_to_all_sources(self, node_id, depth):
@@ -140,7 +128,7 @@ def trace_infocube_to_all_sources(self, node_id, depth):
 
     # Direct DataSource connections
     for neighbor in st.session_state.graph.predecessors(node_id):
-        neighbor_data = st.session_state.graph.nodes.get(neighbor)
+        neighbor_data = get_node_record(st.session_state.graph, neighbor)
         if neighbor_data and neighbor_data.get('type') == 'DS':
             edge_data = st.session_state.graph.get_edge_data(neighbor, node_id)
             source_connections.append({
@@ -157,11 +145,11 @@ def trace_infocube_to_all_sources(self, node_id, depth):
 
     # Indirect connections through other providers
     for neighbor in st.session_state.graph.predecessors(node_id):
-        neighbor_data = st.session_state.graph.nodes.get(neighbor)
+        neighbor_data = get_node_record(st.session_state.graph, neighbor)
         if neighbor_data and neighbor_data.get('type') in ['ADSO', 'ODSO', 'TRAN']:
             # Look for DataSources connected to this intermediate object
             for ds_neighbor in st.session_state.graph.predecessors(neighbor):
-                ds_data = st.session_state.graph.nodes.get(ds_neighbor)
+                ds_data = get_node_record(st.session_state.graph, ds_neighbor)
                 if ds_data and ds_data.get('type') == 'DS':
                     edge_data = st.session_state.graph.get_edge_data(ds_neighbor, neighbor)
                     source_connections.append({
@@ -180,152 +168,50 @@ def trace_infocube_to_all_sources(self, node_id, depth):
     return source_connections
 
 
-def generate_infocube_data_lineage(self, target_cube, visited_nodes):
+def generate_infocube_data_lineage(self, target_cube, visited_nodes, order=LINEAGE_ORDER_SHORTEST):
     """NEW METHOD: Generate complete data lineage paths for InfoCube"""
 
-    lineage_paths = []
+    graph = st.session_state.graph
 
     # Find all DataSources in the visited nodes
     datasources = []
     for node_id in visited_nodes:
-        node_data = st.session_state.graph.nodes.get(node_id)
+        node_data = get_node_record(graph, node_id)
         if node_data and node_data.get('type') == 'DS':
             datasources.append(node_id)
 
-    # For each DataSource, find path to target InfoCube
-    for ds_node in datasources:
-        paths = list(nx.all_simple_paths(st.session_state.graph, ds_node, target_cube, cutoff=5))
-
-        for path in paths:
-            path_info = {
-                'source': ds_node.split(':')[1],  # Remove type prefix
-                'target': target_cube.split(':')[1],
-                'path_length': len(path),
-                'intermediate_objects': []
-            }
+    # One reverse sweep counts every path; only the best few per DataSource are listed
+    traced = trace_lineage(graph, target_cube, datasources, order=order)
+    lineage_paths = LineagePaths(path_counts=traced.path_counts, truncated=traced.truncated)
+
+    for ds_node, path, path_weight in traced:
+        path_info = {
+            'source': ds_node.split(':')[1],  # Remove type prefix
+            'target': target_cube.split(':')[1],
+            'path_length': len(path),
+            'path_weight': path_weight,
+            'intermediate_objects': []
+        }
 
-            # Add intermediate objects
-            for i, node_id in enumerate(path[1:-1], 1):  # Skip source and target
-                node_data = st.session_state.graph.nodes.get(node_id)
-                if node_data:
-                    path_info['intermediate_objects'].append({
-                        'step': i,
-                        'object_name': node_data['name'],
-                        'object_type': node_data['type_name'],
-                        'category': node_data['category']
-                    })
+        # Add intermediate objects
+        for i, node_id in enumerate(path[1:-1], 1):  # Skip source and target
+            node_data = get_node_record(graph, node_id)
+            if node_data:
+                path_info['intermediate_objects'].append({
+                    'step': i,
+                    'object_name': node_data['name'],
+                    'object_type': node_data['type_name'],
+                    'category': node_data['category']
+                })
 
-            lineage_paths.append(path_info)
+        lineage_paths.append(path_info)
 
     return lineage_paths
 
 
 def calculate_connection_percentages(self):
-    """Calculate comprehensive connection percentage statistics - ENHANCED METHOD"""
-
-    connection_stats = {
-        'total_objects': 0,
-        'connected_objects': 0,
-        'isolated_objects': 0,
-        'overall_connected_percentage': 0.0,
-        'isolated_percentage': 0.0,
-        'connection_level_distribution': {},
-        'by_object_type': {},
-        'average_connections': 0.0,
-        'max_connections': 0,
-        'most_connected_object': None
-    }
-
-    # Initialize connection level buckets
-    connection_levels = {
-        '0 (Isolated)': 0,
-        '1-5': 0,
-        '6-10': 0,
-        '11-20': 0,
-        '21-50': 0,
-        '50+': 0
-    }
-
-    total_connections = 0
-    max_connections = 0
-    most_connected_object = None
-
-    # Analyze each object type
-    for obj_type, objects in st.session_state.global_inventory.items():
-        type_stats = {
-            'total': len(objects),
-            'connected': 0,
-            'isolated': 0,
-            'connected_percentage': 0.0,
-            'average_connections': 0.0,
-            'total_connections': 0
-        }
-
-        for obj in objects:
-            node_id = f"{obj_type}:{obj['name']}"
-            connections = 0
-
-            if node_id in st.session_state.graph.nodes:
-                connections = st.session_state.graph.degree(node_id)
-
-            # Update totals
-            connection_stats['total_objects'] += 1
-            total_connections += connections
-
-            if connections > 0:
-                connection_stats['connected_objects'] += 1
-                type_stats['connected'] += 1
-            else:
-                connection_stats['isolated_objects'] += 1
-                type_stats['isolated'] += 1
-
-            # Update connection level distribution
-            if connections == 0:
-                connection_levels['0 (Isolated)'] += 1
-            elif connections <= 5:
-                connection_levels['1-5'] += 1
-            elif connections <= 10:
-                connection_levels['6-10'] += 1
-            elif connections <= 20:
-                connection_levels['11-20'] += 1
-            elif connections <= 50:
-                connection_levels['21-50'] += 1
-            else:
-                connection_levels['50+'] += 1
-
-            # Track most connected object
-            if connections > max_connections:
-                max_connections = connections
-                most_connected_object = {
-                    'name': obj['name'],
-                    'type': obj['type_name'],
-                    'connections': connections
-                }
-
-            type_stats['total_connections'] += connections
-
-        # Calculate type-specific percentages
-        if type_stats['total'] > 0:
-            type_stats['connected_percentage'] = (type_stats['connected'] / type_stats['total']) * 100
-            type_stats['average_connections'] = type_stats['total_connections'] / type_stats['total']
-
-        connection_stats['by_object_type'][obj_type] = type_stats
-
-    # Calculate overall percentages
-    if connection_stats['total_objects'] > 0:
-        connection_stats['overall_connected_percentage'] = (
-            connection_stats['connected_objects'] / connection_stats['total_objects']
-        ) * 100
-        connection_stats['isolated_percentage'] = (
-            connection_stats['isolated_objects'] / connection_stats['total_objects']
-        ) * 100
-        connection_stats['average_connections'] = total_connections / connection_stats['total_objects']
-
-    connection_stats['connection_level_distribution'] = connection_levels
-    connection_stats['max_connections'] = max_connections
-    connection_stats['most_connected_object'] = most_connected_object
-
-    return connection_stats
+    """Connection percentage statistics of the loaded dataset, computed once per dataset"""
+    return get_connection_stats(st.session_state.global_inventory, st.session_state.graph)
 
 
 def prepare_infocube_connection_csv(self, results):
@@ -0,0 +1,193 @@
+from collections.abc import Mapping, Sequence
+import numpy as np
+import pandas as pd
+
+# Row keys in the order the original per-object dicts used
+ROW_KEYS = (
+    'name', 'type', 'type_name', 'category', 'color', 'shape', 'size_base', 'icon', 'z_layer',
+    'owner', 'infoarea', 'active', 'status', 'last_changed'
+)
+
+# Row keys served from the object type configuration instead of being stored per object
+TYPE_ATTRIBUTE_SOURCES = {
+    'type_name': 'name', 'category': 'category', 'color': 'color', 'shape': 'shape',
+    'size_base': 'size_base', 'icon': 'icon', 'z_layer': 'z_layer'
+}
+
+# Low-cardinality columns are dictionary encoded; the rest are stored as plain object arrays
+CATEGORICAL_COLUMNS = ('owner', 'infoarea', 'active', 'status')
+COLUMN_DEFAULTS = {
+    'owner': 'Unknown', 'infoarea': 'UNASSIGNED', 'active': 'Unknown', 'status': 'Unknown', 'last_changed': 'Unknown'
+}
+
+
+class InventoryRow(Mapping):
+    """Read-only dict-like view of one inventory row"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._table.get_value(self._index, key)
+
+    def __iter__(self):
+        return iter(ROW_KEYS)
+
+    def __len__(self):
+        return len(ROW_KEYS)
+
+    def __contains__(self, key):
+        return key in ROW_KEYS
+
+    def copy(self):
+        """Materialize the row as a regular dict that callers may modify"""
+        return {key: self[key] for key in ROW_KEYS}
+
+    @property
+    def index(self):
+        return self._index
+
+    def __repr__(self):
+        return f"InventoryRow({self.copy()!r})"
+
+
+class InventoryTable(Sequence):
+    """Columnar store of the active objects of one type, exposed as a sequence of row views"""
+
+    def __init__(self, object_type, config, names, columns=None):
+        columns = columns or {}
+        self.object_type = object_type
+        self.type_attributes = {key: config.get(source) for key, source in TYPE_ATTRIBUTE_SOURCES.items()}
+        self.names = np.asarray(names, dtype=object)
+
+        size = len(self.names)
+        self.categories = {}
+        self.codes = {}
+        for column in CATEGORICAL_COLUMNS:
+            values = columns.get(column)
+            if values is None:
+                self.categories[column] = np.asarray([COLUMN_DEFAULTS[column]], dtype=object)
+                self.codes[column] = np.zeros(size, dtype=np.int32)
+            else:
+                # factorize keeps first-seen order and copes with mixed value types
+                codes, categories = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+                self.categories[column] = np.asarray(categories, dtype=object)
+                self.codes[column] = codes.astype(np.int32)
+
+        last_changed = columns.get('last_changed')
+        self.last_changed = (np.asarray(last_changed, dtype=object) if last_changed is not None
+                             else np.full(size, COLUMN_DEFAULTS['last_changed'], dtype=object))
+
+    @classmethod
+    def from_records(cls, object_type, config, records):
+        """Build a table from dict-like rows (used when patching an existing table)"""
+        records = list(records)
+        columns = {
+            column: [record.get(column, COLUMN_DEFAULTS[column]) for record in records]
+            for column in CATEGORICAL_COLUMNS + ('last_changed',)
+        }
+        return cls(object_type, config, [record['name'] for record in records], columns)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [InventoryRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('inventory row index out of range')
+        return InventoryRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield InventoryRow(self, index)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(row == item for row, item in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def get_value(self, index, key):
+        """Value of one cell, resolving type-level attributes from the configuration"""
+        if key == 'name':
+            return self.names[index]
+        if key == 'type':
+            return self.object_type
+        if key in self.type_attributes:
+            return self.type_attributes[key]
+        if key in self.codes:
+            return self.categories[key][self.codes[key][index]]
+        if key == 'last_changed':
+            return self.last_changed[index]
+        raise KeyError(key)
+
+    def column(self, key):
+        """Whole column as a numpy array for vectorized filtering"""
+        if key == 'name':
+            return self.names
+        if key == 'last_changed':
+            return self.last_changed
+        if key in self.codes:
+            return self.categories[key][self.codes[key]]
+        if key == 'type' or key in self.type_attributes:
+            value = self.object_type if key == 'type' else self.type_attributes[key]
+            return np.full(len(self), value, dtype=object)
+        raise KeyError(key)
+
+    def mask(self, key, values):
+        """Boolean mask of the rows whose categorical column takes one of the given values"""
+        values = set(values)
+        wanted = [code for code, category in enumerate(self.categories[key]) if category in values]
+        return np.isin(self.codes[key], wanted)
+
+    def distinct(self, key):
+        """Distinct values present in a categorical column"""
+        return self.categories[key][np.unique(self.codes[key])].tolist()
+
+    def nbytes(self):
+        """Approximate memory held by the arrays (string payloads excluded)"""
+        arrays = [self.names, self.last_changed] + list(self.codes.values()) + list(self.categories.values())
+        return sum(array.nbytes for array in arrays)
+
+
+def get_object_names(objects):
+    """Names of an inventory list or table"""
+    if isinstance(objects, InventoryTable):
+        return objects.names.tolist()
+    return [obj['name'] for obj in objects]
+
+
+def get_distinct_values(objects, key, default=None):
+    """Distinct values of a column for an inventory list or table"""
+    if isinstance(objects, InventoryTable):
+        return objects.distinct(key)
+    return list({obj.get(key, default) for obj in objects})
+
+
+def get_column_values(objects, key, default=None):
+    """Values of a column, row by row, for an inventory list or table"""
+    if isinstance(objects, InventoryTable):
+        return objects.column(key).tolist()
+    return [obj.get(key, default) for obj in objects]
+
+
+def get_node_attributes(obj):
+    """Graph node attributes for an inventory object; table rows keep only identity plus a row reference"""
+    if isinstance(obj, InventoryRow):
+        return {'type': obj['type'], 'name': obj['name'], 'record': obj}
+    return obj
+
+
+def get_node_record(graph, node_id):
+    """Full object attributes of a graph node, or None when the node is unknown"""
+    node_data = graph.nodes.get(node_id)
+    if isinstance(node_data, dict) and 'record' in node_data:
+        return node_data['record']
+    return node_data
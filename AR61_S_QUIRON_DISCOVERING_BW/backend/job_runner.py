@@ -0,0 +1,296 @@
+import os
+import types
+import pickle
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import streamlit as st
+
+# CPU-bound analyses run in a process pool per shared dataset so the Streamlit script
+# thread stays responsive. Each pool writes the dataset to a temporary file once and
+# every worker loads it a single time when it starts; jobs then only ship their
+# parameters and results. Sessions without a shared dataset run their jobs inline.
+# Tasks that are generators (the iter_*_levels analyses) publish every partial result
+# in a shared dict that only keeps the latest one per job, so pages can render levels
+# as they complete, and stop between two levels once their job is cancelled.
+# Every worker holds its own copy of the dataset, so the pool size is capped whatever
+# the number of CPUs.
+MAX_JOB_WORKERS = 4
+DEFAULT_MAX_WORKERS = max(1, min(os.cpu_count() or 1, MAX_JOB_WORKERS))
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# Session fields a worker needs to run the analyses against its copy of the dataset
+WORKER_DATASET_FIELDS = ('global_inventory', 'graph', 'dataset_stats')
+
+
+class Job:
+    """Handle on a submitted analysis: state, result and cancellation"""
+
+    def __init__(self, label, future, pool=None, cancel_event=None, job_id=None):
+        self.label = label
+        self.future = future
+        self.cancelled = False
+        self.pool = pool
+        self.job_id = job_id
+        self.partial = None
+        self.cancel_event = cancel_event
+
+    @property
+    def state(self):
+        if self.cancelled or self.future.cancelled():
+            return JOB_CANCELLED
+        if not self.future.done():
+            return JOB_RUNNING if self.future.running() else JOB_PENDING
+        return JOB_FAILED if self.future.exception() is not None else JOB_DONE
+
+    def done(self):
+        return self.state in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+    def result(self):
+        """Result of a finished job (None if it failed or was cancelled)"""
+        return self.future.result() if self.state == JOB_DONE else None
+
+    def get_error(self):
+        return self.future.exception() if self.state == JOB_FAILED else None
+
+    def get_partial(self):
+        """Latest partial result streamed by a generator task (None before the first one)"""
+        if self.pool is not None:
+            partial = self.pool.get_partial(self.job_id, self.future.done())
+            if partial is not None:
+                self.partial = partial
+        return self.partial
+
+    def get_latest(self):
+        """Final result when done, otherwise what has been computed so far"""
+        return self.result() if self.state == JOB_DONE else self.get_partial()
+
+    def cancel(self):
+        """Cancel a queued job; a job already running stops in its worker after the level it is computing,
+        its final result is discarded and only the partial results streamed before cancelling are kept"""
+        if not self.future.cancel() and not self.future.done():
+            self.cancelled = True
+            if self.cancel_event is not None:
+                try:
+                    self.cancel_event.set()
+                except (OSError, EOFError):
+                    pass  # The pool is already shut down and its workers stopped
+        return self.state == JOB_CANCELLED
+
+
+class JobGroup:
+    """Several jobs submitted together, tracked as one unit by a page"""
+
+    def __init__(self, jobs, params=None):
+        self.jobs = dict(jobs)
+        self.params = params
+        # Set by the page once the finished results have been put in the result cache
+        self.results_stored = False
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def done(self):
+        return all(job.done() for job in self.jobs.values())
+
+    def get_progress(self):
+        """Fraction of the jobs that have finished"""
+        return sum(job.done() for job in self.jobs.values()) / len(self.jobs) if self.jobs else 1.0
+
+    def count(self, state):
+        return sum(job.state == state for job in self.jobs.values())
+
+    def cancel(self):
+        for job in self.jobs.values():
+            job.cancel()
+
+    def get_results(self, include_partial=False):
+        """Results of the jobs that finished successfully, by label (plus the partial results of stopped ones)"""
+        results = {label: job.result() for label, job in self.jobs.items() if job.state == JOB_DONE}
+        if include_partial:
+            for label, job in self.jobs.items():
+                if job.state == JOB_CANCELLED and job.get_partial() is not None:
+                    results[label] = job.get_partial()
+        return results
+
+    def get_errors(self):
+        return {label: job.get_error() for label, job in self.jobs.items() if job.state == JOB_FAILED}
+
+
+class JobPool:
+    """Process pool bound to one version of a shared dataset"""
+
+    def __init__(self, session_state, max_workers=DEFAULT_MAX_WORKERS):
+        dataset_stats = getattr(session_state, 'dataset_stats', None) or {}
+        self.dataset_key = session_state.dataset_key
+        self.dataset_version = dataset_stats.get('dataset_version', 1)
+        self.max_workers = max_workers
+        self.submitted = 0
+
+        payload = {field: getattr(session_state, field, None) for field in WORKER_DATASET_FIELDS}
+        fd, self.dataset_path = tempfile.mkstemp(prefix='quiron-jobs-', suffix='.pkl')
+        with os.fdopen(fd, 'wb') as dataset_file:
+            pickle.dump(payload, dataset_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Spawned workers never inherit the threads of the Streamlit server
+        context = multiprocessing.get_context('spawn')
+        # Cancellation flags must reach workers that are already running, hence managed events;
+        # partial results overwrite each other so unread levels never pile up
+        self.manager = context.Manager()
+        self.partials = self.manager.dict()
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=load_worker_dataset,
+            initargs=(self.dataset_path, self.partials)
+        )
+
+    def matches(self, session_state):
+        dataset_stats = getattr(session_state, 'dataset_stats', None) or {}
+        current = (getattr(session_state, 'dataset_key', None), dataset_stats.get('dataset_version', 1))
+        return (self.dataset_key, self.dataset_version) == current
+
+    def submit(self, task, args=(), label=None):
+        self.submitted += 1
+        job_id = self.submitted
+        cancel_event = self.manager.Event()
+        future = self.executor.submit(run_worker_task, task, tuple(args), job_id, cancel_event)
+        return Job(label or task.__name__, future, self, cancel_event, job_id)
+
+    def get_partial(self, job_id, done=False):
+        """Latest partial result published by a job (None if there is none or the pool is shut down)
+
+        The entry of a finished job is removed once read.
+        """
+        try:
+            return self.partials.pop(job_id, None) if done else self.partials.get(job_id)
+        except (OSError, EOFError):
+            return None
+
+    def shutdown(self):
+        """Stop the workers (queued jobs are cancelled, running ones are terminated) and remove the dataset file"""
+        processes = list((getattr(self.executor, '_processes', None) or {}).values())
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        self.manager.shutdown()
+        if os.path.exists(self.dataset_path):
+            os.remove(self.dataset_path)
+
+
+_worker_partials = None
+
+
+def load_worker_dataset(dataset_path, partials=None):
+    """Worker initializer: install the shipped dataset as the worker's session state"""
+    global _worker_partials
+    _worker_partials = partials
+    with open(dataset_path, 'rb') as dataset_file:
+        payload = pickle.load(dataset_file)
+    for field, value in payload.items():
+        setattr(st.session_state, field, value)
+    st.session_state.data_loaded = True
+
+
+def run_worker_task(task, args, job_id=None, cancel_event=None):
+    """Run an analysis function (module level, called as task(self, *args)) inside a worker"""
+    def report(partial):
+        if _worker_partials is not None:
+            _worker_partials[job_id] = partial
+    return collect_task_result(task(None, *args), report, cancel_event)
+
+
+def collect_task_result(result, report=None, cancel_event=None):
+    """Final value of a task: generators are run to the end, reporting every partial result
+
+    A generator whose cancel_event is set is closed before its next level, returning the
+    last level it completed.
+    """
+    if not isinstance(result, types.GeneratorType):
+        return result
+    final = None
+    for final in result:
+        if report is not None:
+            report(final)
+        if cancel_event is not None and cancel_event.is_set():
+            result.close()
+            break
+    return final
+
+
+def run_inline(task, args=(), label=None):
+    """Run a job in the calling thread, returning it already finished"""
+    future = Future()
+    try:
+        future.set_result(collect_task_result(task(None, *args)))
+    except Exception as exc:
+        future.set_exception(exc)
+    return Job(label or task.__name__, future)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_job_pool(session_state, max_workers=DEFAULT_MAX_WORKERS):
+    """Pool of the session's shared dataset, replacing the pool of an older version; None without a shared dataset"""
+    dataset_key = getattr(session_state, 'dataset_key', None)
+    if not isinstance(dataset_key, str) or max_workers < 1:
+        return None
+
+    with _pools_lock:
+        pool = _pools.get(dataset_key)
+        if pool is not None and not pool.matches(session_state):
+            pool.shutdown()
+            pool = None
+        if pool is None:
+            pool = JobPool(session_state, max_workers)
+            _pools[dataset_key] = pool
+        return pool
+
+
+def submit_job(session_state, task, args=(), label=None):
+    """Run task(self, *args) in the dataset's process pool, or inline when the dataset is not shared"""
+    pool = get_job_pool(session_state)
+    if pool is None:
+        return run_inline(task, args, label)
+    return pool.submit(task, args, label)
+
+
+def submit_job_group(session_state, tasks, params=None):
+    """Submit several (label, task, args) jobs at once; they spread over all workers of the pool"""
+    return JobGroup(((label, submit_job(session_state, task, args, label)) for label, task, args in tasks), params)
+
+
+def shutdown_job_pool(dataset_key):
+    with _pools_lock:
+        pool = _pools.pop(dataset_key, None)
+    if pool is not None:
+        pool.shutdown()
+
+
+def shutdown_job_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+def get_job_pool_stats():
+    """Summary of the running pools for display"""
+    with _pools_lock:
+        return {
+            'pools': len(_pools),
+            'workers': sum(pool.max_workers for pool in _pools.values()),
+            'submitted': sum(pool.submitted for pool in _pools.values())
+        }
@@ -0,0 +1,145 @@
+import heapq
+import math
+
+# Ordering of the enumerated paths
+LINEAGE_ORDER_SHORTEST = 'shortest'
+LINEAGE_ORDER_WEIGHT = 'weight'
+LINEAGE_ORDERS = {
+    LINEAGE_ORDER_SHORTEST: 'Shortest paths first',
+    LINEAGE_ORDER_WEIGHT: 'Highest-weight paths first'
+}
+
+DEFAULT_MAX_PATH_LENGTH = 5  # edges, as the former all_simple_paths cutoff
+DEFAULT_TOP_K = 10  # paths listed per source
+DEFAULT_PATH_BUDGET = 200  # paths listed in total
+DEFAULT_EXPANSION_BUDGET = 100000  # partial paths explored in total
+
+
+class LineagePaths(list):
+    """Lineage path records plus how many paths exist and whether the listing was cut short"""
+
+    def __init__(self, paths=(), path_counts=None, truncated=False):
+        super().__init__(paths)
+        self.path_counts = path_counts or {}
+        self.truncated = truncated
+
+    @property
+    def total_paths(self):
+        return sum(self.path_counts.values())
+
+
+class LineageSweep:
+    """Reverse sweep from a target over at most max_length edges
+
+    For every node that can reach the target it keeps the number of paths to it, the
+    shortest distance and, per number of hops, the best achievable edge weight. Counts
+    are exact on acyclic lineage; with cycles near the target they are an upper bound.
+    """
+
+    def __init__(self, graph, target, max_length=DEFAULT_MAX_PATH_LENGTH):
+        self.graph = graph
+        self.target = target
+        self.max_length = max_length
+        self.distances = {target: 0}
+        self.path_counts = {}
+        self.best_weights = [{target: 0.0}]
+
+        level = {target: 1}
+        for hops in range(1, max_length + 1):
+            next_level, next_best = {}, {}
+            previous_best = self.best_weights[-1]
+            for node, count in level.items():
+                for predecessor in graph.predecessors(node):
+                    next_level[predecessor] = next_level.get(predecessor, 0) + count
+                    weight = previous_best[node] + get_edge_weight(graph, predecessor, node)
+                    if weight > next_best.get(predecessor, -math.inf):
+                        next_best[predecessor] = weight
+                    self.distances.setdefault(predecessor, hops)
+            if not next_level:
+                break
+            for node, count in next_level.items():
+                self.path_counts[node] = self.path_counts.get(node, 0) + count
+            self.best_weights.append(next_best)
+            level = next_level
+
+    def reaches_target(self, node):
+        return node in self.distances
+
+    def get_weight_bound(self, node, hops_left):
+        """Upper bound on the weight still collectable from a node within hops_left edges"""
+        return max((best[node] for best in self.best_weights[:hops_left + 1] if node in best), default=-math.inf)
+
+
+def get_edge_weight(graph, source, target):
+    """Numeric weight of an edge (1 when missing)"""
+    weight = (graph.get_edge_data(source, target) or {}).get('weight', 1)
+    return weight if isinstance(weight, (int, float)) else 1
+
+
+def enumerate_paths(sweep, source, limit, order=LINEAGE_ORDER_SHORTEST, expansion_budget=DEFAULT_EXPANSION_BUDGET):
+    """Best-first listing of up to limit simple paths from source to the sweep target
+
+    Returns (paths, expansions, complete); each path is (nodes, total weight) and complete
+    tells that no other path exists. The sweep distances (or weight bounds) guide the
+    search, so paths come out shortest or heaviest first and branches that cannot reach
+    the target within the length bound are never opened.
+    """
+    graph, target, max_length = sweep.graph, sweep.target, sweep.max_length
+    if not sweep.reaches_target(source) or limit <= 0:
+        return [], 0, not sweep.reaches_target(source)
+
+    def priority(node, hops, weight):
+        if order == LINEAGE_ORDER_WEIGHT:
+            return -(weight + sweep.get_weight_bound(node, max_length - hops))
+        return hops + sweep.distances[node]
+
+    heap = [(priority(source, 0, 0.0), 0, (source,), 0.0)]
+    paths, expansions, tiebreak = [], 0, 1
+    while heap and len(paths) < limit and expansions < expansion_budget:
+        _, _, path, weight = heapq.heappop(heap)
+        node = path[-1]
+        if node == target:
+            paths.append((list(path), weight))
+            continue
+        expansions += 1
+        hops = len(path) - 1
+        for successor in graph.successors(node):
+            if successor in path or not sweep.reaches_target(successor):
+                continue
+            if hops + 1 + sweep.distances[successor] > max_length:
+                continue
+            successor_weight = weight + get_edge_weight(graph, node, successor)
+            heapq.heappush(heap, (priority(successor, hops + 1, successor_weight), tiebreak, path + (successor,), successor_weight))
+            tiebreak += 1
+    return paths, expansions, not heap
+
+
+def trace_lineage(graph, target, sources, max_length=DEFAULT_MAX_PATH_LENGTH, top_k=DEFAULT_TOP_K,
+                  order=LINEAGE_ORDER_SHORTEST, path_budget=DEFAULT_PATH_BUDGET, expansion_budget=DEFAULT_EXPANSION_BUDGET):
+    """Paths from several sources to a target: per-source counts from one reverse sweep, top_k paths each within budgets
+
+    Returns a LineagePaths of (source, nodes, weight) tuples; truncated is set when any
+    source has more paths than were listed.
+    """
+    sweep = LineageSweep(graph, target, max_length)
+    reachable = sorted((source for source in sources if source != target and sweep.reaches_target(source)),
+                       key=lambda source: (sweep.distances[source], source))
+
+    listed, expansions_left = [], expansion_budget
+    path_counts = {source: sweep.path_counts[source] for source in reachable}
+    for source in reachable:
+        limit = min(top_k, path_budget - len(listed))
+        if limit <= 0 or expansions_left <= 0:
+            break
+        paths, expansions, complete = enumerate_paths(sweep, source, limit, order, expansions_left)
+        expansions_left -= expansions
+        listed.extend((source, nodes, weight) for nodes, weight in paths)
+        if complete:
+            # Every simple path was listed, so the count is exact even when cycles inflated the sweep
+            path_counts[source] = len(paths)
+
+    listed_per_source = {}
+    for source, _, _ in listed:
+        listed_per_source[source] = listed_per_source.get(source, 0) + 1
+    truncated = any(listed_per_source.get(source, 0) < count for source, count in path_counts.items())
+    return LineagePaths(listed, path_counts, truncated)
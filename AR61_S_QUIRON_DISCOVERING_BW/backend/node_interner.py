@@ -0,0 +1,157 @@
+import networkx as nx
+import numpy as np
+
+from backend.inventory_store import get_object_names
+
+# Key under which the interner built at load travels with the graph (graph.graph attributes)
+INTERNER_GRAPH_KEY = 'node_interner'
+
+
+class NodeInterner:
+    """Dense integer codes for the inventory objects, in inventory order, with the reverse name tables
+
+    Each object type owns a contiguous code range, so code - start is the position of
+    the object in its inventory sequence. Degrees are read from the graph once and kept
+    as arrays indexed by code.
+    """
+
+    def __init__(self, global_inventory, graph=None):
+        self.node_ids = []
+        self.names = []
+        self.type_ranges = {}
+        self._codes = {}
+
+        for obj_type, objects in global_inventory.items():
+            start = len(self.node_ids)
+            for name in get_object_names(objects):
+                node_id = f"{obj_type}:{name}"
+                self._codes.setdefault(node_id, len(self.node_ids))
+                self.node_ids.append(node_id)
+                self.names.append(name)
+            self.type_ranges[obj_type] = (start, len(self.node_ids))
+
+        self.type_codes = np.zeros(len(self.node_ids), dtype=np.uint8)
+        self.types = list(self.type_ranges)
+        for type_code, (start, stop) in enumerate(self.type_ranges.values()):
+            self.type_codes[start:stop] = type_code
+
+        self.graph = graph
+        self.signature = get_interner_signature(global_inventory, graph)
+        self._degrees = {}
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def __contains__(self, node_id):
+        return node_id in self._codes
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The graph pickles alongside the interner; keeping a back reference would only duplicate it
+        state['graph'] = None
+        return state
+
+    def iter_node_ids(self):
+        """Distinct node ids in code order"""
+        return iter(self._codes)
+
+    def get_canonical_codes(self):
+        """For every code, the code of the first row with the same node id"""
+        return np.fromiter((self._codes[node_id] for node_id in self.node_ids), dtype=np.int32, count=len(self.node_ids))
+
+    def get_code(self, node_id):
+        """Code of a node id, or -1 when it is not an inventory object"""
+        return self._codes.get(node_id, -1)
+
+    def encode(self, node_ids):
+        """Codes of several node ids (-1 for unknown ones)"""
+        return np.fromiter((self._codes.get(node_id, -1) for node_id in node_ids), dtype=np.int32)
+
+    def decode(self, codes):
+        """Node id strings of several codes"""
+        return [self.node_ids[code] for code in codes]
+
+    def get_type(self, code):
+        """Object type of a code"""
+        return self.types[self.type_codes[code]]
+
+    def get_type_slice(self, obj_type):
+        """Code range of an object type (empty for unknown types)"""
+        start, stop = self.type_ranges.get(obj_type, (0, 0))
+        return slice(start, stop)
+
+    def get_node_id(self, obj_type, index):
+        """Node id of the index-th object of a type"""
+        return self.node_ids[self.type_ranges[obj_type][0] + index]
+
+    def get_degrees(self, kind='degree'):
+        """Degree ('degree', 'in_degree' or 'out_degree') of every code, read from the graph once"""
+        if kind not in self._degrees:
+            self._degrees[kind] = read_graph_degrees(self.graph, self.node_ids, kind)
+        return self._degrees[kind]
+
+    def get_in_graph(self):
+        """Boolean mask of the codes whose node is present in the graph"""
+        if 'in_graph' not in self._degrees:
+            graph = self.graph
+            self._degrees['in_graph'] = np.fromiter((graph is not None and node_id in graph.nodes for node_id in self.node_ids),
+                                                    dtype=bool, count=len(self.node_ids))
+        return self._degrees['in_graph']
+
+    def get_type_degrees(self, obj_type, kind='degree'):
+        """Degrees aligned with the inventory sequence of a type"""
+        return self.get_degrees(kind)[self.get_type_slice(obj_type)]
+
+
+def read_graph_degrees(graph, node_ids, kind='degree'):
+    """Degree of each node id as an int array (0 for nodes missing from the graph)"""
+    if graph is None:
+        return np.zeros(len(node_ids), dtype=np.int32)
+
+    # Array-backed graphs (the CSR engine) hand out their degree arrays directly
+    if isinstance(getattr(graph, 'interner', None), NodeInterner):
+        return graph.get_degree_array(kind, node_ids)
+
+    if isinstance(graph, nx.Graph):
+        # Undirected graphs have no separate in/out degree
+        view = getattr(graph, kind) if graph.is_directed() else graph.degree
+        degree_map = dict(view())
+        return np.fromiter((degree_map.get(node_id, 0) for node_id in node_ids), dtype=np.int32, count=len(node_ids))
+
+    view = getattr(graph, kind)
+    return np.fromiter((view(node_id) if node_id in graph.nodes else 0 for node_id in node_ids),
+                       dtype=np.int32, count=len(node_ids))
+
+
+def get_interner_signature(global_inventory, graph):
+    """Cheap identity of an inventory/graph pair used to detect a stale interner (patches re-index explicitly)"""
+    graph_size = len(graph) if get_graph_attributes(graph) is not None else None
+    return graph_size, tuple((obj_type, len(objects)) for obj_type, objects in global_inventory.items())
+
+
+def get_graph_attributes(graph):
+    """Graph-level attribute dict of a NetworkX or CSR graph (None for stand-ins such as mocks)"""
+    graph_attributes = getattr(graph, 'graph', None)
+    return graph_attributes if isinstance(graph_attributes, dict) else None
+
+
+def index_graph_nodes(global_inventory, graph, interner=None):
+    """Attach an interner (built here unless given) to a freshly built or patched graph"""
+    interner = interner or NodeInterner(global_inventory, graph)
+    interner.graph = graph
+    interner.signature = get_interner_signature(global_inventory, graph)
+    graph.graph[INTERNER_GRAPH_KEY] = interner
+    return interner
+
+
+def get_node_interner(global_inventory, graph):
+    """Interner of a dataset, rebuilt only when the inventory or graph no longer match"""
+    graph_attributes = get_graph_attributes(graph)
+    interner = graph_attributes.get(INTERNER_GRAPH_KEY) if graph_attributes is not None else None
+    if interner is not None and interner.signature == get_interner_signature(global_inventory, graph):
+        interner.graph = graph
+        return interner
+
+    if graph_attributes is None:
+        return NodeInterner(global_inventory, graph)
+    return index_graph_nodes(global_inventory, graph)
@@ -2,83 +2,122 @@ import streamlit as st
 import networkx as nx
 import plotly.graph_objects as go
 import random
+import numpy as np
 from collections import defaultdict
 from connectors.source_detectors import get_source_system_info 
+from backend.edge_store import select_edges_within
+from backend.filter_expression import get_filter_mask
+from backend.search_index import get_search_index
+
+
+def get_eligible_codes(selected_types, selected_infoareas, min_connections, filter_expression=''):
+    """Search index and codes (in inventory order) of the objects passing the visualization filters"""
+    search_index = get_search_index(st.session_state.global_inventory, st.session_state.graph)
+    mask = get_filter_mask(search_index, filter_expression)
+    in_types = np.zeros(len(search_index), dtype=bool)
+    for obj_type in selected_types:
+        in_types |= search_index.get_type_mask(obj_type)
+    codes = search_index.search(infoareas=selected_infoareas, min_degree=min_connections, mask=mask & in_types)
+    return search_index, codes
+
+
+# Connection-based sample types drawn from a single stratum, by stratum position
+STRATUM_SAMPLE_TYPES = ("Show Highly Connected", "Show Well Connected", "Show Isolated")
+MIXED_SAMPLE_TYPE = "Show Mixed Distribution"
+
+
+def get_objects_with_connections(search_index, codes):
+    """Copies of some objects with their connection count and node id (only these are materialized)"""
+    global_inventory = st.session_state.global_inventory
+    objects = []
+    for code in codes.tolist():
+        _, obj = search_index.get_object(global_inventory, code)
+        obj_with_connections = obj.copy()
+        obj_with_connections['connections'] = int(search_index.degrees[code])
+        obj_with_connections['node_id'] = search_index.interner.node_ids[code]
+        objects.append(obj_with_connections)
+    return objects
+
+
+def get_eligible_objects(selected_types, selected_infoareas, min_connections, filter_expression=''):
+    """Copies of the eligible objects with their connection count and node id"""
+    search_index, codes = get_eligible_codes(selected_types, selected_infoareas, min_connections, filter_expression)
+    return get_objects_with_connections(search_index, codes)
+
+
+def get_connection_strata(degrees):
+    """Masks of the highly (> 2×avg), well (avg..2×avg) and isolated (0) connected positions of a degree array"""
+    avg_connections = degrees.mean()
+    return [
+        degrees > avg_connections * 2,
+        (degrees >= avg_connections) & (degrees <= avg_connections * 2),
+        degrees == 0
+    ]
+
+
+def get_stratum_quotas(max_objects, shares):
+    """Whole quotas proportional to the shares that add up exactly to their total (largest remainder)"""
+    wanted = np.asarray(shares, dtype=float) * max_objects
+    quotas = np.floor(wanted).astype(np.int64)
+    missing = min(int(round(wanted.sum())), max_objects) - int(quotas.sum())
+    if missing > 0:
+        quotas[np.argsort(quotas - wanted, kind='stable')[:missing]] += 1
+    return quotas.tolist()
+
+
+def reservoir_sample(priorities, positions, count):
+    """The count positions with the lowest random priorities, in inventory order
+
+    Keeping the lowest priorities is a bottom-k reservoir: every subset of the stratum
+    is equally likely and the result does not depend on the order positions come in.
+    """
+    if count <= 0:
+        return positions[:0]
+    if count >= len(positions):
+        return positions
+    lowest = np.argpartition(priorities[positions], count - 1)[:count]
+    return np.sort(positions[lowest])
 
 
 def get_connection_based_dataset(self, sample_type, selected_types, selected_infoareas,
                                  max_objects, min_connections, max_edges,
-                                 highly_pct=0.4, well_pct=0.4, isolated_pct=0.2):
+                                 highly_pct=0.4, well_pct=0.4, isolated_pct=0.2, filter_expression='', seed=0):
     """Get dataset based on connection patterns - NEW METHOD"""
 
-    # Get all eligible objects with connection analysis
-    all_objects = []
-
-    for obj_type, objects in st.session_state.global_inventory.items():
-        if obj_type in selected_types:
-            for obj in objects:
-                # Apply InfoArea filter
-                if selected_infoareas and obj.get('infoarea', 'UNASSIGNED') not in selected_infoareas:
-                    continue
-
-                # Get connection count
-                node_id = f"{obj_type}:{obj['name']}"
-                connections = st.session_state.graph.degree(node_id) if node_id in st.session_state.graph.nodes else 0
-
-                if connections >= min_connections:
-                    obj_with_connections = obj.copy()
-                    obj_with_connections['connections'] = connections
-                    obj_with_connections['node_id'] = node_id
-                    all_objects.append(obj_with_connections)
-
-    # Calculate connection thresholds
-    if all_objects:
-        connection_counts = [obj['connections'] for obj in all_objects]
-        avg_connections = sum(connection_counts) / len(connection_counts)
-
-        # Categorize objects by connection level
-        highly_connected = [obj for obj in all_objects if obj['connections'] > avg_connections * 2]
-        well_connected = [obj for obj in all_objects if avg_connections <= obj['connections'] <= avg_connections * 2]
-        isolated = [obj for obj in all_objects if obj['connections'] == 0]
-
-        # Sample based on strategy
-        sampled_objects = []
-
-        if sample_type == "Show Highly Connected":
-            sampled_objects = highly_connected[:max_objects]
-        elif sample_type == "Show Well Connected":
-            sampled_objects = well_connected[:max_objects]
-        elif sample_type == "Show Isolated":
-            sampled_objects = isolated[:max_objects]
-        elif sample_type == "Show Mixed Distribution":
-            # Mix according to specified percentages
-            high_count = int(max_objects * highly_pct)
-            well_count = int(max_objects * well_pct)
-            isolated_count = int(max_objects * isolated_pct)
-
-            sampled_objects.extend(highly_connected[:high_count])
-            sampled_objects.extend(well_connected[:well_count])
-            sampled_objects.extend(isolated[:isolated_count])
-
-            # Fill remaining spots if needed
-            remaining = max_objects - len(sampled_objects)
-            if remaining > 0:
-                remaining_objects = [obj for obj in all_objects if obj not in sampled_objects]
-                sampled_objects.extend(remaining_objects[:remaining])
-
-        # Get relevant relationships
-        sampled_node_ids = set(obj['node_id'] for obj in sampled_objects)
-        sampled_relationships = []
-
-        for rel in st.session_state.relationships:
-            if rel['source'] in sampled_node_ids and rel['target'] in sampled_node_ids:
-                sampled_relationships.append(rel)
-                if len(sampled_relationships) >= max_edges and max_edges > 0:
-                    break
-
-        return sampled_objects, sampled_relationships
-
-    return [], []
+    # Eligible objects stay codes into the search index; only the final sample is copied
+    search_index, codes = get_eligible_codes(selected_types, selected_infoareas, min_connections, filter_expression)
+    if not len(codes):
+        return [], []
+
+    degrees = search_index.degrees[codes]
+    strata = get_connection_strata(degrees)
+    priorities = np.random.default_rng(seed).random(len(codes))
+
+    # Sample based on strategy
+    if sample_type in STRATUM_SAMPLE_TYPES:
+        in_stratum = strata[STRATUM_SAMPLE_TYPES.index(sample_type)]
+        positions = reservoir_sample(priorities, np.flatnonzero(in_stratum), max_objects)
+    elif sample_type == MIXED_SAMPLE_TYPE:
+        # Each stratum gets its quota; the strata that fall short leave room for the other objects
+        taken = np.zeros(len(codes), dtype=bool)
+        parts = []
+        for in_stratum, quota in zip(strata, get_stratum_quotas(max_objects, [highly_pct, well_pct, isolated_pct])):
+            part = reservoir_sample(priorities, np.flatnonzero(in_stratum & ~taken), quota)
+            taken[part] = True
+            parts.append(part)
+        remaining = max_objects - sum(len(part) for part in parts)
+        parts.append(reservoir_sample(priorities, np.flatnonzero(~taken), remaining))
+        positions = np.concatenate(parts)
+    else:
+        positions = np.zeros(0, dtype=np.int64)
+
+    sampled_objects = get_objects_with_connections(search_index, codes[positions])
+
+    # Get relevant relationships
+    sampled_node_ids = set(obj['node_id'] for obj in sampled_objects)
+    sampled_relationships = select_edges_within(st.session_state.relationships, sampled_node_ids, max_edges)
+
+    return sampled_objects, sampled_relationships
 
 
 def calculate_sampled_connection_stats(self, sampled_objects):
@@ -388,30 +427,11 @@ def add_connection_aware_3d_nodes_by_category(self, fig, category, objects, pos_
 
 
 def get_optimized_dataset(self, strategy, selected_types, selected_infoareas,
-                          max_objects, min_connections, max_edges):
+                          max_objects, min_connections, max_edges, filter_expression=''):
     """Get optimized dataset based on strategy"""
 
     # First, get all eligible objects
-    eligible_objects = []
-
-    for obj_type, objects in st.session_state.global_inventory.items():
-        if obj_type in selected_types:
-            for obj in objects:
-                # Apply InfoArea filter
-                if selected_infoareas and obj.get('infoarea', 'UNASSIGNED') not in selected_infoareas:
-                    continue
-
-                # Apply connection filter
-                node_id = f"{obj_type}:{obj['name']}"
-                connections = st.session_state.graph.degree(node_id) if node_id in st.session_state.graph.nodes else 0
-                if connections < min_connections:
-                    continue
-
-                # Add connection count for sorting
-                obj_with_connections = obj.copy()
-                obj_with_connections['connections'] = connections
-                obj_with_connections['node_id'] = node_id
-                eligible_objects.append(obj_with_connections)
+    eligible_objects = get_eligible_objects(selected_types, selected_infoareas, min_connections, filter_expression)
 
     # Apply sampling strategy
     if strategy == "🎯 Smart Sample (Recommended)":
@@ -430,13 +450,7 @@ def get_optimized_dataset(self, strategy, selected_types, selected_infoareas,
 
     # Get relevant relationships
     sampled_node_ids = set(obj['node_id'] for obj in sampled_objects)
-    sampled_relationships = []
-
-    for rel in st.session_state.relationships:
-        if rel['source'] in sampled_node_ids and rel['target'] in sampled_node_ids:
-            sampled_relationships.append(rel)
-            if len(sampled_relationships) >= max_edges and max_edges > 0:
-                break
+    sampled_relationships = select_edges_within(st.session_state.relationships, sampled_node_ids, max_edges)
 
     return sampled_objects, sampled_relationships
 
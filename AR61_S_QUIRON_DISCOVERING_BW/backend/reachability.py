@@ -0,0 +1,128 @@
+import numpy as np
+
+from backend.condensation import CONDENSATION_GRAPH_KEY, FLOW_EDGE_TYPES, get_condensation
+from backend.node_interner import get_graph_attributes
+from backend.traversal import get_typed_adjacency
+
+# Key under which the upstream source index travels with the graph (graph.graph attributes)
+REACHABILITY_GRAPH_KEY = 'source_reachability'
+
+SOURCE_FLOW_EDGE_TYPES = FLOW_EDGE_TYPES
+SOURCE_OBJECT_TYPE = 'DS'
+
+
+class SourceReachability:
+    """Upstream DataSource set of every object on the data flow, as packed bitsets
+
+    Flow edges are condensed into strongly connected components and swept once in
+    topological order; each component row holds one bit per DataSource that reaches it
+    through at least one flow edge. Lookups go node -> component row in constant time.
+    """
+
+    def __init__(self, graph, edge_types=SOURCE_FLOW_EDGE_TYPES):
+        adjacency = get_typed_adjacency(graph)
+        self.adjacency = adjacency
+        self.edge_types = tuple(edge_types)
+        self.signature = adjacency.signature
+
+        condensation = get_condensation(graph, edge_types)
+        sources, _ = adjacency.get_edges(edge_types)
+
+        # Columns: DataSources with at least one outgoing flow edge, in code order
+        source_codes = sorted({code for code in set(sources.tolist()) if self._is_source(code)})
+        self.sources = [adjacency.node_ids[code] for code in source_codes]
+        self._columns = {code: column for column, code in enumerate(source_codes)}
+        words = max(1, (len(source_codes) + 63) // 64)
+
+        self._rows = condensation.components
+        own = np.zeros((len(condensation), words), dtype=np.uint64)
+        for code in source_codes:
+            self._set_bit(own[self._rows[code]], code)
+
+        # Inside a cycle the members feed each other; a lone source only feeds downstream
+        self.bits = np.where(condensation.cyclic[:, None], own, np.uint64(0))
+        has_successors = np.flatnonzero(np.diff(condensation.dag_indptr))
+        for component in has_successors.tolist():
+            # Component ids are topological: every predecessor has already been swept
+            self.bits[condensation.get_successors(component)] |= self.bits[component] | own[component]
+
+    def _is_source(self, code):
+        return self.adjacency.node_ids[code].split(':', 1)[0] == SOURCE_OBJECT_TYPE
+
+    def _set_bit(self, bitset, code):
+        column = self._columns.get(code)
+        if column is not None:
+            bitset[column >> 6] |= np.uint64(1) << np.uint64(column & 63)
+
+    def get_row(self, node_id):
+        """Component row of a node, or -1 when no flow edge touches it"""
+        code = self.adjacency.get_code(node_id)
+        return int(self._rows[code]) if code >= 0 else -1
+
+    def get_source_bits(self, node_id):
+        """Packed bitset of the DataSources upstream of a node (all zeros off the data flow)"""
+        row = self.get_row(node_id)
+        return self.bits[row] if row >= 0 else np.zeros(self.bits.shape[1], dtype=np.uint64)
+
+    def get_upstream_sources(self, node_id):
+        """DataSource node ids that ultimately feed a node"""
+        bits = np.unpackbits(self.get_source_bits(node_id).view(np.uint8), bitorder='little')
+        return [self.sources[column] for column in np.flatnonzero(bits[:len(self.sources)])]
+
+    def count_upstream_sources(self, node_id):
+        return int(np.bitwise_count(self.get_source_bits(node_id)).sum())
+
+    def feeds(self, source_id, node_id):
+        """Whether a DataSource reaches a node along the data flow"""
+        column = self._columns.get(self.adjacency.get_code(source_id))
+        if column is None:
+            return False
+        return bool(self.get_source_bits(node_id)[column >> 6] >> np.uint64(column & 63) & np.uint64(1))
+
+    def get_group_masks(self, get_group):
+        """Bitset per group of DataSources, grouping by get_group(source name)"""
+        masks = {}
+        for column, source_id in enumerate(self.sources):
+            group = get_group(source_id.split(':', 1)[1])
+            mask = masks.setdefault(group, np.zeros(self.bits.shape[1], dtype=np.uint64))
+            mask[column >> 6] |= np.uint64(1) << np.uint64(column & 63)
+        return masks
+
+    def get_group_matrix(self, node_ids, get_group):
+        """(groups, counts) where counts[i, j] is how many sources of group j feed node_ids[i]"""
+        masks = self.get_group_masks(get_group)
+        groups = sorted(masks)
+        rows = np.asarray([self.get_row(node_id) for node_id in node_ids], dtype=np.int64)
+        node_bits = np.zeros((len(rows), self.bits.shape[1]), dtype=np.uint64)
+        on_flow = rows >= 0
+        node_bits[on_flow] = self.bits[rows[on_flow]]
+        counts = np.zeros((len(rows), len(groups)), dtype=np.int32)
+        for column, group in enumerate(groups):
+            counts[:, column] = np.bitwise_count(node_bits & masks[group]).sum(axis=1)
+        return groups, counts
+
+    def nbytes(self):
+        return self.bits.nbytes + self._rows.nbytes
+
+
+def get_source_reachability(graph):
+    """Upstream source index of a graph, built on first use and kept with the graph"""
+    graph_attributes = get_graph_attributes(graph)
+    reachability = graph_attributes.get(REACHABILITY_GRAPH_KEY) if graph_attributes is not None else None
+    if reachability is not None and reachability.signature == get_typed_adjacency(graph).signature:
+        return reachability
+
+    reachability = SourceReachability(graph)
+    if graph_attributes is not None:
+        graph_attributes[REACHABILITY_GRAPH_KEY] = reachability
+    return reachability
+
+
+def index_source_reachability(graph):
+    """Precompute the upstream source index of a freshly built or patched graph (graphs without attributes are skipped)"""
+    graph_attributes = get_graph_attributes(graph)
+    if graph_attributes is None:
+        return None
+    graph_attributes.pop(REACHABILITY_GRAPH_KEY, None)
+    graph_attributes.pop(CONDENSATION_GRAPH_KEY, None)
+    return get_source_reachability(graph)
@@ -1,6 +1,14 @@
 import streamlit as st
+import numpy as np
+import pandas as pd
 from datetime import datetime
 from connectors.source_detectors import get_source_system_info, determine_infosource_type
+from backend.edge_store import count_edge_types
+from backend.node_interner import get_node_interner
+from backend.inventory_store import get_object_names
+from backend.reachability import get_source_reachability
+from backend.filter_expression import get_filter_mask
+from backend.search_index import get_search_index
 
 
 def generate_search_connection_summary(self, df, connection_filter_type):
@@ -92,10 +100,7 @@ CONNECTION TYPE ANALYSIS
 """
     
     # Analyze connection types
-    connection_types = {}
-    for rel in st.session_state.relationships:
-        rel_type = rel['type']
-        connection_types[rel_type] = connection_types.get(rel_type, 0) + 1
+    connection_types = count_edge_types(st.session_state.relationships)
     
     for conn_type, count in sorted(connection_types.items(), key=lambda x: x[1], reverse=True):
         percentage = (count / len(st.session_state.relationships)) * 100
@@ -109,11 +114,13 @@ OBJECT CONNECTIVITY ANALYSIS
     
     # Find most and least connected objects
     connectivity_stats = []
+    interner = get_node_interner(st.session_state.global_inventory, st.session_state.graph)
     for obj_type, objects in st.session_state.global_inventory.items():
-        for obj in objects:
-            node_id = f"{obj_type}:{obj['name']}"
-            if node_id in st.session_state.graph.nodes:
-                connections = st.session_state.graph.degree(node_id)
+        degrees = interner.get_type_degrees(obj_type)
+        in_graph = interner.get_in_graph()[interner.get_type_slice(obj_type)]
+        for index, obj in enumerate(objects):
+            if in_graph[index]:
+                connections = int(degrees[index])
                 connectivity_stats.append({
                     'name': obj['name'],
                     'type': obj['type_name'],
@@ -174,8 +181,8 @@ RECOMMENDATIONS
     return report
 
 
-def prepare_objects_csv_export(self):
-    """Prepare comprehensive CSV export of all objects"""
+def prepare_objects_csv_export(self, filter_expression=''):
+    """Prepare comprehensive CSV export of all objects, or of those matching a filter expression"""
     
     csv_data = []
     
@@ -183,61 +190,74 @@ def prepare_objects_csv_export(self):
     csv_data.append("Object Name,Object Type,Category,Owner,InfoArea,Active,Status,Total Connections,"
                     "In Connections,Out Connections,Source System,InfoSource Type,Last Changed")
     
-    # Process all objects
-    for obj_type, objects in st.session_state.global_inventory.items():
-        for obj in objects:
-            node_id = f"{obj_type}:{obj['name']}"
-            
-            # Get connection statistics
-            total_connections = 0
-            in_connections = 0
-            out_connections = 0
-            
-            if node_id in st.session_state.graph.nodes:
-                total_connections = st.session_state.graph.degree(node_id)
-                in_connections = st.session_state.graph.in_degree(node_id)
-                out_connections = st.session_state.graph.out_degree(node_id)
-            
-            # Enhanced info for DataSources
-            source_system = ""
-            infosource_type = ""
-            if obj_type == 'DS':
-                source_system = get_source_system_info(self, obj['name'])
-                infosource_type = determine_infosource_type(self, obj['name'])
-            
-            # Build CSV row
-            row = [
-                obj['name'],
-                obj['type_name'],
-                obj['category'],
-                obj.get('owner', 'Unknown'),
-                obj.get('infoarea', 'UNASSIGNED'),
-                obj.get('active', 'Unknown'),
-                obj.get('status', 'Unknown'),
-                str(total_connections),
-                str(in_connections),
-                str(out_connections),
-                source_system,
-                infosource_type,
-                obj.get('last_changed', 'Unknown')
-            ]
-            
-            csv_data.append(','.join(f'"{field}"' for field in row))
+    # Process the matching objects only
+    global_inventory = st.session_state.global_inventory
+    search_index = get_search_index(global_inventory, st.session_state.graph)
+    codes = np.flatnonzero(get_filter_mask(search_index, filter_expression))
+    interner = search_index.interner
+    degrees = interner.get_degrees()
+    in_degrees = interner.get_degrees('in_degree')
+    out_degrees = interner.get_degrees('out_degree')
+    for code in codes.tolist():
+        obj_type, obj = search_index.get_object(global_inventory, code)
+        # Get connection statistics
+        total_connections = int(degrees[code])
+        in_connections = int(in_degrees[code])
+        out_connections = int(out_degrees[code])
+        
+        # Enhanced info for DataSources
+        source_system = ""
+        infosource_type = ""
+        if obj_type == 'DS':
+            source_system = get_source_system_info(self, obj['name'])
+            infosource_type = determine_infosource_type(self, obj['name'])
+        
+        # Build CSV row
+        row = [
+            obj['name'],
+            obj['type_name'],
+            obj['category'],
+            obj.get('owner', 'Unknown'),
+            obj.get('infoarea', 'UNASSIGNED'),
+            obj.get('active', 'Unknown'),
+            obj.get('status', 'Unknown'),
+            str(total_connections),
+            str(in_connections),
+            str(out_connections),
+            source_system,
+            infosource_type,
+            obj.get('last_changed', 'Unknown')
+        ]
+        
+        csv_data.append(','.join(f'"{field}"' for field in row))
     
     return '\n'.join(csv_data)
 
 
+def prepare_cube_source_system_matrix(self):
+    """InfoCubes by source system: how many upstream DataSources of each system feed each cube"""
+    cube_names = list(dict.fromkeys(get_object_names(st.session_state.global_inventory.get('CUBE', []))))
+    reachability = get_source_reachability(st.session_state.graph)
+    systems, counts = reachability.get_group_matrix([f"CUBE:{name}" for name in cube_names],
+                                                    lambda ds_name: get_source_system_info(self, ds_name))
+
+    matrix = pd.DataFrame(counts, index=pd.Index(cube_names, name='InfoCube'), columns=systems)
+    matrix['Total DataSources'] = [reachability.count_upstream_sources(f"CUBE:{name}") for name in cube_names]
+    return matrix.sort_values('Total DataSources', ascending=False)
+
+
 def get_sample_for_export(self):
     """Get a representative sample for export"""
     sample_objects = {}
+    interner = get_node_interner(st.session_state.global_inventory, st.session_state.graph)
     
     for obj_type, objects in st.session_state.global_inventory.items():
         if len(objects) > 100:
             # Take a sample of 100 most connected objects
             objects_with_connections = []
-            for obj in objects:
-                node_id = f"{obj_type}:{obj['name']}"
-                connections = st.session_state.graph.degree(node_id) if node_id in st.session_state.graph.nodes else 0
+            degrees = interner.get_type_degrees(obj_type)
+            for index, obj in enumerate(objects):
+                connections = int(degrees[index])
                 obj_copy = obj.copy()
                 obj_copy['connections'] = connections
                 objects_with_connections.append(obj_copy)
@@ -0,0 +1,175 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# Process-wide cache of analysis results shared by every session on the same dataset.
+# Keys carry the dataset key and version, so a refresh (which bumps the version) makes
+# older results unreachable; they are dropped eagerly when the dataset is republished.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Long sequences are sized from a sample of their items
+SIZE_SAMPLE_ITEMS = 64
+
+
+class ResultCache:
+    """Thread-safe LRU of analysis results bounded by their estimated memory size"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Cached value of a key (marking it as recently used), counting the hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """Store a value, evicting the least recently used entries to stay within max_bytes"""
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            self.discard(key)
+            if size > self.max_bytes:
+                # Results larger than the whole budget are never cached
+                return False
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+            return True
+
+    def get_or_compute(self, key, compute):
+        """Cached value of a key, computing and storing it on a miss (None and partial results are not stored)"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        value = compute()
+        if is_complete_result(value):
+            self.put(key, value)
+        return value
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[1]
+
+    def discard_dataset(self, dataset_key, keep_version=None):
+        """Drop the results of a dataset, except those of keep_version; returns how many were dropped"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == dataset_key and key[1] != keep_version]
+            for key in stale:
+                self.discard(key)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def get_stats(self):
+        """Counters for display"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+def is_complete_result(value):
+    """Whether a result may be cached: None and results cut short by a budget or a stop ('partial') are not"""
+    return value is not None and not (isinstance(value, dict) and value.get('partial'))
+
+
+def estimate_size(value, _depth=0):
+    """Approximate deep memory size of a result made of dicts, sequences and scalars"""
+    size = sys.getsizeof(value)
+    if _depth > 8:
+        return size
+    if isinstance(value, dict):
+        items = list(value.items())
+        if len(items) > SIZE_SAMPLE_ITEMS:
+            sample = items[:SIZE_SAMPLE_ITEMS]
+            sampled = sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in sample)
+            return size + sampled * len(items) // len(sample)
+        return size + sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in items)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = value if isinstance(value, (list, tuple)) else list(value)
+        if len(items) > SIZE_SAMPLE_ITEMS:
+            sample = items[:SIZE_SAMPLE_ITEMS]
+            return size + sum(estimate_size(item, _depth + 1) for item in sample) * len(items) // len(sample)
+        return size + sum(estimate_size(item, _depth + 1) for item in items)
+    return size
+
+
+_result_cache = ResultCache()
+
+
+def get_analysis_key(session_state, analysis, *params):
+    """Cache key of an analysis on the session's dataset, or None when the dataset is not shared"""
+    dataset_key = getattr(session_state, 'dataset_key', None)
+    if not isinstance(dataset_key, str):
+        return None
+    dataset_stats = getattr(session_state, 'dataset_stats', None) or {}
+    normalized = tuple(tuple(sorted(set(param))) if isinstance(param, (list, tuple, set)) else param for param in params)
+    return dataset_key, dataset_stats.get('dataset_version', 1), analysis, normalized
+
+
+def get_cached_analysis(session_state, analysis, params, compute):
+    """Result of compute() for an analysis and its parameters, shared across sessions of the same dataset version"""
+    key = get_analysis_key(session_state, analysis, *params)
+    if key is None:
+        return compute()
+    return _result_cache.get_or_compute(key, compute)
+
+
+def get_cached_result(session_state, analysis, params):
+    """Cached result of an analysis, or None when it has not been computed on this dataset version"""
+    key = get_analysis_key(session_state, analysis, *params)
+    return _result_cache.get(key) if key is not None else None
+
+
+def store_cached_result(session_state, analysis, params, value):
+    """Store a result computed elsewhere (e.g. by a background job) under its analysis key"""
+    key = get_analysis_key(session_state, analysis, *params)
+    if key is not None and is_complete_result(value):
+        _result_cache.put(key, value)
+
+
+def discard_dataset_results(dataset_key, keep_version=None):
+    """Forget cached results of a dataset (all of them, or every version but keep_version)"""
+    return _result_cache.discard_dataset(dataset_key, keep_version)
+
+
+def get_result_cache_stats():
+    return _result_cache.get_stats()
+
+
+def clear_result_cache():
+    _result_cache.clear()
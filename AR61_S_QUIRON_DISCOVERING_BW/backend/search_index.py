@@ -0,0 +1,369 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from backend.csr_graph import get_indptr
+from backend.inventory_store import get_column_values
+from backend.node_interner import get_graph_attributes, get_node_interner
+
+# Key under which the object search index built at load travels with the graph (graph.graph attributes)
+SEARCH_INDEX_GRAPH_KEY = 'object_search'
+
+# Columns with an inverted index, and the value of objects that lack them
+INDEXED_COLUMNS = {
+    'type_name': '', 'category': '', 'infoarea': 'UNASSIGNED', 'owner': '', 'active': 'Unknown', 'status': 'Unknown'
+}
+
+# Change timestamps (CONTTIMESTMP) compare as YYYYMMDDhhmmss numbers; shorter dates are padded
+TIMESTAMP_DIGITS = 14
+
+# Result columns that can be sorted
+SORT_CONNECTIONS = 'Connections'
+SORT_NAME = 'Name'
+SORT_TYPE = 'Type'
+SORT_OWNER = 'Owner'
+SORT_INFOAREA = 'InfoArea'
+SORT_STATUS = 'Connection Status'
+SORT_PERCENTAGE = 'Connection %'
+
+# Suggestions a typeahead picker sends to the browser
+TYPEAHEAD_LIMIT = 50
+
+# Share of the search term's trigrams a name must contain to be a fuzzy match
+FUZZY_MIN_SIMILARITY = 0.6
+
+TRIGRAM_SIZE = 3
+
+
+def get_timestamp_numbers(values):
+    """YYYYMMDDhhmmss numbers of timestamps or dates in any punctuation (NaN when there is no date)"""
+    digits = pd.Series(values, dtype=object).astype(str).str.replace(r'\D', '', regex=True)
+    stamps = digits.str[:TIMESTAMP_DIGITS].str.ljust(TIMESTAMP_DIGITS, '0').where(digits.str.len() >= 8)
+    return pd.to_numeric(stamps, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def get_trigrams(text):
+    """Distinct trigrams of a lowercased text (none for texts shorter than three characters)"""
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """Name and attribute indexes over the inventory objects, addressed by interner code
+
+    Names are kept lowercased in code order and once more sorted, for prefix lookups by
+    bisection. Every trigram of every name points to the codes containing it (CSR
+    postings), which narrows substring and fuzzy searches to a few candidates. The
+    categorical columns get one posting list per distinct value. Every filter yields a
+    boolean mask over the codes, so a search is the intersection of its masks.
+    """
+
+    def __init__(self, global_inventory, graph):
+        interner = get_node_interner(global_inventory, graph)
+        self.interner = interner
+        self.degrees = interner.get_degrees('degree')
+        self.names = [str(name).lower() for name in interner.names]
+
+        order = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self.sorted_names = [self.names[code] for code in order]
+        self.sorted_codes = np.asarray(order, dtype=np.int32)
+        self.name_ranks = np.empty(len(order), dtype=np.int32)
+        self.name_ranks[self.sorted_codes] = np.arange(len(order), dtype=np.int32)
+
+        self.trigram_ids = {}
+        gram_ids, gram_codes = [], []
+        for code, name in enumerate(self.names):
+            for gram in get_trigrams(name):
+                gram_ids.append(self.trigram_ids.setdefault(gram, len(self.trigram_ids)))
+                gram_codes.append(code)
+        gram_ids = np.asarray(gram_ids, dtype=np.int32)
+        # A stable sort keeps every posting list in code order
+        postings = np.argsort(gram_ids, kind='stable')
+        self.trigram_codes = np.asarray(gram_codes, dtype=np.int32)[postings]
+        self.trigram_ptr = get_indptr(gram_ids[postings], len(self.trigram_ids))
+
+        self.type_max_degrees = {
+            obj_type: int(self.degrees[start:stop].max()) if stop > start else 0
+            for obj_type, (start, stop) in interner.type_ranges.items()
+        }
+
+        self.changed = get_timestamp_numbers(
+            [value for objects in global_inventory.values() for value in get_column_values(objects, 'last_changed')])
+
+        self.columns = {}
+        self.column_codes = {}
+        for key, default in INDEXED_COLUMNS.items():
+            values = []
+            for objects in global_inventory.values():
+                values.extend(get_column_values(objects, key, default))
+            codes, categories = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+            self.column_codes[key] = codes.astype(np.int32)
+            value_order = np.argsort(codes, kind='stable')
+            self.columns[key] = (
+                {value: position for position, value in enumerate(categories.tolist())},
+                value_order.astype(np.int32),
+                get_indptr(codes[value_order], len(categories))
+            )
+
+    def __len__(self):
+        return len(self.names)
+
+    def _get_posting(self, gram):
+        gram_id = self.trigram_ids.get(gram)
+        if gram_id is None:
+            return np.zeros(0, dtype=np.int32)
+        return self.trigram_codes[self.trigram_ptr[gram_id]:self.trigram_ptr[gram_id + 1]]
+
+    def get_joined_names(self):
+        """All lowercased names in one newline separated text, with the offset where each starts"""
+        if not hasattr(self, '_joined_names'):
+            lengths = np.fromiter((len(name) + 1 for name in self.names), dtype=np.int64, count=len(self.names))
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(lengths) else lengths
+            self._joined_names = ('\n'.join(self.names), offsets)
+        return self._joined_names
+
+    def to_mask(self, codes):
+        mask = np.zeros(len(self), dtype=bool)
+        mask[codes] = True
+        return mask
+
+    def match_prefix(self, prefix):
+        """Codes of the names starting with a prefix, in name order"""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.sorted_names, prefix)
+        stop = bisect.bisect_left(self.sorted_names, prefix + '\U0010ffff', start)
+        return self.sorted_codes[start:stop]
+
+    def match_substring(self, term):
+        """Codes of the names containing a term, in code order"""
+        term = term.lower()
+        grams = get_trigrams(term)
+        if not grams:
+            # Too short for a trigram: a plain scan is already cheap
+            return np.asarray([code for code, name in enumerate(self.names) if term in name], dtype=np.int32)
+
+        postings = sorted((self._get_posting(gram) for gram in grams), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        # Sharing every trigram does not guarantee they appear in sequence
+        return np.asarray([code for code in candidates.tolist() if term in self.names[code]], dtype=np.int32)
+
+    def match_fuzzy(self, term, min_similarity=FUZZY_MIN_SIMILARITY):
+        """Codes of the names containing the term or most of its trigrams (typos, swapped characters)"""
+        grams = get_trigrams(term.lower())
+        if not grams:
+            return self.match_substring(term)
+        shared = np.bincount(np.concatenate([self._get_posting(gram) for gram in grams]), minlength=len(self))
+        similar = np.flatnonzero(shared >= min_similarity * len(grams))
+        return np.union1d(similar, self.match_substring(term)).astype(np.int32)
+
+    def match_names(self, term, fuzzy=False):
+        """Mask of the objects whose name matches a search term"""
+        return self.to_mask(self.match_fuzzy(term) if fuzzy else self.match_substring(term))
+
+    def get_values(self, key):
+        """Distinct values of an indexed column"""
+        return list(self.columns[key][0])
+
+    def match_values(self, key, values):
+        """Mask of the objects whose column takes one of the given values"""
+        positions, codes, indptr = self.columns[key]
+        wanted = [positions[value] for value in values if value in positions]
+        return self.to_mask(np.concatenate([codes[indptr[p]:indptr[p + 1]] for p in wanted] or [codes[:0]]))
+
+    def match_values_containing(self, key, term):
+        """Mask of the objects whose column value contains a term (case insensitive)"""
+        term = term.lower()
+        return self.match_values(key, [value for value in self.columns[key][0] if term in str(value).lower()])
+
+    def get_type_mask(self, obj_type):
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.interner.get_type_slice(obj_type)] = True
+        return mask
+
+    def get_type_max_degree(self, obj_type):
+        return self.type_max_degrees.get(obj_type, 0)
+
+    def search(self, term='', obj_type=None, category=None, infoareas=None, owner='', min_degree=0, max_degree=None,
+               fuzzy=False, mask=None):
+        """Codes of the objects passing every given filter (and an optional precomputed mask), in inventory order"""
+        mask = self.degrees >= min_degree if mask is None else mask & (self.degrees >= min_degree)
+        if max_degree is not None:
+            mask &= self.degrees <= max_degree
+        if obj_type is not None:
+            mask &= self.get_type_mask(obj_type)
+        if category is not None:
+            mask &= self.match_values('category', [category])
+        if infoareas:
+            mask &= self.match_values('infoarea', infoareas)
+        if owner:
+            mask &= self.match_values_containing('owner', owner)
+        if term:
+            mask &= self.match_names(term, fuzzy)
+        return np.flatnonzero(mask)
+
+    def suggest(self, term='', obj_type=None, limit=TYPEAHEAD_LIMIT):
+        """Best matches of a typeahead term, with the number of matches
+
+        Exact names rank first, then names starting with the term, then names containing
+        it (or, when none does, fuzzy matches); within each group the most connected
+        objects come first. Without a term the most connected objects are suggested.
+        """
+        in_type = self.get_type_mask(obj_type) if obj_type is not None else np.ones(len(self), dtype=bool)
+        if not term:
+            candidates, groups = np.flatnonzero(in_type), np.zeros(int(in_type.sum()), dtype=np.int8)
+        else:
+            contained = self.match_substring(term)
+            if not len(contained):
+                contained = self.match_fuzzy(term)
+            candidates = contained[in_type[contained]]
+            lowered = term.lower()
+            groups = np.full(len(candidates), 2, dtype=np.int8)
+            groups[self.to_mask(self.match_prefix(term))[candidates]] = 1
+            groups[[self.names[code] == lowered for code in candidates.tolist()]] = 0
+
+        order = np.lexsort((self.name_ranks[candidates], -self.degrees[candidates].astype(np.int64), groups))
+        return candidates[order[:limit]], len(candidates)
+
+    def get_suggested_names(self, term='', obj_type=None, limit=TYPEAHEAD_LIMIT):
+        """Distinct object names of the best typeahead matches, with the number of matches"""
+        codes, match_count = self.suggest(term, obj_type, limit)
+        return list(dict.fromkeys(self.interner.names[code] for code in codes.tolist())), match_count
+
+    def count_type(self, obj_type):
+        start, stop = self.interner.type_ranges.get(obj_type, (0, 0))
+        return stop - start
+
+    def get_column(self, key, codes):
+        """Values of an indexed column for some codes"""
+        categories = np.asarray(self.get_values(key), dtype=object)
+        return categories[self.column_codes[key][codes]]
+
+    def get_column_ranks(self, key):
+        """Rank of every value of an indexed column in sorted order, indexed by value position"""
+        values = self.get_values(key)
+        ranks = np.empty(len(values), dtype=np.int32)
+        ranks[sorted(range(len(values)), key=lambda position: str(values[position]))] = np.arange(len(values))
+        return ranks
+
+    def get_object(self, global_inventory, code):
+        """(object type, inventory row) of a code"""
+        obj_type = self.interner.get_type(code)
+        return obj_type, global_inventory[obj_type][code - self.interner.type_ranges[obj_type][0]]
+
+
+def index_object_search(global_inventory, graph):
+    """Build the search index of a freshly built or patched graph and keep it with it"""
+    search_index = SearchIndex(global_inventory, graph)
+    graph.graph[SEARCH_INDEX_GRAPH_KEY] = search_index
+    return search_index
+
+
+def get_search_index(global_inventory, graph):
+    """Search index of a dataset, rebuilt only when its interner has been replaced"""
+    graph_attributes = get_graph_attributes(graph)
+    search_index = graph_attributes.get(SEARCH_INDEX_GRAPH_KEY) if graph_attributes is not None else None
+    if search_index is not None and search_index.interner is get_node_interner(global_inventory, graph):
+        return search_index
+
+    if graph_attributes is None:
+        return SearchIndex(global_inventory, graph)
+    return index_object_search(global_inventory, graph)
+
+
+class SearchResults:
+    """Codes matched by a search, kept as an index array and turned into rows one page at a time
+
+    Each sort order is an argsort of the matched codes over the index columns, computed
+    the first time it is requested and reused for every page and for the export.
+    """
+
+    def __init__(self, search_index, codes, params=None):
+        self.search_index = search_index
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.params = params
+        self._orders = {}
+        self._subsets = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def get_status_subset(self, connected):
+        """Results narrowed to the connected (True) or isolated (False) objects, kept with their own sort orders"""
+        if connected not in self._subsets:
+            keep = (self.get_degrees() > 0) == connected
+            self._subsets[connected] = SearchResults(self.search_index, self.codes[keep], self.params)
+        return self._subsets[connected]
+
+    def get_degrees(self):
+        return self.search_index.degrees[self.codes]
+
+    def contains_type(self, obj_type):
+        start, stop = self.search_index.interner.type_ranges.get(obj_type, (0, 0))
+        return bool(np.any((self.codes >= start) & (self.codes < stop)))
+
+    def get_connection_percentages(self):
+        """Connections of every result relative to the most connected object of its type"""
+        index = self.search_index
+        type_max = np.asarray([index.get_type_max_degree(obj_type) for obj_type in index.interner.types], dtype=np.float64)
+        maxima = type_max[index.interner.type_codes[self.codes]]
+        return np.divide(self.get_degrees() * 100.0, maxima, out=np.zeros(len(self)), where=maxima > 0)
+
+    def get_sort_keys(self, column):
+        index = self.search_index
+        if column == SORT_CONNECTIONS:
+            return self.get_degrees()
+        if column == SORT_PERCENTAGE:
+            return self.get_connection_percentages()
+        if column == SORT_STATUS:
+            # 'Connected' sorts before 'Isolated'
+            return self.get_degrees() == 0
+        if column == SORT_NAME:
+            names = np.asarray([index.interner.names[code] for code in self.codes.tolist()], dtype=object)
+            return np.unique(names.astype(str), return_inverse=True)[1] if len(names) else names
+        key = {SORT_TYPE: 'type_name', SORT_OWNER: 'owner', SORT_INFOAREA: 'infoarea'}[column]
+        return index.get_column_ranks(key)[index.column_codes[key][self.codes]]
+
+    def get_order(self, column=SORT_CONNECTIONS, ascending=False):
+        """Positions of the results in the requested order (computed once per column and direction)"""
+        if (column, ascending) not in self._orders:
+            keys = self.get_sort_keys(column)
+            if not ascending:
+                keys = -keys.astype(np.float64)
+            self._orders[(column, ascending)] = np.argsort(keys, kind='stable')
+        return self._orders[(column, ascending)]
+
+    def get_page_count(self, page_size):
+        return max(1, -(-len(self) // page_size))
+
+    def get_page(self, page, page_size, column=SORT_CONNECTIONS, ascending=False):
+        """Codes shown on a page (numbered from 1)"""
+        start = (page - 1) * page_size
+        return self.codes[self.get_order(column, ascending)[start:start + page_size]]
+
+    def iter_chunks(self, chunk_size, column=SORT_CONNECTIONS, ascending=False):
+        """Codes of every result in order, a chunk at a time"""
+        order = self.get_order(column, ascending)
+        for start in range(0, len(order), chunk_size):
+            yield self.codes[order[start:start + chunk_size]]
+
+    def get_type_counts(self):
+        """Result count by type name, most frequent first"""
+        type_names = self.search_index.get_column('type_name', self.codes)
+        counts = pd.Series(type_names, dtype=object).value_counts()
+        return dict(zip(counts.index.tolist(), counts.tolist()))
+
+    def get_summary_frame(self):
+        """Columns the connection summary report reads, built column by column"""
+        index = self.search_index
+        degrees = self.get_degrees()
+        return pd.DataFrame({
+            'Name': [index.interner.names[code] for code in self.codes.tolist()],
+            'Type': index.get_column('type_name', self.codes),
+            'Category': index.get_column('category', self.codes),
+            'Connections': degrees,
+            'Connection Status': np.where(degrees > 0, 'Connected', 'Isolated')
+        })
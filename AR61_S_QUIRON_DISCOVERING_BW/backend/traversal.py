@@ -0,0 +1,502 @@
+import math
+import time
+
+import numpy as np
+
+from backend.csr_graph import CSRGraph, get_indptr
+from backend.node_interner import get_graph_attributes
+
+# Key under which the typed adjacency index travels with the graph (graph.graph attributes)
+ADJACENCY_GRAPH_KEY = 'typed_adjacency'
+
+# Traversal directions; downstream follows successors (outgoing edges), upstream predecessors (incoming edges)
+DIRECTION_DOWNSTREAM = 'downstream'
+DIRECTION_UPSTREAM = 'upstream'
+DIRECTION_BOTH = 'both'
+TRAVERSAL_DIRECTIONS = {
+    DIRECTION_DOWNSTREAM: ('outgoing',),
+    DIRECTION_UPSTREAM: ('incoming',),
+    DIRECTION_BOTH: ('outgoing', 'incoming')
+}
+EDGE_DIRECTIONS = ('outgoing', 'incoming')
+
+# Default budgets of the impact and InfoCube traversals: expanded nodes, and wall-clock
+# seconds. Both are checked every BUDGET_CHECK_NODES frontier nodes while a level is
+# expanded; reaching either trims that level and stops the traversal.
+DEFAULT_NODE_BUDGET = 250000
+DEFAULT_TIME_BUDGET_SECONDS = 60.0
+BUDGET_CHECK_NODES = 1024
+BUDGET_NODES = 'nodes'
+BUDGET_TIME = 'time'
+
+
+class TypedAdjacency:
+    """Per-edge-type adjacency of a graph, one index per direction
+
+    Edges of each direction are sorted by (edge type, node, neighbor). For every edge
+    type the nodes that own edges of that type form a sorted run of rows, and each row
+    points at the contiguous block of its neighbors, so a filtered hop is a binary search
+    per type that only ever reads the matching edges.
+    """
+
+    def __init__(self, graph):
+        if isinstance(graph, CSRGraph):
+            self.node_ids = graph.interner.node_ids
+            self._codes = graph.interner
+            node_count = len(self.node_ids)
+            src = np.repeat(np.arange(node_count, dtype=np.int32), np.diff(graph.indptr))
+            dst, kinds = graph.indices, graph.kinds.astype(np.int32)
+            self.kind_attributes = graph.kind_attributes
+        else:
+            self.node_ids = list(graph.nodes)
+            self._codes = {node_id: code for code, node_id in enumerate(self.node_ids)}
+            node_count = len(self.node_ids)
+            src, dst, kinds, self.kind_attributes = read_graph_edges(graph, self._codes)
+
+        type_index = {}
+        kind_types = np.asarray([type_index.setdefault(attributes.get('type'), len(type_index))
+                                 for attributes in self.kind_attributes], dtype=np.int32)
+        self.edge_types = list(type_index)
+        self._type_index = type_index
+        self.node_count = node_count
+        self.signature = get_adjacency_signature(graph)
+
+        edge_types = kind_types[kinds] if len(kinds) else np.empty(0, dtype=np.int32)
+        self._directions = {
+            'outgoing': build_type_rows(src, dst, kinds, edge_types, len(self.edge_types)),
+            'incoming': build_type_rows(dst, src, kinds, edge_types, len(self.edge_types))
+        }
+
+    def __len__(self):
+        return self.node_count
+
+    def get_code(self, node_id):
+        """Code of a node, or -1 when it is not in the graph"""
+        return self._codes.get(node_id, -1) if isinstance(self._codes, dict) else self._codes.get_code(node_id)
+
+    def get_type_codes(self, edge_types=None):
+        """Codes of the given edge types present in the graph (every type when None)"""
+        if edge_types is None:
+            return list(range(len(self.edge_types)))
+        return sorted({self._type_index[edge_type] for edge_type in edge_types if edge_type in self._type_index})
+
+    def hop(self, codes, direction, type_codes):
+        """Edges of the given direction and types leaving sorted unique codes, as (owner, neighbor, kind) arrays"""
+        row_nodes, row_ptr, type_rows, neighbors, kinds = self._directions[direction]
+        owners, positions = [], []
+        for type_code in type_codes:
+            start, stop = type_rows[type_code], type_rows[type_code + 1]
+            keys = row_nodes[start:stop]
+            found = np.searchsorted(keys, codes)
+            hit = found < len(keys)
+            hit[hit] = keys[found[hit]] == codes[hit]
+            rows = start + found[hit]
+            starts, stops = row_ptr[rows], row_ptr[rows + 1]
+            owners.append(np.repeat(codes[hit], stops - starts))
+            positions.append(expand_ranges(starts, stops))
+
+        if not positions:
+            empty = np.empty(0, dtype=np.int32)
+            return empty, empty, empty
+        positions = np.concatenate(positions)
+        return np.concatenate(owners), neighbors[positions], kinds[positions]
+
+    def get_edges(self, edge_types=None):
+        """(source codes, target codes) of every edge of the given types"""
+        row_nodes, row_ptr, type_rows, neighbors, _ = self._directions['outgoing']
+        sources, targets = [], []
+        for type_code in self.get_type_codes(edge_types):
+            rows = np.arange(type_rows[type_code], type_rows[type_code + 1])
+            starts, stops = row_ptr[rows], row_ptr[rows + 1]
+            sources.append(np.repeat(row_nodes[rows], stops - starts))
+            targets.append(neighbors[starts[0]:stops[-1]] if len(rows) else neighbors[:0])
+        if not sources:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        return np.concatenate(sources), np.concatenate(targets)
+
+    def get_degrees(self, directions, type_codes):
+        """Edges of the given directions and types per node code, computed once per combination"""
+        cache = self.__dict__.setdefault('_degrees', {})
+        key = (tuple(directions), tuple(type_codes))
+        if key not in cache:
+            degrees = np.zeros(self.node_count, dtype=np.int64)
+            for direction in directions:
+                row_nodes, row_ptr, type_rows, _, _ = self._directions[direction]
+                for type_code in type_codes:
+                    # Within one type every owner has a single row
+                    rows = np.arange(type_rows[type_code], type_rows[type_code + 1])
+                    degrees[row_nodes[rows]] += row_ptr[rows + 1] - row_ptr[rows]
+            cache[key] = degrees
+        return cache[key]
+
+    def get_excess_degree(self, directions, type_codes):
+        """Mean number of further edges of a node reached through an edge (sum d^2 / sum d - 1)"""
+        degrees = self.get_degrees(directions, type_codes)
+        edge_ends = degrees.sum()
+        if not edge_ends:
+            return 0.0
+        return max(float(np.dot(degrees, degrees)) / edge_ends - 1.0, 0.0)
+
+    def nbytes(self):
+        """Memory held by the index arrays"""
+        return sum(array.nbytes for arrays in self._directions.values() for array in arrays)
+
+
+class TraversalResult:
+    """Outcome of a bounded traversal kept as code arrays, decoded on demand
+
+    expanded lists the nodes whose edges were followed, in level order, frontier the
+    nodes reached at the last level and not expanded. Each traversed edge is stored once
+    per expanding node with its direction (0 outgoing, 1 incoming) and level. While a
+    traversal is streamed, final stays False until the last level; complete is set on a
+    final result that was not cut short by a budget (stopped_by names the budget).
+    """
+
+    def __init__(self, adjacency, depth):
+        self.adjacency = adjacency
+        self.depth = depth
+        self.levels_completed = 0
+        self.final = False
+        self.complete = False
+        self.stopped_by = None
+        self.expanded = np.empty(0, dtype=np.int32)
+        self.expanded_depths = np.empty(0, dtype=np.int16)
+        self.frontier = np.empty(0, dtype=np.int32)
+        self.sources = np.empty(0, dtype=np.int32)
+        self.targets = np.empty(0, dtype=np.int32)
+        self.kinds = np.empty(0, dtype=np.int32)
+        self.directions = np.empty(0, dtype=np.uint8)
+        self.depths = np.empty(0, dtype=np.int16)
+        self._expanded_mask = np.zeros(len(adjacency), dtype=bool)
+
+    def __contains__(self, node_id):
+        code = self.adjacency.get_code(node_id)
+        return code >= 0 and bool(self._expanded_mask[code])
+
+    def number_of_edges(self):
+        return len(self.sources)
+
+    def get_expanded_nodes(self):
+        """Node ids whose edges were followed, starting nodes included"""
+        return [self.adjacency.node_ids[code] for code in self.expanded]
+
+    def get_frontier_nodes(self):
+        """Node ids reached at the last level"""
+        return [self.adjacency.node_ids[code] for code in self.frontier]
+
+    def get_relationships(self):
+        """Traversed edges as relationship dicts with their direction, level and edge attributes"""
+        node_ids, kind_attributes = self.adjacency.node_ids, self.adjacency.kind_attributes
+        return [
+            {
+                'source': node_ids[source],
+                'target': node_ids[target],
+                'direction': EDGE_DIRECTIONS[direction],
+                'depth': int(depth),
+                **kind_attributes[kind]
+            }
+            for source, target, kind, direction, depth in zip(
+                self.sources.tolist(), self.targets.tolist(), self.kinds.tolist(), self.directions.tolist(), self.depths.tolist()
+            )
+        ]
+
+
+def read_graph_edges(graph, codes):
+    """Edge code arrays of a NetworkX graph; equal attribute dicts share one kind"""
+    src, dst, kinds = [], [], []
+    kind_attributes, kind_index = [], {}
+    for source, target, data in graph.edges(data=True):
+        try:
+            key = tuple(data.items())
+            kind = kind_index.get(key)
+        except TypeError:
+            key = kind = None
+        if kind is None:
+            kind = len(kind_attributes)
+            kind_attributes.append(dict(data))
+            if key is not None:
+                kind_index[key] = kind
+        src.append(codes[source])
+        dst.append(codes[target])
+        kinds.append(kind)
+    return (np.asarray(src, dtype=np.int32), np.asarray(dst, dtype=np.int32),
+            np.asarray(kinds, dtype=np.int32), kind_attributes)
+
+
+def build_type_rows(owners, neighbors, kinds, edge_types, type_count):
+    """Index arrays of one direction: (row_nodes, row_ptr, type_rows, neighbors, kinds) sorted by type, owner, neighbor"""
+    order = np.lexsort((neighbors, owners, edge_types))
+    owners, edge_types = owners[order], edge_types[order]
+
+    # One row per distinct (type, owner) pair
+    starts = np.flatnonzero(np.append(True, (owners[1:] != owners[:-1]) | (edge_types[1:] != edge_types[:-1]))) if len(order) else order
+    row_nodes = owners[starts].astype(np.int32)
+    row_ptr = np.append(starts, len(order)).astype(np.int64)
+    type_rows = get_indptr(edge_types[starts], type_count)
+    return row_nodes, row_ptr, type_rows, neighbors[order].astype(np.int32), kinds[order].astype(np.int32)
+
+
+def expand_ranges(starts, stops):
+    """Concatenation of the integer ranges [start, stop) without a Python loop"""
+    lengths = stops - starts
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(lengths.sum(), dtype=np.int64)
+
+
+def get_adjacency_signature(graph):
+    """Cheap identity of a graph used to detect a stale index (patches drop it explicitly)"""
+    return graph.number_of_nodes(), graph.number_of_edges()
+
+
+def get_typed_adjacency(graph):
+    """Typed adjacency of a graph, built on first use and kept with the graph"""
+    graph_attributes = get_graph_attributes(graph)
+    adjacency = graph_attributes.get(ADJACENCY_GRAPH_KEY) if graph_attributes is not None else None
+    if adjacency is not None and adjacency.signature == get_adjacency_signature(graph):
+        return adjacency
+
+    adjacency = TypedAdjacency(graph)
+    if graph_attributes is not None:
+        graph_attributes[ADJACENCY_GRAPH_KEY] = adjacency
+    return adjacency
+
+
+def traverse(graph, start_nodes, depth, edge_types=None, direction=DIRECTION_BOTH, expand=None, max_nodes=None, time_budget=None):
+    """Level-by-level traversal from start_nodes, following only edges of edge_types, up to depth levels
+
+    Every level expands the nodes reached by the previous one that were not expanded yet.
+    expand(node_id, level, result) may return extra node ids to visit at the next level;
+    'node_id in result' tells whether a node has already been expanded. max_nodes bounds
+    the expanded nodes and time_budget the seconds spent; the level that reaches them only
+    expands the nodes that fit and the result is marked with stopped_by.
+    """
+    result = None
+    for result in iter_traversal(graph, start_nodes, depth, edge_types, direction, expand, max_nodes, time_budget):
+        pass
+    return result
+
+
+def iter_traversal(graph, start_nodes, depth, edge_types=None, direction=DIRECTION_BOTH, expand=None, max_nodes=None,
+                   time_budget=None):
+    """Same traversal as traverse, yielding the result after every completed level
+
+    The same TraversalResult object is yielded each time, grown with the new level; the
+    last one yielded has final set. Stopping the iteration early keeps a consistent
+    result covering the levels completed so far.
+    """
+    started = time.monotonic()
+    adjacency = get_typed_adjacency(graph)
+    result = TraversalResult(adjacency, depth)
+    type_codes = adjacency.get_type_codes(edge_types)
+    directions = TRAVERSAL_DIRECTIONS[direction]
+
+    frontier = np.unique([code for code in map(adjacency.get_code, start_nodes) if code >= 0]).astype(np.int32)
+    expanded, expanded_depths = [], []
+    columns = {name: [] for name in ('sources', 'targets', 'kinds', 'directions', 'depths')}
+
+    stopped_by = None
+    expanded_count = 0
+    for level in range(depth):
+        frontier = frontier[~result._expanded_mask[frontier]]
+        if not len(frontier):
+            break
+        result._expanded_mask[frontier] = True
+
+        reached = [np.empty(0, dtype=np.int32)]
+        for start in range(0, len(frontier), BUDGET_CHECK_NODES):
+            chunk = frontier[start:start + BUDGET_CHECK_NODES]
+            if level or start:
+                stopped_by = check_budgets(expanded_count + len(chunk), started, max_nodes, time_budget)
+                if stopped_by:
+                    # Trim the level to the nodes that still fit; the rest stay in the frontier
+                    fit = max(max_nodes - expanded_count, 0) if stopped_by == BUDGET_NODES else 0
+                    chunk = chunk[:fit]
+                    result._expanded_mask[frontier[start + fit:]] = False
+            expanded_count += len(chunk)
+            expanded.append(chunk)
+            expanded_depths.append(np.full(len(chunk), level, dtype=np.int16))
+            reached.append(expand_nodes(adjacency, chunk, level, directions, type_codes, columns, expand, result))
+            if stopped_by:
+                break
+
+        if stopped_by:
+            frontier = np.unique(np.concatenate(reached + [frontier])).astype(np.int32)
+            break
+        frontier = np.unique(np.concatenate(reached)).astype(np.int32)
+        publish_level(result, expanded, expanded_depths, columns, frontier)
+        result.levels_completed = level + 1
+        result.final = result.complete = level + 1 == depth or not len(result.frontier)
+        yield result
+
+    if not result.final:
+        # Nothing (left) to expand, or a budget ran out: the traversal ends before reaching depth
+        publish_level(result, expanded, expanded_depths, columns, frontier)
+        result.stopped_by = stopped_by
+        result.final = True
+        result.complete = stopped_by is None
+        yield result
+
+
+def expand_nodes(adjacency, codes, level, directions, type_codes, columns, expand=None, result=None):
+    """Append the edges of the nodes codes expanded at level to columns and return the node codes they reach"""
+    reached = [np.empty(0, dtype=np.int32)]
+    for edge_direction in directions:
+        owners, neighbors, kinds = adjacency.hop(codes, edge_direction, type_codes)
+        outgoing = edge_direction == 'outgoing'
+        columns['sources'].append(owners if outgoing else neighbors)
+        columns['targets'].append(neighbors if outgoing else owners)
+        columns['kinds'].append(kinds)
+        columns['directions'].append(np.full(len(owners), EDGE_DIRECTIONS.index(edge_direction), dtype=np.uint8))
+        columns['depths'].append(np.full(len(owners), level + 1, dtype=np.int16))
+        reached.append(neighbors)
+
+    if expand is not None:
+        extra = [adjacency.get_code(node_id)
+                 for code in codes.tolist()
+                 for node_id in expand(adjacency.node_ids[code], level + 1, result) or ()]
+        reached.append(np.asarray([code for code in extra if code >= 0], dtype=np.int32))
+    return np.concatenate(reached)
+
+
+def check_budgets(node_count, started, max_nodes=None, time_budget=None):
+    """Name of the budget a traversal about to hold node_count expanded nodes would exceed, or None"""
+    if max_nodes is not None and node_count > max_nodes:
+        return BUDGET_NODES
+    if time_budget is not None and time.monotonic() - started > time_budget:
+        return BUDGET_TIME
+    return None
+
+
+def estimate_traversal(graph, start_nodes, depth, edge_types=None, direction=DIRECTION_BOTH):
+    """Predicted reached nodes and traversed edges per level, before running a traversal
+
+    The first level is exact (one hop from the start nodes) and so are the edges of the
+    second. Deeper levels grow by the excess degree of the typed degree statistics, with
+    newly reached nodes saturating as the connected part of the graph fills up. Returns
+    one dict per level with 'level', 'nodes', 'edges', 'total_nodes' and 'total_edges'.
+    """
+    adjacency = get_typed_adjacency(graph)
+    type_codes = adjacency.get_type_codes(edge_types)
+    directions = TRAVERSAL_DIRECTIONS[direction]
+    degrees = adjacency.get_degrees(directions, type_codes)
+    excess = adjacency.get_excess_degree(directions, type_codes)
+    connected = max(int(np.count_nonzero(degrees)), 1)
+    edge_ends = float(degrees.sum())
+
+    starts = np.unique([code for code in map(adjacency.get_code, start_nodes) if code >= 0]).astype(np.int32)
+    reached = [adjacency.hop(starts, edge_direction, type_codes)[1] for edge_direction in directions]
+    first_level = np.setdiff1d(np.concatenate(reached) if reached else starts[:0], starts)
+
+    levels, total_nodes, total_edges = [], len(starts), 0
+    frontier_nodes, frontier_edges = float(len(first_level)), float(degrees[starts].sum())
+    for level in range(1, depth + 1):
+        if level > 1:
+            # Edges arrive at nodes in proportion to their degree; those landing on reached nodes add nothing
+            remaining = max(connected - total_nodes, 0)
+            frontier_nodes = remaining * (1.0 - math.exp(-frontier_edges / connected))
+        total_nodes += frontier_nodes
+        total_edges += frontier_edges
+        levels.append({'level': level, 'nodes': int(round(frontier_nodes)), 'edges': int(round(frontier_edges)),
+                       'total_nodes': int(round(total_nodes)), 'total_edges': int(round(total_edges))})
+        # Every edge is traversed at most once from each end
+        frontier_edges = float(degrees[first_level].sum()) if level == 1 else min(frontier_nodes * excess, edge_ends - total_edges)
+    return levels
+
+
+def publish_level(result, expanded, expanded_depths, columns, frontier):
+    """Expose the levels accumulated so far as the result arrays"""
+    result.frontier = frontier[~result._expanded_mask[frontier]] if len(frontier) else frontier
+    if expanded:
+        result.expanded = np.concatenate(expanded)
+        result.expanded_depths = np.concatenate(expanded_depths)
+    for name, chunks in columns.items():
+        if chunks:
+            setattr(result, name, np.concatenate(chunks).astype(getattr(result, name).dtype))
+
+
+class SeedTraversalResult:
+    """Objects reached from several seeds, with the seeds that reached each of them
+
+    reached holds node codes in code order, depths the first level at which any seed
+    reached them (0 for the seeds themselves), other_depths the first level at which a
+    seed other than the node itself reached them (-1 for seeds no other seed reaches)
+    and seed_bits one packed row per reached node with a bit per seed.
+    """
+
+    def __init__(self, adjacency, seeds, depth, reached, depths, seed_bits, other_depths=None):
+        self.adjacency = adjacency
+        self.seeds = seeds
+        self.depth = depth
+        self.reached = reached
+        self.depths = depths
+        self.seed_bits = seed_bits
+        self.other_depths = depths if other_depths is None else other_depths
+
+    def __len__(self):
+        return len(self.reached)
+
+    def get_node_ids(self):
+        return [self.adjacency.node_ids[code] for code in self.reached]
+
+    def get_seed_matrix(self):
+        """Boolean (reached node x seed) matrix"""
+        unpacked = np.unpackbits(self.seed_bits.view(np.uint8), axis=1, bitorder='little')
+        return unpacked[:, :len(self.seeds)].astype(bool)
+
+    def get_seeds(self, index):
+        """Seed node ids that reached the index-th reached node"""
+        row = np.unpackbits(self.seed_bits[index].view(np.uint8), bitorder='little')[:len(self.seeds)]
+        return [self.seeds[column] for column in np.flatnonzero(row)]
+
+
+def traverse_from_seeds(graph, seed_nodes, depth, edge_types=None, direction=DIRECTION_BOTH):
+    """One traversal from many seeds that keeps, for every reached node, which seeds reach it within depth levels
+
+    Each node carries a packed seed bitset; a node is expanded again only with the seed
+    bits it had not seen yet, so every seed reaches each node at its shortest distance.
+    """
+    adjacency = get_typed_adjacency(graph)
+    type_codes = adjacency.get_type_codes(edge_types)
+    directions = TRAVERSAL_DIRECTIONS[direction]
+
+    seeds = [node_id for node_id in dict.fromkeys(seed_nodes) if adjacency.get_code(node_id) >= 0]
+    words = max(1, (len(seeds) + 63) // 64)
+    seen = np.zeros((len(adjacency), words), dtype=np.uint64)
+    # Level at which each node first gets bits it had not seen; a seed already holds its own
+    # bit, so whatever reaches it later comes from the other seeds
+    arrival_depths = np.full(len(adjacency), -1, dtype=np.int16)
+
+    seed_codes = np.asarray([adjacency.get_code(node_id) for node_id in seeds], dtype=np.int32)
+    for column, code in enumerate(seed_codes):
+        seen[code, column >> 6] |= np.uint64(1) << np.uint64(column & 63)
+    frontier = np.unique(seed_codes)
+    frontier_bits = seen[frontier].copy()
+
+    for level in range(depth):
+        if not len(frontier):
+            break
+        neighbors, carried = [], []
+        for edge_direction in directions:
+            owners, reached, _ = adjacency.hop(frontier, edge_direction, type_codes)
+            neighbors.append(reached)
+            carried.append(frontier_bits[np.searchsorted(frontier, owners)])
+        neighbors = np.concatenate(neighbors)
+        if not len(neighbors):
+            break
+        carried = np.concatenate(carried)
+
+        # Merge the bits arriving at each neighbor and keep only the ones it had not seen
+        order = np.argsort(neighbors, kind='stable')
+        neighbors, carried = neighbors[order], carried[order]
+        starts = np.flatnonzero(np.append(True, neighbors[1:] != neighbors[:-1]))
+        frontier = neighbors[starts]
+        frontier_bits = np.bitwise_or.reduceat(carried, starts, axis=0) & ~seen[frontier]
+        fresh = frontier_bits.any(axis=1)
+        frontier, frontier_bits = frontier[fresh], frontier_bits[fresh]
+        seen[frontier] |= frontier_bits
+        arrival_depths[frontier] = np.where(arrival_depths[frontier] < 0, level + 1, arrival_depths[frontier])
+
+    first_depths = arrival_depths.copy()
+    first_depths[seed_codes] = 0
+    reached = np.flatnonzero(first_depths >= 0).astype(np.int32)
+    return SeedTraversalResult(adjacency, seeds, depth, reached, first_depths[reached], seen[reached], arrival_depths[reached])
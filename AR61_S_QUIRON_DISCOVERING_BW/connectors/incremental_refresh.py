@@ -0,0 +1,294 @@
+import os
+import sqlite3
+from datetime import datetime
+import streamlit as st
+import networkx as nx
+import numpy as np
+
+from backend.enhaced_relationships import get_active_objects_by_type
+from backend.enhaced_relationships import get_active_object_names
+from backend.enhaced_relationships import get_object_high_water_mark
+from backend.enhaced_relationships import iter_relationships_for_objects
+from backend.dataset_registry import get_dataset_key, release_dataset
+from backend.inventory_store import InventoryTable, InventoryRow, get_node_attributes
+from backend.edge_store import EdgeTable, get_edge_attributes
+from backend.node_interner import index_graph_nodes
+from backend.csr_graph import GRAPH_ENGINE_NETWORKX, get_graph_engine
+from backend.traversal import ADJACENCY_GRAPH_KEY
+from backend.reachability import index_source_reachability
+from backend.connection_stats import index_connection_stats
+from backend.search_index import index_object_search
+from connectors.snapshot_cache import compute_db_fingerprint, load_latest_snapshot, save_snapshot
+from connectors.sqlite_connector import load_and_analyze_data, publish_dataset, build_graph_for_engine
+
+
+def get_refresh_base(self, db_path):
+    """Dataset to patch: the one attached to this session if it came from db_path, else the DB's last snapshot
+
+    A session's dataset is shared through the registry ('shared' is True) and must be copied before patching.
+    """
+    stats = getattr(st.session_state, 'dataset_stats', None) or {}
+    if getattr(st.session_state, 'data_loaded', False) and stats.get('source_path') == os.path.abspath(db_path):
+        return {
+            'global_inventory': st.session_state.global_inventory,
+            'relationships': st.session_state.relationships,
+            'graph': st.session_state.graph,
+            'dataset_stats': stats,
+            'dataset_key': getattr(st.session_state, 'dataset_key', None),
+            'shared': True
+        }
+    return load_latest_snapshot(db_path, self.object_types)
+
+
+def copy_refresh_base(base):
+    """Private copies of the containers a refresh patches; rows, tables and attribute values stay shared
+
+    Other sessions may be reading the base dataset (and results are cached against it),
+    so the patch works copy-on-write: the inventory dict and lists, the edge table, the
+    networkx graph (with its own attribute dicts) and the statistics are copied.
+    """
+    relationships = base['relationships']
+    graph = base['graph']
+    if get_graph_engine(graph) == GRAPH_ENGINE_NETWORKX:
+        # graph.graph only holds derived indexes; the patch replaces them in the copy's own dict
+        graph = graph.copy()
+    return {
+        'global_inventory': {obj_type: objects if isinstance(objects, InventoryTable) else list(objects)
+                             for obj_type, objects in base['global_inventory'].items()},
+        'relationships': relationships.copy() if isinstance(relationships, EdgeTable) else list(relationships),
+        'graph': graph,
+        'dataset_stats': dict(base['dataset_stats'])
+    }
+
+
+def compute_object_delta(self, conn, obj_type, config, existing_objects, high_water_mark):
+    """Return the changed or new objects and the removed names of one object type"""
+    existing = {obj['name']: obj for obj in existing_objects}
+
+    if high_water_mark is None:
+        # Undated tables are re-read completely and compared row by row
+        candidates = get_active_objects_by_type(self, conn, obj_type, config)
+    else:
+        candidates = get_active_objects_by_type(self, conn, obj_type, config, changed_since=high_water_mark)
+
+    # Rows stamped exactly at the mark are re-read on purpose; only real differences count
+    changed = [obj for obj in candidates if existing.get(obj['name']) != obj]
+
+    # Deletions leave no timestamp behind, so they are found with a key-only scan
+    active_names = get_active_object_names(self, conn, obj_type, config)
+    removed = [name for name in existing if name not in active_names]
+
+    return changed, removed
+
+
+def patch_inventory_type(global_inventory, obj_type, changed, removed, config=None):
+    """Apply one type's delta to its inventory, keeping it ordered by name; returns the patched objects"""
+    objects = global_inventory.setdefault(obj_type, [])
+
+    if isinstance(objects, InventoryTable) or any(isinstance(obj, InventoryRow) for obj in changed):
+        # Columnar tables are immutable: rebuild the type's table from the merged rows
+        records = {obj['name']: obj for obj in objects}
+        records.update((obj['name'], obj) for obj in changed)
+        for name in removed:
+            records.pop(name, None)
+        table = InventoryTable.from_records(obj_type, config or {}, (records[name] for name in sorted(records)))
+        global_inventory[obj_type] = table
+        return table
+
+    positions = {obj['name']: i for i, obj in enumerate(objects)}
+    appended = False
+
+    for obj in changed:
+        if obj['name'] in positions:
+            objects[positions[obj['name']]] = obj
+        else:
+            objects.append(obj)
+            appended = True
+
+    if removed:
+        removed_names = set(removed)
+        objects[:] = [obj for obj in objects if obj['name'] not in removed_names]
+
+    if appended:
+        objects.sort(key=lambda obj: obj['name'])
+
+    return objects
+
+
+def patch_graph_nodes(graph, obj_type, objects, changed, removed):
+    """Update, add and remove the graph nodes of one type; returns the touched node ids"""
+    touched = set()
+    changed_names = {obj['name'] for obj in changed}
+
+    for obj in objects:
+        node_id = f"{obj_type}:{obj['name']}"
+        if obj['name'] in changed_names:
+            touched.add(node_id)
+            if node_id in graph:
+                attributes = graph.nodes[node_id]
+                attributes.clear()
+                attributes.update(get_node_attributes(obj))
+            else:
+                graph.add_node(node_id, **get_node_attributes(obj))
+        elif isinstance(obj, InventoryRow) and node_id in graph:
+            # Re-point unchanged nodes so the replaced table can be released
+            graph.nodes[node_id]['record'] = obj
+
+    for name in removed:
+        node_id = f"{obj_type}:{name}"
+        touched.add(node_id)
+        if node_id in graph:
+            graph.remove_node(node_id)
+
+    return touched
+
+
+def patch_relationships(self, conn, available_tables, relationships, graph, affected_nodes, affected_names, changed_transformations):
+    """Replace every edge touching an affected object with a fresh read of just those edges"""
+    def is_affected(rel):
+        touches_object = rel['source'] in affected_nodes or rel['target'] in affected_nodes
+        return touches_object or rel.get('trans_id') in changed_transformations
+
+    affected = relationships.touching_mask(affected_nodes) | relationships.trans_mask(changed_transformations)
+    removed_pairs = {(rel['source'], rel['target']) for rel in relationships.rows(np.flatnonzero(affected))}
+
+    for source, target in removed_pairs:
+        if graph.has_edge(source, target):
+            graph.remove_edge(source, target)
+
+    # Name matching is type-agnostic, so keep only edges that really belong to the delta
+    reloaded = [rel for rel in iter_relationships_for_objects(self, conn, available_tables, affected_names) if is_affected(rel)]
+
+    # Unaffected edges sharing a removed node pair (parallel transformations) are restored as well
+    relationships.retain(~affected)
+    restored = [rel for rel in relationships if (rel['source'], rel['target']) in removed_pairs]
+    for rel in restored + reloaded:
+        if rel['source'] in graph and rel['target'] in graph:
+            graph.add_edge(rel['source'], rel['target'], **get_edge_attributes(rel))
+
+    relationships.extend(reloaded)
+    return len(removed_pairs), len(reloaded)
+
+
+def refresh_data_incrementally(self, db_path):
+    """Patch the loaded dataset with the objects changed since its CONTTIMESTMP high-water marks"""
+    try:
+        base = get_refresh_base(self, db_path)
+        if base is None or base['dataset_stats'].get('high_water_marks') is None:
+            # Nothing to patch yet: fall back to a complete load
+            return load_and_analyze_data(self, db_path)
+
+        status_text = st.empty()
+        status_text.text("Checking for changed objects...")
+
+        fingerprint = compute_db_fingerprint(db_path, self.object_types)
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;")
+        available_tables = set(table[0] for table in cursor.fetchall())
+
+        previous_marks = base['dataset_stats']['high_water_marks']
+
+        # New marks are taken before reading the delta so nothing written meanwhile is skipped next time
+        new_marks = {
+            obj_type: get_object_high_water_mark(self, conn, obj_type, config)
+            for obj_type, config in self.object_types.items() if config['table'] in available_tables
+        }
+
+        deltas = []
+        for obj_type, config in self.object_types.items():
+            existing_objects = base['global_inventory'].get(obj_type, [])
+            if config['table'] in available_tables:
+                status_text.text(f"Checking {config['name']}s for changes...")
+                changed, removed = compute_object_delta(
+                    self, conn, obj_type, config, existing_objects, previous_marks.get(obj_type)
+                )
+            else:
+                changed, removed = [], [obj['name'] for obj in existing_objects]
+            if changed or removed:
+                deltas.append((obj_type, config, changed, removed))
+
+        # Other sessions may hold the base: patch private copies and publish them as a new dataset
+        if deltas and base.get('shared'):
+            base = {**base, **copy_refresh_base(base)}
+
+        global_inventory = base['global_inventory']
+        relationships = base['relationships']
+        if not isinstance(relationships, EdgeTable):
+            relationships = EdgeTable.from_records(relationships)
+        graph = base['graph']
+        graph_engine = get_graph_engine(graph)
+        # The CSR engine is read-only: patches go to a scratch graph and the arrays are rebuilt afterwards
+        patch_graph = graph if graph_engine == GRAPH_ENGINE_NETWORKX else nx.DiGraph()
+        dataset_stats = dict(base['dataset_stats'])
+
+        affected_nodes = set()
+        affected_names = set()
+        changed_transformations = set()
+        changed_count = 0
+        removed_count = 0
+
+        for obj_type, config, changed, removed in deltas:
+            objects = patch_inventory_type(global_inventory, obj_type, changed, removed, config)
+            affected_nodes |= patch_graph_nodes(patch_graph, obj_type, objects, changed, removed)
+            affected_names.update(obj['name'] for obj in changed)
+            affected_names.update(removed)
+            if obj_type == 'TRAN':
+                changed_transformations.update(obj['name'] for obj in changed)
+                changed_transformations.update(removed)
+            changed_count += len(changed)
+            removed_count += len(removed)
+
+        edges_removed = edges_reloaded = 0
+        if affected_nodes:
+            status_text.text(f"Re-reading relationships of {len(affected_nodes):,} changed objects...")
+            edges_removed, edges_reloaded = patch_relationships(
+                self, conn, available_tables, relationships, patch_graph,
+                affected_nodes, affected_names, changed_transformations
+            )
+            # Codes follow inventory order, which the patch may have shifted
+            if graph_engine == GRAPH_ENGINE_NETWORKX:
+                index_graph_nodes(global_inventory, graph)
+                graph.graph.pop(ADJACENCY_GRAPH_KEY, None)
+                index_source_reachability(graph)
+                index_connection_stats(global_inventory, graph)
+                index_object_search(global_inventory, graph)
+            else:
+                graph = build_graph_for_engine(self, global_inventory, relationships, graph_engine)
+
+        conn.close()
+
+        # Bumping the version invalidates every cache derived from this dataset
+        dataset_stats.pop('restored_from_snapshot', None)
+        dataset_stats.update({
+            'total_objects': sum(len(objects) for objects in global_inventory.values()),
+            'total_relationships': len(relationships),
+            'object_type_counts': {obj_type: len(objects) for obj_type, objects in global_inventory.items()},
+            'graph_density': nx.density(graph) if graph.nodes else 0,
+            'high_water_marks': {**previous_marks, **{k: v for k, v in new_marks.items() if v is not None}},
+            'dataset_version': dataset_stats.get('dataset_version', 1) + (1 if affected_nodes else 0),
+            'source_path': os.path.abspath(db_path),
+            'last_refresh': {
+                'timestamp': datetime.now().isoformat(),
+                'changed_objects': changed_count,
+                'removed_objects': removed_count,
+                'edges_removed': edges_removed,
+                'edges_reloaded': edges_reloaded
+            }
+        })
+
+        dataset_key = get_dataset_key(fingerprint, graph_engine)
+        publish_dataset(dataset_key, global_inventory, relationships, graph, dataset_stats)
+        if base.get('dataset_key') and base['dataset_key'] != dataset_key:
+            # The previous version stays intact for the sessions still using it until they move on
+            release_dataset(base['dataset_key'])
+        if fingerprint is not None:
+            status_text.text("Saving analysis snapshot...")
+            save_snapshot(db_path, fingerprint, global_inventory, relationships, graph, dataset_stats)
+
+        status_text.text("✅ Incremental refresh complete!")
+        return True
+
+    except Exception as e:
+        st.error(f"Error refreshing data incrementally (run a full load to recover): {str(e)}")
+        return False
@@ -0,0 +1,165 @@
+import os
+import hmac
+import json
+import pickle
+import hashlib
+import secrets
+import tempfile
+
+# Bump whenever the layout of the pickled payload changes so stale snapshots are rebuilt
+SNAPSHOT_VERSION = 4
+SNAPSHOT_SUFFIX = '.quiron-snapshot.pkl'
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Snapshots live in a directory owned by the application, never next to the (user-chosen) database,
+# and every file starts with an HMAC of the pickle so only files this installation wrote get unpickled
+SNAPSHOT_DIR_ENV = 'QUIRON_SNAPSHOT_DIR'
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'quiron', 'snapshots')
+SNAPSHOT_KEY_FILE = 'snapshot.key'
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+def get_snapshot_dir():
+    """Directory holding the snapshots and their signing key (overridable through QUIRON_SNAPSHOT_DIR)"""
+    return os.environ.get(SNAPSHOT_DIR_ENV) or DEFAULT_SNAPSHOT_DIR
+
+
+def get_snapshot_path(db_path):
+    """Return the snapshot file path of a database inside the snapshot directory"""
+    path_digest = hashlib.blake2b(os.path.abspath(db_path).encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(get_snapshot_dir(), f"{path_digest}{SNAPSHOT_SUFFIX}")
+
+
+def get_snapshot_key(create=False):
+    """Secret key signing the snapshots of this installation (None when missing and not created)"""
+    key_path = os.path.join(get_snapshot_dir(), SNAPSHOT_KEY_FILE)
+    if create and not os.path.isfile(key_path):
+        os.makedirs(get_snapshot_dir(), mode=0o700, exist_ok=True)
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # Another process created it first
+        else:
+            with os.fdopen(fd, 'wb') as key_file:
+                key_file.write(secrets.token_bytes(32))
+    try:
+        with open(key_path, 'rb') as key_file:
+            return key_file.read() or None
+    except OSError:
+        return None
+
+
+def sign_payload(key, data):
+    return hmac.new(key, data, hashlib.sha256).digest()
+
+
+def get_config_hash(object_types):
+    """Digest of the object type configuration, which shapes the stored inventory"""
+    return hashlib.blake2b(
+        json.dumps(object_types or {}, sort_keys=True, default=str).encode('utf-8'),
+        digest_size=12
+    ).hexdigest()
+
+
+def compute_db_fingerprint(db_path, object_types=None):
+    """Fingerprint a database file by size, mtime and content hash (None if the file is missing)"""
+    if not db_path or not os.path.isfile(db_path):
+        return None
+
+    stat = os.stat(db_path)
+    digest = hashlib.blake2b(digest_size=20)
+    with open(db_path, 'rb') as db_file:
+        for chunk in iter(lambda: db_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    # Uncheckpointed WAL pages are part of the logical database contents
+    wal_path = f"{db_path}-wal"
+    if os.path.isfile(wal_path):
+        with open(wal_path, 'rb') as wal_file:
+            for chunk in iter(lambda: wal_file.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'content_hash': digest.hexdigest(),
+        'config_hash': get_config_hash(object_types),
+        'snapshot_version': SNAPSHOT_VERSION
+    }
+
+
+def read_snapshot_payload(db_path):
+    """Unpickle the snapshot of a database, or None if it is missing, unreadable or not signed by this installation"""
+    snapshot_path = get_snapshot_path(db_path)
+    key = get_snapshot_key()
+    if key is None or not os.path.isfile(snapshot_path):
+        return None
+
+    try:
+        with open(snapshot_path, 'rb') as snapshot_file:
+            signature = snapshot_file.read(SIGNATURE_SIZE)
+            data = snapshot_file.read()
+        # The signature is checked before unpickling: a planted or altered file never gets executed
+        if not hmac.compare_digest(signature, sign_payload(key, data)):
+            return None
+        payload = pickle.loads(data)
+    except Exception:
+        return None
+
+    return payload if isinstance(payload, dict) else None
+
+
+def load_snapshot(db_path, fingerprint):
+    """Return the stored snapshot payload if it matches the fingerprint, otherwise None"""
+    if fingerprint is None:
+        return None
+
+    payload = read_snapshot_payload(db_path)
+    if payload is None or payload.get('fingerprint') != fingerprint:
+        return None
+
+    return payload
+
+
+def load_latest_snapshot(db_path, object_types=None):
+    """Return the stored snapshot even if the database changed since, provided its layout still matches"""
+    payload = read_snapshot_payload(db_path)
+    fingerprint = payload.get('fingerprint') if payload else None
+    if not fingerprint or fingerprint.get('snapshot_version') != SNAPSHOT_VERSION:
+        return None
+
+    if fingerprint.get('config_hash') != get_config_hash(object_types):
+        return None
+
+    return payload
+
+
+def save_snapshot(db_path, fingerprint, global_inventory, relationships, graph, dataset_stats):
+    """Atomically write the signed analysis results to the snapshot directory; returns True on success"""
+    if fingerprint is None or not os.path.isfile(db_path):
+        return False
+
+    payload = {
+        'fingerprint': fingerprint,
+        'global_inventory': global_inventory,
+        'relationships': relationships,
+        'graph': graph,
+        'dataset_stats': dataset_stats
+    }
+
+    snapshot_path = get_snapshot_path(db_path)
+    tmp_path = None
+    try:
+        key = get_snapshot_key(create=True)
+        data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(sign_payload(key, data))
+            tmp_file.write(data)
+        os.replace(tmp_path, snapshot_path)
+        return True
+    except Exception:
+        # A read-only folder or full disk must never break the data load itself
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
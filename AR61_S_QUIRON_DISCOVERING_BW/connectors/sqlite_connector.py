@@ -1,16 +1,177 @@
+import os
+import time
+import pathlib
+import threading
 import streamlit as st
 import sqlite3
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import networkx as nx
 
 from backend.enhaced_relationships import get_active_objects_by_type
 from backend.enhaced_relationships import analyze_enhanced_relationships
 from backend.enhaced_relationships import build_relationship_graph
+from backend.enhaced_relationships import load_relationship_source
+from backend.enhaced_relationships import get_object_high_water_mark
+from backend.enhaced_relationships import RELATIONSHIP_MEMORY_BUDGET_MB, RELATIONSHIP_SOURCES
+from backend.edge_store import EdgeTable
+from backend.csr_graph import CSRGraph, GRAPH_ENGINE_CSR, GRAPH_ENGINE_NETWORKX, get_graph_engine
+from backend.reachability import index_source_reachability
+from backend.connection_stats import index_connection_stats
+from backend.search_index import index_object_search
+from backend.node_interner import INTERNER_GRAPH_KEY
+from backend.dataset_registry import get_dataset_key, register_dataset, acquire_dataset, attach_session_dataset
+from connectors.snapshot_cache import compute_db_fingerprint, load_snapshot, save_snapshot
 
 
-def load_and_analyze_data(self, db_path):
-    """Load and analyze data with progress tracking"""
+def publish_dataset(dataset_key, global_inventory, relationships, graph, dataset_stats):
+    """Share a loaded dataset through the process registry and attach it to the current session"""
+    if dataset_key is None:
+        # Datasets that cannot be fingerprinted stay private to this session
+        st.session_state.dataset_key = None
+        st.session_state.global_inventory = global_inventory
+        st.session_state.relationships = relationships
+        st.session_state.graph = graph
+        st.session_state.dataset_stats = dataset_stats
+        return
+
+    register_dataset(dataset_key, global_inventory, relationships, graph, dataset_stats)
+    attach_session_dataset(st.session_state, dataset_key, acquire_dataset(dataset_key))
+
+
+# Upper bound on concurrent reader connections in the parallel loading mode
+MAX_LOAD_WORKERS = 8
+
+
+def open_readonly_connection(db_path):
+    """Open a read-only SQLite connection for a loader thread"""
+    db_uri = f"{pathlib.Path(db_path).resolve().as_uri()}?mode=ro"
+    return sqlite3.connect(db_uri, uri=True)
+
+
+def get_script_context():
+    """Return the active Streamlit script context so worker threads can report errors"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx()
+    except Exception:
+        return None
+
+
+def attach_script_context(ctx):
+    """Thread pool initializer binding the worker thread to the Streamlit script context"""
+    if ctx is None:
+        return
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(threading.current_thread(), ctx)
+    except Exception:
+        pass
+
+
+def run_load_task(db_path, task):
+    """Execute one table load on its own read-only connection and time it"""
+    started = time.perf_counter()
+    conn = open_readonly_connection(db_path)
+    try:
+        result = task['load'](conn)
+    finally:
+        conn.close()
+    return result, time.perf_counter() - started
+
+
+def load_tables_in_parallel(self, db_path, available_tables, progress_bar, status_text, memory_budget_mb, max_workers=None):
+    """Read object and relationship tables concurrently, one read-only connection per thread"""
+    tasks = []
+    for obj_type, config in self.object_types.items():
+        if config['table'] in available_tables:
+            tasks.append({
+                'kind': 'objects', 'key': obj_type, 'table': config['table'], 'label': f"{config['name']}s",
+                'load': lambda conn, obj_type=obj_type, config=config: get_active_objects_by_type(self, conn, obj_type, config)
+            })
+
+    relationship_sources = [source for source in RELATIONSHIP_SOURCES if source['table'] in available_tables]
+    workers = max(1, min(max_workers or MAX_LOAD_WORKERS, len(tasks) + len(relationship_sources)))
+    # Every worker may hold one page in flight, so the budget is shared between them
+    worker_budget_mb = memory_budget_mb / workers
+    for source in relationship_sources:
+        tasks.append({
+            'kind': 'relationships', 'key': source['table'], 'table': source['table'], 'label': f"{source['table']} relationships",
+            'load': lambda conn, source=source: load_relationship_source(self, conn, source, worker_budget_mb)
+        })
+
+    global_inventory = {obj_type: [] for obj_type in self.object_types}
+    relationships_by_table = {}
+    load_timings = {}
+
+    with ThreadPoolExecutor(max_workers=workers, initializer=attach_script_context,
+                            initargs=(get_script_context(),)) as executor:
+        futures = {executor.submit(run_load_task, db_path, task): task for task in tasks}
+
+        # Progress is reported from the script thread only, as tasks finish
+        for done, future in enumerate(as_completed(futures), 1):
+            task = futures[future]
+            result, elapsed = future.result()
+            load_timings[task['table']] = elapsed
+            if task['kind'] == 'objects':
+                global_inventory[task['key']] = result
+            else:
+                relationships_by_table[task['key']] = result
+
+            status_text.text(f"Loaded {task['label']} ({done}/{len(tasks)})")
+            progress_bar.progress(0.9 * done / len(tasks))
+
+    # Keep the sequential loader's edge order regardless of completion order
+    relationships = EdgeTable()
+    for source in relationship_sources:
+        relationships.extend(relationships_by_table[source['table']])
+
+    return global_inventory, relationships, load_timings
+
+
+def build_graph_for_engine(self, global_inventory, relationships, graph_engine=GRAPH_ENGINE_NETWORKX):
+    """Build the dataset graph with the selected engine, with its upstream source index"""
+    if graph_engine == GRAPH_ENGINE_CSR:
+        graph = CSRGraph.from_dataset(global_inventory, relationships)
+    else:
+        graph = build_relationship_graph(self, global_inventory, relationships)
+    index_source_reachability(graph)
+    # Statistics and search indexes are derived from the interner the builder attached
+    if INTERNER_GRAPH_KEY in graph.graph:
+        index_connection_stats(global_inventory, graph)
+        index_object_search(global_inventory, graph)
+    return graph
+
+
+def load_and_analyze_data(self, db_path, use_snapshot=True, memory_budget_mb=RELATIONSHIP_MEMORY_BUDGET_MB,
+                          parallel=False, max_workers=None, graph_engine=GRAPH_ENGINE_NETWORKX):
+    """Load and analyze data with progress tracking, reusing shared or snapshotted results when the DB is unchanged"""
     try:
+        fingerprint = compute_db_fingerprint(db_path, self.object_types)
+        dataset_key = get_dataset_key(fingerprint, graph_engine)
+
+        if use_snapshot and dataset_key is not None:
+            # Another session already holds this exact database in memory
+            entry = acquire_dataset(dataset_key)
+            if entry is not None:
+                attach_session_dataset(st.session_state, dataset_key, entry)
+                st.empty().text("✅ Data attached from shared dataset!")
+                return True
+
+            # Reuse a previous analysis of the very same database file when available
+            snapshot = load_snapshot(db_path, fingerprint)
+            if snapshot is not None:
+                dataset_stats = dict(snapshot['dataset_stats'])
+                dataset_stats['restored_from_snapshot'] = True
+                graph = snapshot['graph']
+                if get_graph_engine(graph) != graph_engine:
+                    # Only the graph depends on the engine; rebuilding it is cheap next to reading the tables
+                    graph = build_graph_for_engine(self, snapshot['global_inventory'], snapshot['relationships'], graph_engine)
+                    dataset_stats['graph_engine'] = graph_engine
+                publish_dataset(dataset_key, snapshot['global_inventory'], snapshot['relationships'], graph, dataset_stats)
+                st.empty().text("✅ Data restored from snapshot!")
+                return True
+
         # Connect to database
         conn = sqlite3.connect(db_path)
 
@@ -23,30 +184,61 @@ def load_and_analyze_data(self, db_path):
         progress_bar = st.progress(0)
         status_text = st.empty()
 
-        # Load objects by type
-        global_inventory = {}
-        total_objects = 0
+        # Timestamps are read before the data so later incremental refreshes cannot miss a change
+        high_water_marks = {
+            obj_type: get_object_high_water_mark(self, conn, obj_type, config)
+            for obj_type, config in self.object_types.items() if config['table'] in available_tables
+        }
 
-        for i, (obj_type, config) in enumerate(self.object_types.items()):
-            status_text.text(f"Loading {config['name']}s...")
-            progress_bar.progress((i + 1) / (len(self.object_types) + 2))
+        load_started = time.perf_counter()
+        load_timings = {}
 
-            if config['table'] in available_tables:
-                objects = get_active_objects_by_type(self, conn, obj_type, config)
-                global_inventory[obj_type] = objects
-                total_objects += len(objects)
-            else:
-                global_inventory[obj_type] = []
+        if parallel and os.path.isfile(db_path):
+            global_inventory, relationships, load_timings = load_tables_in_parallel(
+                self, db_path, available_tables, progress_bar, status_text, memory_budget_mb, max_workers
+            )
+        else:
+            parallel = False
 
-        # Analyze relationships - Enhanced for InfoCube connections
-        status_text.text("Analyzing relationships and source connections...")
-        progress_bar.progress(0.9)
-        relationships = analyze_enhanced_relationships(self, conn, available_tables)
+            # Load objects by type
+            global_inventory = {}
+
+            for i, (obj_type, config) in enumerate(self.object_types.items()):
+                status_text.text(f"Loading {config['name']}s...")
+                progress_bar.progress((i + 1) / (len(self.object_types) + 2))
+
+                if config['table'] in available_tables:
+                    table_started = time.perf_counter()
+                    objects = get_active_objects_by_type(self, conn, obj_type, config)
+                    load_timings[config['table']] = time.perf_counter() - table_started
+                    global_inventory[obj_type] = objects
+                else:
+                    global_inventory[obj_type] = []
+
+            # Analyze relationships - Enhanced for InfoCube connections
+            status_text.text("Analyzing relationships and source connections...")
+            progress_bar.progress(0.9)
+
+            # Pages arrive in table order, so time since the previous page belongs to the current table
+            page_clock = {'mark': time.perf_counter()}
+
+            def report_relationship_page(table, rows_loaded, pages_loaded):
+                now = time.perf_counter()
+                load_timings[table] = load_timings.get(table, 0.0) + now - page_clock['mark']
+                page_clock['mark'] = now
+                status_text.text(f"Analyzing relationships: {table} - {rows_loaded:,} rows read ({pages_loaded} pages)")
+
+            relationships = analyze_enhanced_relationships(self, conn, available_tables,
+                                                           progress_callback=report_relationship_page,
+                                                           memory_budget_mb=memory_budget_mb)
+
+        total_objects = sum(len(objects) for objects in global_inventory.values())
+        table_load_seconds = time.perf_counter() - load_started
 
         # Build graph
         status_text.text("Building network graph...")
         progress_bar.progress(0.95)
-        graph = build_relationship_graph(self, global_inventory, relationships)
+        graph = build_graph_for_engine(self, global_inventory, relationships, graph_engine)
 
         # Store dataset statistics
         dataset_stats = {
@@ -54,14 +246,23 @@ def load_and_analyze_data(self, db_path):
             'total_relationships': len(relationships),
             'object_type_counts': {obj_type: len(objects) for obj_type, objects in global_inventory.items()},
             'graph_density': nx.density(graph) if graph.nodes else 0,
-            'load_timestamp': datetime.now().isoformat()
+            'load_timestamp': datetime.now().isoformat(),
+            'load_mode': 'parallel' if parallel else 'sequential',
+            'load_timings': load_timings,
+            'table_load_seconds': table_load_seconds,
+            'high_water_marks': high_water_marks,
+            'dataset_version': 1,
+            'source_path': os.path.abspath(db_path),
+            'graph_engine': graph_engine
         }
 
         # Store in session state
-        st.session_state.global_inventory = global_inventory
-        st.session_state.relationships = relationships
-        st.session_state.graph = graph
-        st.session_state.dataset_stats = dataset_stats
+        publish_dataset(dataset_key, global_inventory, relationships, graph, dataset_stats)
+
+        # Persist the analysis so the next load of this DB is instant
+        if use_snapshot and fingerprint is not None:
+            status_text.text("Saving analysis snapshot...")
+            save_snapshot(db_path, fingerprint, global_inventory, relationships, graph, dataset_stats)
 
         # Clear progress indicators
         progress_bar.progress(1.0)
@@ -4,6 +4,11 @@ import streamlit as st
 import networkx as nx
 import warnings
 from connectors.sqlite_connector import load_and_analyze_data
+from connectors.incremental_refresh import refresh_data_incrementally
+from backend.dataset_registry import sync_session_dataset
+from backend.enhaced_relationships import RELATIONSHIP_MEMORY_BUDGET_MB
+from backend.csr_graph import GRAPH_ENGINES
+from backend.result_cache import get_result_cache_stats
 from frontend.dashboard import show_analytics_dashboard
 from frontend.home_page import show_home_page
 from frontend.impact_page import show_infoobject_impact_analysis
@@ -92,6 +97,11 @@ class SAP_BW_Enhanced_Analyzer:
             st.session_state.pos_3d = {}
         if 'dataset_stats' not in st.session_state:
             st.session_state.dataset_stats = {}
+        if 'dataset_key' not in st.session_state:
+            st.session_state.dataset_key = None
+
+        # Loaded data lives in the process-wide registry; keep this session's reference alive
+        sync_session_dataset(st.session_state)
     # Add any remaining helper methods that might be missing
 
     def create_main_interface(self):
@@ -184,11 +194,42 @@ class SAP_BW_Enhanced_Analyzer:
                     help="Enter the path to your database file"
                 )
 
+            use_snapshot = st.checkbox(
+                "♻️ Reuse analysis snapshot",
+                value=True,
+                help="Restore the cached analysis when the database file has not changed"
+            )
+
+            memory_budget_mb = st.number_input(
+                "Relationship page memory budget (MB)",
+                min_value=8,
+                max_value=4096,
+                value=RELATIONSHIP_MEMORY_BUDGET_MB,
+                step=8,
+                help="Relationship tables are read completely in keyset pages sized to fit this budget"
+            )
+
+            parallel_loading = st.checkbox(
+                "⚡ Parallel table loading",
+                value=False,
+                help="Read object and relationship tables concurrently, each on its own read-only connection"
+            )
+
+            graph_engine = st.selectbox(
+                "🕸️ Graph engine",
+                list(GRAPH_ENGINES),
+                format_func=GRAPH_ENGINES.get,
+                help="CSR keeps the graph in compact NumPy arrays for fast traversals on very large datasets"
+            )
+
             # Load data button
             if st.button("🚀 Load & Analyze Data", type="primary"):
                 if db_path:
                     with st.spinner("🔄 Loading and analyzing data for all features..."):
-                        success = load_and_analyze_data(self, db_path)
+                        success = load_and_analyze_data(self, db_path, use_snapshot=use_snapshot,
+                                                        memory_budget_mb=memory_budget_mb,
+                                                        parallel=parallel_loading,
+                                                        graph_engine=graph_engine)
                         if success:
                             st.success("✅ Data loaded successfully! All features ready.")
                             st.session_state.data_loaded = True
@@ -198,6 +239,17 @@ class SAP_BW_Enhanced_Analyzer:
                 else:
                     st.error("Please provide a database path or upload a file")
 
+            if st.session_state.data_loaded and db_path:
+                if st.button("🔄 Incremental Refresh", help="Apply only the objects changed since the last load (CONTTIMESTMP)"):
+                    with st.spinner("🔄 Applying changes since the last load..."):
+                        if refresh_data_incrementally(self, db_path):
+                            last_refresh = st.session_state.dataset_stats.get('last_refresh', {})
+                            st.success(f"✅ {last_refresh.get('changed_objects', 0):,} changed and "
+                                       f"{last_refresh.get('removed_objects', 0):,} removed objects applied")
+                            st.session_state.data_loaded = True
+                        else:
+                            st.error("❌ Incremental refresh failed")
+
             # Quick stats in sidebar
             if st.session_state.data_loaded:
                 st.markdown("---")
@@ -205,6 +257,8 @@ class SAP_BW_Enhanced_Analyzer:
                 stats = st.session_state.dataset_stats
                 st.write(f"📦 Objects: {stats.get('total_objects', 0):,}")
                 st.write(f"🔗 Connections: {stats.get('total_relationships', 0):,}")
+                if stats.get('restored_from_snapshot'):
+                    st.caption("♻️ Restored from analysis snapshot")
 
                 cube_count = len(st.session_state.global_inventory.get('CUBE', []))
                 iobj_count = len(st.session_state.global_inventory.get('IOBJ', []))
@@ -214,6 +268,24 @@ class SAP_BW_Enhanced_Analyzer:
                 st.write(f"🏷️ InfoObjects: {iobj_count:,}")
                 st.write(f"📡 DataSources: {ds_count:,}")
 
+                load_timings = stats.get('load_timings') or {}
+                if load_timings:
+                    with st.expander("⏱️ Load timings"):
+                        st.caption(f"Mode: {stats.get('load_mode', 'sequential')} · "
+                                   f"tables read in {stats.get('table_load_seconds', 0):.2f}s")
+                        for table, seconds in sorted(load_timings.items(), key=lambda item: item[1], reverse=True):
+                            st.write(f"`{table}`: {seconds:.2f}s")
+                        critical_table = max(load_timings, key=load_timings.get)
+                        st.caption(f"Critical path: {critical_table}")
+
+                cache_stats = get_result_cache_stats()
+                if cache_stats['hits'] or cache_stats['misses']:
+                    with st.expander("🗃️ Analysis cache"):
+                        st.write(f"Hits: {cache_stats['hits']:,} · Misses: {cache_stats['misses']:,} "
+                                 f"({cache_stats['hit_rate']:.0%} hit rate)")
+                        st.caption(f"{cache_stats['entries']:,} results · {cache_stats['bytes'] / 1024 ** 2:.1f} of "
+                                   f"{cache_stats['max_bytes'] / 1024 ** 2:.0f} MB · {cache_stats['evictions']:,} evicted")
+
         # Main content area based on selected page - ALL FEATURES AVAILABLE
         if page == "🏠 Home & Data Loading":
             show_home_page(self)
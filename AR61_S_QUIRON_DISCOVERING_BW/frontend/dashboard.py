@@ -1,9 +1,16 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 from backend.infocube_analysis import calculate_connection_percentages
+from backend.edge_store import count_edge_types
+from backend.node_interner import get_graph_attributes, get_node_interner
+from backend.condensation import get_condensation
 from connectors.source_detectors import get_source_system_info
 
+# Cycles listed in the dashboard table (largest first)
+MAX_LISTED_CYCLES = 50
+
 
 def show_analytics_dashboard(self):
     """Show analytics dashboard with comprehensive connection percentage analysis"""
@@ -378,12 +385,15 @@ def show_analytics_dashboard(self):
         if st.button("🎯 Visualize Network", help="Create 3D visualization"):
             st.info("💡 Use the 3D Network Visualization page with connection-based sampling")
 
+    show_flow_cycles(st.session_state.graph)
+
     # Detailed breakdown
     st.markdown("---")
     st.subheader("🔍 Detailed Breakdown")
 
     # Create detailed stats table
     detailed_stats = []
+    interner = get_node_interner(st.session_state.global_inventory, st.session_state.graph)
     for obj_type, count in stats['object_type_counts'].items():
         if count > 0:
             config = self.object_types[obj_type]
@@ -391,11 +401,7 @@ def show_analytics_dashboard(self):
             # Calculate average connections
             avg_connections = 0
             if obj_type in st.session_state.global_inventory:
-                total_connections = 0
-                for obj in st.session_state.global_inventory[obj_type]:
-                    node_id = f"{obj_type}:{obj['name']}"
-                    if node_id in st.session_state.graph.nodes:
-                        total_connections += st.session_state.graph.degree(node_id)
+                total_connections = int(interner.get_type_degrees(obj_type).sum())
                 avg_connections = total_connections / count if count > 0 else 0
 
             detailed_stats.append({
@@ -419,10 +425,7 @@ def show_analytics_dashboard(self):
 
     with col1:
         st.markdown("**Connection Types Distribution**")
-        connection_types = {}
-        for rel in st.session_state.relationships:
-            rel_type = rel['type']
-            connection_types[rel_type] = connection_types.get(rel_type, 0) + 1
+        connection_types = count_edge_types(st.session_state.relationships)
 
         if connection_types:
             for conn_type, count in sorted(connection_types.items(), key=lambda x: x[1], reverse=True):
@@ -434,16 +437,14 @@ def show_analytics_dashboard(self):
         # Find top connected objects across all types
         top_connected = []
         for obj_type, objects in st.session_state.global_inventory.items():
-            for obj in objects:
-                node_id = f"{obj_type}:{obj['name']}"
-                if node_id in st.session_state.graph.nodes:
-                    connections = st.session_state.graph.degree(node_id)
-                    if connections > 0:
-                        top_connected.append({
-                            'name': obj['name'],
-                            'type': obj['type_name'],
-                            'connections': connections
-                        })
+            degrees = interner.get_type_degrees(obj_type)
+            for index in np.flatnonzero(degrees > 0):
+                obj = objects[int(index)]
+                top_connected.append({
+                    'name': obj['name'],
+                    'type': obj['type_name'],
+                    'connections': int(degrees[index])
+                })
 
         # Sort and show top 10
         top_connected.sort(key=lambda x: x['connections'], reverse=True)
@@ -475,3 +476,29 @@ def show_analytics_dashboard(self):
 
     for rec in recommendations:
         st.info(rec)
+
+
+def show_flow_cycles(graph):
+    """Flag the cycles of the data flow (strongly connected components of its flow edges)"""
+    if get_graph_attributes(graph) is None:
+        return
+
+    condensation = get_condensation(graph)
+    st.markdown("---")
+    st.subheader("🔁 Data Flow Cycles")
+
+    cycle_count = condensation.count_cycles()
+    if not cycle_count:
+        st.success("✅ No cycles in the data flow (transformations and source connections)")
+        return
+
+    cycles = condensation.get_cycles()
+    st.warning(f"⚠️ {cycle_count:,} cycles found in the data flow, involving {sum(len(members) for members in cycles):,} objects; "
+               "the objects of each cycle feed each other.")
+    with st.expander(f"🔁 Cycles found (largest {min(cycle_count, MAX_LISTED_CYCLES)})"):
+        st.dataframe(pd.DataFrame([{
+            'Cycle': number,
+            'Objects': len(members),
+            'Object Types': ', '.join(sorted({member.split(':', 1)[0] for member in members})),
+            'Members': ', '.join(members[:10]) + (' ...' if len(members) > 10 else '')
+        } for number, members in enumerate(cycles[:MAX_LISTED_CYCLES], 1)]), use_container_width=True, hide_index=True)
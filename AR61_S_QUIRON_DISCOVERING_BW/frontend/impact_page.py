@@ -1,5 +1,22 @@
 import streamlit as st
-from backend.impact_analysis import analyze_infoobject_impact_with_sources, display_impact_analysis_with_sources
+import pandas as pd
+from datetime import datetime
+from backend.batch_impact import analyze_batch_impact, parse_object_names, prepare_batch_impact_csv, read_object_names_csv
+from backend.impact_analysis import display_impact_analysis_with_sources, iter_infoobject_impact_levels
+from backend.search_index import get_search_index
+from backend.job_runner import submit_job_group
+from backend.result_cache import get_cached_result, store_cached_result
+from backend.traversal import DIRECTION_BOTH, DIRECTION_DOWNSTREAM, DIRECTION_UPSTREAM
+from frontend.job_progress import (show_job_errors, show_job_progress, show_partial_levels, show_partial_notice,
+                                   show_traversal_estimate)
+
+CONNECTION_TYPE_OPTIONS = ['transformation', 'usage_dimension', 'usage_keyfigure', 'source_connection']
+BATCH_MODE = "Object list (transport request)"
+BATCH_DIRECTIONS = {
+    DIRECTION_BOTH: "Both directions",
+    DIRECTION_DOWNSTREAM: "Downstream (dependents)",
+    DIRECTION_UPSTREAM: "Upstream (providers)"
+}
 
 
 def show_infoobject_impact_analysis(self):
@@ -11,18 +28,22 @@ def show_infoobject_impact_analysis(self):
     st.header("🔍 InfoObject Impact Analysis with Source Connections")
     st.markdown("**Analyze dependencies, impact, and trace connections back to data sources**")
 
-    # Get all InfoObjects for selection
-    iobj_list = []
-    if 'IOBJ' in st.session_state.global_inventory:
-        iobj_list = [obj['name'] for obj in st.session_state.global_inventory['IOBJ']]
+    analysis_mode = st.radio(
+        "Analysis Mode:",
+        options=["Single InfoObject", BATCH_MODE],
+        horizontal=True,
+        help="Analyze one InfoObject, or the consolidated impact of a list of objects"
+    )
+    if analysis_mode == BATCH_MODE:
+        show_batch_impact_analysis(self)
+        return
 
-    if not iobj_list:
+    # Object picker backed by the search index: only the best matches reach the browser
+    search_index = get_search_index(st.session_state.global_inventory, getattr(st.session_state, 'graph', None))
+    if not search_index.count_type('IOBJ'):
         st.error("❌ No InfoObjects found in the dataset")
         return
 
-    # Sort InfoObjects alphabetically
-    iobj_list.sort()
-
     # Controls section - Simplified and focused on source connections
     col1, col2, col3 = st.columns(3)
 
@@ -33,21 +54,18 @@ def show_infoobject_impact_analysis(self):
         search_iobj = st.text_input(
             "🔍 Search InfoObjects:",
             placeholder="Type to filter InfoObjects...",
-            help="Filter the InfoObject list"
+            help="Names starting with the text come first, then names containing it; most connected first"
         )
 
-        # Filter InfoObjects based on search
-        filtered_iobj_list = [iobj for iobj in iobj_list
-                              if search_iobj.lower() in iobj.lower()] if search_iobj else iobj_list
-
-        if not filtered_iobj_list:
+        suggested_iobjs, match_count = search_index.get_suggested_names(search_iobj, 'IOBJ')
+        if not suggested_iobjs:
             st.warning("No InfoObjects match your search")
             return
 
         selected_iobj = st.selectbox(
             "Choose InfoObject:",
-            options=filtered_iobj_list,
-            help=f"Select from {len(filtered_iobj_list)} InfoObjects"
+            options=suggested_iobjs,
+            help=f"Top {len(suggested_iobjs)} of {match_count:,} matching InfoObjects"
         )
 
         st.info(f"🏷️ **Selected:** {selected_iobj}")
@@ -71,13 +89,13 @@ def show_infoobject_impact_analysis(self):
 
         show_connection_types = st.multiselect(
             "Connection Types to Show:",
-            options=['transformation', 'usage_dimension', 'usage_keyfigure', 'source_connection', 'all'],
+            options=CONNECTION_TYPE_OPTIONS + ['all'],
             default=['transformation', 'usage_dimension', 'source_connection'],
             help="Filter by relationship types"
         )
 
         if 'all' in show_connection_types:
-            show_connection_types = ['transformation', 'usage_dimension', 'usage_keyfigure', 'source_connection']
+            show_connection_types = CONNECTION_TYPE_OPTIONS
 
     with col3:
         st.subheader("📊 Display Options")
@@ -110,20 +128,146 @@ def show_infoobject_impact_analysis(self):
 
     st.markdown("---")
 
+    show_traversal_estimate(f"IOBJ:{selected_iobj}", analysis_depth, show_connection_types)
+
     # Analyze button
     if st.button("🔍 Analyze InfoObject Impact & Sources", type="primary"):
-        with st.spinner(f"🔄 Analyzing impact and source connections for InfoObject: {selected_iobj}..."):
+        params = (selected_iobj, analysis_depth, include_source_tracing, show_connection_types, show_source_systems)
+        tasks = [] if get_cached_result(st.session_state, 'infoobject_impact', params) is not None else [
+            (selected_iobj, iter_infoobject_impact_levels, params)
+        ]
+        st.session_state.impact_jobs = submit_job_group(st.session_state, tasks, params=params)
+
+    job_group = getattr(st.session_state, 'impact_jobs', None)
+    if job_group is None or not show_job_progress(job_group, 'impact_jobs', "Analyzing impact and source connections",
+                                                  show_partial_levels):
+        return
+
+    show_job_errors(job_group)
+    params = job_group.params
+    impact_results = job_group.get_results(include_partial=True).get(params[0])
+    if impact_results is None:
+        impact_results = get_cached_result(st.session_state, 'infoobject_impact', params)
+    elif not job_group.results_stored and not impact_results.get('partial'):
+        store_cached_result(st.session_state, 'infoobject_impact', params, impact_results)
+    job_group.results_stored = True
+
+    if not impact_results:
+        st.warning(f"No connections found for InfoObject: {params[0]}")
+        return
+
+    # Display results
+    show_partial_notice(impact_results)
+    display_impact_analysis_with_sources(
+        self, params[0], impact_results, group_by_type, show_details, render_3d
+    )
+
+
+def show_batch_impact_analysis(self):
+    """Consolidated impact of a pasted or uploaded list of objects, from one multi-seed traversal"""
+    st.subheader("📦 Batch Impact Analysis")
+    st.markdown("Paste object names (one per line or comma separated, `TYPE:NAME` for non-InfoObjects) or upload a CSV")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        pasted_objects = st.text_area(
+            "Objects:",
+            placeholder="0CUSTOMER\n0MATERIAL\nCUBE:ZSALES_C01",
+            help="Bare names are taken as InfoObjects"
+        )
+        uploaded_file = st.file_uploader(
+            "Or upload a CSV:",
+            type=['csv', 'txt'],
+            help="Uses the object/name column when the header has one, otherwise the first column"
+        )
+
+    with col2:
+        analysis_depth = st.slider(
+            "Connection Depth:",
+            min_value=1,
+            max_value=5,
+            value=2,
+            key="batch_impact_depth",
+            help="How many levels of connections to analyze from each object"
+        )
+        direction = st.selectbox(
+            "Direction:",
+            options=list(BATCH_DIRECTIONS),
+            format_func=lambda value: BATCH_DIRECTIONS[value],
+            help="Follow dependents, providers or both"
+        )
+        connection_types = st.multiselect(
+            "Connection Types:",
+            options=CONNECTION_TYPE_OPTIONS,
+            default=['transformation', 'usage_dimension', 'source_connection'],
+            key="batch_impact_connection_types",
+            help="Filter by relationship types"
+        )
+
+    seed_nodes = parse_object_names(pasted_objects)
+    if uploaded_file is not None:
+        seed_nodes = list(dict.fromkeys(seed_nodes + read_object_names_csv(uploaded_file.getvalue())))
+
+    st.info(f"📋 **Objects listed:** {len(seed_nodes)}")
+
+    if st.button("🔍 Analyze Batch Impact", type="primary"):
+        if not seed_nodes:
+            st.warning("⚠️ List at least one object to analyze")
+            return
+        params = (seed_nodes, analysis_depth, connection_types, direction)
+        tasks = [] if get_cached_result(st.session_state, 'batch_impact', params) is not None else [
+            ('batch_impact', analyze_batch_impact, params)
+        ]
+        st.session_state.batch_impact_jobs = submit_job_group(st.session_state, tasks, params=params)
+
+    job_group = getattr(st.session_state, 'batch_impact_jobs', None)
+    if job_group is None or not show_job_progress(job_group, 'batch_impact_jobs', "Analyzing batch impact"):
+        return
+
+    show_job_errors(job_group)
+    results = job_group.get_results().get('batch_impact')
+    if results is None:
+        results = get_cached_result(st.session_state, 'batch_impact', job_group.params)
+    elif not job_group.results_stored:
+        store_cached_result(st.session_state, 'batch_impact', job_group.params, results)
+    job_group.results_stored = True
+
+    if not results:
+        st.warning("None of the listed objects was found in the dataset")
+        return
+
+    if results['missing']:
+        st.warning(f"⚠️ {len(results['missing'])} objects not found: {', '.join(results['missing'][:20])}"
+                   f"{' ...' if len(results['missing']) > 20 else ''}")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Analyzed Objects", len(results['seeds']))
+    col2.metric("Impacted Objects", results['total_impacted'])
+    col3.metric("Shared Impact", results['shared_impacted'], help="Objects reached from more than one listed object")
+    col4.metric("Object Types", len(results['by_type']))
 
-            # Perform the enhanced impact analysis with source tracing
-            impact_results = analyze_infoobject_impact_with_sources(
-                self, selected_iobj, analysis_depth, include_source_tracing, show_connection_types, show_source_systems
-            )
+    if results['impacted_objects']:
+        st.markdown("#### 🎯 Impacted Objects")
+        st.dataframe(pd.DataFrame([{
+            'Object': obj['name'],
+            'Type': obj['type_name'],
+            'Owner': obj['owner'],
+            'InfoArea': obj['infoarea'],
+            'Min Depth': obj['min_depth'],
+            'Reached By': obj['seed_count'],
+            'In Transport': 'Yes' if obj['in_transport'] else 'No',
+            'Reached From': ', '.join(seed.split(':', 1)[1] for seed in obj['reached_by'])
+        } for obj in results['impacted_objects']]), use_container_width=True, hide_index=True)
 
-            if not impact_results:
-                st.warning(f"No connections found for InfoObject: {selected_iobj}")
-                return
+    st.markdown("#### 📦 Impact per Listed Object")
+    st.dataframe(pd.DataFrame(
+        [{'Object': node_id, 'Impacted Objects': count} for node_id, count in results['per_seed'].items()]
+    ), use_container_width=True, hide_index=True)
 
-            # Display results
-            display_impact_analysis_with_sources(
-                self, selected_iobj, impact_results, group_by_type, show_details, render_3d
-            )
+    st.download_button(
+        label="📥 Download Batch Impact (CSV)",
+        data=prepare_batch_impact_csv(self, results),
+        file_name=f"batch_impact_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv"
+    )
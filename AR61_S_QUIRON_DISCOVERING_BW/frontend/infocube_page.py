@@ -3,11 +3,18 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
-from backend.infocube_analysis import analyze_infocube_connections
+from backend.infocube_analysis import iter_infocube_connection_levels
 from backend.infocube_analysis import create_infocube_connection_3d_visualization
 from backend.infocube_analysis import prepare_infocube_connection_csv
 from backend.infocube_analysis import generate_infocube_connection_report
 from connectors.source_detectors import get_source_system_info
+from backend.inventory_store import get_node_record
+from backend.search_index import get_search_index
+from backend.result_cache import get_cached_result, store_cached_result
+from backend.lineage import LINEAGE_ORDERS
+from backend.job_runner import submit_job_group
+from frontend.job_progress import (show_job_errors, show_job_progress, show_partial_levels, show_partial_notice,
+                                   show_traversal_estimate)
 
 
 def show_infocube_connection_analysis(self):
@@ -19,18 +26,12 @@ def show_infocube_connection_analysis(self):
     st.header("🧊 InfoCube Connection Analysis with Complete Source Tracing")
     st.markdown("**Analyze all connections for a specific InfoCube including InfoSources, DataSources, and complete data flow**")
 
-    # Get all InfoCubes for selection
-    cube_list = []
-    if 'CUBE' in st.session_state.global_inventory:
-        cube_list = [obj['name'] for obj in st.session_state.global_inventory['CUBE']]
-
-    if not cube_list:
+    # Object picker backed by the search index: only the best matches reach the browser
+    search_index = get_search_index(st.session_state.global_inventory, getattr(st.session_state, 'graph', None))
+    if not search_index.count_type('CUBE'):
         st.error("❌ No InfoCubes found in the dataset")
         return
 
-    # Sort InfoCubes alphabetically
-    cube_list.sort()
-
     # Controls section
     col1, col2, col3 = st.columns(3)
 
@@ -41,25 +42,33 @@ def show_infocube_connection_analysis(self):
         search_cube = st.text_input(
             "🔍 Search InfoCubes:",
             placeholder="Type to filter InfoCubes...",
-            help="Filter the InfoCube list"
+            help="Names starting with the text come first, then names containing it; most connected first"
         )
 
-        # Filter InfoCubes based on search
-        filtered_cube_list = [cube for cube in cube_list
-                              if search_cube.lower() in cube.lower()] if search_cube else cube_list
-
-        if not filtered_cube_list:
+        suggested_cubes, match_count = search_index.get_suggested_names(search_cube, 'CUBE')
+        if not suggested_cubes:
             st.warning("No InfoCubes match your search")
             return
 
         selected_cube = st.selectbox(
             "Choose InfoCube:",
-            options=filtered_cube_list,
-            help=f"Select from {len(filtered_cube_list)} InfoCubes"
+            options=suggested_cubes,
+            help=f"Top {len(suggested_cubes)} of {match_count:,} matching InfoCubes"
         )
 
         st.info(f"🧊 **Selected:** {selected_cube}")
 
+        # Extras picked under earlier searches stay selected and selectable whatever the current search
+        chosen_extras = [cube for cube in getattr(st.session_state, 'infocube_extra_cubes', []) if cube != selected_cube]
+        extra_cubes = st.multiselect(
+            "Also analyze:",
+            options=chosen_extras + [cube for cube in suggested_cubes if cube != selected_cube and cube not in chosen_extras],
+            default=chosen_extras,
+            help="More InfoCubes, picked among the matches of any search, analyzed in parallel with the same settings "
+                 "and summarized side by side"
+        )
+        st.session_state.infocube_extra_cubes = extra_cubes
+
     with col2:
         st.subheader("🔧 Analysis Settings")
 
@@ -114,27 +123,70 @@ def show_infocube_connection_analysis(self):
             help="Display complete path from sources to InfoCube"
         )
 
+        lineage_order = st.selectbox(
+            "Lineage Path Order:",
+            options=list(LINEAGE_ORDERS),
+            format_func=LINEAGE_ORDERS.get,
+            help="Which lineage paths to list first; only the top paths of each source are listed"
+        )
+
     st.markdown("---")
 
+    show_traversal_estimate(f"CUBE:{selected_cube}", analysis_depth, connection_types)
+
     # Analyze button
     if st.button("🧊 Analyze InfoCube Connections & Sources", type="primary"):
-        with st.spinner(f"🔄 Analyzing all connections for InfoCube: {selected_cube}..."):
+        cubes = [selected_cube] + list(extra_cubes)
+        settings = (analysis_depth, include_all_sources, connection_types, show_data_lineage, lineage_order)
 
-            # Perform the InfoCube connection analysis
-            connection_results = analyze_infocube_connections(
-                self, selected_cube, analysis_depth, include_all_sources,
-                connection_types, show_data_lineage
-            )
+        # Cubes already analyzed on this dataset version are not submitted again
+        tasks = [(cube, iter_infocube_connection_levels, (cube,) + settings) for cube in cubes
+                 if get_cached_result(st.session_state, 'infocube_connections', (cube,) + settings) is None]
+        st.session_state.infocube_jobs = submit_job_group(st.session_state, tasks, params={'cubes': cubes, 'settings': settings})
 
-            if not connection_results:
-                st.warning(f"No connections found for InfoCube: {selected_cube}")
-                return
+    job_group = getattr(st.session_state, 'infocube_jobs', None)
+    if job_group is None or not show_job_progress(job_group, 'infocube_jobs', "Analyzing InfoCubes", show_partial_levels):
+        return
 
-            # Display results
-            display_infocube_connection_analysis(
-                self, selected_cube, connection_results, group_by_type,
-                show_details, render_3d, show_data_lineage
-            )
+    show_job_errors(job_group)
+    cubes, settings = job_group.params['cubes'], job_group.params['settings']
+    fresh_results = job_group.get_results(include_partial=True)
+    if not job_group.results_stored:
+        for cube, result in fresh_results.items():
+            if result and not result.get('partial'):
+                store_cached_result(st.session_state, 'infocube_connections', (cube,) + settings, result)
+        job_group.results_stored = True
+    cube_results = {cube: fresh_results.get(cube) or get_cached_result(st.session_state, 'infocube_connections', (cube,) + settings)
+                    for cube in cubes}
+
+    if len(cubes) > 1:
+        display_infocube_comparison(cube_results)
+
+    target_cube = cubes[0]
+    connection_results = cube_results[target_cube]
+    if not connection_results:
+        st.warning(f"No connections found for InfoCube: {target_cube}")
+        return
+
+    # Display results
+    show_partial_notice(connection_results)
+    display_infocube_connection_analysis(
+        self, target_cube, connection_results, group_by_type,
+        show_details, render_3d, settings[3]
+    )
+
+
+def display_infocube_comparison(cube_results):
+    """Side by side summary of several analyzed InfoCubes"""
+    st.subheader("📊 InfoCube Comparison")
+    st.dataframe(pd.DataFrame([{
+        'InfoCube': cube,
+        'Connected Objects': results['total_objects'] if results else 0,
+        'Relationships': results['total_relationships'] if results else 0,
+        'Upstream DataSources': len(results.get('upstream_datasources', [])) if results else 0,
+        'Lineage Paths': results.get('lineage_total_paths', 0) if results else 0
+    } for cube, results in cube_results.items()]), use_container_width=True, hide_index=True)
+    st.markdown("---")
 
 
 def display_infocube_connection_analysis(self, cube_name, results, group_by_type, show_details, render_3d, show_lineage):
@@ -162,6 +214,9 @@ def display_infocube_connection_analysis(self, cube_name, results, group_by_type
     if show_lineage and results.get('data_lineage_paths'):
         st.subheader("🛤️ Complete Data Lineage Analysis")
         st.caption("Tracing data flow from sources to InfoCube")
+        if results.get('lineage_truncated'):
+            st.info(f"ℹ️ {results.get('lineage_total_paths', 0):,} lineage paths exist within 5 steps; "
+                    f"only the top {len(results['data_lineage_paths']):,} are listed")
 
         col1, col2 = st.columns(2)
 
@@ -178,7 +233,7 @@ def display_infocube_connection_analysis(self, cube_name, results, group_by_type
                 source_systems.add(source_system)
 
             summary_data = {
-                'Total Lineage Paths': total_paths,
+                'Total Lineage Paths': results.get('lineage_total_paths', total_paths),
                 'Source Systems': len(source_systems),
                 'Avg Path Length': f"{np.mean(path_lengths):.1f}" if path_lengths else "0",
                 'Max Path Length': max(path_lengths) if path_lengths else 0,
@@ -222,6 +277,19 @@ def display_infocube_connection_analysis(self, cube_name, results, group_by_type
 
     st.markdown("---")
 
+    # Full upstream sources from the load-time reachability index (not limited by the analysis depth)
+    upstream_datasources = results.get('upstream_datasources')
+    if upstream_datasources:
+        upstream_rows = [
+            {'DataSource': node_id.split(':', 1)[1], 'Source System': get_source_system_info(self, node_id.split(':', 1)[1])}
+            for node_id in upstream_datasources
+        ]
+        df_upstream = pd.DataFrame(upstream_rows)
+        with st.expander(f"🌊 All Upstream DataSources ({len(upstream_rows):,}) across the full data flow", expanded=False):
+            st.dataframe(df_upstream['Source System'].value_counts().rename_axis('Source System').reset_index(name='DataSources'),
+                         use_container_width=True, height=200)
+            st.dataframe(df_upstream, use_container_width=True, height=300)
+
     # Source system analysis
     if results['connected_objects'].get('DS'):
         st.subheader("📡 Source System Analysis")
@@ -278,7 +346,7 @@ def display_infocube_connection_analysis(self, cube_name, results, group_by_type
         feeding_objects = []
         for rel in results['relationships']:
             if rel['direction'] == 'incoming':
-                source_node = st.session_state.graph.nodes.get(rel['source'])
+                source_node = get_node_record(st.session_state.graph, rel['source'])
                 if source_node:
                     feeding_objects.append({
                         'Object': source_node['name'],
@@ -302,7 +370,7 @@ def display_infocube_connection_analysis(self, cube_name, results, group_by_type
         consuming_objects = []
         for rel in results['relationships']:
             if rel['direction'] == 'outgoing':
-                target_node = st.session_state.graph.nodes.get(rel['target'])
+                target_node = get_node_record(st.session_state.graph, rel['target'])
                 if target_node:
                     consuming_objects.append({
                         'Object': target_node['name'],
@@ -0,0 +1,102 @@
+import time
+import pandas as pd
+import streamlit as st
+from backend.traversal import BUDGET_NODES, BUDGET_TIME, DEFAULT_NODE_BUDGET, estimate_traversal
+
+# Pause between reruns while background jobs are still running
+JOB_POLL_SECONDS = 0.5
+
+# Estimated reached objects above which a traversal is flagged as large before running
+LARGE_TRAVERSAL_NODES = 20000
+
+
+def show_job_progress(group, state_key, label="Analyzing", render_partial=None):
+    """Progress and stop control for a job group kept in st.session_state[state_key]
+
+    Returns True once the group can be displayed: every job finished, or the user stopped
+    it (the jobs then keep the levels streamed so far). Until then the partial results are
+    shown through render_partial(job_label, partial) and the page is rerun periodically so
+    the other widgets stay usable while the workers compute.
+    """
+    if group.done():
+        return True
+
+    finished = sum(job.done() for job in group.jobs.values())
+    st.progress(group.get_progress(), text=f"🔄 {label}: {finished}/{len(group)} jobs finished")
+    if st.button("⏹️ Stop", key=f"{state_key}_stop", help="Stop the analysis and keep what has been computed so far"):
+        group.cancel()
+        return True
+
+    if render_partial is not None:
+        for job_label, job in group.jobs.items():
+            partial = job.get_partial()
+            if partial is not None and not job.done():
+                render_partial(job_label, partial)
+
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
+    return False
+
+
+def show_job_errors(group):
+    """Warn about the jobs of a group that failed"""
+    for label, error in group.get_errors().items():
+        st.error(f"❌ {label}: {error}")
+
+
+def get_level_rows(relationships, direction):
+    """Objects reached in one direction, each at the first level it appeared"""
+    end = 'source' if direction == 'incoming' else 'target'
+    levels = {}
+    for rel in relationships:
+        if rel['direction'] == direction:
+            node_id = rel[end]
+            levels[node_id] = min(levels.get(node_id, rel['depth']), rel['depth'])
+    return [{'Object': node_id.split(':', 1)[-1], 'Type': node_id.split(':', 1)[0], 'Level': level}
+            for node_id, level in sorted(levels.items(), key=lambda item: (item[1], item[0]))]
+
+
+def show_partial_levels(job_label, results):
+    """Upstream and downstream objects of a traversal streamed level by level"""
+    st.markdown(f"**{job_label}** — level {results.get('levels_completed', 0)} of {results.get('analysis_depth', '?')}: "
+                f"{results.get('total_objects', 0)} objects, {results.get('total_relationships', 0)} relationships so far")
+
+    col1, col2 = st.columns(2)
+    for column, title, direction in ((col1, "⬆️ Upstream", 'incoming'), (col2, "⬇️ Downstream", 'outgoing')):
+        with column:
+            rows = get_level_rows(results.get('relationships', []), direction)
+            st.markdown(f"{title} ({len(rows)})")
+            if rows:
+                st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+
+def show_partial_notice(results):
+    """Tell that a displayed result stops at an intermediate level, and why"""
+    if not results or not results.get('partial'):
+        return
+    reason = {
+        BUDGET_NODES: "the object budget was reached",
+        BUDGET_TIME: "the time budget ran out"
+    }.get(results.get('stopped_by'), "it was stopped")
+    st.warning(f"⏹️ Analysis ended after level {results.get('levels_completed', 0)} of "
+               f"{results.get('analysis_depth', '?')} because {reason}: showing the partial results computed so far")
+
+
+def show_traversal_estimate(start_node, depth, edge_types):
+    """Predicted size of a traversal from the degree statistics, with a warning when it is large"""
+    graph = getattr(st.session_state, 'graph', None)
+    if graph is None or start_node not in graph.nodes:
+        return None
+
+    levels = estimate_traversal(graph, [start_node], depth, edge_types)
+    if not levels:
+        return levels
+    total_nodes, total_edges = levels[-1]['total_nodes'], levels[-1]['total_edges']
+    st.caption(f"📐 Estimated size: ~{total_nodes:,} objects and ~{total_edges:,} relationships within {depth} levels")
+
+    if total_nodes > LARGE_TRAVERSAL_NODES:
+        breakdown = ", ".join(f"level {level['level']}: ~{level['total_nodes']:,}" for level in levels)
+        budget_note = (f" It will probably stop at the budget of {DEFAULT_NODE_BUDGET:,} objects."
+                       if total_nodes > DEFAULT_NODE_BUDGET else "")
+        st.warning(f"⚠️ Large traversal expected ({breakdown}). Consider a lower depth or fewer connection types.{budget_note}")
+    return levels
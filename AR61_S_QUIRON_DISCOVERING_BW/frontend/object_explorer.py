@@ -1,3 +1,5 @@
+import io
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -6,6 +8,21 @@ from backend.infocube_analysis import calculate_connection_percentages
 from backend.reports import generate_search_connection_summary
 from connectors.source_detectors import get_source_system_info
 from connectors.source_detectors import determine_infosource_type
+from backend.filter_expression import FILTER_FIELDS, FilterSyntaxError, get_filter_mask
+from backend.search_index import (
+    SORT_CONNECTIONS, SORT_INFOAREA, SORT_NAME, SORT_OWNER, SORT_PERCENTAGE, SORT_STATUS, SORT_TYPE, SearchResults,
+    get_search_index
+)
+
+# Columns of every result row; 'Connection %' and the DataSource columns are added when they apply
+RESULT_COLUMNS = ('Icon', 'Name', 'Type', 'Category', 'Owner', 'InfoArea', 'Active', 'Connections', 'Connection Status',
+                  'Last Changed')
+
+PAGE_SIZES = [50, 100, 250, 500, 1000]
+DEFAULT_PAGE_SIZE = 100
+
+# Rows turned into CSV at a time when exporting the whole result
+EXPORT_CHUNK_ROWS = 5000
 
 
 def show_object_explorer(self):
@@ -38,6 +55,7 @@ def show_object_explorer(self):
 
     with col1:
         search_term = st.text_input("🔍 Search objects:", placeholder="Enter object name...")
+        fuzzy_search = st.checkbox("Fuzzy match", value=False, help="Also match names with typos or slightly different spelling")
 
     with col2:
         object_type_filter = st.selectbox(
@@ -97,226 +115,232 @@ def show_object_explorer(self):
     with col3:
         st.markdown("**Advanced Filters**")
         # InfoArea filter
-        all_infoareas = set()
-        for objects in st.session_state.global_inventory.values():
-            for obj in objects:
-                all_infoareas.add(obj.get('infoarea', 'UNASSIGNED'))
-
+        search_index = get_search_index(st.session_state.global_inventory, st.session_state.graph)
         infoarea_filter = st.multiselect(
             "Filter by InfoArea:",
-            options=sorted(all_infoareas),
+            options=sorted(search_index.get_values('infoarea'), key=str),
             default=[]
         )
 
         # Owner filter
         owner_filter = st.text_input("Filter by owner:", placeholder="Owner name...")
 
-    # Results limit
-    max_results = st.slider("Max results to display:", 100, 5000, 1000, 100)
+        # Filter expression, combined with the filters above
+        filter_expression = st.text_input(
+            "Filter expression:",
+            placeholder="type in (CUBE, ADSO) and infoarea ~ 'FI*'",
+            help="Combine comparisons with and / or / not and parentheses; ~ matches * and ? wildcards. "
+                 f"Fields: {', '.join(FILTER_FIELDS)}"
+        )
 
     # Enhanced search button
     if st.button("🔍 Search Objects with Connection Analysis", type="primary"):
+        try:
+            expression_mask = get_filter_mask(search_index, filter_expression)
+        except FilterSyntaxError as e:
+            st.error(f"Invalid filter expression: {e}")
+            return
+
         with st.spinner("Searching objects with connection analysis..."):
+            # Every filter is a mask over the indexed objects; the matches stay an index array
+            matches = search_index.search(
+                term=search_term,
+                obj_type=object_type_filter if object_type_filter != "All" else None,
+                category=category_filter if category_filter != "All" else None,
+                infoareas=infoarea_filter,
+                owner=owner_filter,
+                min_degree=min_connections,
+                max_degree=max_connections,
+                fuzzy=fuzzy_search,
+                mask=expression_mask
+            )
+            st.session_state.explorer_results = SearchResults(search_index, matches, params={
+                'connection_filter_type': connection_filter_type
+            })
+
+    results = getattr(st.session_state, 'explorer_results', None)
+    # Results of a previous dataset version refer to codes that no longer exist
+    if results is None or results.search_index is not search_index:
+        return
+
+    if len(results):
+        show_search_results(self, results, show_connection_percentage)
+    else:
+        st.info("No objects match your search criteria.")
+
+        # Enhanced suggestions for no results
+        st.markdown("**💡 Search Tips:**")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("• Try broader search terms")
+            st.write("• Remove or adjust filters")
+            st.write("• Check InfoArea or Owner filters")
+        with col2:
+            st.write("• Adjust connection range")
+            st.write("• Try different connection filter types")
+            st.write(f"• Current avg connections: {connection_stats['average_connections']:.1f}")
+
+
+def get_result_columns(results, show_connection_percentage):
+    """Columns of the result rows, fixed for the whole result so every page and export chunk line up"""
+    columns = list(RESULT_COLUMNS)
+    if show_connection_percentage:
+        columns.append('Connection %')
+    if results.contains_type('DS'):
+        columns += ['Source System', 'InfoSource Type']
+    return columns
+
+
+def get_result_rows(self, results, codes):
+    """Display rows of some result codes (only these objects are materialized)"""
+    search_index = results.search_index
+    global_inventory = st.session_state.global_inventory
+    rows = []
+    for code in codes.tolist():
+        obj_type, obj = search_index.get_object(global_inventory, code)
+        connections = int(search_index.degrees[code])
+
+        # Calculate connection percentage within type
+        type_max_connections = search_index.get_type_max_degree(obj_type)
+        connection_percentage = (connections / type_max_connections * 100) if type_max_connections > 0 else 0
+
+        row = {
+            'Icon': obj['icon'],
+            'Name': obj['name'],
+            'Type': obj['type_name'],
+            'Category': obj['category'],
+            'Owner': obj.get('owner', 'Unknown'),
+            'InfoArea': obj.get('infoarea', 'UNASSIGNED'),
+            'Active': obj.get('active', 'Unknown'),
+            'Connections': connections,
+            'Connection Status': 'Connected' if connections > 0 else 'Isolated',
+            'Last Changed': obj.get('last_changed', 'Unknown'),
+            'Connection %': f"{connection_percentage:.1f}%"
+        }
+
+        # Add source system info for DataSources
+        if obj_type == 'DS':
+            row['Source System'] = get_source_system_info(self, obj['name'])
+            row['InfoSource Type'] = determine_infosource_type(self, obj['name'])
+
+        rows.append(row)
+    return rows
+
+
+def prepare_results_csv(self, results, columns, sort_by, ascending):
+    """CSV text of every result in display order
+
+    Rows are read from the index and converted EXPORT_CHUNK_ROWS at a time, but the whole
+    CSV is built in memory: the pinned streamlit only downloads str or bytes, not streams.
+    """
+    buffer = io.StringIO()
+    for position, codes in enumerate(results.iter_chunks(EXPORT_CHUNK_ROWS, sort_by, ascending)):
+        pd.DataFrame(get_result_rows(self, results, codes), columns=columns).to_csv(buffer, index=False, header=position == 0)
+    return buffer.getvalue()
+
+
+def show_search_results(self, results, show_connection_percentage):
+    """Paginated result grid: sorting and paging work on the index array, only the visible page becomes rows"""
+    st.success(f"✅ Found {len(results):,} objects with connection analysis")
+
+    # Enhanced sorting options
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sort_by = st.selectbox(
+            "Sort by:",
+            options=[SORT_CONNECTIONS, SORT_NAME, SORT_TYPE, SORT_OWNER, SORT_INFOAREA, SORT_STATUS] + (
+                [SORT_PERCENTAGE] if show_connection_percentage else []),
+            index=0
+        )
+    with col2:
+        sort_order = st.selectbox("Order:", options=['Descending', 'Ascending'])
+    with col3:
+        # Quick status filter, applied to the index array
+        status_filter = st.selectbox("Show:", options=['All Results', 'Connected Only', 'Isolated Only'])
+        if status_filter != 'All Results':
+            results = results.get_status_subset(status_filter == 'Connected Only')
+    with col4:
+        page_size = st.selectbox("Rows per page:", options=PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+
+    ascending = sort_order == 'Ascending'
+    page_count = results.get_page_count(page_size)
+    page = st.number_input(f"Page (of {page_count:,}):", min_value=1, max_value=page_count, value=1, step=1)
+    page = min(max(int(page), 1), page_count)
+
+    columns = get_result_columns(results, show_connection_percentage)
+    page_rows = get_result_rows(self, results, results.get_page(page, page_size, sort_by, ascending))
+    st.dataframe(pd.DataFrame(page_rows, columns=columns), use_container_width=True, height=400, hide_index=True)
+    first = (page - 1) * page_size
+    st.caption(f"Showing {min(first + 1, len(results)):,}-{min(first + page_size, len(results)):,} of {len(results):,} objects")
+
+    # Enhanced summary statistics, computed on the whole result
+    degrees = results.get_degrees()
+    with st.expander("📊 Search Results Connection Analysis"):
+        col1, col2, col3, col4 = st.columns(4)
+
+        connected_count = int(np.count_nonzero(degrees))
+        with col1:
+            st.metric("Total Results", len(results))
+            st.metric("Connected Objects", connected_count)
+
+        with col2:
+            st.metric("Isolated Objects", len(results) - connected_count)
+            if len(results) > 0:
+                connected_pct = (connected_count / len(results)) * 100
+                st.metric("Connection Rate", f"{connected_pct:.1f}%")
+
+        with col3:
+            st.metric("Avg Connections", f"{degrees.mean() if len(degrees) else 0:.1f}")
+            st.metric("Max Connections", int(degrees.max()) if len(degrees) else 0)
+
+        with col4:
+            # Type distribution in results
+            st.write("**Top Types Found:**")
+            for obj_type, count in list(results.get_type_counts().items())[:3]:
+                st.write(f"• {obj_type}: {count}")
+
+        # Connection distribution chart
+        if len(results) > 1:
+            st.markdown("**Connection Distribution in Results:**")
+            fig_hist = px.histogram(
+                x=degrees,
+                nbins=20,
+                title="Connection Count Distribution",
+                labels={'x': 'Number of Connections', 'count': 'Number of Objects'}
+            )
+            fig_hist.update_layout(height=300)
+            st.plotly_chart(fig_hist, use_container_width=True)
+
+    # Enhanced export options
+    st.markdown("---")
+    col1, col2, col3 = st.columns(3)
 
-            filtered_objects = []
-            result_count = 0
-
-            for obj_type, objects in st.session_state.global_inventory.items():
-                # Apply type filter
-                if object_type_filter != "All" and obj_type != object_type_filter:
-                    continue
-
-                for obj in objects:
-                    # Apply category filter
-                    if category_filter != "All" and obj['category'] != category_filter:
-                        continue
-
-                    # Apply search filter
-                    if search_term and search_term.lower() not in obj['name'].lower():
-                        continue
-
-                    # Apply InfoArea filter
-                    if infoarea_filter and obj.get('infoarea', 'UNASSIGNED') not in infoarea_filter:
-                        continue
-
-                    # Apply owner filter
-                    if owner_filter and owner_filter.lower() not in obj.get('owner', '').lower():
-                        continue
-
-                    # Get connection count and calculate percentage
-                    node_id = f"{obj_type}:{obj['name']}"
-                    connections = st.session_state.graph.degree(node_id) if node_id in st.session_state.graph.nodes else 0
-
-                    # Apply connection range filter
-                    if connections < min_connections or connections > max_connections:
-                        continue
-
-                    # Calculate connection percentage within type
-                    type_stats = connection_stats['by_object_type'].get(obj_type, {})
-                    type_max_connections = 0
-                    if type_stats and type_stats.get('total', 0) > 0:
-                        # Find max connections for this type
-                        for check_obj in objects:
-                            check_node_id = f"{obj_type}:{check_obj['name']}"
-                            check_connections = st.session_state.graph.degree(check_node_id) if check_node_id in st.session_state.graph.nodes else 0
-                            type_max_connections = max(type_max_connections, check_connections)
-
-                    connection_percentage = (connections / type_max_connections * 100) if type_max_connections > 0 else 0
-
-                    # Add enhanced information for all objects
-                    enhanced_obj = {
-                        'Icon': obj['icon'],
-                        'Name': obj['name'],
-                        'Type': obj['type_name'],
-                        'Category': obj['category'],
-                        'Owner': obj.get('owner', 'Unknown'),
-                        'InfoArea': obj.get('infoarea', 'UNASSIGNED'),
-                        'Active': obj.get('active', 'Unknown'),
-                        'Connections': connections,
-                        'Connection Status': 'Connected' if connections > 0 else 'Isolated',
-                        'Last Changed': obj.get('last_changed', 'Unknown')
-                    }
-
-                    # Add connection percentage if requested
-                    if show_connection_percentage:
-                        enhanced_obj['Connection %'] = f"{connection_percentage:.1f}%"
-
-                    # Add source system info for DataSources
-                    if obj_type == 'DS':
-                        enhanced_obj['Source System'] = get_source_system_info(self, obj['name'])
-                        enhanced_obj['InfoSource Type'] = determine_infosource_type(self, obj['name'])
-
-                    filtered_objects.append(enhanced_obj)
-
-                    result_count += 1
-                    if result_count >= max_results:
-                        break
-
-                if result_count >= max_results:
-                    break
-
-            if filtered_objects:
-                st.success(f"✅ Found {len(filtered_objects):,} objects with connection analysis")
-
-                # Convert to dataframe and display
-                df = pd.DataFrame(filtered_objects)
-
-                # Enhanced sorting options
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    sort_by = st.selectbox(
-                        "Sort by:",
-                        options=['Connections', 'Name', 'Type', 'Owner', 'InfoArea', 'Connection Status'] + (['Connection %']
-                                                                                                             if show_connection_percentage else []),
-                        index=0
-                    )
-                with col2:
-                    sort_order = st.selectbox("Order:", options=['Descending', 'Ascending'])
-                with col3:
-                    # Quick filter buttons
-                    if st.button("Show Only Connected"):
-                        df = df[df['Connection Status'] == 'Connected']
-                    elif st.button("Show Only Isolated"):
-                        df = df[df['Connection Status'] == 'Isolated']
-
-                # Apply sorting
-                ascending = sort_order == 'Ascending'
-                if sort_by == 'Connection %' and show_connection_percentage:
-                    # Special sorting for percentage column
-                    df['Connection_Numeric'] = df['Connection %'].str.rstrip('%').astype(float)
-                    df = df.sort_values('Connection_Numeric', ascending=ascending)
-                    df = df.drop('Connection_Numeric', axis=1)
-                else:
-                    df = df.sort_values(sort_by, ascending=ascending)
-
-                # Display results with enhanced formatting
-                st.dataframe(df, use_container_width=True, height=400)
-
-                # Enhanced summary statistics
-                with st.expander("📊 Search Results Connection Analysis"):
-                    col1, col2, col3, col4 = st.columns(4)
-
-                    with col1:
-                        st.metric("Total Results", len(filtered_objects))
-                        connected_count = len(df[df['Connection Status'] == 'Connected'])
-                        st.metric("Connected Objects", connected_count)
-
-                    with col2:
-                        isolated_count = len(df[df['Connection Status'] == 'Isolated'])
-                        st.metric("Isolated Objects", isolated_count)
-                        if len(filtered_objects) > 0:
-                            connected_pct = (connected_count / len(filtered_objects)) * 100
-                            st.metric("Connection Rate", f"{connected_pct:.1f}%")
-
-                    with col3:
-                        st.metric("Avg Connections", f"{df['Connections'].mean():.1f}")
-                        st.metric("Max Connections", df['Connections'].max())
-
-                    with col4:
-                        # Type distribution in results
-                        type_counts = df['Type'].value_counts()
-                        st.write("**Top Types Found:**")
-                        for obj_type, count in type_counts.head(3).items():
-                            st.write(f"• {obj_type}: {count}")
-
-                    # Connection distribution chart
-                    if len(filtered_objects) > 1:
-                        st.markdown("**Connection Distribution in Results:**")
-                        fig_hist = px.histogram(
-                            df,
-                            x='Connections',
-                            nbins=20,
-                            title="Connection Count Distribution",
-                            labels={'Connections': 'Number of Connections', 'count': 'Number of Objects'}
-                        )
-                        fig_hist.update_layout(height=300)
-                        st.plotly_chart(fig_hist, use_container_width=True)
-
-                # Enhanced export options
-                st.markdown("---")
-                col1, col2, col3 = st.columns(3)
-
-                with col1:
-                    # CSV export with connection analysis
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Results with Connection Analysis (CSV)",
-                        data=csv,
-                        file_name=f"sap_bw_search_connection_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv"
-                    )
-
-                with col2:
-                    # Connection summary export
-                    if st.button("📊 Export Connection Summary"):
-                        summary_report = generate_search_connection_summary(self, df, connection_filter_type)
-                        st.download_button(
-                            label="📥 Download Connection Summary (TXT)",
-                            data=summary_report,
-                            file_name=f"connection_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                            mime="text/plain"
-                        )
-
-                with col3:
-                    # Quick analysis actions
-                    if st.button("🎯 Visualize These Results"):
-                        st.info("💡 Consider using 3D Network Visualization with similar filters")
-                    if st.button("📊 Detailed Analysis"):
-                        st.info("💡 For specific objects, use InfoCube or InfoObject Impact Analysis")
-
-                if len(filtered_objects) >= max_results:
-                    st.warning(f"⚠️ Results limited to {max_results}. Increase limit or refine search to see more.")
-            else:
-                st.info("No objects match your search criteria.")
-
-                # Enhanced suggestions for no results
-                st.markdown("**💡 Search Tips:**")
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write("• Try broader search terms")
-                    st.write("• Remove or adjust filters")
-                    st.write("• Check InfoArea or Owner filters")
-                with col2:
-                    st.write("• Adjust connection range")
-                    st.write("• Try different connection filter types")
-                    st.write(f"• Current avg connections: {connection_stats['average_connections']:.1f}")
+    with col1:
+        # Every matching object, generated only when the export is requested
+        if st.button("📄 Export Results with Connection Analysis"):
+            results_csv = prepare_results_csv(self, results, columns, sort_by, ascending)
+            st.download_button(
+                label="📥 Download Results with Connection Analysis (CSV)",
+                data=results_csv,
+                file_name=f"sap_bw_search_connection_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
+
+    with col2:
+        # Connection summary export
+        if st.button("📊 Export Connection Summary"):
+            connection_filter_type = (results.params or {}).get('connection_filter_type', 'All Objects')
+            summary_report = generate_search_connection_summary(self, results.get_summary_frame(), connection_filter_type)
+            st.download_button(
+                label="📥 Download Connection Summary (TXT)",
+                data=summary_report,
+                file_name=f"connection_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                mime="text/plain"
+            )
+
+    with col3:
+        # Quick analysis actions
+        if st.button("🎯 Visualize These Results"):
+            st.info("💡 Consider using 3D Network Visualization with similar filters")
+        if st.button("📊 Detailed Analysis"):
+            st.info("💡 For specific objects, use InfoCube or InfoObject Impact Analysis")
@@ -6,6 +6,9 @@ from backend.optimized_network import get_optimized_dataset
 from backend.optimized_network import calculate_sampled_connection_stats
 from backend.optimized_network import create_connection_aware_3d_network
 from backend.impact_analysis import analyze_infoobject_impact_with_sources, create_impact_analysis_3d_visualization
+from backend.inventory_store import get_object_names
+from backend.filter_expression import FilterSyntaxError, compile_filter
+from backend.result_cache import get_cached_analysis
 
 
 def show_optimized_3d_visualization_page(self):
@@ -78,7 +81,7 @@ def show_optimized_3d_visualization_page(self):
         if viz_strategy == "🏷️ InfoObject Impact Focus":
             iobj_list = []
             if 'IOBJ' in st.session_state.global_inventory:
-                iobj_list = [obj['name'] for obj in st.session_state.global_inventory['IOBJ']]
+                iobj_list = get_object_names(st.session_state.global_inventory['IOBJ'])
                 iobj_list.sort()
 
             if iobj_list:
@@ -152,6 +155,12 @@ def show_optimized_3d_visualization_page(self):
             help="Limit to specific business areas"
         )
 
+        filter_expression = st.text_input(
+            "Filter expression:",
+            placeholder="owner = 'JDOE' and changed > 2025-01-01",
+            help="Same language as the Object Explorer, e.g. type in (CUBE, ADSO) and infoarea ~ 'FI*' and degree >= 5"
+        )
+
     with col3:
         st.subheader("⚡ Performance & Connection Display")
 
@@ -201,6 +210,12 @@ def show_optimized_3d_visualization_page(self):
 
     # Enhanced generate visualization button
     if st.button("🎨 Generate 3D Visualization with Connection Analysis", type="primary"):
+        try:
+            compile_filter(filter_expression.strip())
+        except FilterSyntaxError as e:
+            st.error(f"Invalid filter expression: {e}")
+            return
+
         with st.spinner("🎯 Creating connection-aware 3D visualization..."):
 
             # Get optimized dataset with connection analysis
@@ -211,12 +226,15 @@ def show_optimized_3d_visualization_page(self):
                     max_objects, min_connections_viz, max_edges,
                     locals().get('highly_connected_pct', 0.4),
                     locals().get('well_connected_pct', 0.4),
-                    locals().get('isolated_pct', 0.2)
+                    locals().get('isolated_pct', 0.2),
+                    filter_expression=filter_expression
                 )
             elif viz_strategy == "🏷️ InfoObject Impact Focus":
                 # Use InfoObject impact analysis for visualization
-                impact_results = analyze_infoobject_impact_with_sources(
-                    self, selected_iobj_for_viz, 2, True, ['transformation', 'usage_dimension', 'usage_keyfigure'], True
+                viz_connection_types = ['transformation', 'usage_dimension', 'usage_keyfigure']
+                impact_results = get_cached_analysis(
+                    st.session_state, 'infoobject_impact', (selected_iobj_for_viz, 2, True, viz_connection_types, True),
+                    lambda: analyze_infoobject_impact_with_sources(self, selected_iobj_for_viz, 2, True, viz_connection_types, True)
                 )
 
                 if impact_results:
@@ -249,7 +267,8 @@ def show_optimized_3d_visualization_page(self):
                 sampled_objects, sampled_relationships = get_optimized_dataset(
                     self,
                     viz_strategy, selected_types, selected_infoareas,
-                    max_objects, min_connections_viz, max_edges
+                    max_objects, min_connections_viz, max_edges,
+                    filter_expression=filter_expression
                 )
 
             if not sampled_objects:
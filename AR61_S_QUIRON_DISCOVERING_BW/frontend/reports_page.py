@@ -6,6 +6,8 @@ from connectors.source_detectors import get_source_system_info
 from backend.reports import get_sample_for_export
 from backend.reports import prepare_objects_csv_export
 from backend.reports import generate_connection_analysis_report
+from backend.reports import prepare_cube_source_system_matrix
+from backend.filter_expression import FilterSyntaxError
 
 
 def show_reports_page(self):
@@ -82,6 +84,19 @@ def show_reports_page(self):
                 mime="text/plain"
             )
 
+        # Upstream sources of every InfoCube, from the load-time reachability index
+        if st.button("🧊 InfoCubes by Source System"):
+            matrix = prepare_cube_source_system_matrix(self)
+            st.caption("DataSources of each source system feeding each InfoCube through the full data flow")
+            st.dataframe(matrix, use_container_width=True, height=300)
+
+            st.download_button(
+                label="📥 Download InfoCube × Source System Matrix (CSV)",
+                data=matrix.to_csv(),
+                file_name=f"sap_bw_cube_sources_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
+
     with col2:
         st.subheader("📤 Data Export")
 
@@ -98,7 +113,7 @@ def show_reports_page(self):
                     'object_counts': {obj_type: len(objects) for obj_type, objects in st.session_state.global_inventory.items()},
                     # Include sample of objects for large datasets
                     'sample_objects': get_sample_for_export(self),
-                    'sample_relationships': st.session_state.relationships[:1000]  # Sample relationships
+                    'sample_relationships': [dict(rel) for rel in st.session_state.relationships[:1000]]  # Sample relationships
                 }
 
                 json_str = json.dumps(export_data, indent=2, default=str)
@@ -111,16 +126,25 @@ def show_reports_page(self):
                 st.success("✅ Export ready for download!")
 
         # Enhanced CSV export
+        csv_filter = st.text_input(
+            "Export only objects matching:",
+            placeholder="type in (CUBE, ADSO) and infoarea ~ 'FI*'",
+            help="Filter expression; leave empty to export every object"
+        )
         if st.button("📊 Export Objects (CSV)"):
             with st.spinner("Preparing CSV export..."):
-                csv_data = prepare_objects_csv_export(self)
-                st.download_button(
-                    label="📥 Download Objects CSV",
-                    data=csv_data,
-                    file_name=f"sap_bw_objects_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
-                st.success("✅ CSV export ready!")
+                try:
+                    csv_data = prepare_objects_csv_export(self, csv_filter)
+                except FilterSyntaxError as e:
+                    st.error(f"Invalid filter expression: {e}")
+                else:
+                    st.download_button(
+                        label="📥 Download Objects CSV",
+                        data=csv_data,
+                        file_name=f"sap_bw_objects_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv"
+                    )
+                    st.success("✅ CSV export ready!")
 
     # Performance tips
     st.markdown("---")
@@ -0,0 +1,87 @@
+import networkx as nx
+import pytest
+import streamlit as st
+
+from backend.batch_impact import analyze_batch_impact, parse_object_names, prepare_batch_impact_csv, read_object_names_csv
+from backend.traversal import DIRECTION_DOWNSTREAM
+
+
+@pytest.fixture(autouse=True)
+def grafo():
+    # I1 y I2 alimentan C1; C1 -> C2; I2 -> C3
+    st.session_state.clear()
+    g = nx.DiGraph()
+    for node in ["IOBJ:I1", "IOBJ:I2", "CUBE:C1", "CUBE:C2", "CUBE:C3"]:
+        obj_type, name = node.split(":")
+        g.add_node(node, record={"name": name, "type": obj_type, "type_name": obj_type, "category": "cat",
+                                 "owner": "OWN", "infoarea": "AREA"})
+    g.add_edge("IOBJ:I1", "CUBE:C1", type="usage_dimension")
+    g.add_edge("IOBJ:I2", "CUBE:C1", type="usage_dimension")
+    g.add_edge("IOBJ:I2", "CUBE:C3", type="usage_dimension")
+    g.add_edge("CUBE:C1", "CUBE:C2", type="transformation")
+    st.session_state.graph = g
+    yield g
+    st.session_state.clear()
+
+
+def test_parse_object_names_acepta_separadores_y_tipos():
+    texto = "I1\nI2, cube:C1 ; I1\n\n'I3'"
+    assert parse_object_names(texto) == ["IOBJ:I1", "IOBJ:I2", "CUBE:C1", "IOBJ:I3"]
+    assert parse_object_names("") == []
+
+
+def test_read_object_names_csv_con_y_sin_cabecera():
+    con_cabecera = "type,Name\nx,I1\ny,CUBE:C1\n"
+    assert read_object_names_csv(con_cabecera) == ["IOBJ:I1", "CUBE:C1"]
+    sin_cabecera = "﻿I1,otro\nI2,otro\n".encode("utf-8")
+    assert read_object_names_csv(sin_cabecera) == ["IOBJ:I1", "IOBJ:I2"]
+    assert read_object_names_csv("") == []
+
+
+def test_analisis_consolidado_sin_duplicados():
+    res = analyze_batch_impact(None, ["IOBJ:I1", "IOBJ:I2", "IOBJ:NOPE"], 2, None, DIRECTION_DOWNSTREAM)
+    assert res["seeds"] == ["IOBJ:I1", "IOBJ:I2"]
+    assert res["missing"] == ["IOBJ:NOPE"]
+
+    impactados = {obj["node_id"]: obj for obj in res["impacted_objects"]}
+    assert set(impactados) == {"CUBE:C1", "CUBE:C2", "CUBE:C3"}
+    assert impactados["CUBE:C1"]["reached_by"] == ["IOBJ:I1", "IOBJ:I2"]
+    assert impactados["CUBE:C2"]["min_depth"] == 2
+    assert impactados["CUBE:C3"]["seed_count"] == 1
+    # Los más compartidos primero
+    assert res["impacted_objects"][0]["seed_count"] == 2
+    assert res["per_seed"] == {"IOBJ:I1": 2, "IOBJ:I2": 3}
+    assert res["by_type"] == {"CUBE": 3}
+    assert res["shared_impacted"] == 2
+
+
+def test_semilla_alcanzada_por_otra_se_marca_en_transporte():
+    res = analyze_batch_impact(None, ["IOBJ:I1", "CUBE:C1"], 1, None, DIRECTION_DOWNSTREAM)
+    impactados = {obj["node_id"]: obj for obj in res["impacted_objects"]}
+    assert impactados["CUBE:C1"]["in_transport"] is True
+    assert impactados["CUBE:C1"]["reached_by"] == ["IOBJ:I1"]
+    assert "IOBJ:I1" not in impactados
+
+
+def test_semilla_alcanzada_por_otra_usa_la_distancia_desde_las_demas():
+    # I1 -> C1 -> C2 con C2 también en la lista: está a 2 niveles de I1, no a 0
+    res = analyze_batch_impact(None, ["IOBJ:I1", "CUBE:C2"], 2, None, DIRECTION_DOWNSTREAM)
+    impactados = {obj["node_id"]: obj for obj in res["impacted_objects"]}
+    assert impactados["CUBE:C2"]["min_depth"] == 2
+    assert impactados["CUBE:C2"]["reached_by"] == ["IOBJ:I1"]
+    assert impactados["CUBE:C1"]["min_depth"] == 1
+    # A igual número de semillas, el más cercano va primero
+    assert [obj["node_id"] for obj in res["impacted_objects"]] == ["CUBE:C1", "CUBE:C2"]
+    fila_c2 = next(linea for linea in prepare_batch_impact_csv(None, res).splitlines() if linea.startswith("C2,"))
+    assert ",2,1,Yes," in fila_c2
+
+
+def test_sin_objetos_encontrados_devuelve_none():
+    assert analyze_batch_impact(None, ["IOBJ:NOPE"], 2, None) is None
+
+
+def test_csv_incluye_objetos_y_no_encontrados():
+    res = analyze_batch_impact(None, ["IOBJ:I1", "IOBJ:I2", "IOBJ:NOPE"], 2, None, DIRECTION_DOWNSTREAM)
+    csv = prepare_batch_impact_csv(None, res)
+    assert "IOBJ:NOPE,NOT FOUND" in csv
+    assert "C1,CUBE,cat,OWN,AREA,1,2,No,IOBJ:I1;IOBJ:I2" in csv
@@ -0,0 +1,75 @@
+import pickle
+import random
+
+import networkx as nx
+import numpy as np
+
+from backend.condensation import CONDENSATION_GRAPH_KEY, get_condensation, strongly_connected_components
+from backend.csr_graph import get_indptr
+from backend.traversal import ADJACENCY_GRAPH_KEY
+
+
+def _grafo_aleatorio(semilla, nodos=200, aristas=400):
+    random.seed(semilla)
+    g = nx.DiGraph()
+    for _ in range(aristas):
+        g.add_edge(f"CUBE:{random.randrange(nodos)}", f"CUBE:{random.randrange(nodos)}",
+                   type=random.choice(["transformation", "source_connection", "usage_dimension"]))
+    return g
+
+
+def test_componentes_iguales_a_networkx_y_orden_topologico():
+    for semilla in range(5):
+        g = _grafo_aleatorio(semilla)
+        flujo = nx.DiGraph([(u, v) for u, v, d in g.edges(data=True) if d["type"] != "usage_dimension"])
+        c = get_condensation(g)
+
+        esperadas = {frozenset(scc) for scc in nx.strongly_connected_components(flujo)}
+        assert {frozenset(c.get_members(i)) for i in range(len(c))} == esperadas
+        # Toda arista entre componentes apunta hacia delante
+        assert all(c.get_component(u) <= c.get_component(v) for u, v in flujo.edges())
+        orden = {node: i for i, node in enumerate(c.get_topological_nodes())}
+        assert all(orden[u] < orden[v] for u, v in flujo.edges() if c.get_component(u) != c.get_component(v))
+
+
+def test_ciclos_y_bucles_propios():
+    g = nx.DiGraph()
+    g.add_edge("ODSO:A", "ODSO:B", type="transformation")
+    g.add_edge("ODSO:B", "ODSO:A", type="transformation")
+    g.add_edge("ODSO:B", "CUBE:C", type="transformation")
+    g.add_edge("CUBE:C", "CUBE:C", type="transformation")
+    g.add_edge("IOBJ:I", "CUBE:C", type="usage_dimension")
+    c = get_condensation(g)
+
+    assert c.count_cycles() == 2
+    assert sorted(c.get_cycles()[0]) == ["ODSO:A", "ODSO:B"]
+    assert c.is_cyclic("CUBE:C")
+    # Las aristas de uso no forman parte del flujo
+    assert c.get_component("IOBJ:I") == -1
+    assert list(c.get_successors(c.get_component("ODSO:A"))) == [c.get_component("CUBE:C")]
+
+
+def test_cadena_larga_sin_recursion():
+    n = 50000
+    indptr = get_indptr(np.arange(n, dtype=np.int32), n + 1)
+    indices = np.arange(1, n + 1, dtype=np.int32)
+    componentes, total = strongly_connected_components(indptr, indices)
+    assert total == n + 1
+    # Tarjan cierra primero el sumidero
+    assert componentes[n] == 0 and componentes[0] == n
+
+
+def test_cache_en_el_grafo_invalidado_y_serializable():
+    g = _grafo_aleatorio(1)
+    c = get_condensation(g)
+    assert get_condensation(g) is c
+    assert c in g.graph[CONDENSATION_GRAPH_KEY].values()
+
+    copia = pickle.loads(pickle.dumps(g))
+    assert get_condensation(copia).count_cycles() == c.count_cycles()
+
+    # Un parche sustituye el índice de adyacencia y con él la condensación
+    g.add_edge("CUBE:X", "CUBE:Y", type="transformation")
+    g.graph.pop(ADJACENCY_GRAPH_KEY)
+    assert get_condensation(g) is not c
+    assert get_condensation(g).get_component("CUBE:X") >= 0
@@ -0,0 +1,102 @@
+import pickle
+import random
+
+import networkx as nx
+import pytest
+
+from backend.connection_stats import CONNECTION_STATS_GRAPH_KEY, get_connection_stats, index_connection_stats
+from backend.csr_graph import CSRGraph
+from backend.edge_store import EdgeTable
+from backend.enhaced_relationships import build_edge
+from backend.node_interner import index_graph_nodes
+
+
+def _dataset(semilla, por_tipo=60, aristas=300):
+    random.seed(semilla)
+    inventario = {
+        tipo: [{"name": f"{tipo}{i}", "type_name": f"Tipo {tipo}"} for i in range(por_tipo)]
+        for tipo in ("IOBJ", "CUBE", "DS")
+    }
+    inventario["VACIO"] = []
+    g = nx.DiGraph()
+    for tipo, objetos in inventario.items():
+        g.add_nodes_from(f"{tipo}:{obj['name']}" for obj in objetos)
+    for _ in range(aristas):
+        # Algunos nodos concentran muchas aristas para llenar los niveles altos
+        origen = f"IOBJ:IOBJ{min(random.randrange(por_tipo), random.randrange(por_tipo))}"
+        g.add_edge(origen, f"{random.choice(['CUBE', 'DS'])}:{random.choice(['CUBE', 'DS'])}{random.randrange(por_tipo)}")
+    return inventario, g
+
+
+def _referencia(inventario, g):
+    """Cálculo objeto a objeto, como lo hacía el bucle original"""
+    niveles = {'0 (Isolated)': 0, '1-5': 0, '6-10': 0, '11-20': 0, '21-50': 0, '50+': 0}
+    por_tipo, conectados, total, maximo, mas_conectado = {}, 0, 0, 0, None
+    for tipo, objetos in inventario.items():
+        grados = [g.degree(f"{tipo}:{obj['name']}") if f"{tipo}:{obj['name']}" in g else 0 for obj in objetos]
+        por_tipo[tipo] = (len(objetos), sum(1 for d in grados if d), sum(grados))
+        for obj, d in zip(objetos, grados):
+            conectados += d > 0
+            total += d
+            clave = ('0 (Isolated)' if d == 0 else '1-5' if d <= 5 else '6-10' if d <= 10
+                     else '11-20' if d <= 20 else '21-50' if d <= 50 else '50+')
+            niveles[clave] += 1
+            if d > maximo:
+                maximo, mas_conectado = d, {'name': obj['name'], 'type': obj['type_name'], 'connections': d}
+    return niveles, por_tipo, conectados, total, maximo, mas_conectado
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_igual_al_calculo_objeto_a_objeto(semilla):
+    inventario, g = _dataset(semilla)
+    niveles, por_tipo, conectados, total, maximo, mas_conectado = _referencia(inventario, g)
+
+    res = get_connection_stats(inventario, g)
+    objetos = sum(len(objs) for objs in inventario.values())
+    assert res['total_objects'] == objetos
+    assert res['connected_objects'] == conectados
+    assert res['isolated_objects'] == objetos - conectados
+    assert res['connection_level_distribution'] == niveles
+    assert res['average_connections'] == pytest.approx(total / objetos)
+    assert res['max_connections'] == maximo
+    assert res['most_connected_object'] == mas_conectado
+    for tipo, (cuantos, conectados_tipo, conexiones) in por_tipo.items():
+        stats = res['by_object_type'][tipo]
+        assert (stats['total'], stats['connected'], stats['total_connections']) == (cuantos, conectados_tipo, conexiones)
+        assert stats['isolated'] == cuantos - conectados_tipo
+    # Un tipo sin objetos aparece con todo a cero
+    assert res['by_object_type']['VACIO']['average_connections'] == 0.0
+
+
+def test_se_calcula_una_vez_por_dataset():
+    inventario, g = _dataset(0)
+    index_connection_stats(inventario, g)
+    primera = get_connection_stats(inventario, g)
+    assert get_connection_stats(inventario, g) is primera
+
+    # Un parche vuelve a indexar los nodos y retira las estadísticas anteriores
+    g.add_edge("IOBJ:IOBJ59", "CUBE:CUBE0")
+    g.add_edge("IOBJ:IOBJ59", "CUBE:CUBE1")
+    index_graph_nodes(inventario, g)
+    nueva = get_connection_stats(inventario, g)
+    niveles, _, conectados, _, maximo, _ = _referencia(inventario, g)
+    assert nueva is not primera
+    assert nueva['connection_level_distribution'] == niveles
+    assert (nueva['connected_objects'], nueva['max_connections']) == (conectados, maximo)
+
+
+def test_viaja_con_el_grafo_y_con_el_motor_csr():
+    inventario = {"IOBJ": [{"name": "I1", "type_name": "InfoObject"}, {"name": "I2", "type_name": "InfoObject"}],
+                  "CUBE": [{"name": "C1", "type_name": "InfoCube"}]}
+    relaciones = EdgeTable.from_records([
+        build_edge("IOBJ", "I1", "CUBE", "C1", "usage_dimension", 2, "#E67E22"),
+        build_edge("IOBJ", "I1", "CUBE", "C1", "usage_keyfigure", 2, "#8E44AD"),
+    ])
+    csr = CSRGraph.from_dataset(inventario, relaciones)
+    res = index_connection_stats(inventario, csr).values
+
+    copia = pickle.loads(pickle.dumps(csr))
+    assert get_connection_stats(inventario, copia) is copia.graph[CONNECTION_STATS_GRAPH_KEY].values
+    assert get_connection_stats(inventario, copia) == res
+    assert res['connected_objects'] == 2
+    assert res['most_connected_object'] == {'name': 'I1', 'type': 'InfoObject', 'connections': csr.degree("IOBJ:I1")}
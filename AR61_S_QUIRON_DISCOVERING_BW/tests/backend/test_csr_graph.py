@@ -0,0 +1,97 @@
+import pickle
+
+import networkx as nx
+import pytest
+
+from backend.csr_graph import CSRGraph, GRAPH_ENGINE_CSR, GRAPH_ENGINE_NETWORKX, get_graph_engine
+from backend.edge_store import EdgeTable
+from backend.enhaced_relationships import build_edge, build_relationship_graph
+from backend.inventory_store import InventoryTable, get_node_record
+from backend.node_interner import get_node_interner
+
+
+def _dataset():
+    inventario = {
+        "DS": [{"name": "DS1", "type": "DS"}, {"name": "DS1", "type": "DS"}],
+        "IOBJ": InventoryTable("IOBJ", {"name": "InfoObject"}, ["I1", "I2", "I3"], {"owner": ["A", "B", "A"]}),
+        "CUBE": [{"name": "C1", "type": "CUBE"}, {"name": "C2", "type": "CUBE"}],
+    }
+    relaciones = EdgeTable.from_records([
+        build_edge("IOBJ", "I1", "CUBE", "C1", "usage_dimension", 2, "#E67E22"),
+        build_edge("IOBJ", "I1", "CUBE", "C1", "usage_keyfigure", 2, "#8E44AD"),
+        build_edge("IOBJ", "I2", "CUBE", "C2", "usage_dimension", 2, "#E67E22"),
+        build_edge("DS", "DS1", "CUBE", "C1", "source_connection", 3, "#16A085"),
+        build_edge("CUBE", "C1", "CUBE", "C2", "transformation", 3, "#2E86C1", trans_id="T1"),
+        build_edge("CUBE", "C2", "CUBE", "C2", "transformation", 3, "#2E86C1", trans_id="T2"),
+        build_edge("ODSO", "FUERA", "CUBE", "C2", "transformation", 3, "#2E86C1", trans_id="T3"),
+    ])
+    return inventario, relaciones
+
+
+def test_equivale_a_networkx():
+    inventario, relaciones = _dataset()
+    nx_graph = build_relationship_graph(None, inventario, relaciones)
+    csr = CSRGraph.from_dataset(inventario, relaciones)
+
+    assert list(csr.nodes) == list(nx_graph.nodes)
+    assert len(csr) == nx_graph.number_of_nodes()
+    assert csr.number_of_edges() == nx_graph.number_of_edges() == 5
+    assert sorted(csr.edges()) == sorted(nx_graph.edges())
+    for node in nx_graph.nodes:
+        assert sorted(csr.successors(node)) == sorted(nx_graph.successors(node))
+        assert sorted(csr.predecessors(node)) == sorted(nx_graph.predecessors(node))
+        assert (csr.degree(node), csr.in_degree(node), csr.out_degree(node)) == \
+            (nx_graph.degree(node), nx_graph.in_degree(node), nx_graph.out_degree(node))
+        assert get_node_record(csr, node) == get_node_record(nx_graph, node)
+    for source, target in nx_graph.edges():
+        assert csr.get_edge_data(source, target) == nx_graph.get_edge_data(source, target)
+    assert dict(csr.degree()) == dict(nx_graph.degree())
+    assert nx.density(csr) == nx.density(nx_graph)
+    assert list(nx.all_simple_paths(csr, "DS:DS1", "CUBE:C2", cutoff=5)) == [["DS:DS1", "CUBE:C1", "CUBE:C2"]]
+
+
+def test_ultima_arista_del_par_gana_como_en_networkx():
+    csr = CSRGraph.from_dataset(*_dataset())
+    assert csr.get_edge_data("IOBJ:I1", "CUBE:C1")["type"] == "usage_keyfigure"
+    assert csr.has_edge("CUBE:C2", "CUBE:C2")
+    assert not csr.has_edge("CUBE:C2", "CUBE:C1")
+    assert csr.get_edge_data("CUBE:C2", "CUBE:C1", "nada") == "nada"
+    assert csr.get_edge_data("X:Y", "CUBE:C1") is None
+
+
+def test_nodos_desconocidos_y_vista_de_nodos():
+    csr = CSRGraph.from_dataset(*_dataset())
+    with pytest.raises(nx.NetworkXError):
+        list(csr.successors("X:Y"))
+    with pytest.raises(KeyError):
+        csr.nodes["X:Y"]
+    assert "ODSO:FUERA" not in csr
+    assert csr.nodes["IOBJ:I2"]["record"]["owner"] == "B"
+    assert dict(csr.nodes(data=True))["CUBE:C1"]["name"] == "C1"
+
+
+def test_arrays_enteros_para_recorridos():
+    csr = CSRGraph.from_dataset(*_dataset())
+    c1 = csr.get_code("CUBE:C1")
+    assert csr.interner.decode(csr.predecessor_codes(c1)) == ["DS:DS1", "IOBJ:I1"]
+    assert [csr.kind_attributes[k]["type"] for k in csr.predecessor_kinds(c1)] == ["source_connection", "usage_keyfigure"]
+    assert csr.interner.decode(csr.successor_codes(c1)) == ["CUBE:C2"]
+    assert csr.nbytes() > 0
+
+
+def test_interner_compartido_y_grados_por_fila():
+    inventario, relaciones = _dataset()
+    csr = CSRGraph.from_dataset(inventario, relaciones)
+    interner = get_node_interner(inventario, csr)
+    assert interner is csr.interner
+    # Las filas duplicadas comparten el nodo de su primera aparición
+    assert interner.get_type_degrees("DS").tolist() == [1, 1]
+    assert interner.get_type_degrees("CUBE", "in_degree").tolist() == [2, 3]
+
+
+def test_pickle_y_motor():
+    csr = pickle.loads(pickle.dumps(CSRGraph.from_dataset(*_dataset())))
+    assert get_graph_engine(csr) == GRAPH_ENGINE_CSR
+    assert get_graph_engine(nx.DiGraph()) == GRAPH_ENGINE_NETWORKX
+    assert sorted(csr.successors("IOBJ:I2")) == ["CUBE:C2"]
+    assert csr.nodes["IOBJ:I1"]["type"] == "IOBJ"
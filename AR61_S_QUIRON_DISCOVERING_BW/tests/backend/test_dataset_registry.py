@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import networkx as nx
+import pytest
+
+import backend.dataset_registry as reg_mod
+
+
+@pytest.fixture(autouse=True)
+def registry_limpio():
+    reg_mod.clear_registry()
+    yield
+    reg_mod.clear_registry()
+
+
+def _register(key="k1", graph=None):
+    return reg_mod.register_dataset(key, {"CUBE": [{"name": "A"}]}, [], graph or nx.DiGraph(), {"total_objects": 1})
+
+
+def test_get_dataset_key():
+    assert reg_mod.get_dataset_key(None) is None
+    assert reg_mod.get_dataset_key({"content_hash": "abc", "config_hash": "cfg"}) == "abc:cfg"
+
+
+def test_get_session_id_fuera_de_streamlit():
+    assert reg_mod.get_session_id() == "local"
+
+
+def test_acquire_release_y_refcount():
+    assert reg_mod.acquire_dataset("k1", "s1") is None
+    _register()
+    entry = reg_mod.acquire_dataset("k1", "s1")
+    reg_mod.acquire_dataset("k1", "s2")
+    assert set(entry["sessions"]) == {"s1", "s2"}
+    assert reg_mod.get_registry_stats()["sessions"] == 2
+
+    reg_mod.release_dataset("k1", "s1")
+    reg_mod.release_dataset("no_existe", "s1")
+    assert set(entry["sessions"]) == {"s2"}
+
+
+def test_register_mantiene_sesiones_al_reemplazar():
+    _register()
+    reg_mod.acquire_dataset("k1", "s1")
+    new_graph = nx.DiGraph([("a", "b")])
+    entry = _register(graph=new_graph)
+    assert entry["graph"] is new_graph
+    assert "s1" in entry["sessions"]
+
+
+def test_evict_idle_datasets():
+    _register("k1")
+    _register("k2")
+    reg_mod.acquire_dataset("k1", "s1", now=1000.0)
+    reg_mod.acquire_dataset("k2", "s2", now=1000.0)
+    reg_mod.acquire_dataset("k2", "s2", now=1500.0)
+
+    evicted = reg_mod.evict_idle_datasets(idle_ttl=300, now=1400.0)
+    assert evicted == ["k1"]
+    assert reg_mod.get_registry_stats()["datasets"] == 1
+
+    # Sesión abandonada: su referencia caduca y luego el dataset
+    assert reg_mod.evict_idle_datasets(idle_ttl=300, now=1900.0) == ["k2"]
+
+
+def test_attach_y_sync_session_dataset():
+    graph = nx.DiGraph([("CUBE:A", "IOBJ:B")])
+    _register("k1", graph)
+    _register("k2")
+    session = SimpleNamespace(dataset_key=None, data_loaded=True, graph=nx.DiGraph())
+
+    assert reg_mod.sync_session_dataset(session) is False
+
+    reg_mod.attach_session_dataset(session, "k1", reg_mod.acquire_dataset("k1"))
+    assert session.graph is graph
+    assert session.global_inventory == {"CUBE": [{"name": "A"}]}
+
+    # Cambiar de dataset libera la referencia anterior
+    reg_mod.attach_session_dataset(session, "k2", reg_mod.acquire_dataset("k2"))
+    assert "local" not in reg_mod._registry["k1"]["sessions"]
+
+    session.graph = nx.DiGraph()
+    assert reg_mod.sync_session_dataset(session) is True
+    assert session.graph is reg_mod._registry["k2"]["graph"]
+
+    reg_mod.clear_registry()
+    assert reg_mod.sync_session_dataset(session) is False
+    assert session.dataset_key is None
+    assert session.data_loaded is False
+    assert session.global_inventory == {}
@@ -0,0 +1,112 @@
+import pickle
+
+import networkx as nx
+import numpy as np
+
+from backend.edge_store import EdgeRow, EdgeTable, count_edge_types, get_edge_attributes, select_edges_within
+from backend.enhaced_relationships import build_edge, build_relationship_graph
+
+
+def _aristas():
+    return [
+        build_edge("DS", "DS1", "ADSO", "ADSO1", "transformation", 3, "#2E86C1", trans_id="TR1"),
+        build_edge("ADSO", "ADSO1", "CUBE", "CUBE1", "transformation", 3, "#2E86C1", trans_id="TR2"),
+        build_edge("IOBJ", "IOBJ1", "CUBE", "CUBE1", "usage_dimension", 2, "#E67E22"),
+        build_edge("IOBJ", "IOBJ2", "CUBE", "CUBE1", "usage_keyfigure", 2, "#8E44AD"),
+        build_edge("DS", "DS1", "CUBE", "CUBE1", "source_connection", 3, "#16A085"),
+    ]
+
+
+def test_filas_equivalen_a_los_dicts_originales():
+    aristas = _aristas()
+    tabla = EdgeTable.from_records(aristas)
+
+    assert len(tabla) == 5
+    assert tabla == aristas
+    assert isinstance(tabla[0], EdgeRow)
+    assert list(tabla[0]) == list(aristas[0])
+    assert list(tabla[2]) == list(aristas[2])
+    assert tabla[2].get("trans_id") is None
+    assert tabla[-1].copy() == aristas[-1]
+    assert [fila["target_name"] for fila in tabla[1:3]] == ["CUBE1", "CUBE1"]
+
+
+def test_columnas_compactas_y_tablas_laterales():
+    tabla = EdgeTable.from_records(_aristas())
+    assert tabla.src.dtype == np.int32 and tabla.dst.dtype == np.int32
+    assert tabla.kind.dtype == np.uint8
+    assert tabla.trans.tolist() == [0, 1, -1, -1, -1]
+    assert len(tabla.nodes) == 5
+    assert len(tabla.kinds) == 5
+    assert tabla.nbytes() == 5 * (4 + 4 + 1 + 4)
+
+
+def test_mascaras_y_conteos():
+    tabla = EdgeTable.from_records(_aristas())
+    assert tabla.type_mask({"transformation"}).tolist() == [True, True, False, False, False]
+    assert tabla.touching_mask({"ADSO:ADSO1", "NO:EXISTE"}).tolist() == [True, True, False, False, False]
+    assert tabla.within_mask({"DS:DS1", "CUBE:CUBE1"}).tolist() == [False, False, False, False, True]
+    assert tabla.trans_mask({"TR2"}).tolist() == [False, True, False, False, False]
+    assert count_edge_types(tabla) == {"transformation": 2, "usage_dimension": 1, "usage_keyfigure": 1, "source_connection": 1}
+    assert count_edge_types(_aristas()) == count_edge_types(tabla)
+
+
+def test_select_edges_within_con_tabla_y_lista():
+    nodos = {"IOBJ:IOBJ1", "IOBJ:IOBJ2", "CUBE:CUBE1"}
+    tabla = EdgeTable.from_records(_aristas())
+    assert [r["type"] for r in select_edges_within(tabla, nodos)] == ["usage_dimension", "usage_keyfigure"]
+    assert len(select_edges_within(tabla, nodos, max_edges=1)) == 1
+    assert select_edges_within(_aristas(), nodos, max_edges=1) == [_aristas()[2]]
+
+
+def test_extend_con_otra_tabla_recodifica():
+    aristas = _aristas()
+    tabla = EdgeTable.from_records(aristas[2:])
+    otra = EdgeTable.from_records(aristas[:2])
+    tabla.extend(otra)
+    assert tabla == aristas[2:] + aristas[:2]
+
+    # Crecimiento más allá de la capacidad inicial
+    grande = EdgeTable.from_records(
+        build_edge("IOBJ", f"I{i}", "CUBE", "C", "usage_dimension", 2, "#E67E22") for i in range(3000)
+    )
+    assert len(grande) == 3000 and grande[2999]["source"] == "IOBJ:I2999"
+
+
+def test_retain_en_sitio():
+    tabla = EdgeTable.from_records(_aristas())
+    tabla.retain(~tabla.type_mask({"transformation"}))
+    assert [r["type"] for r in tabla] == ["usage_dimension", "usage_keyfigure", "source_connection"]
+    tabla.append(_aristas()[0])
+    assert tabla[-1]["trans_id"] == "TR1"
+
+
+def test_copia_independiente():
+    tabla = EdgeTable.from_records(_aristas())
+    copia = tabla.copy()
+    copia.retain(~copia.type_mask({"transformation"}))
+    copia.append(build_edge("DS", "DS9", "CUBE", "CUBE9", "source_connection", 3, "#16A085"))
+    assert tabla == _aristas()
+    assert "DS:DS9" not in tabla.nodes
+    assert [r["source"] for r in copia] == ["IOBJ:IOBJ1", "IOBJ:IOBJ2", "DS:DS1", "DS:DS9"]
+
+
+def test_grafo_desde_tabla_con_atributos_reducidos():
+    tabla = EdgeTable.from_records(_aristas())
+    inventario = {"IOBJ": [{"name": "IOBJ1"}], "CUBE": [{"name": "CUBE1"}], "DS": [{"name": "DS1"}]}
+    grafo = build_relationship_graph(None, inventario, tabla)
+
+    assert set(grafo.edges) == {("IOBJ:IOBJ1", "CUBE:CUBE1"), ("DS:DS1", "CUBE:CUBE1")}
+    assert grafo.edges["IOBJ:IOBJ1", "CUBE:CUBE1"] == {"type": "usage_dimension", "weight": 2, "color": "#E67E22"}
+    assert get_edge_attributes(tabla[4]) == grafo.edges["DS:DS1", "CUBE:CUBE1"]
+    assert get_edge_attributes(_aristas()[0]) == _aristas()[0]
+    assert build_relationship_graph(None, {}, EdgeTable()).number_of_edges() == 0
+    assert isinstance(grafo, nx.DiGraph)
+
+
+def test_pickle_recorta_la_capacidad():
+    tabla = pickle.loads(pickle.dumps(EdgeTable.from_records(_aristas())))
+    assert len(tabla._src) == 5
+    assert tabla == _aristas()
+    tabla.append(_aristas()[0])
+    assert len(tabla) == 6
@@ -12,14 +12,19 @@ import backend.enhaced_relationships as er_mod
 class FakeCursor:
     def __init__(self, rows):
         self._rows = rows
+        self._pending = []
 
     def execute(self, query, *args, **kwargs):
         # no hacemos nada, sólo simulamos la ejecución
-        pass
+        self._pending = list(self._rows)
 
     def fetchall(self):
         return self._rows
 
+    def fetchmany(self, size):
+        batch, self._pending = self._pending[:size], self._pending[size:]
+        return batch
+
 
 class FakeConn:
     def __init__(self, rows):
@@ -101,6 +106,13 @@ def test_analyze_enhanced_relationships_multibranch(monkeypatch):
                 return rows_keyf
             return []
 
+        def fetchmany(self, size):
+            # Cada consulta entrega su lote una sola vez
+            if getattr(self, "_served", None) == self.calls:
+                return []
+            self._served = self.calls
+            return self.fetchall()
+
     class MultiConn:
         def cursor(self):
             return MultiCursor()
@@ -129,6 +141,36 @@ def test_analyze_enhanced_relationships_multibranch(monkeypatch):
     assert keyf_rel["weight"] == 2
     assert keyf_rel["color"] == "#8E44AD"
 
+
+def test_iter_fetchmany_respeta_el_tamano_de_lote():
+    cursor = FakeCursor([(i,) for i in range(7)])
+    cursor.execute("SELECT")
+    sizes = []
+    original = cursor.fetchmany
+
+    def spy(size):
+        batch = original(size)
+        sizes.append(len(batch))
+        return batch
+
+    cursor.fetchmany = spy
+    assert [row[0] for row in er_mod.iter_fetchmany(cursor, 3)] == list(range(7))
+    assert sizes == [3, 3, 1, 0]
+
+
+def test_iter_enhanced_relationships_es_perezoso_y_alimenta_el_grafo():
+    conn = FakeConn([("IOBJ1", "CUBE1"), ("IOBJ2", "CUBE1")])
+    stream = er_mod.iter_enhanced_relationships(None, conn, {"RSDDIMEIOBJ"}, batch_size=1)
+    assert not isinstance(stream, list)
+
+    inventory = {
+        "IOBJ": [{"name": "IOBJ1"}, {"name": "IOBJ2"}],
+        "CUBE": [{"name": "CUBE1"}],
+    }
+    graph = build_relationship_graph(None, inventory, stream)
+    assert set(graph.edges()) == {("IOBJ:IOBJ1", "CUBE:CUBE1"), ("IOBJ:IOBJ2", "CUBE:CUBE1")}
+    assert graph.edges["IOBJ:IOBJ1", "CUBE:CUBE1"]["type"] == "usage_dimension"
+
 # ------------------------------------------------------------------------
 # map_sap_type_to_our_type
 
@@ -385,3 +427,92 @@ def test_build_relationship_graph_filters_missing_nodes():
     assert list(G.edges) == [("A:1", "A:1")]
     # Y su atributo 'type' debe ser 'self'
     assert G["A:1"]["A:1"]["type"] == "self"
+
+
+# ------------------------------------------------------------------------
+# Lectura paginada por keyset
+
+
+def _usage_db(rows):
+    import sqlite3
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE RSDDIMEIOBJ (IOBJNM TEXT, INFOCUBE TEXT, OBJVERS TEXT)")
+    conn.executemany("INSERT INTO RSDDIMEIOBJ VALUES (?, ?, ?)", rows)
+    return conn
+
+
+def test_iter_keyset_rows_lee_todas_las_paginas():
+    rows = [(f"IOBJ{i:03d}", f"CUBE{i % 4}", "A") for i in range(10)]
+    rows += [("IOBJ000", "CUBE0", "A"), (None, "CUBE1", "A"), ("IOBJX", "CUBE1", "M")]
+    conn = _usage_db(rows)
+    pages = []
+
+    result = list(er_mod.iter_keyset_rows(
+        conn.cursor(), "RSDDIMEIOBJ", ("IOBJNM", "INFOCUBE"), "OBJVERS = 'A'", 3,
+        on_page=lambda table, loaded, count: pages.append((table, loaded, count))
+    ))
+
+    assert result == sorted({(f"IOBJ{i:03d}", f"CUBE{i % 4}") for i in range(10)})
+    assert pages[-1] == ("RSDDIMEIOBJ", 10, 4)
+    assert [loaded for _, loaded, _ in pages] == [3, 6, 9, 10]
+
+
+def test_iter_keyset_rows_orden_distinto_de_columnas():
+    rows = [("B", "CUBE1", "A"), ("A", "CUBE2", "A"), ("C", "CUBE0", "A")]
+    conn = _usage_db(rows)
+    result = list(er_mod.iter_keyset_rows(
+        conn.cursor(), "RSDDIMEIOBJ", ("IOBJNM", "INFOCUBE"), "OBJVERS = 'A'", 1, order=("INFOCUBE", "IOBJNM")
+    ))
+    assert result == [("C", "CUBE0"), ("B", "CUBE1"), ("A", "CUBE2")]
+
+
+def _rstran_db(rows):
+    import sqlite3
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE RSTRAN (SOURCETYPE TEXT, SOURCENAME TEXT, TARGETTYPE TEXT, TARGETNAME TEXT, "
+                 "TRANID TEXT, OBJVERS TEXT)")
+    conn.executemany("INSERT INTO RSTRAN VALUES (?, ?, ?, ?, ?, 'A')", rows)
+    return conn
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 1000])
+def test_transformaciones_sin_tranid_se_siguen_cargando(monkeypatch, page_size):
+    rows = [
+        ("CUBE", "SRC1", "IOBJ", "TGT1", None),
+        ("CUBE", "SRC2", "IOBJ", "TGT2", None),
+        ("ADSO", "SRC3", "CUBE", "TGT3", "TR03"),
+        ("ADSO", "SRC4", "CUBE", "TGT4", "TR01"),
+        ("ADSO", None, "CUBE", "TGT5", "TR05"),   # sin extremo de origen: no es una arista
+        ("CUBE", "SRC6", "IOBJ", None, None),    # sin extremo de destino
+    ]
+    source = er_mod.RELATIONSHIP_SOURCES[0]
+    leidas = list(er_mod.iter_keyset_rows(_rstran_db(rows).cursor(), "RSTRAN", source["columns"], source["condition"],
+                                          page_size, order=source["order"], required=source["required"]))
+    assert sorted(leidas, key=str) == sorted(rows[:4], key=str)
+    assert len(leidas) == len(set(leidas))
+
+    monkeypatch.setattr(er_mod, "map_sap_type_to_our_type", lambda self, sap_type: sap_type)
+    rels = analyze_enhanced_relationships(None, _rstran_db(rows), {"RSTRAN"})
+    assert sorted(r["source"] for r in rels) == ["ADSO:SRC3", "ADSO:SRC4", "CUBE:SRC1", "CUBE:SRC2"]
+    assert [r for r in rels if r["source"] == "CUBE:SRC1"][0].get("trans_id") is None
+
+
+def test_analyze_enhanced_relationships_sin_limite_y_con_progreso():
+    # Más filas que el antiguo LIMIT 20000 de RSDDIMEIOBJ
+    rows = [(f"IOBJ{i}", f"CUBE{i % 50}", "A") for i in range(20500)]
+    conn = _usage_db(rows)
+    progress = []
+
+    rels = analyze_enhanced_relationships(None, conn, {"RSDDIMEIOBJ"},
+                                          progress_callback=lambda *args: progress.append(args),
+                                          memory_budget_mb=0)
+
+    assert len(rels) == 20500
+    assert er_mod.get_page_size(0) == er_mod.MIN_PAGE_SIZE
+    assert len(progress) == 21
+    assert progress[-1] == ("RSDDIMEIOBJ", 20500, 21)
+
+
+def test_get_page_size_escala_con_el_presupuesto():
+    assert er_mod.get_page_size(64) == 64 * 1024 * 1024 // er_mod.ESTIMATED_BYTES_PER_ROW
+    assert er_mod.get_page_size(128) == 2 * er_mod.get_page_size(64)
@@ -0,0 +1,103 @@
+import fnmatch
+import random
+
+import networkx as nx
+import pytest
+
+from backend.filter_expression import FilterSyntaxError, get_filter_mask, quote_filter_value
+from backend.inventory_store import InventoryTable
+from backend.search_index import get_search_index
+
+
+def _dataset(semilla=0, por_tipo=120):
+    random.seed(semilla)
+    palabras = ["SALES", "CUSTOMER", "FI_GL", "fi_ap", "ORDER", "COST"]
+    fechas = ["20240115103000", "2025-03-01 08:00:00", "20250612", "Unknown", "", "2023-12-31"]
+    inventario = {}
+    for tipo in ("CUBE", "ADSO", "IOBJ"):
+        inventario[tipo] = [{
+            "name": f"{random.choice('0Z')}{random.choice(palabras)}{i}",
+            "type_name": tipo, "category": "Metadata" if tipo == "IOBJ" else "Provider",
+            "infoarea": random.choice(["FI_GL", "FIAP", "SD", "0FI"]), "owner": random.choice(["ANA", "O'BRIEN", "LUIS"]),
+            "active": random.choice(["X", ""]), "status": random.choice(["A", "M"]),
+            "last_changed": random.choice(fechas)
+        } for i in range(por_tipo)]
+    inventario["DS"] = InventoryTable("DS", {"name": "DataSource", "category": "Source"}, ["2LIS_11_VAHDR", "FI_GL_4"],
+                                      {"owner": ["ANA", "PEDRO"], "infoarea": ["SD", "FI_GL"],
+                                       "last_changed": ["20250102000000", "Unknown"]})
+    g = nx.DiGraph()
+    for tipo, objetos in inventario.items():
+        g.add_nodes_from(f"{tipo}:{obj['name']}" for obj in objetos)
+    nodos = list(g.nodes)
+    for _ in range(600):
+        g.add_edge(random.choice(nodos), random.choice(nodos))
+    return inventario, g
+
+
+def _fecha(valor):
+    digitos = "".join(c for c in str(valor) if c.isdigit())
+    return int(digitos.ljust(14, "0")) if len(digitos) >= 8 else None
+
+
+def _evaluar(inventario, g, condicion):
+    """Misma condición escrita en Python, objeto a objeto"""
+    return [bool(condicion(tipo, obj, g.degree(f"{tipo}:{obj['name']}"), g.in_degree(f"{tipo}:{obj['name']}")))
+            for tipo, objetos in inventario.items() for obj in objetos]
+
+
+@pytest.mark.parametrize("expresion,condicion", [
+    ("type in (CUBE, adso) and infoarea ~ 'FI*' and degree >= 5",
+     lambda t, o, d, i: t in ("CUBE", "ADSO") and o["infoarea"].lower().startswith("fi") and d >= 5),
+    ("infoarea = fi_gl or owner = \"o'brien\" and not status = A",
+     lambda t, o, d, i: o["infoarea"] == "FI_GL" or (o["owner"] == "O'BRIEN" and o.get("status", "Unknown") != "A")),
+    ("(infoarea = FI_GL or owner = ANA) and in_degree < 3",
+     lambda t, o, d, i: (o["infoarea"] == "FI_GL" or o["owner"] == "ANA") and i < 3),
+    ("name ~ '*fi_??1*' or name = 2lis_11_vahdr",
+     lambda t, o, d, i: fnmatch.fnmatch(o["name"].lower(), "*fi_??1*") or o["name"] == "2LIS_11_VAHDR"),
+    ("name ~ 'zcost*' and connections != 4", lambda t, o, d, i: o["name"].lower().startswith("zcost") and d != 4),
+    ("name !~ '*order*' and category in (Source, Metadata)",
+     lambda t, o, d, i: "order" not in o["name"].lower() and o["category"] in ("Source", "Metadata")),
+    ("changed > 2025-01-01", lambda t, o, d, i: (_fecha(o.get("last_changed")) or 0) > 20250101000000),
+    ("not changed >= 20240115103000", lambda t, o, d, i: not (_fecha(o.get("last_changed")) or 0) >= 20240115103000),
+    ("type_name !~ 'c*' and active = ''", lambda t, o, d, i: not o["type_name"].lower().startswith("c") and o["active"] == ""),
+    ("", lambda t, o, d, i: True),
+])
+def test_igual_a_la_condicion_en_python(expresion, condicion):
+    inventario, g = _dataset()
+    indice = get_search_index(inventario, g)
+    mascara = get_filter_mask(indice, expresion)
+    assert mascara.tolist() == _evaluar(inventario, g, condicion)
+    assert mascara.any() or not expresion
+
+
+def test_precedencia_de_and_sobre_or():
+    inventario, g = _dataset()
+    indice = get_search_index(inventario, g)
+    sin_parentesis = get_filter_mask(indice, "owner = ANA or owner = LUIS and type = CUBE")
+    assert sin_parentesis.tolist() == get_filter_mask(indice, "owner = ANA or (owner = LUIS and type = CUBE)").tolist()
+    assert sin_parentesis.tolist() != get_filter_mask(indice, "(owner = ANA or owner = LUIS) and type = CUBE").tolist()
+
+
+def test_valores_citados_desde_codigo():
+    inventario, g = _dataset()
+    indice = get_search_index(inventario, g)
+    expresion = "owner = " + quote_filter_value("O'BRIEN")
+    assert get_filter_mask(indice, expresion).tolist() == _evaluar(inventario, g, lambda t, o, d, i: o["owner"] == "O'BRIEN")
+
+
+@pytest.mark.parametrize("expresion,mensaje", [
+    ("colour = red", "Unknown field 'colour'"),
+    ("degree >= many", "degree needs a number"),
+    ("changed > yesterday", "changed needs a date"),
+    ("degree ~ '5*'", "only applies to text fields"),
+    ("type in CUBE", "Expected '(' after in"),
+    ("(owner = ANA", "Expected ')' but found the end of the filter"),
+    ("owner = ANA owner", "Unexpected 'owner' at position 13"),
+    ("name ~ 'abc", "Unexpected character"),
+    ("owner =", "Expected a value"),
+])
+def test_errores_de_sintaxis(expresion, mensaje):
+    inventario, g = _dataset(por_tipo=5)
+    indice = get_search_index(inventario, g)
+    with pytest.raises(FilterSyntaxError, match=mensaje.replace("(", r"\(").replace(")", r"\)")):
+        get_filter_mask(indice, expresion)
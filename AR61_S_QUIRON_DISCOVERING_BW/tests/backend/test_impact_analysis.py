@@ -153,6 +153,33 @@ def test_with_source_tracing(monkeypatch):
     assert result["analysis_depth"] == 2
     assert result["source_tracing_enabled"] is True
 
+def test_impacto_por_niveles_parcial_y_final():
+    """
+    iter_infoobject_impact_levels entrega un resultado por nivel; solo el último es completo
+    y coincide con analyze_infoobject_impact_with_sources.
+    """
+    g = st.session_state.graph
+    for node in ["IOBJ:T4", "CUBE:C1", "CUBE:C2"]:
+        g.add_node(node, type=node.split(":")[0], name=node.split(":")[1])
+    g.add_edge("IOBJ:T4", "CUBE:C1", type="usage_dimension")
+    g.add_edge("CUBE:C1", "CUBE:C2", type="transformation")
+
+    niveles = list(ia_mod.iter_infoobject_impact_levels(None, "T4", 3, False, ["usage_dimension", "transformation"], False))
+    assert [r["levels_completed"] for r in niveles] == [1, 2, 3]
+    assert [r["partial"] for r in niveles] == [True, True, False]
+    assert niveles[0]["total_relationships"] == 1
+    final = analyze_infoobject_impact_with_sources(None, "T4", 3, False, ["usage_dimension", "transformation"], False)
+    assert final["total_objects"] == niveles[-1]["total_objects"] == 2
+    assert final["partial"] is False
+
+    # Con un presupuesto de un nodo el análisis termina tras el primer nivel, marcado como parcial
+    cortado = analyze_infoobject_impact_with_sources(None, "T4", 3, False, ["usage_dimension", "transformation"], False,
+                                                     max_nodes=1)
+    assert cortado["partial"] is True
+    assert cortado["stopped_by"] == "nodes"
+    assert cortado["levels_completed"] == 1
+
+
 # ---------------------------------------------------------------------------
 # trace_to_data_sources
 import backend.impact_analysis as ia_mod
@@ -22,7 +22,7 @@ def setup_graph_and_patches(monkeypatch):
     st.session_state.graph = nx.DiGraph()
     # Parches que devuelven valores neutrales
     monkeypatch.setattr(ia_mod, "trace_infocube_to_all_sources", lambda self, node, depth: [])
-    monkeypatch.setattr(ia_mod, "generate_infocube_data_lineage", lambda self, target, visited: [])
+    monkeypatch.setattr(ia_mod, "generate_infocube_data_lineage", lambda self, target, visited, order: [])
     monkeypatch.setattr(ia_mod, "get_source_system_info", lambda self, name: "SYS")
     monkeypatch.setattr(ia_mod, "determine_infosource_type", lambda self, name: "IST")
     yield
@@ -132,7 +132,7 @@ def test_show_lineage_invokes_generator(monkeypatch):
     g.add_node("CUBE:C3", type="CUBE", name="C3")
 
     # Stub de lineage
-    monkeypatch.setattr(ia_mod, "generate_infocube_data_lineage", lambda self, target, visited: ["pathA", "pathB"])
+    monkeypatch.setattr(ia_mod, "generate_infocube_data_lineage", lambda self, target, visited, order: ["pathA", "pathB"])
 
     res = analyze_infocube_connections(None, "C3", depth=1,
                                        include_all_sources=False,
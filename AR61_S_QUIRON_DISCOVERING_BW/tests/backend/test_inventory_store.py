@@ -0,0 +1,94 @@
+import pickle
+
+import networkx as nx
+import numpy as np
+
+from backend.inventory_store import (
+    InventoryRow, InventoryTable, ROW_KEYS, get_distinct_values, get_node_attributes, get_node_record, get_object_names
+)
+
+CONFIG = {
+    "name": "InfoCube", "category": "Provider", "color": "#fff", "shape": "box",
+    "size_base": 10, "icon": "C", "z_layer": 3
+}
+
+
+def _tabla():
+    return InventoryTable("CUBE", CONFIG, ["C1", "C2", "C3"], {
+        "owner": ["ANA", "LUIS", "ANA"],
+        "infoarea": ["FIN", "FIN", "HR"],
+        "active": ["Yes", "No", "Yes"],
+        "status": ["ACT", "ACT", "ACT"],
+        "last_changed": ["20240101", "Unknown", "20240301"],
+    })
+
+
+def test_fila_equivale_al_dict_original():
+    fila = _tabla()[0]
+    assert isinstance(fila, InventoryRow)
+    assert list(fila) == list(ROW_KEYS)
+    assert fila["type_name"] == "InfoCube"
+    assert fila["z_layer"] == 3
+    assert fila.get("owner") == "ANA"
+    assert fila.get("no_existe", "x") == "x"
+    assert "infoarea" in fila
+
+    copia = fila.copy()
+    assert isinstance(copia, dict) and copia == dict(fila)
+    copia["owner"] = "OTRO"
+    assert fila["owner"] == "ANA"
+
+
+def test_columnas_por_defecto():
+    tabla = InventoryTable("IOBJ", CONFIG, ["A", "B"])
+    assert tabla[1]["owner"] == "Unknown"
+    assert tabla[0]["last_changed"] == "Unknown"
+    assert tabla.distinct("infoarea") == ["UNASSIGNED"]
+
+
+def test_secuencia_slices_e_igualdad():
+    tabla = _tabla()
+    assert len(tabla) == 3
+    assert tabla[-1]["name"] == "C3"
+    assert [fila["name"] for fila in tabla[1:]] == ["C2", "C3"]
+    assert tabla == [fila.copy() for fila in tabla]
+    assert tabla != [tabla[0].copy()]
+    try:
+        tabla[3]
+        assert False
+    except IndexError:
+        pass
+
+
+def test_from_records_y_columnas():
+    tabla = InventoryTable.from_records("CUBE", CONFIG, [fila.copy() for fila in _tabla()][::-1])
+    assert get_object_names(tabla) == ["C3", "C2", "C1"]
+    assert tabla.column("owner").tolist() == ["ANA", "LUIS", "ANA"]
+    assert tabla.column("type").tolist() == ["CUBE"] * 3
+    assert tabla.mask("infoarea", {"FIN"}).tolist() == [False, True, True]
+    assert sorted(get_distinct_values(tabla, "owner")) == ["ANA", "LUIS"]
+    assert tabla.codes["owner"].dtype == np.int32
+    assert tabla.nbytes() > 0
+
+
+def test_helpers_con_listas_de_dicts():
+    objetos = [{"name": "A", "infoarea": "X"}, {"name": "B"}]
+    assert get_object_names(objetos) == ["A", "B"]
+    assert sorted(get_distinct_values(objetos, "infoarea", "UNASSIGNED")) == ["UNASSIGNED", "X"]
+
+
+def test_atributos_de_nodo_y_record():
+    tabla = _tabla()
+    grafo = nx.DiGraph()
+    grafo.add_node("CUBE:C1", **get_node_attributes(tabla[0]))
+    grafo.add_node("IOBJ:A", **get_node_attributes({"type": "IOBJ", "name": "A", "owner": "X"}))
+
+    assert set(grafo.nodes["CUBE:C1"]) == {"type", "name", "record"}
+    assert get_node_record(grafo, "CUBE:C1")["owner"] == "ANA"
+    assert get_node_record(grafo, "IOBJ:A")["owner"] == "X"
+    assert get_node_record(grafo, "CUBE:NO") is None
+
+
+def test_pickle_conserva_la_tabla():
+    tabla = pickle.loads(pickle.dumps(_tabla()))
+    assert tabla[2].copy() == _tabla()[2].copy()
@@ -0,0 +1,187 @@
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import networkx as nx
+import pytest
+
+from backend.batch_impact import analyze_batch_impact
+from backend.job_runner import (JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_PENDING, Job, get_job_pool, get_job_pool_stats,
+                                run_inline, shutdown_job_pools, submit_job, submit_job_group)
+
+
+def _suma(self, a, b):
+    return a + b
+
+
+def _falla(self):
+    raise ValueError("boom")
+
+
+@pytest.fixture(autouse=True)
+def limpiar_pools():
+    yield
+    shutdown_job_pools()
+
+
+def test_sin_dataset_compartido_se_ejecuta_en_linea():
+    sesion = SimpleNamespace(dataset_key=None)
+    assert get_job_pool(sesion) is None
+    job = submit_job(sesion, _suma, (2, 3))
+    assert job.state == JOB_DONE
+    assert job.result() == 5
+    assert job.label == "_suma"
+
+
+def test_error_queda_en_el_job():
+    job = run_inline(_falla)
+    assert job.state == JOB_FAILED
+    assert job.result() is None
+    assert isinstance(job.get_error(), ValueError)
+
+
+def test_cancelar_job_pendiente_y_en_curso():
+    pendiente = Job("p", Future())
+    assert pendiente.state == JOB_PENDING
+    assert pendiente.cancel()
+    assert pendiente.state == JOB_CANCELLED
+
+    # Un job en curso no se puede interrumpir: su resultado se descarta
+    en_curso = Future()
+    en_curso.set_running_or_notify_cancel()
+    job = Job("r", en_curso)
+    assert job.cancel()
+    en_curso.set_result(1)
+    assert job.state == JOB_CANCELLED
+    assert job.result() is None
+
+
+def test_grupo_de_jobs_progreso_y_resultados():
+    sesion = SimpleNamespace(dataset_key=None)
+    grupo = submit_job_group(sesion, [("a", _suma, (1, 1)), ("b", _falla, ())], params={"x": 1})
+    assert grupo.done()
+    assert grupo.get_progress() == 1.0
+    assert grupo.get_results() == {"a": 2}
+    assert list(grupo.get_errors()) == ["b"]
+    assert grupo.params == {"x": 1}
+
+
+def test_pool_de_procesos_con_dataset_enviado_una_vez():
+    # Los workers cargan el grafo al arrancar y ejecutan varios análisis en paralelo
+    g = nx.DiGraph()
+    g.add_edge("IOBJ:A", "CUBE:C", type="usage_dimension")
+    g.add_edge("IOBJ:B", "CUBE:C", type="usage_dimension")
+    sesion = SimpleNamespace(dataset_key="k", dataset_stats={"dataset_version": 1}, graph=g, global_inventory={})
+
+    grupo = submit_job_group(sesion, [(n, analyze_batch_impact, ([f"IOBJ:{n}"], 1, None)) for n in "AB"])
+    limite = time.time() + 60
+    while not grupo.done() and time.time() < limite:
+        time.sleep(0.05)
+
+    resultados = grupo.get_results()
+    assert {n: r["impacted_objects"][0]["node_id"] for n, r in resultados.items()} == {"A": "CUBE:C", "B": "CUBE:C"}
+    assert get_job_pool_stats()["pools"] == 1
+
+    # Una nueva versión del dataset sustituye al pool anterior
+    pool = get_job_pool(sesion)
+    sesion.dataset_stats = {"dataset_version": 2}
+    assert get_job_pool(sesion) is not pool
+    assert get_job_pool_stats()["pools"] == 1
+
+
+def _niveles(self, n):
+    for i in range(n):
+        yield {"nivel": i + 1}
+
+
+def test_generador_en_linea_devuelve_el_ultimo_nivel():
+    job = run_inline(_niveles, (3,))
+    assert job.result() == {"nivel": 3}
+
+
+def test_pool_transmite_resultados_parciales():
+    g = nx.DiGraph()
+    for i in range(4):
+        g.add_edge(f"CUBE:C{i}", f"CUBE:C{i + 1}", type="transformation")
+    sesion = SimpleNamespace(dataset_key="k", dataset_stats={"dataset_version": 1}, graph=g, global_inventory={})
+
+    from backend.impact_analysis import iter_infoobject_impact_levels
+    from backend.infocube_analysis import iter_infocube_connection_levels
+    grupo = submit_job_group(sesion, [("C0", iter_infocube_connection_levels, ("C0", 4, False, ["transformation"], False)),
+                                      ("X", iter_infoobject_impact_levels, ("NOEXISTE", 2, False, None, False))])
+    limite = time.time() + 60
+    while not grupo.done() and time.time() < limite:
+        time.sleep(0.05)
+
+    job = grupo.jobs["C0"]
+    assert job.result()["levels_completed"] == 4
+    # El último parcial recibido es el resultado completo
+    assert job.get_partial()["partial"] is False
+    assert grupo.jobs["X"].result() is None
+
+
+def _niveles_lentos(self, n):
+    for i in range(n):
+        time.sleep(0.2)
+        yield {"nivel": i + 1}
+
+
+def test_cancelar_detiene_el_generador_entre_niveles():
+    import threading
+    from backend.job_runner import collect_task_result
+    cancelar, calculados = threading.Event(), []
+
+    def niveles():
+        for i in range(5):
+            calculados.append(i + 1)
+            yield {"nivel": i + 1}
+
+    def informar(parcial):
+        if parcial["nivel"] == 2:
+            cancelar.set()
+
+    assert collect_task_result(niveles(), informar, cancelar) == {"nivel": 2}
+    assert calculados == [1, 2]
+
+
+def test_cancelar_job_en_curso_libera_el_worker():
+    # El worker deja de calcular niveles en cuanto se cancela, sin esperar al final del análisis
+    sesion = SimpleNamespace(dataset_key="k", dataset_stats={"dataset_version": 1}, graph=nx.DiGraph(), global_inventory={})
+    job = get_job_pool(sesion, max_workers=1).submit(_niveles_lentos, (200,))
+    limite = time.time() + 60
+    while job.get_partial() is None and time.time() < limite:
+        time.sleep(0.05)
+    assert job.cancel()
+
+    job.future.result(timeout=10)
+    assert job.state == JOB_CANCELLED
+    assert job.get_partial()["nivel"] < 200
+
+
+def test_workers_por_defecto_acotados():
+    from backend.job_runner import DEFAULT_MAX_WORKERS, MAX_JOB_WORKERS
+    assert 1 <= DEFAULT_MAX_WORKERS <= MAX_JOB_WORKERS
+
+
+def _niveles_sin_pausa(self, n):
+    for i in range(n):
+        yield {"nivel": i + 1, "datos": list(range(1000))}
+    time.sleep(60)
+
+
+def test_apagar_el_pool_no_deja_procesos_hijos():
+    # Parciales que nadie lee y un job que sigue en curso no impiden parar los workers
+    import multiprocessing
+    sesion = SimpleNamespace(dataset_key="k", dataset_stats={"dataset_version": 1}, graph=nx.DiGraph(), global_inventory={})
+    pool = get_job_pool(sesion, max_workers=2)
+    jobs = [pool.submit(_niveles_sin_pausa, (500,)) for _ in range(3)]
+    limite = time.time() + 60
+    while jobs[0].get_partial() is None and time.time() < limite:
+        time.sleep(0.05)
+
+    inicio = time.time()
+    shutdown_job_pools()
+    assert time.time() - inicio < 10
+    assert multiprocessing.active_children() == []
+    # Lo ya recibido se conserva
+    assert jobs[0].get_partial()["nivel"] >= 1
@@ -0,0 +1,69 @@
+import networkx as nx
+
+from backend.lineage import LINEAGE_ORDER_WEIGHT, LineageSweep, trace_lineage
+
+
+def _grafo_en_capas():
+    # DS:Dn -> ADSO:A* -> ADSO:B* -> CUBE:T, todas las combinaciones
+    g = nx.DiGraph()
+    for d in range(3):
+        for a in range(3):
+            g.add_edge(f"DS:D{d}", f"ADSO:A{a}", weight=a + 1)
+    for a in range(3):
+        for b in range(2):
+            g.add_edge(f"ADSO:A{a}", f"ADSO:B{b}", weight=1)
+            g.add_edge(f"ADSO:B{b}", "CUBE:T", weight=b + 1)
+    g.add_edge("DS:D0", "CUBE:T", weight=1)
+    return g
+
+
+def test_conteo_de_caminos_en_un_solo_barrido():
+    g = _grafo_en_capas()
+    sweep = LineageSweep(g, "CUBE:T")
+    for source in ["DS:D0", "DS:D1", "ADSO:A0"]:
+        assert sweep.path_counts[source] == len(list(nx.all_simple_paths(g, source, "CUBE:T", cutoff=5)))
+    assert sweep.distances["DS:D0"] == 1
+    assert sweep.distances["DS:D1"] == 3
+
+
+def test_enumeracion_completa_coincide_con_all_simple_paths():
+    g = _grafo_en_capas()
+    g.add_edge("ADSO:B0", "ADSO:A1", weight=1)  # ciclo: los caminos siguen siendo simples
+    sources = ["DS:D0", "DS:D1", "DS:D2"]
+    res = trace_lineage(g, "CUBE:T", sources, top_k=1000, path_budget=1000)
+    esperado = sorted(tuple(p) for s in sources for p in nx.all_simple_paths(g, s, "CUBE:T", cutoff=5))
+    assert sorted(tuple(nodes) for _, nodes, _ in res) == esperado
+    assert res.truncated is False
+    assert res.total_paths == len(esperado)
+
+
+def test_orden_y_truncado():
+    g = _grafo_en_capas()
+    res = trace_lineage(g, "CUBE:T", ["DS:D0", "DS:D1"], top_k=2)
+    assert res.truncated is True
+    assert res.path_counts == {"DS:D0": 7, "DS:D1": 6}
+    # El camino directo sale primero
+    assert res[0] == ("DS:D0", ["DS:D0", "CUBE:T"], 1)
+    longitudes = [len(nodes) for source, nodes, _ in res if source == "DS:D1"]
+    assert longitudes == sorted(longitudes)
+
+    pesados = trace_lineage(g, "CUBE:T", ["DS:D1"], top_k=3, order=LINEAGE_ORDER_WEIGHT)
+    pesos = [weight for _, _, weight in pesados]
+    assert pesos == sorted(pesos, reverse=True)
+    assert pesos[0] == 3 + 1 + 2  # DS:D1 -> A2 -> B1 -> T
+
+
+def test_presupuesto_global_de_caminos():
+    g = _grafo_en_capas()
+    res = trace_lineage(g, "CUBE:T", ["DS:D0", "DS:D1", "DS:D2"], top_k=10, path_budget=5)
+    assert len(res) == 5
+    assert res.truncated is True
+    assert res.total_paths == 19
+
+
+def test_fuentes_sin_camino_o_fuera_del_limite():
+    g = nx.DiGraph([("DS:X", "A:1"), ("A:1", "A:2"), ("A:2", "A:3"), ("A:3", "A:4"), ("A:4", "A:5"), ("A:5", "CUBE:T")])
+    g.add_node("DS:SUELTO")
+    res = trace_lineage(g, "CUBE:T", ["DS:X", "DS:SUELTO"])
+    assert list(res) == [] and res.path_counts == {} and res.truncated is False
+    assert len(trace_lineage(g, "CUBE:T", ["DS:X"], max_length=6)) == 1
@@ -0,0 +1,85 @@
+import pickle
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from backend.enhaced_relationships import build_relationship_graph
+from backend.node_interner import INTERNER_GRAPH_KEY, NodeInterner, get_node_interner, index_graph_nodes
+
+
+def _inventario():
+    return {
+        "IOBJ": [{"name": "I1"}, {"name": "I2"}, {"name": "I3"}],
+        "CUBE": [{"name": "C1"}],
+    }
+
+
+def _relaciones():
+    return [
+        {"source": "IOBJ:I1", "target": "CUBE:C1", "type": "usage_dimension"},
+        {"source": "IOBJ:I2", "target": "CUBE:C1", "type": "usage_dimension"},
+    ]
+
+
+def test_codigos_densos_por_tipo_y_vuelta_a_nombres():
+    interner = NodeInterner(_inventario())
+    assert len(interner) == 4
+    assert interner.type_ranges == {"IOBJ": (0, 3), "CUBE": (3, 4)}
+    assert interner.get_code("CUBE:C1") == 3
+    assert interner.get_code("CUBE:NO") == -1
+    assert interner.encode(["IOBJ:I2", "X:Y"]).tolist() == [1, -1]
+    assert interner.decode([3, 0]) == ["CUBE:C1", "IOBJ:I1"]
+    assert interner.get_type(2) == "IOBJ"
+    assert interner.get_node_id("IOBJ", 1) == "IOBJ:I2"
+    assert "IOBJ:I3" in interner
+    assert interner.get_type_slice("DS") == slice(0, 0)
+
+
+def test_grafo_construido_lleva_su_interner():
+    graph = build_relationship_graph(None, _inventario(), _relaciones())
+    interner = graph.graph[INTERNER_GRAPH_KEY]
+
+    assert get_node_interner(_inventario(), graph) is interner
+    assert interner.get_type_degrees("IOBJ").tolist() == [1, 1, 0]
+    assert interner.get_type_degrees("CUBE", "in_degree").tolist() == [2]
+    assert interner.get_type_degrees("CUBE", "out_degree").tolist() == [0]
+    assert interner.get_in_graph().all()
+    # Los nodos del grafo reutilizan las cadenas internadas
+    assert any(node is interner.node_ids[0] for node in graph.nodes)
+
+
+def test_interner_obsoleto_se_reconstruye():
+    graph = build_relationship_graph(None, _inventario(), _relaciones())
+    viejo = graph.graph[INTERNER_GRAPH_KEY]
+
+    inventario = _inventario()
+    inventario["IOBJ"].append({"name": "I4"})
+    graph.add_node("IOBJ:I4")
+    nuevo = get_node_interner(inventario, graph)
+    assert nuevo is not viejo
+    assert graph.graph[INTERNER_GRAPH_KEY] is nuevo
+    assert nuevo.get_type_degrees("IOBJ").tolist() == [1, 1, 0, 0]
+
+    # Un parche explícito re-indexa aunque los tamaños no cambien
+    graph.add_edge("IOBJ:I3", "CUBE:C1")
+    assert index_graph_nodes(inventario, graph).get_type_degrees("IOBJ").tolist() == [1, 1, 1, 0]
+
+
+def test_grafos_no_networkx_no_se_cachean():
+    graph = MagicMock()
+    graph.nodes = {"IOBJ:I1", "CUBE:C1"}
+    graph.degree.side_effect = lambda node: {"IOBJ:I1": 5}.get(node, 0)
+
+    interner = get_node_interner(_inventario(), graph)
+    assert interner.get_degrees().tolist() == [5, 0, 0, 0]
+    assert interner.get_in_graph().tolist() == [True, False, False, True]
+    assert get_node_interner(_inventario(), graph) is not interner
+
+
+def test_pickle_sin_referencia_al_grafo():
+    graph = build_relationship_graph(None, _inventario(), _relaciones())
+    copia = pickle.loads(pickle.dumps(graph))
+    interner = copia.graph[INTERNER_GRAPH_KEY]
+    assert interner.graph is None
+    assert get_node_interner(_inventario(), copia) is interner
+    assert np.array_equal(interner.get_type_degrees("IOBJ"), [1, 1, 0])
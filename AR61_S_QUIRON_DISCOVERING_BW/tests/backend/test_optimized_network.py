@@ -173,6 +173,65 @@ def test_max_edges_limits_relationships():
     # Ninguna relación cumple source AND target en {'Y:o2'}
     assert rl == []
 
+def setup_stratified_inventory():
+    """
+    300 objetos X:n0..n299: los 40 primeros muy conectados, los 110 siguientes
+    con unas cuatro aristas cada uno y los 150 últimos aislados.
+    """
+    st.session_state.global_inventory = {'X': [{'name': f'n{i}', 'infoarea': 'IA'} for i in range(300)]}
+    G = nx.DiGraph()
+    G.add_nodes_from(f'X:n{i}' for i in range(300))
+    for i in range(30):
+        G.add_edges_from((f'X:n{i}', f'X:n{j}') for j in range(30, 40))
+    for i in range(40, 148):
+        G.add_edges_from([(f'X:n{i}', f'X:n{i + 1}'), (f'X:n{i}', f'X:n{i + 2}')])
+    st.session_state.graph = G
+
+
+def _muestra(sample_type, max_objects, seed=0, **pcts):
+    return get_connection_based_dataset(
+        None, sample_type=sample_type, selected_types=['X'], selected_infoareas=[],
+        max_objects=max_objects, min_connections=0, max_edges=10, seed=seed, **pcts
+    )[0]
+
+
+def test_mixed_distribution_cumple_cuotas_exactas():
+    """Cada estrato recibe exactamente su cuota y ningún objeto se repite."""
+    setup_stratified_inventory()
+    grados = {n: st.session_state.graph.degree(n) for n in st.session_state.graph}
+    media = sum(grados.values()) / len(grados)
+
+    ob = _muestra("Show Mixed Distribution", 50, highly_pct=0.3, well_pct=0.3, isolated_pct=0.4)
+    ids = [o['node_id'] for o in ob]
+    assert len(ids) == len(set(ids)) == 50
+    assert sum(grados[i] > media * 2 for i in ids) == 15
+    assert sum(media <= grados[i] <= media * 2 for i in ids) == 15
+    assert sum(grados[i] == 0 for i in ids) == 20
+    assert all(o['connections'] == grados[o['node_id']] for o in ob)
+
+
+def test_muestreo_reproducible_por_semilla():
+    """La misma semilla da la misma muestra; otra semilla la cambia."""
+    setup_stratified_inventory()
+    primera = [o['node_id'] for o in _muestra("Show Isolated", 20, seed=7)]
+    assert primera == [o['node_id'] for o in _muestra("Show Isolated", 20, seed=7)]
+    assert primera != [o['node_id'] for o in _muestra("Show Isolated", 20, seed=8)]
+    # Dentro de la muestra se conserva el orden del inventario
+    assert primera == sorted(primera, key=lambda n: int(n.split(':n')[1]))
+
+
+def test_estrato_pequeno_se_toma_entero_y_se_rellena():
+    """Si un estrato no llega a su cuota, el hueco se llena con el resto de objetos."""
+    setup_stratified_inventory()
+    altos = _muestra("Show Highly Connected", 100)
+    assert len(altos) == len({o['node_id'] for o in altos}) < 100
+
+    ob = _muestra("Show Mixed Distribution", 200, highly_pct=1.0, well_pct=0, isolated_pct=0)
+    ids = {o['node_id'] for o in ob}
+    assert len(ob) == len(ids) == 200
+    assert {o['node_id'] for o in altos} <= ids
+
+
 #-------------------------------------------------------------------------------
 from backend.optimized_network import calculate_sampled_connection_stats
 
@@ -0,0 +1,81 @@
+import pickle
+import random
+
+import networkx as nx
+
+from backend.csr_graph import CSRGraph
+from backend.enhaced_relationships import build_edge, build_relationship_graph
+from backend.reachability import REACHABILITY_GRAPH_KEY, get_source_reachability, index_source_reachability
+
+
+def _dataset():
+    # DS:S1 -> ADSO:A -> CUBE:C1 ; DS:S2 -> ADSO:B <-> ADSO:C (ciclo) -> CUBE:C2 ; IOBJ:I solo por uso
+    inventario = {
+        "DS": [{"name": "ERP_S1"}, {"name": "CRM_S2"}, {"name": "ERP_S3"}],
+        "ADSO": [{"name": "A"}, {"name": "B"}, {"name": "C"}],
+        "CUBE": [{"name": "C1"}, {"name": "C2"}, {"name": "C3"}],
+        "IOBJ": [{"name": "I"}],
+    }
+    relaciones = [
+        build_edge("DS", "ERP_S1", "ADSO", "A", "transformation", 3, "#2E86C1", trans_id="T1"),
+        build_edge("ADSO", "A", "CUBE", "C1", "transformation", 3, "#2E86C1", trans_id="T2"),
+        build_edge("DS", "CRM_S2", "ADSO", "B", "transformation", 3, "#2E86C1", trans_id="T3"),
+        build_edge("ADSO", "B", "ADSO", "C", "transformation", 3, "#2E86C1", trans_id="T4"),
+        build_edge("ADSO", "C", "ADSO", "B", "transformation", 3, "#2E86C1", trans_id="T5"),
+        build_edge("ADSO", "C", "CUBE", "C2", "transformation", 3, "#2E86C1", trans_id="T6"),
+        build_edge("DS", "ERP_S3", "CUBE", "C2", "source_connection", 3, "#16A085"),
+        build_edge("DS", "ERP_S3", "IOBJ", "I", "source_connection", 2, "#3498DB"),
+        build_edge("IOBJ", "I", "CUBE", "C3", "usage_dimension", 2, "#E67E22"),
+    ]
+    return inventario, relaciones
+
+
+def test_fuentes_aguas_arriba_con_ciclos():
+    graph = build_relationship_graph(None, *_dataset())
+    index = get_source_reachability(graph)
+    assert index.get_upstream_sources("CUBE:C1") == ["DS:ERP_S1"]
+    assert sorted(index.get_upstream_sources("CUBE:C2")) == ["DS:CRM_S2", "DS:ERP_S3"]
+    assert index.get_upstream_sources("ADSO:B") == ["DS:CRM_S2"]
+    # Las aristas de uso no transportan datos
+    assert index.get_upstream_sources("CUBE:C3") == []
+    assert index.get_upstream_sources("DS:ERP_S1") == []
+    assert index.count_upstream_sources("CUBE:C2") == 2
+    assert index.feeds("DS:ERP_S3", "CUBE:C2") and not index.feeds("DS:ERP_S1", "CUBE:C2")
+    assert index.get_upstream_sources("X:NO_EXISTE") == []
+
+
+def test_matriz_por_sistema_fuente():
+    graph = build_relationship_graph(None, *_dataset())
+    sistemas, conteos = get_source_reachability(graph).get_group_matrix(
+        ["CUBE:C1", "CUBE:C2", "CUBE:C3"], lambda name: name.split("_")[0])
+    assert sistemas == ["CRM", "ERP"]
+    assert conteos.tolist() == [[0, 1], [1, 1], [0, 0]]
+
+
+def test_equivale_a_ancestros_en_grafo_aleatorio():
+    random.seed(7)
+    g = nx.DiGraph()
+    nodos = [f"DS:D{i}" for i in range(70)] + [f"ADSO:A{i}" for i in range(60)] + [f"CUBE:C{i}" for i in range(30)]
+    g.add_nodes_from(nodos)
+    for _ in range(300):
+        u, v = random.sample(nodos, 2)
+        g.add_edge(u, v, type=random.choice(["transformation", "usage_dimension"]))
+    flujo = nx.DiGraph([(u, v) for u, v, t in g.edges(data="type") if t == "transformation"])
+    index = get_source_reachability(g)
+    for node in nodos:
+        esperado = sorted(a for a in (nx.ancestors(flujo, node) if node in flujo else ()) if a.startswith("DS:"))
+        assert sorted(index.get_upstream_sources(node)) == esperado
+
+
+def test_motor_csr_y_pickle():
+    inventario, relaciones = _dataset()
+    csr = CSRGraph.from_dataset(inventario, relaciones)
+    index = index_source_reachability(csr)
+    assert csr.graph[REACHABILITY_GRAPH_KEY] is index
+    assert sorted(index.get_upstream_sources("CUBE:C2")) == ["DS:CRM_S2", "DS:ERP_S3"]
+
+    graph = build_relationship_graph(None, inventario, relaciones)
+    index_source_reachability(graph)
+    restaurado = pickle.loads(pickle.dumps(graph))
+    assert get_source_reachability(restaurado) is restaurado.graph[REACHABILITY_GRAPH_KEY]
+    assert get_source_reachability(restaurado).get_upstream_sources("CUBE:C1") == ["DS:ERP_S1"]
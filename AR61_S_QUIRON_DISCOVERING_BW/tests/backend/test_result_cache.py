@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend import result_cache
+from backend.dataset_registry import clear_registry, evict_idle_datasets, register_dataset
+from backend.result_cache import (ResultCache, estimate_size, get_analysis_key, get_cached_analysis, get_cached_result,
+                                  store_cached_result)
+
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    result_cache.clear_result_cache()
+    clear_registry()
+    yield
+    result_cache.clear_result_cache()
+    clear_registry()
+
+
+def test_lru_por_tamano_y_contadores():
+    cache = ResultCache(max_bytes=250)
+    cache.put("a", "A", size=100)
+    cache.put("b", "B", size=100)
+    assert cache.get("a") == "A"          # "a" pasa a ser la más reciente
+    cache.put("c", "C", size=100)         # desaloja "b", la menos usada
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    assert stats["bytes"] == 200
+    # Un resultado mayor que todo el presupuesto no se guarda
+    assert cache.put("enorme", "X", size=1000) is False
+    assert "enorme" not in cache
+
+
+def test_get_or_compute_no_guarda_none():
+    cache = ResultCache()
+    llamadas = []
+    assert cache.get_or_compute("k", lambda: llamadas.append(1)) is None
+    assert cache.get_or_compute("k", lambda: llamadas.append(1)) is None
+    assert len(llamadas) == 2
+    assert cache.get_or_compute("v", lambda: {"x": 1}) is cache.get_or_compute("v", lambda: {"x": 2})
+
+
+def test_estimate_size_crece_con_el_contenido():
+    pequeno = {"relationships": [{"source": "A", "target": "B"}] * 10}
+    grande = {"relationships": [{"source": "A", "target": "B"}] * 1000}
+    assert estimate_size(grande) > estimate_size(pequeno) > 0
+
+
+def test_clave_incluye_version_y_normaliza_tipos():
+    sesion = SimpleNamespace(dataset_key="ds", dataset_stats={"dataset_version": 3})
+    assert get_analysis_key(sesion, "impact", "I1", 2, ["b", "a"]) == ("ds", 3, "impact", ("I1", 2, ("a", "b")))
+    assert get_analysis_key(SimpleNamespace(dataset_key=None), "impact", "I1") is None
+
+
+def test_compartida_entre_sesiones_e_invalidada_por_version():
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        return {"total_objects": len(llamadas)}
+
+    sesion_a = SimpleNamespace(dataset_key="ds", dataset_stats={"dataset_version": 1})
+    sesion_b = SimpleNamespace(dataset_key="ds", dataset_stats={"dataset_version": 1})
+    primero = get_cached_analysis(sesion_a, "impact", ("I1", 2), calcular)
+    assert get_cached_analysis(sesion_b, "impact", ("I1", 2), calcular) is primero
+    assert len(llamadas) == 1
+
+    # Publicar la versión 2 descarta los resultados de la versión 1
+    register_dataset("ds", {}, [], None, {"dataset_version": 2})
+    assert result_cache.get_result_cache_stats()["entries"] == 0
+    sesion_a.dataset_stats = {"dataset_version": 2}
+    assert get_cached_analysis(sesion_a, "impact", ("I1", 2), calcular)["total_objects"] == 2
+
+    # Sesiones sin dataset compartido no usan la caché
+    get_cached_analysis(SimpleNamespace(), "impact", ("I1", 2), calcular)
+    assert len(llamadas) == 3
+
+
+def test_desalojar_dataset_inactivo_limpia_sus_resultados():
+    register_dataset("ds", {}, [], None, {"dataset_version": 1})
+    sesion = SimpleNamespace(dataset_key="ds", dataset_stats={"dataset_version": 1})
+    get_cached_analysis(sesion, "impact", ("I1",), lambda: {"ok": True})
+    assert evict_idle_datasets(idle_ttl=0, now=10 ** 12) == ["ds"]
+    assert result_cache.get_result_cache_stats()["entries"] == 0
+
+
+def test_resultado_de_job_se_guarda_y_se_lee():
+    sesion = SimpleNamespace(dataset_key="k", dataset_stats={"dataset_version": 1})
+    assert get_cached_result(sesion, "a", ("X", 2)) is None
+    store_cached_result(sesion, "a", ("X", 2), {"total": 1})
+    assert get_cached_result(sesion, "a", ("X", 2)) == {"total": 1}
+    # Sin dataset compartido no se guarda nada
+    store_cached_result(SimpleNamespace(dataset_key=None), "a", ("X", 2), {"total": 2})
+    assert get_cached_result(SimpleNamespace(dataset_key=None), "a", ("X", 2)) is None
+
+
+def test_resultados_parciales_no_se_guardan():
+    # Un análisis cortado por el presupuesto no debe servirse después como si estuviera completo
+    sesion = SimpleNamespace(dataset_key="k", dataset_stats={"dataset_version": 1})
+    parcial = {"total_objects": 3, "partial": True}
+    assert get_cached_analysis(sesion, "infoobject_impact", ("X", 2), lambda: parcial) is parcial
+    assert get_cached_result(sesion, "infoobject_impact", ("X", 2)) is None
+    store_cached_result(sesion, "infoobject_impact", ("X", 2), parcial)
+    assert get_cached_result(sesion, "infoobject_impact", ("X", 2)) is None
+
+    completo = {"total_objects": 5, "partial": False}
+    assert get_cached_analysis(sesion, "infoobject_impact", ("X", 2), lambda: completo) is completo
+    assert get_cached_result(sesion, "infoobject_impact", ("X", 2)) is completo
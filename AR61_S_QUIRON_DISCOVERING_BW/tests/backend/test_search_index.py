@@ -0,0 +1,182 @@
+import pickle
+import random
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.inventory_store import InventoryTable
+from backend.node_interner import index_graph_nodes
+from backend.search_index import (
+    SEARCH_INDEX_GRAPH_KEY, SORT_CONNECTIONS, SORT_INFOAREA, SORT_NAME, SORT_OWNER, SearchResults, get_search_index,
+    index_object_search
+)
+
+
+def _dataset(semilla=0, por_tipo=80):
+    random.seed(semilla)
+    palabras = ["SALES", "CUSTOMER", "MATERIAL", "PLANT", "ORDER", "BILLING", "COST", "ab", "Ab"]
+    inventario = {}
+    for tipo in ("IOBJ", "CUBE"):
+        inventario[tipo] = [{
+            "name": f"{random.choice('0ZY')}{random.choice(palabras)}_{random.choice(palabras)}{i}",
+            "type_name": tipo, "category": "Metadata" if tipo == "IOBJ" else "Provider",
+            "infoarea": random.choice(["FI", "SD", "MM"]), "owner": random.choice(["ANA", "LUIS", "MARIANA"])
+        } for i in range(por_tipo)]
+    inventario["DS"] = InventoryTable("DS", {"name": "DataSource", "category": "Source"}, ["2LIS_11_VAHDR", "0CUSTOMER_ATTR"],
+                                      {"owner": ["ANA", "PEDRO"], "infoarea": ["SD", "SD"]})
+    g = nx.DiGraph()
+    for tipo, objetos in inventario.items():
+        g.add_nodes_from(f"{tipo}:{obj['name']}" for obj in objetos)
+    nodos = list(g.nodes)
+    for _ in range(200):
+        g.add_edge(random.choice(nodos), random.choice(nodos))
+    return inventario, g
+
+
+def _filas(inventario):
+    return [(tipo, obj) for tipo, objetos in inventario.items() for obj in objetos]
+
+
+def _busqueda_lineal(inventario, g, term="", obj_type=None, category=None, infoareas=None, owner="", min_degree=0, max_degree=None):
+    """Filtro objeto a objeto, como el bucle original del explorador"""
+    resultado = []
+    for code, (tipo, obj) in enumerate(_filas(inventario)):
+        grado = g.degree(f"{tipo}:{obj['name']}")
+        descartes = [
+            obj_type and tipo != obj_type,
+            category and obj['category'] != category,
+            term and term.lower() not in obj['name'].lower(),
+            infoareas and obj.get('infoarea', 'UNASSIGNED') not in infoareas,
+            owner and owner.lower() not in obj.get('owner', '').lower(),
+            grado < min_degree,
+            max_degree is not None and grado > max_degree,
+        ]
+        if any(descartes):
+            continue
+        resultado.append(code)
+    return resultado
+
+
+@pytest.mark.parametrize("filtros", [
+    {"term": "sales"},
+    {"term": "ab"},
+    {"term": "TOMER_CO"},
+    {"term": "xyz"},
+    {"obj_type": "CUBE", "term": "order"},
+    {"category": "Source"},
+    {"infoareas": ["SD", "MM"], "owner": "ana"},
+    {"owner": "LUIS", "min_degree": 1, "max_degree": 4},
+    {"term": "0", "max_degree": 0},
+])
+def test_igual_a_la_busqueda_lineal(filtros):
+    inventario, g = _dataset()
+    indice = get_search_index(inventario, g)
+    assert indice.search(**filtros).tolist() == _busqueda_lineal(inventario, g, **filtros)
+
+
+def test_prefijo_y_maximo_por_tipo():
+    inventario, g = _dataset()
+    indice = get_search_index(inventario, g)
+    nombres = [obj['name'] for _, obj in _filas(inventario)]
+
+    codigos = indice.match_prefix("zsal")
+    assert sorted(codigos.tolist()) == [i for i, n in enumerate(nombres) if n.lower().startswith("zsal")]
+    assert [indice.names[c] for c in codigos] == sorted(indice.names[c] for c in codigos)
+
+    for tipo, objetos in inventario.items():
+        assert indice.get_type_max_degree(tipo) == max(g.degree(f"{tipo}:{obj['name']}") for obj in objetos)
+    tipo, obj = indice.get_object(inventario, len(nombres) - 1)
+    assert (tipo, obj['name']) == ("DS", "0CUSTOMER_ATTR")
+
+
+def test_busqueda_difusa_tolera_erratas():
+    inventario, g = _dataset()
+    indice = get_search_index(inventario, g)
+
+    assert not indice.match_names("CUSTOMR").any()
+    difusa = indice.match_names("CUSTOMR", fuzzy=True)
+    assert difusa.any()
+    assert all("customer" in indice.names[c] for c in np.flatnonzero(difusa))
+    # Lo que coincide exactamente también coincide en modo difuso
+    assert not (indice.match_names("MATERIAL") & ~indice.match_names("MATERIAL", fuzzy=True)).any()
+
+
+def test_viaja_con_el_grafo_y_se_renueva_al_reindexar():
+    inventario, g = _dataset()
+    indice = index_object_search(inventario, g)
+    assert get_search_index(inventario, g) is indice
+
+    copia = pickle.loads(pickle.dumps(g))
+    assert get_search_index(inventario, copia) is copia.graph[SEARCH_INDEX_GRAPH_KEY]
+
+    index_graph_nodes(inventario, g)
+    assert get_search_index(inventario, g) is not indice
+
+
+@pytest.mark.parametrize("columna,clave", [
+    (SORT_CONNECTIONS, "Connections"),
+    (SORT_NAME, "Name"),
+    (SORT_OWNER, "Owner"),
+    (SORT_INFOAREA, "InfoArea"),
+])
+@pytest.mark.parametrize("ascendente", [True, False])
+def test_paginas_siguen_el_orden_de_pandas(columna, clave, ascendente):
+    inventario, g = _dataset()
+    indice = get_search_index(inventario, g)
+    resultados = SearchResults(indice, indice.search(term="a"))
+    filas = pd.DataFrame([{
+        "code": code, "Name": obj["name"], "Owner": obj["owner"], "InfoArea": obj["infoarea"],
+        "Connections": g.degree(f"{tipo}:{obj['name']}")
+    } for code, (tipo, obj) in enumerate(_filas(inventario)) if code in set(resultados.codes.tolist())])
+    esperado = filas.sort_values(clave, ascending=ascendente, kind="stable")[clave].tolist()
+
+    paginas = [resultados.get_page(p, 25, columna, ascendente) for p in range(1, resultados.get_page_count(25) + 1)]
+    codigos = np.concatenate(paginas)
+    assert sorted(codigos.tolist()) == sorted(resultados.codes.tolist())
+    assert filas.set_index("code").loc[codigos, clave].tolist() == esperado
+    # El orden se calcula una sola vez y lo reutiliza la exportación por bloques
+    assert np.concatenate(list(resultados.iter_chunks(7, columna, ascendente))).tolist() == codigos.tolist()
+    assert len(resultados._orders) == 1
+
+
+def test_subconjuntos_por_estado_y_resumen():
+    inventario, g = _dataset()
+    indice = get_search_index(inventario, g)
+    resultados = SearchResults(indice, indice.search())
+
+    conectados = resultados.get_status_subset(True)
+    aislados = resultados.get_status_subset(False)
+    assert len(conectados) + len(aislados) == len(resultados)
+    assert (conectados.get_degrees() > 0).all() and (aislados.get_degrees() == 0).all()
+    assert resultados.get_status_subset(True) is conectados
+
+    resumen = resultados.get_summary_frame()
+    assert resumen["Connections"].sum() == sum(dict(g.degree()).values())
+    assert resultados.get_type_counts() == {"IOBJ": 80, "CUBE": 80, "DataSource": 2}
+    assert resultados.contains_type("DS") and not conectados.get_status_subset(False).contains_type("DS")
+    porcentajes = resultados.get_connection_percentages()
+    assert porcentajes.max() == 100.0 and porcentajes.min() >= 0.0
+
+
+def test_sugerencias_por_prefijo_y_grado():
+    inventario = {"IOBJ": [{"name": n} for n in ["0MATERIAL", "ZMAT", "0MAT_PLANT", "MAT", "XMATX", "0CUSTOMER"]],
+                  "CUBE": [{"name": "MAT_CUBE"}]}
+    g = nx.DiGraph()
+    g.add_nodes_from(f"{tipo}:{obj['name']}" for tipo, objetos in inventario.items() for obj in objetos)
+    g.add_edges_from([("IOBJ:XMATX", "CUBE:MAT_CUBE"), ("IOBJ:XMATX", "IOBJ:0CUSTOMER"), ("IOBJ:ZMAT", "CUBE:MAT_CUBE")])
+    indice = get_search_index(inventario, g)
+
+    # Nombre exacto, después los que empiezan por el texto y luego los que lo contienen, más conectados primero
+    nombres, total = indice.get_suggested_names("mat", "IOBJ")
+    assert nombres == ["MAT", "XMATX", "ZMAT", "0MAT_PLANT", "0MATERIAL"]
+    assert total == 5
+    assert indice.get_suggested_names("mat", "IOBJ", limit=2) == (["MAT", "XMATX"], 5)
+    assert indice.get_suggested_names("0mat", "IOBJ")[0] == ["0MAT_PLANT", "0MATERIAL"]
+
+    # Sin texto se sugieren los más conectados; con erratas se recurre a la búsqueda difusa
+    assert indice.get_suggested_names("", "IOBJ", limit=3)[0] == ["XMATX", "0CUSTOMER", "ZMAT"]
+    assert indice.get_suggested_names("0CUSTOMR", "IOBJ")[0] == ["0CUSTOMER"]
+    assert indice.get_suggested_names("nada", "CUBE") == ([], 0)
+    assert indice.count_type("CUBE") == 1 and indice.count_type("DS") == 0
@@ -0,0 +1,221 @@
+import networkx as nx
+import pytest
+
+from backend.csr_graph import CSRGraph
+from backend.enhaced_relationships import build_edge
+from backend.traversal import (ADJACENCY_GRAPH_KEY, BUDGET_NODES, BUDGET_TIME, DIRECTION_BOTH, DIRECTION_DOWNSTREAM,
+                               DIRECTION_UPSTREAM, estimate_traversal, get_typed_adjacency, iter_traversal, traverse,
+                               traverse_from_seeds)
+
+
+def _grafo():
+    # DS1 -> CUBE1 <- IOBJ1 ; CUBE1 -> CUBE2 ; IOBJ1 -> CUBE2 (keyfigure)
+    g = nx.DiGraph()
+    for node in ["DS:DS1", "IOBJ:I1", "CUBE:C1", "CUBE:C2", "CUBE:C3"]:
+        g.add_node(node, type=node.split(":")[0], name=node.split(":")[1])
+    g.add_edge("DS:DS1", "CUBE:C1", type="source_connection", weight=3)
+    g.add_edge("IOBJ:I1", "CUBE:C1", type="usage_dimension", weight=2)
+    g.add_edge("IOBJ:I1", "CUBE:C2", type="usage_keyfigure", weight=2)
+    g.add_edge("CUBE:C1", "CUBE:C2", type="transformation", weight=3)
+    g.add_edge("CUBE:C2", "CUBE:C3", type="transformation", weight=3)
+    return g
+
+
+def _bfs_de_referencia(g, start, depth, types):
+    # Recorrido original nivel a nivel, con get_edge_data por vecino
+    visited, relaciones, nivel = set(), [], {start}
+    for d in range(depth):
+        siguiente = set()
+        for node in nivel:
+            if node in visited:
+                continue
+            visited.add(node)
+            for n in g.successors(node):
+                if g.get_edge_data(node, n).get("type") in types:
+                    siguiente.add(n)
+                    relaciones.append((node, n, "outgoing", d + 1))
+            for n in g.predecessors(node):
+                if g.get_edge_data(n, node).get("type") in types:
+                    siguiente.add(n)
+                    relaciones.append((n, node, "incoming", d + 1))
+        nivel = siguiente
+    return visited, sorted(relaciones)
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+@pytest.mark.parametrize("types", [["transformation"], ["transformation", "usage_dimension", "source_connection"]])
+def test_equivale_al_bfs_original(depth, types):
+    g = _grafo()
+    res = traverse(g, ["CUBE:C1"], depth, types)
+    visited, relaciones = _bfs_de_referencia(g, "CUBE:C1", depth, types)
+    assert set(res.get_expanded_nodes()) == visited
+    encontradas = sorted((r["source"], r["target"], r["direction"], r["depth"]) for r in res.get_relationships())
+    assert encontradas == relaciones
+
+
+def test_direcciones_y_atributos():
+    g = _grafo()
+    abajo = traverse(g, ["IOBJ:I1"], 2, None, DIRECTION_DOWNSTREAM)
+    assert set(abajo.get_expanded_nodes()) == {"IOBJ:I1", "CUBE:C1", "CUBE:C2"}
+    assert abajo.get_frontier_nodes() == ["CUBE:C3"]
+    assert set(abajo.directions.tolist()) == {0}
+
+    arriba = traverse(g, ["CUBE:C2"], 2, None, DIRECTION_UPSTREAM)
+    assert set(arriba.get_expanded_nodes()) == {"CUBE:C2", "IOBJ:I1", "CUBE:C1"}
+    rel = next(r for r in arriba.get_relationships() if r["source"] == "IOBJ:I1")
+    assert rel == {"source": "IOBJ:I1", "target": "CUBE:C2", "direction": "incoming", "depth": 1,
+                   "type": "usage_keyfigure", "weight": 2}
+    assert "CUBE:C3" not in arriba
+
+
+def test_expand_anade_nodos_al_siguiente_nivel():
+    g = _grafo()
+    llamadas = []
+
+    def expand(node, depth, result):
+        llamadas.append((node, depth))
+        return ["DS:DS1", "X:NO_EXISTE"] if node == "CUBE:C3" and "DS:DS1" not in result else []
+
+    res = traverse(g, ["CUBE:C3"], 2, [], DIRECTION_BOTH, expand=expand)
+    assert res.number_of_edges() == 0
+    assert llamadas == [("CUBE:C3", 1), ("DS:DS1", 2)]
+    assert res.get_expanded_nodes() == ["CUBE:C3", "DS:DS1"]
+
+
+def test_indice_se_guarda_y_se_invalida():
+    g = _grafo()
+    adj = get_typed_adjacency(g)
+    assert g.graph[ADJACENCY_GRAPH_KEY] is adj
+    assert get_typed_adjacency(g) is adj
+    g.add_edge("CUBE:C3", "DS:DS1", type="transformation")
+    assert get_typed_adjacency(g) is not adj
+    assert adj.nbytes() > 0
+
+
+def test_motor_csr_da_el_mismo_resultado():
+    inventario = {
+        "IOBJ": [{"name": "I1"}, {"name": "I2"}],
+        "CUBE": [{"name": "C1"}, {"name": "C2"}],
+    }
+    relaciones = [
+        build_edge("IOBJ", "I1", "CUBE", "C1", "usage_dimension", 2, "#E67E22"),
+        build_edge("IOBJ", "I2", "CUBE", "C1", "usage_keyfigure", 2, "#8E44AD"),
+        build_edge("CUBE", "C1", "CUBE", "C2", "transformation", 3, "#2E86C1", trans_id="T1"),
+    ]
+    csr = CSRGraph.from_dataset(inventario, relaciones)
+    res = traverse(csr, ["CUBE:C1"], 2, ["usage_dimension", "transformation"])
+    assert set(res.get_expanded_nodes()) == {"CUBE:C1", "IOBJ:I1", "CUBE:C2"}
+    assert sorted(r["source"] for r in res.get_relationships() if r["depth"] == 1) == ["CUBE:C1", "IOBJ:I1"]
+
+
+@pytest.mark.parametrize("direction", [DIRECTION_BOTH, DIRECTION_DOWNSTREAM, DIRECTION_UPSTREAM])
+def test_semillas_equivalen_a_un_recorrido_por_semilla(direction):
+    # Cada semilla alcanza un nodo a su distancia mínima; el bit se conserva aunque otra semilla llegue antes
+    g = _grafo()
+    semillas = ["DS:DS1", "IOBJ:I1", "CUBE:C3"]
+    res = traverse_from_seeds(g, semillas + ["CUBE:NOEXISTE"], 2, None, direction)
+    assert res.seeds == semillas
+
+    esperado = {}
+    for semilla in semillas:
+        alcanzados = nx.single_source_shortest_path_length(
+            g if direction == DIRECTION_DOWNSTREAM else g.reverse() if direction == DIRECTION_UPSTREAM else g.to_undirected(),
+            semilla, cutoff=2)
+        for node, dist in alcanzados.items():
+            depth, origenes = esperado.get(node, (dist, set()))
+            esperado[node] = (min(depth, dist), origenes | {semilla})
+
+    obtenido = {node: (int(res.depths[i]), set(res.get_seeds(i))) for i, node in enumerate(res.get_node_ids())}
+    assert obtenido == esperado
+    assert res.get_seed_matrix().shape == (len(res), 3)
+
+
+def test_semillas_mas_de_64():
+    # Los bits de semilla ocupan varias palabras
+    g = nx.DiGraph()
+    for i in range(130):
+        g.add_edge(f"DS:D{i}", "CUBE:C", type="source_connection")
+    res = traverse_from_seeds(g, [f"DS:D{i}" for i in range(130)], 1, ["source_connection"], DIRECTION_DOWNSTREAM)
+    fila = res.get_node_ids().index("CUBE:C")
+    assert len(res.get_seeds(fila)) == 130
+    assert int(res.depths[fila]) == 1
+
+
+def test_iter_traversal_entrega_cada_nivel():
+    g = _grafo()
+    niveles = []
+    for res in iter_traversal(g, ["CUBE:C1"], 3, None):
+        niveles.append((res.levels_completed, res.complete, res.number_of_edges(), len(res.get_expanded_nodes())))
+    assert [nivel[0] for nivel in niveles] == [1, 2, 3]
+    assert [nivel[1] for nivel in niveles] == [False, False, True]
+    # Cada nivel amplía el anterior y el último coincide con traverse
+    assert niveles[0][2] <= niveles[1][2] <= niveles[2][2]
+    final = traverse(g, ["CUBE:C1"], 3, None)
+    assert niveles[-1][2:] == (final.number_of_edges(), len(final.get_expanded_nodes()))
+
+
+def test_iter_traversal_termina_antes_si_no_quedan_nodos():
+    g = _grafo()
+    niveles = [(res.levels_completed, res.complete) for res in iter_traversal(g, ["CUBE:C3"], 5, None, DIRECTION_DOWNSTREAM)]
+    assert niveles == [(1, True)]
+    assert [res.complete for res in iter_traversal(g, ["CUBE:NOEXISTE"], 2)] == [True]
+
+
+def test_presupuesto_de_nodos_corta_en_un_nivel():
+    g = _grafo()
+    completo = traverse(g, ["CUBE:C1"], 3, None)
+    assert completo.complete and completo.stopped_by is None
+
+    # El nivel 2 expandiría C1 y sus 3 vecinos: con 3 nodos como máximo solo se expanden 2 de ellos
+    cortado = traverse(g, ["CUBE:C1"], 3, None, max_nodes=3)
+    assert cortado.stopped_by == BUDGET_NODES
+    assert cortado.final and not cortado.complete
+    assert cortado.levels_completed == 1
+    expandidos = cortado.get_expanded_nodes()
+    assert expandidos[0] == "CUBE:C1" and len(expandidos) == 3
+    vecinos = {"DS:DS1", "IOBJ:I1", "CUBE:C2"}
+    assert set(expandidos[1:]) < vecinos
+    # El vecino sin expandir sigue en la frontera y las aristas de los expandidos se conservan
+    assert vecinos - set(expandidos) <= set(cortado.get_frontier_nodes())
+    assert not set(expandidos) & set(cortado.get_frontier_nodes())
+    assert all(r["source"] in expandidos or r["target"] in expandidos for r in cortado.get_relationships())
+
+
+def test_presupuesto_de_tiempo():
+    g = _grafo()
+    res = traverse(g, ["CUBE:C1"], 3, None, time_budget=-1)
+    # El primer nivel siempre se calcula
+    assert res.stopped_by == BUDGET_TIME
+    assert res.levels_completed == 1
+
+
+def test_presupuesto_de_tiempo_recorta_el_nivel_en_curso(monkeypatch):
+    # Estrella de 10 hojas: el presupuesto se comprueba cada 2 nodos y cada comprobación avanza un segundo
+    import backend.traversal as traversal_mod
+    g = nx.DiGraph()
+    for i in range(10):
+        g.add_edge("CUBE:HUB", f"DS:D{i}", type="transformation")
+        g.add_edge(f"DS:D{i}", f"IOBJ:I{i}", type="transformation")
+    reloj = iter(range(1000))
+    monkeypatch.setattr(traversal_mod, "BUDGET_CHECK_NODES", 2)
+    monkeypatch.setattr(traversal_mod.time, "monotonic", lambda: next(reloj))
+
+    res = traverse(g, ["CUBE:HUB"], 3, None, DIRECTION_DOWNSTREAM, time_budget=2.5)
+    assert res.stopped_by == BUDGET_TIME
+    assert res.levels_completed == 1
+    assert len(res.get_expanded_nodes()) == 1 + 4
+    # Las hojas alcanzadas por los 4 expandidos y los 6 DataSources pendientes forman la frontera
+    assert len(res.get_frontier_nodes()) == 4 + 6
+
+
+def test_estimacion_exacta_en_los_primeros_niveles():
+    g = _grafo()
+    niveles = estimate_traversal(g, ["CUBE:C1"], 3, None)
+    real_1 = traverse(g, ["CUBE:C1"], 1, None)
+    real_2 = traverse(g, ["CUBE:C1"], 2, None)
+    assert niveles[0]["total_nodes"] == len(real_1.get_expanded_nodes()) + len(real_1.get_frontier_nodes())
+    assert niveles[0]["total_edges"] == real_1.number_of_edges()
+    assert niveles[1]["total_edges"] == real_2.number_of_edges()
+    # Nunca se estiman más aristas de las que tiene el grafo (contadas desde ambos extremos)
+    assert niveles[-1]["total_edges"] <= 2 * g.number_of_edges()
+    assert estimate_traversal(g, ["CUBE:NOEXISTE"], 2)[-1]["total_nodes"] == 0
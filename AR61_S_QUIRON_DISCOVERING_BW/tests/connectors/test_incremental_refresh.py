@@ -0,0 +1,178 @@
+# tests/connectors/test_incremental_refresh.py
+
+import sqlite3
+import pytest
+import streamlit as st
+
+from frontend.app import SAP_BW_Enhanced_Analyzer
+import connectors.sqlite_connector as sqlite_mod
+import connectors.incremental_refresh as inc_mod
+from backend.dataset_registry import acquire_dataset, clear_registry, get_registry_stats
+from backend.inventory_store import get_node_record
+from connectors.snapshot_cache import SNAPSHOT_DIR_ENV
+
+
+class FakeProgress:
+    def progress(self, val):
+        pass
+
+
+class FakeStatus:
+    def text(self, msg):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def ui_silenciosa(monkeypatch, tmp_path):
+    monkeypatch.setenv(SNAPSHOT_DIR_ENV, str(tmp_path / "snapshots"))
+    clear_registry()
+    monkeypatch.setattr(st, "progress", lambda initial: FakeProgress())
+    monkeypatch.setattr(st, "empty", lambda: FakeStatus())
+    yield
+    clear_registry()
+
+
+def _crear_bd(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE RSDIOBJ (IOBJNM TEXT, OBJVERS TEXT, OWNER TEXT, CONTTIMESTMP INTEGER)")
+    conn.execute("CREATE TABLE RSDCUBE (INFOCUBE TEXT, OBJVERS TEXT, CONTTIMESTMP INTEGER)")
+    conn.execute("CREATE TABLE RSDDIMEIOBJ (IOBJNM TEXT, INFOCUBE TEXT, OBJVERS TEXT)")
+    conn.executemany("INSERT INTO RSDIOBJ VALUES (?, 'A', 'BWADMIN', 20240101000000)", [(f"IOBJ{i}",) for i in range(6)])
+    conn.executemany("INSERT INTO RSDCUBE VALUES (?, 'A', 20240101000000)", [(f"CUBE{i}",) for i in range(4)])
+    conn.executemany("INSERT INTO RSDDIMEIOBJ VALUES (?, ?, 'A')", [(f"IOBJ{i}", f"CUBE{i % 4}") for i in range(6)])
+    conn.commit()
+    conn.close()
+
+
+def _foto_dataset():
+    inventory = {t: [dict(o) for o in objs] for t, objs in st.session_state.global_inventory.items()}
+    rels = sorted((r["source"], r["target"], r["type"]) for r in st.session_state.relationships)
+    graph = st.session_state.graph
+    return inventory, rels, sorted(graph.nodes), sorted(graph.edges)
+
+
+def test_refresh_incremental_equivale_a_recarga_completa(tmp_path):
+    db = str(tmp_path / "bw.db")
+    _crear_bd(db)
+    analyzer = SAP_BW_Enhanced_Analyzer()
+    assert sqlite_mod.load_and_analyze_data(analyzer, db) is True
+    st.session_state.data_loaded = True
+    assert st.session_state.dataset_stats["high_water_marks"]["IOBJ"] == 20240101000000
+    loaded_graph = st.session_state.graph
+
+    # Cambios nocturnos: uno modificado, uno nuevo, uno borrado
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE RSDIOBJ SET OWNER = 'NUEVO', CONTTIMESTMP = 20240102000000 WHERE IOBJNM = 'IOBJ1'")
+    conn.execute("INSERT INTO RSDIOBJ VALUES ('IOBJ99', 'A', 'BWADMIN', 20240102000000)")
+    conn.execute("DELETE FROM RSDIOBJ WHERE IOBJNM = 'IOBJ2'")
+    conn.execute("DELETE FROM RSDDIMEIOBJ WHERE IOBJNM = 'IOBJ2'")
+    conn.execute("INSERT INTO RSDDIMEIOBJ VALUES ('IOBJ1', 'CUBE3', 'A')")
+    conn.execute("INSERT INTO RSDDIMEIOBJ VALUES ('IOBJ99', 'CUBE0', 'A')")
+    conn.commit()
+    conn.close()
+
+    assert inc_mod.refresh_data_incrementally(analyzer, db) is True
+    stats = st.session_state.dataset_stats
+    assert stats["dataset_version"] == 2
+    assert stats["last_refresh"]["changed_objects"] == 2
+    assert stats["last_refresh"]["removed_objects"] == 1
+    assert stats["high_water_marks"]["IOBJ"] == 20240102000000
+    # Se parchea una copia: el grafo cargado sigue intacto para quien lo comparta
+    assert st.session_state.graph is not loaded_graph
+    assert "IOBJ:IOBJ2" in loaded_graph and "IOBJ:IOBJ99" not in loaded_graph
+    assert get_node_record(st.session_state.graph, "IOBJ:IOBJ1")["owner"] == "NUEVO"
+    # Los nodos apuntan a la tabla reconstruida, no a la anterior
+    assert get_node_record(st.session_state.graph, "IOBJ:IOBJ0") is not None
+    iobj_table = st.session_state.global_inventory["IOBJ"]
+    assert st.session_state.graph.nodes["IOBJ:IOBJ0"]["record"]._table is iobj_table
+    patched = _foto_dataset()
+
+    clear_registry()
+    assert sqlite_mod.load_and_analyze_data(analyzer, db, use_snapshot=False) is True
+    assert patched == _foto_dataset()
+
+
+def test_refresh_no_altera_el_dataset_de_otra_sesion(tmp_path):
+    db = str(tmp_path / "bw.db")
+    _crear_bd(db)
+    analyzer = SAP_BW_Enhanced_Analyzer()
+    assert sqlite_mod.load_and_analyze_data(analyzer, db) is True
+    st.session_state.data_loaded = True
+    clave_anterior = st.session_state.dataset_key
+
+    # Otra sesión sigue trabajando con la versión cargada
+    otra = acquire_dataset(clave_anterior, session_id="otra-sesion")
+    objetos = otra["dataset_stats"]["total_objects"]
+    aristas = len(otra["relationships"])
+    nodos, enlaces = otra["graph"].number_of_nodes(), otra["graph"].number_of_edges()
+    tabla_iobj = otra["global_inventory"]["IOBJ"]
+
+    conn = sqlite3.connect(db)
+    conn.execute("INSERT INTO RSDIOBJ VALUES ('IOBJ99', 'A', 'BWADMIN', 20240102000000)")
+    conn.execute("INSERT INTO RSDDIMEIOBJ VALUES ('IOBJ99', 'CUBE0', 'A')")
+    conn.execute("DELETE FROM RSDIOBJ WHERE IOBJNM = 'IOBJ2'")
+    conn.execute("DELETE FROM RSDDIMEIOBJ WHERE IOBJNM = 'IOBJ2'")
+    conn.commit()
+    conn.close()
+
+    assert inc_mod.refresh_data_incrementally(analyzer, db) is True
+    assert st.session_state.dataset_key != clave_anterior
+    assert st.session_state.dataset_stats["total_objects"] == objetos
+    assert "IOBJ:IOBJ99" in st.session_state.graph
+
+    # La entrada anterior conserva sus objetos, aristas y grafo originales
+    assert otra["dataset_stats"]["total_objects"] == objetos
+    assert "last_refresh" not in otra["dataset_stats"]
+    assert len(otra["relationships"]) == aristas
+    assert (otra["graph"].number_of_nodes(), otra["graph"].number_of_edges()) == (nodos, enlaces)
+    assert "IOBJ:IOBJ2" in otra["graph"] and "IOBJ:IOBJ99" not in otra["graph"]
+    assert otra["global_inventory"]["IOBJ"] is tabla_iobj and len(tabla_iobj) == 6
+    # Esta sesión soltó la versión anterior; solo la otra la mantiene
+    assert get_registry_stats()["by_dataset"][clave_anterior]["sessions"] == 1
+
+
+def test_refresh_sin_cambios_no_cambia_version(tmp_path):
+    db = str(tmp_path / "bw.db")
+    _crear_bd(db)
+    analyzer = SAP_BW_Enhanced_Analyzer()
+    sqlite_mod.load_and_analyze_data(analyzer, db)
+    st.session_state.data_loaded = True
+
+    assert inc_mod.refresh_data_incrementally(analyzer, db) is True
+    assert st.session_state.dataset_stats["dataset_version"] == 1
+    assert st.session_state.dataset_stats["last_refresh"]["changed_objects"] == 0
+
+
+def test_refresh_parte_del_snapshot_si_la_sesion_no_tiene_datos(tmp_path):
+    db = str(tmp_path / "bw.db")
+    _crear_bd(db)
+    analyzer = SAP_BW_Enhanced_Analyzer()
+    sqlite_mod.load_and_analyze_data(analyzer, db)
+    clear_registry()
+    st.session_state.data_loaded = False
+
+    conn = sqlite3.connect(db)
+    conn.execute("DELETE FROM RSDCUBE WHERE INFOCUBE = 'CUBE3'")
+    conn.commit()
+    conn.close()
+
+    assert inc_mod.refresh_data_incrementally(analyzer, db) is True
+    assert "CUBE:CUBE3" not in st.session_state.graph
+    assert st.session_state.dataset_stats["last_refresh"]["removed_objects"] == 1
+
+
+def test_refresh_sin_base_hace_carga_completa(tmp_path, monkeypatch):
+    db = str(tmp_path / "bw.db")
+    _crear_bd(db)
+    st.session_state.data_loaded = False
+    calls = []
+    monkeypatch.setattr(inc_mod, "load_and_analyze_data", lambda self, path: calls.append(path) or True)
+
+    assert inc_mod.refresh_data_incrementally(SAP_BW_Enhanced_Analyzer(), db) is True
+    assert calls == [db]
+
+
+def test_patch_inventory_type_mantiene_orden():
+    inventory = {"IOBJ": [{"name": "A"}, {"name": "C"}]}
+    inc_mod.patch_inventory_type(inventory, "IOBJ", [{"name": "B"}, {"name": "C", "owner": "X"}], ["A"])
+    assert inventory["IOBJ"] == [{"name": "B"}, {"name": "C", "owner": "X"}]
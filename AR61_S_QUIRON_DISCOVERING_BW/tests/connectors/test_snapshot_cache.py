@@ -0,0 +1,122 @@
+# tests/connectors/test_snapshot_cache.py
+
+import os
+import pickle
+import networkx as nx
+import pytest
+
+import connectors.snapshot_cache as snap_mod
+
+
+@pytest.fixture(autouse=True)
+def directorio_de_snapshots(monkeypatch, tmp_path):
+    monkeypatch.setenv(snap_mod.SNAPSHOT_DIR_ENV, str(tmp_path / "snapshots"))
+
+
+class Explosivo:
+    """Objeto cuyo unpickle deja constancia de que se ha ejecutado código"""
+    ejecutado = []
+
+    def __reduce__(self):
+        return (Explosivo.ejecutado.append, ("ejecutado",))
+
+
+def _write_db(path, content=b"SQLite format 3\x00 data"):
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def test_fingerprint_missing_file_returns_none(tmp_path):
+    assert snap_mod.compute_db_fingerprint(str(tmp_path / "no_existe.db")) is None
+    assert snap_mod.compute_db_fingerprint("") is None
+
+
+def test_fingerprint_changes_with_content_and_config(tmp_path):
+    db = tmp_path / "bw.db"
+    _write_db(db)
+    fp1 = snap_mod.compute_db_fingerprint(str(db), {"CUBE": {"table": "RSDCUBE"}})
+    fp_same = snap_mod.compute_db_fingerprint(str(db), {"CUBE": {"table": "RSDCUBE"}})
+    assert fp1 == fp_same
+    assert fp1["size"] == os.path.getsize(db)
+
+    fp_config = snap_mod.compute_db_fingerprint(str(db), {"CUBE": {"table": "OTRA"}})
+    assert fp_config["config_hash"] != fp1["config_hash"]
+
+    # Mismo tamaño y mtime forzado: solo el hash de contenido detecta el cambio
+    stat = os.stat(db)
+    _write_db(db, b"SQLite format 3\x00 dato")
+    os.utime(db, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    fp2 = snap_mod.compute_db_fingerprint(str(db), {"CUBE": {"table": "RSDCUBE"}})
+    assert fp2["size"] == fp1["size"]
+    assert fp2["mtime_ns"] == fp1["mtime_ns"]
+    assert fp2["content_hash"] != fp1["content_hash"]
+
+
+def test_save_and_load_snapshot_roundtrip(tmp_path):
+    db = tmp_path / "bw.db"
+    _write_db(db)
+    fp = snap_mod.compute_db_fingerprint(str(db))
+    graph = nx.DiGraph([("CUBE:A", "IOBJ:B")])
+
+    assert snap_mod.save_snapshot(str(db), fp, {"CUBE": [{"name": "A"}]}, [{"source": "CUBE:A"}], graph, {"total_objects": 1})
+    assert os.path.isfile(snap_mod.get_snapshot_path(str(db)))
+
+    payload = snap_mod.load_snapshot(str(db), fp)
+    assert payload["global_inventory"] == {"CUBE": [{"name": "A"}]}
+    assert payload["relationships"] == [{"source": "CUBE:A"}]
+    assert list(payload["graph"].edges()) == [("CUBE:A", "IOBJ:B")]
+    assert payload["dataset_stats"] == {"total_objects": 1}
+
+
+def test_load_snapshot_rejects_stale_or_corrupt(tmp_path):
+    db = tmp_path / "bw.db"
+    _write_db(db)
+    fp = snap_mod.compute_db_fingerprint(str(db))
+    assert snap_mod.load_snapshot(str(db), fp) is None  # todavía no existe
+    assert snap_mod.load_snapshot(str(db), None) is None
+
+    snap_mod.save_snapshot(str(db), fp, {}, [], nx.DiGraph(), {})
+    _write_db(db, b"contenido nuevo y distinto")
+    new_fp = snap_mod.compute_db_fingerprint(str(db))
+    assert snap_mod.load_snapshot(str(db), new_fp) is None
+
+    with open(snap_mod.get_snapshot_path(str(db)), "wb") as f:
+        f.write(b"no es un pickle")
+    assert snap_mod.load_snapshot(str(db), new_fp) is None
+
+
+def test_save_snapshot_failure_returns_false(tmp_path):
+    missing_dir_db = tmp_path / "no_dir" / "bw.db"
+    assert snap_mod.save_snapshot(str(missing_dir_db), {"size": 1}, {}, [], nx.DiGraph(), {}) is False
+    assert snap_mod.save_snapshot(str(tmp_path / "bw.db"), None, {}, [], nx.DiGraph(), {}) is False
+
+
+def test_snapshot_fuera_del_directorio_de_la_bd(tmp_path):
+    db = tmp_path / "datos" / "bw.db"
+    db.parent.mkdir()
+    _write_db(db)
+    fp = snap_mod.compute_db_fingerprint(str(db))
+    assert snap_mod.save_snapshot(str(db), fp, {}, [], nx.DiGraph(), {})
+    assert os.listdir(db.parent) == ["bw.db"]
+    assert os.path.dirname(snap_mod.get_snapshot_path(str(db))) == str(tmp_path / "snapshots")
+
+
+def test_no_se_deserializa_un_fichero_sin_firma_valida(tmp_path):
+    db = tmp_path / "bw.db"
+    _write_db(db)
+    fp = snap_mod.compute_db_fingerprint(str(db))
+    Explosivo.ejecutado.clear()
+
+    # Un pickle plantado junto a la BD, como en el formato anterior, ni se lee
+    with open(f"{db}{snap_mod.SNAPSHOT_SUFFIX}", "wb") as f:
+        pickle.dump({"fingerprint": fp, "x": Explosivo()}, f)
+    assert snap_mod.load_snapshot(str(db), fp) is None
+
+    # Tampoco uno escrito en el directorio de snapshots sin la clave de esta instalación
+    snap_mod.save_snapshot(str(db), fp, {}, [], nx.DiGraph(), {})
+    data = pickle.dumps({"fingerprint": fp, "x": Explosivo()})
+    with open(snap_mod.get_snapshot_path(str(db)), "wb") as f:
+        f.write(b"\0" * snap_mod.SIGNATURE_SIZE + data)
+    assert snap_mod.load_snapshot(str(db), fp) is None
+    assert snap_mod.load_latest_snapshot(str(db)) is None
+    assert Explosivo.ejecutado == []
@@ -1,5 +1,6 @@
 # tests/connectors/test_sqlite_connector.py
 
+import os
 import sqlite3
 import networkx as nx
 import pytest
@@ -7,6 +8,14 @@ import streamlit as st
 
 from frontend.app import SAP_BW_Enhanced_Analyzer
 import connectors.sqlite_connector as sqlite_mod
+from backend.csr_graph import CSRGraph
+from backend.dataset_registry import clear_registry, get_registry_stats
+from connectors.snapshot_cache import SNAPSHOT_DIR_ENV, get_snapshot_path
+
+
+@pytest.fixture(autouse=True)
+def directorio_de_snapshots(monkeypatch, tmp_path):
+    monkeypatch.setenv(SNAPSHOT_DIR_ENV, str(tmp_path / "snapshots"))
 
 
 class FakeCursor:
@@ -70,7 +79,7 @@ def test_load_and_analyze_data_con_mocks(monkeypatch):
     monkeypatch.setattr(
         sqlite_mod,
         "analyze_enhanced_relationships",
-        lambda self, conn, tables: ["r1", "r2"],
+        lambda self, conn, tables, **kwargs: ["r1", "r2"],
     )
     monkeypatch.setattr(
         sqlite_mod,
@@ -103,3 +112,154 @@ def test_load_and_analyze_data_con_mocks(monkeypatch):
     expected_density = nx.density(g)
     assert stats["graph_density"] == expected_density
     assert "load_timestamp" in stats         # marca de tiempo generada
+
+
+def test_load_and_analyze_data_reutiliza_snapshot(monkeypatch, tmp_path):
+    clear_registry()
+    analyzer = SAP_BW_Enhanced_Analyzer()
+    analyzer.object_types = {"A": {"name": "Tipo A", "table": "T1"}}
+
+    db = tmp_path / "bw.db"
+    db.write_bytes(b"contenido de prueba")
+
+    monkeypatch.setattr(sqlite3, "connect", lambda path: FakeConn())
+    monkeypatch.setattr(st, "progress", lambda initial: FakeProgress())
+    monkeypatch.setattr(st, "empty", lambda: FakeStatus())
+
+    calls = {"objects": 0}
+
+    def fake_objects(self, conn, obj_type, config):
+        calls["objects"] += 1
+        return ["o1"]
+
+    monkeypatch.setattr(sqlite_mod, "get_active_objects_by_type", fake_objects)
+    monkeypatch.setattr(sqlite_mod, "analyze_enhanced_relationships", lambda self, conn, tables, **kwargs: ["r1"])
+    monkeypatch.setattr(sqlite_mod, "build_relationship_graph", lambda self, gi, rels: nx.DiGraph([("n1", "n2")]))
+
+    assert sqlite_mod.load_and_analyze_data(analyzer, str(db)) is True
+    assert calls["objects"] == 1
+    assert "restored_from_snapshot" not in st.session_state.dataset_stats
+
+    # Segunda carga sin cambios: se restaura sin volver a consultar la BD
+    clear_registry()
+    st.session_state.global_inventory = {}
+    assert sqlite_mod.load_and_analyze_data(analyzer, str(db)) is True
+    assert calls["objects"] == 1
+    assert st.session_state.global_inventory == {"A": ["o1"]}
+    assert st.session_state.dataset_stats["restored_from_snapshot"] is True
+
+    # Desactivar el snapshot fuerza la reconstrucción y tampoco lo reescribe
+    snapshot = get_snapshot_path(str(db))
+    mtime = os.stat(snapshot).st_mtime_ns
+    os.utime(snapshot, ns=(mtime - 10**9, mtime - 10**9))
+    assert sqlite_mod.load_and_analyze_data(analyzer, str(db), use_snapshot=False) is True
+    assert calls["objects"] == 2
+    assert os.stat(snapshot).st_mtime_ns == mtime - 10**9
+
+
+def test_load_and_analyze_data_comparte_dataset_entre_sesiones(monkeypatch, tmp_path):
+    clear_registry()
+    analyzer = SAP_BW_Enhanced_Analyzer()
+    analyzer.object_types = {"A": {"name": "Tipo A", "table": "T1"}}
+
+    db = tmp_path / "bw.db"
+    db.write_bytes(b"contenido compartido")
+
+    monkeypatch.setattr(sqlite3, "connect", lambda path: FakeConn())
+    monkeypatch.setattr(st, "progress", lambda initial: FakeProgress())
+    monkeypatch.setattr(st, "empty", lambda: FakeStatus())
+    monkeypatch.setattr(sqlite_mod, "get_active_objects_by_type", lambda self, conn, obj_type, config: ["o1"])
+    monkeypatch.setattr(sqlite_mod, "analyze_enhanced_relationships", lambda self, conn, tables, **kwargs: ["r1"])
+    monkeypatch.setattr(sqlite_mod, "build_relationship_graph", lambda self, gi, rels: nx.DiGraph([("n1", "n2")]))
+    snapshot_reads = []
+    monkeypatch.setattr(sqlite_mod, "load_snapshot", lambda path, fp: snapshot_reads.append(path))
+    monkeypatch.setattr(sqlite_mod, "save_snapshot", lambda *args: True)
+
+    assert sqlite_mod.load_and_analyze_data(analyzer, str(db)) is True
+    first_graph = st.session_state.graph
+    assert st.session_state.dataset_key is not None
+    assert get_registry_stats()["datasets"] == 1
+
+    # Una nueva carga del mismo fichero reutiliza el mismo objeto en memoria
+    st.session_state.graph = nx.DiGraph()
+    assert sqlite_mod.load_and_analyze_data(analyzer, str(db)) is True
+    assert st.session_state.graph is first_graph
+    assert len(snapshot_reads) == 1  # solo la primera carga consulta el snapshot
+    clear_registry()
+
+
+def _crear_bd_bw(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE RSDIOBJ (IOBJNM TEXT, OBJVERS TEXT, OWNER TEXT)")
+    conn.execute("CREATE TABLE RSDCUBE (INFOCUBE TEXT, OBJVERS TEXT, CUBETYPE TEXT)")
+    conn.execute("CREATE TABLE RSDDIMEIOBJ (IOBJNM TEXT, INFOCUBE TEXT, OBJVERS TEXT)")
+    conn.execute("CREATE TABLE RSDCUBEIOBJ (IOBJNM TEXT, INFOCUBE TEXT, OBJVERS TEXT, IOBJTP TEXT)")
+    conn.executemany("INSERT INTO RSDIOBJ VALUES (?, 'A', 'BWADMIN')", [(f"IOBJ{i}",) for i in range(30)])
+    conn.executemany("INSERT INTO RSDCUBE VALUES (?, 'A', 'B')", [(f"CUBE{i}",) for i in range(5)])
+    conn.executemany("INSERT INTO RSDDIMEIOBJ VALUES (?, ?, 'A')", [(f"IOBJ{i}", f"CUBE{i % 5}") for i in range(30)])
+    conn.executemany("INSERT INTO RSDCUBEIOBJ VALUES (?, ?, 'A', 'KYF')", [(f"IOBJ{i}", f"CUBE{(i + 1) % 5}") for i in range(20, 30)])
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_load_and_analyze_data_secuencial_y_paralelo(monkeypatch, tmp_path, parallel):
+    clear_registry()
+    db = tmp_path / "bw.db"
+    _crear_bd_bw(str(db))
+
+    fake_prog = FakeProgress()
+    fake_stat = FakeStatus()
+    monkeypatch.setattr(st, "progress", lambda initial: fake_prog)
+    monkeypatch.setattr(st, "empty", lambda: fake_stat)
+
+    analyzer = SAP_BW_Enhanced_Analyzer()
+    assert sqlite_mod.load_and_analyze_data(analyzer, str(db), use_snapshot=False, parallel=parallel) is True
+
+    stats = st.session_state.dataset_stats
+    assert stats["load_mode"] == ("parallel" if parallel else "sequential")
+    assert stats["object_type_counts"]["IOBJ"] == 30
+    assert stats["object_type_counts"]["CUBE"] == 5
+    assert stats["total_relationships"] == 40
+    assert set(stats["load_timings"]) == {"RSDIOBJ", "RSDCUBE", "RSDDIMEIOBJ", "RSDCUBEIOBJ"}
+    assert all(seconds >= 0 for seconds in stats["load_timings"].values())
+    assert st.session_state.graph.number_of_edges() == 40
+
+    # Las relaciones conservan el orden de RELATIONSHIP_SOURCES
+    types = [rel["type"] for rel in st.session_state.relationships]
+    assert types == ["usage_dimension"] * 30 + ["usage_keyfigure"] * 10
+    assert fake_prog.values[-1] == 1.0
+    clear_registry()
+
+
+def test_load_and_analyze_data_con_motor_csr(monkeypatch, tmp_path):
+    clear_registry()
+    db = tmp_path / "bw.db"
+    _crear_bd_bw(str(db))
+    monkeypatch.setattr(st, "progress", lambda initial: FakeProgress())
+    monkeypatch.setattr(st, "empty", lambda: FakeStatus())
+
+    analyzer = SAP_BW_Enhanced_Analyzer()
+    assert sqlite_mod.load_and_analyze_data(analyzer, str(db), use_snapshot=False) is True
+    nx_key = st.session_state.dataset_key
+    assert sqlite_mod.load_and_analyze_data(analyzer, str(db), use_snapshot=False, graph_engine="csr") is True
+
+    graph = st.session_state.graph
+    assert isinstance(graph, CSRGraph)
+    assert graph.number_of_edges() == 40
+    assert sorted(graph.predecessors("CUBE:CUBE1")) == sorted(["IOBJ:IOBJ1", "IOBJ:IOBJ6", "IOBJ:IOBJ11", "IOBJ:IOBJ16",
+                                                               "IOBJ:IOBJ21", "IOBJ:IOBJ26", "IOBJ:IOBJ20", "IOBJ:IOBJ25"])
+    assert st.session_state.dataset_stats["graph_engine"] == "csr"
+    # Cada motor se registra como un dataset distinto
+    assert st.session_state.dataset_key != nx_key
+    assert get_registry_stats()["datasets"] == 2
+    clear_registry()
+
+
+def test_open_readonly_connection_no_permite_escribir(tmp_path):
+    db = tmp_path / "bw.db"
+    _crear_bd_bw(str(db))
+    conn = sqlite_mod.open_readonly_connection(str(db))
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM RSDIOBJ")
+    conn.close()
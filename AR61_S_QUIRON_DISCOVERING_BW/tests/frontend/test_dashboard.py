@@ -93,3 +93,24 @@ def test_show_analytics_dashboard(mock_st, mock_calc_conn, mock_get_source):
 
     # Ejecuta la función
     show_analytics_dashboard(MockApp())
+
+
+@patch("frontend.dashboard.st")
+def test_show_flow_cycles_marca_los_ciclos(mock_st):
+    import networkx as nx
+    from frontend.dashboard import show_flow_cycles
+
+    g = nx.DiGraph()
+    g.add_edge("ODSO:A", "ODSO:B", type="transformation")
+    g.add_edge("ODSO:B", "ODSO:A", type="transformation")
+    show_flow_cycles(g)
+    mock_st.warning.assert_called_once()
+    mock_st.dataframe.assert_called_once()
+
+    # Sin ciclos solo se confirma; con un grafo simulado no se calcula nada
+    mock_st.reset_mock()
+    show_flow_cycles(nx.DiGraph([("DS:D", "CUBE:C")]))
+    mock_st.success.assert_called_once()
+    mock_st.reset_mock()
+    show_flow_cycles(MagicMock())
+    mock_st.subheader.assert_not_called()
@@ -9,7 +9,7 @@ def mock_app():
     return type("MockApp", (), {})()
 
 
-@patch("frontend.impact_page.analyze_infoobject_impact_with_sources")
+@patch("frontend.impact_page.iter_infoobject_impact_levels")
 @patch("frontend.impact_page.display_impact_analysis_with_sources")
 @patch("frontend.impact_page.st")
 def test_show_infoobject_impact_analysis_basic(mock_st, mock_display, mock_analyze, mock_app):
@@ -46,3 +46,99 @@ def test_show_infoobject_impact_analysis_basic(mock_st, mock_display, mock_analy
     # Verifica que se haya analizado correctamente
     mock_analyze.assert_called_once()
     mock_display.assert_called_once()
+
+
+@patch("frontend.impact_page.analyze_batch_impact")
+@patch("frontend.impact_page.iter_infoobject_impact_levels")
+@patch("frontend.impact_page.st")
+def test_show_infoobject_impact_analysis_modo_lista(mock_st, mock_analyze, mock_batch, mock_app):
+    # En modo lista se analiza la lista pegada y no el análisis individual
+    mock_st.session_state = SimpleNamespace(
+        data_loaded=True,
+        global_inventory={"IOBJ": [{"name": "ZCUST"}]}
+    )
+    mock_st.radio.side_effect = lambda label, options, **kwargs: options[1]
+    mock_st.columns.side_effect = lambda n: [MagicMock() for _ in range(n)]
+    mock_st.text_area.return_value = "ZCUST\nCUBE:ZC01"
+    mock_st.file_uploader.return_value = None
+    mock_st.slider.return_value = 2
+    mock_st.selectbox.side_effect = lambda label, options, **kwargs: options[0]
+    mock_st.multiselect.side_effect = lambda label, options, default, **kwargs: default
+    mock_st.button.return_value = True
+    mock_batch.return_value = {
+        "seeds": ["IOBJ:ZCUST"], "missing": ["CUBE:ZC01"], "impacted_objects": [], "by_type": {},
+        "per_seed": {"IOBJ:ZCUST": 0}, "total_impacted": 0, "shared_impacted": 0, "analysis_depth": 2
+    }
+
+    show_infoobject_impact_analysis(mock_app)
+
+    mock_analyze.assert_not_called()
+    assert mock_batch.call_args[0][1] == ["IOBJ:ZCUST", "CUBE:ZC01"]
+    mock_st.download_button.assert_called_once()
+
+
+@patch("frontend.impact_page.store_cached_result")
+@patch("frontend.impact_page.iter_infoobject_impact_levels")
+@patch("frontend.impact_page.display_impact_analysis_with_sources")
+@patch("frontend.impact_page.st")
+def test_resultado_se_guarda_una_sola_vez_entre_reruns(mock_st, mock_display, mock_analyze, mock_store, mock_app):
+    # El grupo sigue en session_state tras terminar: los reruns lo muestran sin volver a guardarlo
+    mock_st.session_state = SimpleNamespace(data_loaded=True, global_inventory={"IOBJ": [{"name": "ZCUST"}]})
+    mock_st.columns.side_effect = lambda n: [MagicMock() for _ in range(n)]
+    mock_st.text_input.return_value = ""
+    mock_st.selectbox.side_effect = lambda label, options, **kwargs: options[0]
+    mock_st.slider.return_value = 3
+    mock_st.checkbox.side_effect = lambda label, value=True, help=None: value
+    mock_st.multiselect.side_effect = lambda label, options, default, help=None: default
+    mock_analyze.return_value = {"connected_objects": {"DS": []}, "relationships": [], "analysis_depth": 3}
+
+    mock_st.button.side_effect = lambda label, **kwargs: label.startswith("🔍")
+    show_infoobject_impact_analysis(mock_app)
+    mock_st.button.side_effect = lambda label, **kwargs: False
+    for _ in range(3):
+        show_infoobject_impact_analysis(mock_app)
+
+    mock_analyze.assert_called_once()
+    mock_store.assert_called_once()
+    assert mock_display.call_count == 4
+
+
+def test_get_level_rows_separa_arriba_y_abajo():
+    from frontend.job_progress import get_level_rows
+    relaciones = [
+        {"source": "DS:D1", "target": "IOBJ:I", "direction": "incoming", "depth": 1},
+        {"source": "IOBJ:I", "target": "CUBE:C", "direction": "outgoing", "depth": 1},
+        {"source": "CUBE:C", "target": "CUBE:C2", "direction": "outgoing", "depth": 2},
+        {"source": "DS:D1", "target": "CUBE:C", "direction": "incoming", "depth": 2},
+    ]
+    assert get_level_rows(relaciones, "incoming") == [{"Object": "D1", "Type": "DS", "Level": 1}]
+    assert [fila["Object"] for fila in get_level_rows(relaciones, "outgoing")] == ["C", "C2"]
+
+
+def test_detener_conserva_resultados_parciales():
+    # Al detener, el grupo se cancela y la página muestra lo calculado hasta ese nivel
+    from frontend.job_progress import show_job_progress
+    grupo = MagicMock()
+    grupo.done.return_value = False
+    with patch("frontend.job_progress.st") as st_progreso:
+        st_progreso.button.return_value = True
+        assert show_job_progress(grupo, "impact_jobs") is True
+    grupo.cancel.assert_called_once()
+
+
+def test_estimacion_avisa_si_el_recorrido_es_grande():
+    import networkx as nx
+    from frontend import job_progress
+    g = nx.DiGraph()
+    for i in range(30):
+        g.add_edge("IOBJ:HUB", f"CUBE:C{i}", type="usage_dimension")
+    with patch("frontend.job_progress.st") as st_mock, patch.object(job_progress, "LARGE_TRAVERSAL_NODES", 10):
+        st_mock.session_state = SimpleNamespace(graph=g)
+        niveles = job_progress.show_traversal_estimate("IOBJ:HUB", 2, ["usage_dimension"])
+        assert niveles[0]["total_nodes"] == 31
+        st_mock.caption.assert_called_once()
+        st_mock.warning.assert_called_once()
+
+        # Sin grafo (o nodo desconocido) no se estima nada
+        st_mock.session_state = SimpleNamespace()
+        assert job_progress.show_traversal_estimate("IOBJ:HUB", 2, None) is None
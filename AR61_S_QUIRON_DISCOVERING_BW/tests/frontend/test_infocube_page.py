@@ -9,7 +9,7 @@ def mock_app():
     return type("MockApp", (), {})()
 
 
-@patch("frontend.infocube_page.analyze_infocube_connections")
+@patch("frontend.infocube_page.iter_infocube_connection_levels")
 @patch("frontend.infocube_page.st")
 def test_show_infocube_connection_analysis_basic(mock_st, mock_analyze, mock_app):
     # Simula una InfoCube
@@ -54,3 +54,33 @@ def test_show_infocube_connection_analysis_basic(mock_st, mock_analyze, mock_app
     # Validaciones
     mock_st.header.assert_called_once_with("🧊 InfoCube Connection Analysis with Complete Source Tracing")
     mock_analyze.assert_called_once()
+
+
+@patch("frontend.infocube_page.st")
+def test_cubos_adicionales_se_conservan_al_cambiar_la_busqueda(mock_st, mock_app):
+    mock_st.session_state = SimpleNamespace(
+        data_loaded=True,
+        global_inventory={"CUBE": [{"name": name, "category": "Provider"} for name in ("ZSALES", "ZSALES2", "ZCOST")]}
+    )
+    mock_st.columns.side_effect = lambda n: [MagicMock() for _ in range(n)]
+    mock_st.selectbox.side_effect = lambda label, options, **kwargs: options[0]
+    mock_st.slider.return_value = 3
+    mock_st.checkbox.side_effect = lambda label, value=True, help=None: value
+    mock_st.button.return_value = False
+    opciones = []
+
+    def multiselect(label, options, default, help=None):
+        if label == "Also analyze:":
+            opciones.append(list(options))
+            return list(default) or [cube for cube in options if cube == "ZSALES2"]
+        return default
+    mock_st.multiselect.side_effect = multiselect
+
+    # Se elige ZSALES2 buscando "sales" y luego se busca otro cubo
+    mock_st.text_input.return_value = "sales"
+    show_infocube_connection_analysis(mock_app)
+    mock_st.text_input.return_value = "cost"
+    show_infocube_connection_analysis(mock_app)
+
+    assert opciones[-1] == ["ZSALES2"]
+    assert mock_st.session_state.infocube_extra_cubes == ["ZSALES2"]
@@ -1,7 +1,9 @@
+import networkx as nx
 import pytest
 from unittest.mock import patch, MagicMock
 from types import SimpleNamespace
 from frontend.object_explorer import show_object_explorer
+from backend.search_index import SearchResults, get_search_index
 
 
 @pytest.fixture
@@ -78,3 +80,45 @@ def test_show_object_explorer_initial(mock_st, mock_connection_stats, mock_app):
     mock_st.metric.assert_any_call("Total Objects", "2,500")
     mock_st.metric.assert_any_call("Connected Objects", "80.0%")
     mock_st.metric.assert_any_call("Isolated Objects", "20.0%")
+
+
+@patch("frontend.object_explorer.calculate_connection_percentages")
+@patch("frontend.object_explorer.st")
+def test_resultados_paginados_y_exportacion_completa(mock_st, mock_connection_stats, mock_app):
+    mock_connection_stats.return_value = {
+        "overall_connected_percentage": 50.0, "isolated_percentage": 50.0, "average_connections": 1.0, "by_object_type": {}
+    }
+    mock_st.columns.side_effect = lambda n: [MagicMock() for _ in range(n)]
+    mock_st.selectbox.side_effect = lambda *args, **kwargs: kwargs.get("options", [])[0]
+    mock_st.text_input.side_effect = lambda *args, **kwargs: ""
+    mock_st.multiselect.side_effect = lambda *args, **kwargs: []
+    mock_st.checkbox.return_value = True
+    mock_st.number_input.side_effect = lambda *args, **kwargs: kwargs.get("value", 0)
+    mock_st.button.side_effect = lambda label, **kwargs: label.startswith("📄")
+
+    inventario = {"IOBJ": [{"name": f"OBJ{i}", "icon": "🏷️", "type_name": "InfoObject", "category": "Metadata"}
+                           for i in range(120)]}
+    g = nx.DiGraph()
+    g.add_nodes_from(f"IOBJ:OBJ{i}" for i in range(120))
+    g.add_edges_from(("IOBJ:OBJ0", f"IOBJ:OBJ{i}") for i in range(1, 60))
+    indice = get_search_index(inventario, g)
+    mock_st.session_state = SimpleNamespace(
+        dataset_stats={"total_objects": 120}, data_loaded=True, global_inventory=inventario, graph=g,
+        explorer_results=SearchResults(indice, indice.search())
+    )
+
+    show_object_explorer(mock_app)
+
+    # Solo la página visible (50 filas, la primera opción) se convierte en filas
+    pagina = mock_st.dataframe.call_args[0][0]
+    assert len(pagina) == 50
+    assert pagina["Name"].iloc[0] == "OBJ0"
+    assert pagina["Connections"].is_monotonic_decreasing
+    mock_st.metric.assert_any_call("Total Results", 120)
+
+    # La exportación recorre todos los resultados, no solo la página
+    # y se entrega ya generada: download_button solo acepta texto o bytes en la versión fijada de streamlit
+    csv = mock_st.download_button.call_args_list[0].kwargs["data"]
+    assert isinstance(csv, (str, bytes))
+    assert len(csv.strip().splitlines()) == 121
+    assert csv.splitlines()[0].startswith("Icon,Name,Type")